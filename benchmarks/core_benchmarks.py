@@ -0,0 +1,154 @@
+"""Benchmarks for the per-call overhead of the ``sghi.etl.core`` interfaces.
+
+Run these benchmarks using ``tox -e benchmark``.
+"""
+
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import pytest
+from typing_extensions import override
+
+from sghi.etl.core import Processor, Sink, Source
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+@dataclass(slots=True)
+class ConstantSource(Source[int]):
+    """A :class:`Source` that does no work beyond returning a constant."""
+
+    _is_disposed: bool = field(default=False, init=False)
+
+    @override
+    def draw(self) -> int:
+        return 1
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class IdentityProcessor(Processor[int, int]):
+    """A :class:`Processor` that returns its input unchanged."""
+
+    _is_disposed: bool = field(default=False, init=False)
+
+    @override
+    def apply(self, raw_data: int) -> int:
+        return raw_data
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class NullSink(Sink[int]):
+    """A :class:`Sink` that discards everything it receives."""
+
+    _is_disposed: bool = field(default=False, init=False)
+
+    @override
+    def drain(self, processed_data: int) -> None:
+        return None
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@pytest.fixture
+def _ignore_deprecations() -> Iterator[None]:
+    """Silence the deprecation warnings raised by deprecated shims."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        yield
+
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+
+
+@pytest.mark.benchmark(group="source")
+def bench_source_draw(benchmark: BenchmarkFixture) -> None:
+    """Call :meth:`Source.draw` directly, as a baseline."""
+    benchmark(ConstantSource().draw)
+
+
+@pytest.mark.benchmark(group="source")
+def bench_source_call(benchmark: BenchmarkFixture) -> None:
+    """Call a :class:`Source` as a callable."""
+    benchmark(ConstantSource())
+
+
+@pytest.mark.benchmark(group="processor")
+def bench_processor_apply(benchmark: BenchmarkFixture) -> None:
+    """Call :meth:`Processor.apply` directly, as a baseline."""
+    benchmark(IdentityProcessor().apply, 1)
+
+
+@pytest.mark.benchmark(group="processor")
+def bench_processor_call(benchmark: BenchmarkFixture) -> None:
+    """Call a :class:`Processor` as a callable."""
+    benchmark(IdentityProcessor(), 1)
+
+
+@pytest.mark.benchmark(group="processor")
+@pytest.mark.usefixtures("_ignore_deprecations")
+def bench_processor_process(benchmark: BenchmarkFixture) -> None:
+    """Call the deprecated :meth:`Processor.process` shim."""
+    benchmark(IdentityProcessor().process, 1)  # type: ignore
+
+
+@pytest.mark.benchmark(group="sink")
+def bench_sink_drain(benchmark: BenchmarkFixture) -> None:
+    """Call :meth:`Sink.drain` directly, as a baseline."""
+    benchmark(NullSink().drain, 1)
+
+
+@pytest.mark.benchmark(group="sink")
+def bench_sink_call(benchmark: BenchmarkFixture) -> None:
+    """Call a :class:`Sink` as a callable."""
+    benchmark(NullSink(), 1)
+
+
+@pytest.mark.benchmark(group="disposable")
+def bench_disposable_context_manager(benchmark: BenchmarkFixture) -> None:
+    """Enter and exit a component used as a context manager."""
+
+    def setup() -> tuple[tuple[ConstantSource], dict[str, object]]:
+        return (ConstantSource(),), {}
+
+    def use(source: ConstantSource) -> None:
+        with source:
+            pass
+
+    benchmark.pedantic(use, setup=setup, rounds=10_000)
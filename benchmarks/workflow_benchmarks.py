@@ -0,0 +1,171 @@
+"""Benchmarks for the end-to-end throughput of synthetic workflows.
+
+Run these benchmarks using ``tox -e benchmark``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import pytest
+from typing_extensions import override
+
+from sghi.etl.core import Processor, Sink, Source, WorkflowDefinition
+from sghi.etl.executors import PipelinedWorkflowExecutor
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+_CHUNK_SIZE: int = 1_000
+
+_DATA_SIZES: tuple[int, ...] = (1_000, 10_000, 100_000)
+
+
+@dataclass(slots=True)
+class IntsSupplier(Source[list[int]]):
+    """A :class:`Source` that supplies integers in fixed size chunks."""
+
+    max_ints: int
+    _is_disposed: bool = field(default=False, init=False)
+
+    @override
+    def draw(self) -> list[int]:
+        return list(range(self.max_ints))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+    @override
+    def stream(self) -> Iterator[list[int]]:
+        for start in range(0, self.max_ints, _CHUNK_SIZE):
+            yield list(range(start, min(start + _CHUNK_SIZE, self.max_ints)))
+
+
+@dataclass(slots=True)
+class IntsToStrings(Processor[list[int], list[str]]):
+    """A :class:`Processor` that converts integers to strings."""
+
+    _is_disposed: bool = field(default=False, init=False)
+
+    @override
+    def apply(self, raw_data: list[int]) -> list[str]:
+        return list(map(str, raw_data))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class CountingSink(Sink[list[str]]):
+    """A :class:`Sink` that counts the values it receives."""
+
+    count: int = field(default=0)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @override
+    def drain(self, processed_data: list[str]) -> None:
+        self.count += len(processed_data)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(frozen=True, slots=True)
+class SyntheticWorkflow(WorkflowDefinition[list[int], list[str]]):
+    """A :class:`WorkflowDefinition` over a given number of integers."""
+
+    max_ints: int
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return None
+
+    @property
+    @override
+    def id(self) -> str:
+        return f"synthetic-{self.max_ints}"
+
+    @property
+    @override
+    def name(self) -> str:
+        return "Synthetic Workflow"
+
+    @property
+    @override
+    def processor_factory(
+        self,
+    ) -> Callable[[], Processor[list[int], list[str]]]:
+        return IntsToStrings
+
+    @property
+    @override
+    def sink_factory(self) -> Callable[[], Sink[list[str]]]:
+        return CountingSink
+
+    @property
+    @override
+    def source_factory(self) -> Callable[[], Source[list[int]]]:
+        return lambda: IntsSupplier(self.max_ints)
+
+
+def _run_serially(workflow: SyntheticWorkflow) -> None:
+    """Run a workflow in a single shot, one stage after the other."""
+    workflow.prologue()
+    try:
+        with (
+            workflow.source_factory() as source,
+            workflow.processor_factory() as processor,
+            workflow.sink_factory() as sink,
+        ):
+            sink(processor(source()))
+    finally:
+        workflow.epilogue()
+
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+
+
+@pytest.mark.benchmark(group="workflow-serial")
+@pytest.mark.parametrize("max_ints", _DATA_SIZES)
+def bench_serial_workflow(benchmark: BenchmarkFixture, max_ints: int) -> None:
+    """Run a synthetic workflow serially, in a single shot."""
+    benchmark(_run_serially, SyntheticWorkflow(max_ints))
+
+
+@pytest.mark.benchmark(group="workflow-pipelined")
+@pytest.mark.parametrize("max_ints", _DATA_SIZES)
+def bench_pipelined_workflow(
+    benchmark: BenchmarkFixture,
+    max_ints: int,
+) -> None:
+    """Run a synthetic workflow using the pipelined executor."""
+    benchmark(PipelinedWorkflowExecutor().execute, SyntheticWorkflow(max_ints))
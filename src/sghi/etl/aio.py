@@ -0,0 +1,707 @@
+"""Asyncio-native counterparts of the SGHI ETL workflow components.
+
+This module defines :class:`AsyncSource`, :class:`AsyncProcessor` and
+:class:`AsyncSink`, the asynchronous equivalents of the interfaces found in
+:mod:`sghi.etl.core`, together with adapters that convert components from one
+flavor to the other. The ``ToAsync*`` adapters run synchronous components on
+a thread pool so that they can be awaited from an event loop, while the
+``FromAsync*`` adapters drive asynchronous components from synchronous code.
+
+.. versionadded:: 1.3.0
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from abc import ABCMeta, abstractmethod
+from typing import TYPE_CHECKING, Any, Final, Generic, TypeVar, cast
+
+from typing_extensions import override
+
+from sghi.disposable import Disposable, not_disposed
+from sghi.etl.core import Processor, Sink, Source
+from sghi.utils import ensure_not_none
+
+if TYPE_CHECKING:
+    from collections.abc import (
+        AsyncIterable,
+        AsyncIterator,
+        Callable,
+        Coroutine,
+        Iterable,
+        Iterator,
+    )
+    from concurrent.futures import Executor
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_PDT = TypeVar("_PDT")
+"""Processed Data Type."""
+
+_RDT = TypeVar("_RDT")
+"""Raw Data Type."""
+
+_T = TypeVar("_T")
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+
+_EXHAUSTED: Final[object] = object()
+"""Returned in place of a chunk once a synchronous iterator is exhausted."""
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+async def _run_in_executor(
+    executor: Executor | None,
+    func: Callable[..., _T],
+    *args: Any,  # noqa: ANN401
+) -> _T:
+    """Run a blocking callable on the given executor and await its result.
+
+    When ``executor`` is ``None``, the default executor of the running event
+    loop is used.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args))
+
+
+async def _iterate_in_executor(
+    executor: Executor | None,
+    iterator: Iterator[_T],
+) -> AsyncIterator[_T]:
+    """Consume a blocking iterator on the given executor, one item at a time.
+
+    Each call to :func:`next` runs on the executor so that the event loop is
+    never blocked while the next item is being produced.
+    """
+    while True:
+        item: _T | object = await _run_in_executor(
+            executor,
+            _next_or_exhausted,
+            iterator,
+        )
+        if item is _EXHAUSTED:
+            return
+        yield cast("_T", item)
+
+
+def _iterate_on_loop(iterable: AsyncIterable[_T]) -> Iterator[_T]:
+    """Return a blocking iterator over an asynchronous iterable that MUST be
+    consumed off the running event loop, e.g. on an executor.
+
+    Each item is obtained on the running event loop, on which the
+    asynchronous iterable lives, while the caller blocks.
+    """  # noqa: D205
+    bridge = _AsyncToSyncBridge(asyncio.get_running_loop())
+    return bridge.iterate(aiter(iterable))
+
+
+def _next_or_exhausted(iterator: Iterator[_T]) -> _T | object:
+    """Return the next item of the given iterator, or :data:`_EXHAUSTED`.
+
+    :exc:`StopIteration` cannot cross the boundary of a future, so the end
+    of the iterator is reported with a sentinel instead.
+    """
+    return next(iterator, _EXHAUSTED)
+
+
+async def _anext(iterator: AsyncIterator[_T]) -> _T:
+    """Return the next item of the given asynchronous iterator."""
+    return await anext(iterator)
+
+
+class _AsyncToSyncBridge:
+    """Run coroutines to completion on behalf of synchronous callers.
+
+    When given an event loop, coroutines are submitted to it, which requires
+    the loop to be running on a different thread. Otherwise, a private event
+    loop is created on demand and reused by every call so that resources
+    bound to a loop, such as connections, remain usable across calls.
+    """
+
+    __slots__ = ("_loop", "_runner")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None) -> None:
+        super().__init__()
+        self._loop: asyncio.AbstractEventLoop | None = loop
+        self._runner: asyncio.Runner | None = None
+
+    def close(self) -> None:
+        if self._runner is not None:
+            self._runner.close()
+            self._runner = None
+
+    def iterate(self, iterator: AsyncIterator[_T]) -> Iterator[_T]:
+        while True:
+            try:
+                yield self.run(_anext(iterator))
+            except StopAsyncIteration:
+                return
+
+    def run(self, coro: Coroutine[Any, Any, _T]) -> _T:
+        if self._loop is not None:
+            future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+            return future.result()
+        if self._runner is None:
+            self._runner = asyncio.Runner()
+        return self._runner.run(coro)
+
+
+# =============================================================================
+# BASE INTERFACES
+# =============================================================================
+
+
+class AsyncSource(Disposable, Generic[_RDT], metaclass=ABCMeta):
+    """An entity that contains or provides data of interest, asynchronously.
+
+    This is the asynchronous counterpart of :class:`~sghi.etl.core.Source`.
+    Subclasses implementing this interface should override the :meth:`draw`
+    coroutine to specify how the data is obtained.
+
+    .. tip::
+
+        This class implements the :class:`~sghi.disposable.Disposable`
+        interface allowing for easy resource(s) management and clean up.
+    """
+
+    __slots__ = ()
+
+    async def __call__(self) -> _RDT:
+        """Obtain raw data from this :class:`data source<AsyncSource>`.
+
+        Call this ``AsyncSource`` instance as a callable. Delegate actual call
+        to :meth:`draw`.
+
+        :return: The raw data from this `AsyncSource`.
+        """
+        return await self.draw()
+
+    @abstractmethod
+    async def draw(self) -> _RDT:
+        """Obtain raw data from this :class:`data source<AsyncSource>`.
+
+        :return: The raw data from this `AsyncSource`.
+        """
+        ...
+
+    async def stream(self) -> AsyncIterator[_RDT]:
+        """Obtain raw data from this :class:`data source<AsyncSource>` in
+        chunks.
+
+        This is the asynchronous counterpart of
+        :meth:`sghi.etl.core.Source.stream`. The default implementation yields
+        the result of a single call to :meth:`draw` as the only chunk.
+
+        :return: An asynchronous iterator of raw data chunks from this
+            `AsyncSource`.
+        """  # noqa: D205
+        yield await self.draw()
+
+
+class AsyncProcessor(Disposable, Generic[_RDT, _PDT], metaclass=ABCMeta):
+    """The post-extraction transformation(s)/ops performed on raw data,
+    asynchronously.
+
+    This is the asynchronous counterpart of
+    :class:`~sghi.etl.core.Processor`. Subclasses implementing this interface
+    should override the :meth:`apply` coroutine to specify how the data
+    processing occurs.
+
+    .. tip::
+
+        This class implements the :class:`~sghi.disposable.Disposable`
+        interface allowing for easy resource(s) management and clean up.
+    """  # noqa: D205
+
+    __slots__ = ()
+
+    async def __call__(self, raw_data: _RDT) -> _PDT:
+        """Transform raw data into processed, clean data and return it.
+
+        Call this ``AsyncProcessor`` as a callable. Delegate actual call to
+        :meth:`apply`.
+
+        :param raw_data: The unprocessed data drawn from a `Source`.
+
+        :return: The processed, cleaned data that is ready for further
+            consumption downstream.
+        """
+        return await self.apply(raw_data)
+
+    @abstractmethod
+    async def apply(self, raw_data: _RDT) -> _PDT:
+        """Transform raw data into processed, clean data and return it.
+
+        :param raw_data: The unprocessed data drawn from a `Source`.
+
+        :return: The processed, cleaned data that is ready for further
+            consumption downstream.
+        """
+        ...
+
+    async def apply_stream(
+        self,
+        raw_data_chunks: AsyncIterable[_RDT],
+    ) -> AsyncIterator[_PDT]:
+        """Transform chunks of raw data into chunks of processed data.
+
+        This is the asynchronous counterpart of
+        :meth:`sghi.etl.core.Processor.apply_stream`. The default
+        implementation applies :meth:`apply` to each chunk in turn.
+
+        :param raw_data_chunks: An asynchronous iterable of unprocessed data
+            chunks drawn from a `Source`.
+
+        :return: An asynchronous iterator of processed data chunks that are
+            ready for further consumption downstream.
+        """
+        async for raw_data in raw_data_chunks:
+            yield await self.apply(raw_data)
+
+
+class AsyncSink(Disposable, Generic[_PDT], metaclass=ABCMeta):
+    """An entity that consumes processed data, asynchronously.
+
+    This is the asynchronous counterpart of :class:`~sghi.etl.core.Sink`.
+    Subclasses implementing this interface should override the :meth:`drain`
+    coroutine to specify how the processed data is consumed.
+
+    .. tip::
+
+        This class implements the :class:`~sghi.disposable.Disposable`
+        interface allowing for easy resource(s) management and clean up.
+    """
+
+    __slots__ = ()
+
+    async def __call__(self, processed_data: _PDT) -> None:
+        """Consume processed data.
+
+        Call this ``AsyncSink`` as a callable. Delegate actual call to
+        :meth:`drain`.
+
+        :param processed_data: The processed data to be consumed.
+
+        :return: None.
+        """
+        return await self.drain(processed_data)
+
+    @abstractmethod
+    async def drain(self, processed_data: _PDT) -> None:
+        """Consume processed data.
+
+        :param processed_data: The processed data to be consumed.
+
+        :return: None.
+        """
+        ...
+
+    async def drain_stream(
+        self,
+        processed_data_chunks: AsyncIterable[_PDT],
+    ) -> None:
+        """Consume chunks of processed data.
+
+        This is the asynchronous counterpart of
+        :meth:`sghi.etl.core.Sink.drain_stream`. The default implementation
+        awaits :meth:`drain` once for each chunk.
+
+        :param processed_data_chunks: An asynchronous iterable of processed
+            data chunks to be consumed.
+
+        :return: None.
+        """
+        async for processed_data in processed_data_chunks:
+            await self.drain(processed_data)
+
+
+# =============================================================================
+# SYNC TO ASYNC ADAPTERS
+# =============================================================================
+
+
+class ToAsyncSource(AsyncSource[_RDT], Generic[_RDT]):
+    """An :class:`AsyncSource` that wraps a synchronous ``Source``.
+
+    The blocking calls of the wrapped :class:`~sghi.etl.core.Source` are run
+    on a thread pool, leaving the event loop free to make progress on other
+    tasks in the meantime. Disposing this adapter also disposes the wrapped
+    ``Source``.
+    """
+
+    __slots__ = ("_executor", "_source")
+
+    def __init__(
+        self,
+        source: Source[_RDT],
+        executor: Executor | None = None,
+    ) -> None:
+        """Create a new ``ToAsyncSource`` instance.
+
+        :param source: The synchronous ``Source`` to wrap. MUST not be
+            ``None``.
+        :param executor: An optional executor on which to run the blocking
+            calls of the wrapped ``Source``. When not provided, the default
+            executor of the running event loop is used. The executor is NOT
+            shut down when this adapter is disposed.
+
+        :raise ValueError: If ``source`` is ``None``.
+        """
+        super().__init__()
+        self._source: Source[_RDT] = ensure_not_none(
+            source,
+            "'source' MUST not be None.",
+        )
+        self._executor: Executor | None = executor
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._source.is_disposed
+
+    @not_disposed
+    @override
+    async def draw(self) -> _RDT:
+        return await _run_in_executor(self._executor, self._source.draw)
+
+    @override
+    def dispose(self) -> None:
+        self._source.dispose()
+
+    @not_disposed
+    @override
+    async def stream(self) -> AsyncIterator[_RDT]:
+        chunks = _iterate_in_executor(self._executor, self._source.stream())
+        async for chunk in chunks:
+            yield chunk
+
+
+class ToAsyncProcessor(AsyncProcessor[_RDT, _PDT], Generic[_RDT, _PDT]):
+    """An :class:`AsyncProcessor` that wraps a synchronous ``Processor``.
+
+    The blocking calls of the wrapped :class:`~sghi.etl.core.Processor` are
+    run on a thread pool, leaving the event loop free to make progress on
+    other tasks in the meantime. Disposing this adapter also disposes the
+    wrapped ``Processor``.
+
+    The ``apply_stream`` method of the wrapped ``Processor`` runs on the
+    thread pool as well and pulls each chunk from the event loop in turn. The
+    executor MUST therefore have a spare worker when the chunks are produced
+    on it, e.g. by a :class:`ToAsyncSource` using the same executor.
+    """
+
+    __slots__ = ("_executor", "_processor")
+
+    def __init__(
+        self,
+        processor: Processor[_RDT, _PDT],
+        executor: Executor | None = None,
+    ) -> None:
+        """Create a new ``ToAsyncProcessor`` instance.
+
+        :param processor: The synchronous ``Processor`` to wrap. MUST not be
+            ``None``.
+        :param executor: An optional executor on which to run the blocking
+            calls of the wrapped ``Processor``. When not provided, the default
+            executor of the running event loop is used. The executor is NOT
+            shut down when this adapter is disposed.
+
+        :raise ValueError: If ``processor`` is ``None``.
+        """
+        super().__init__()
+        self._processor: Processor[_RDT, _PDT] = ensure_not_none(
+            processor,
+            "'processor' MUST not be None.",
+        )
+        self._executor: Executor | None = executor
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._processor.is_disposed
+
+    @not_disposed
+    @override
+    async def apply(self, raw_data: _RDT) -> _PDT:
+        return await _run_in_executor(
+            self._executor,
+            self._processor.apply,
+            raw_data,
+        )
+
+    @not_disposed
+    @override
+    async def apply_stream(
+        self,
+        raw_data_chunks: AsyncIterable[_RDT],
+    ) -> AsyncIterator[_PDT]:
+        raw_chunks = _iterate_on_loop(raw_data_chunks)
+        # Streaming methods may consume their input eagerly, so they are
+        # called off the event loop too.
+        processed_chunks: Iterator[_PDT] = await _run_in_executor(
+            self._executor,
+            self._processor.apply_stream,
+            raw_chunks,
+        )
+        async for chunk in _iterate_in_executor(
+            self._executor,
+            processed_chunks,
+        ):
+            yield chunk
+
+    @override
+    def dispose(self) -> None:
+        self._processor.dispose()
+
+
+class ToAsyncSink(AsyncSink[_PDT], Generic[_PDT]):
+    """An :class:`AsyncSink` that wraps a synchronous ``Sink``.
+
+    The blocking calls of the wrapped :class:`~sghi.etl.core.Sink` are run on
+    a thread pool, leaving the event loop free to make progress on other
+    tasks in the meantime. Disposing this adapter also disposes the wrapped
+    ``Sink``.
+
+    The ``drain_stream`` method of the wrapped ``Sink`` runs on the thread
+    pool as well and pulls each chunk from the event loop in turn. The
+    executor MUST therefore have a spare worker when the chunks are produced
+    on it, e.g. by a :class:`ToAsyncSource` using the same executor.
+    """
+
+    __slots__ = ("_executor", "_sink")
+
+    def __init__(
+        self,
+        sink: Sink[_PDT],
+        executor: Executor | None = None,
+    ) -> None:
+        """Create a new ``ToAsyncSink`` instance.
+
+        :param sink: The synchronous ``Sink`` to wrap. MUST not be ``None``.
+        :param executor: An optional executor on which to run the blocking
+            calls of the wrapped ``Sink``. When not provided, the default
+            executor of the running event loop is used. The executor is NOT
+            shut down when this adapter is disposed.
+
+        :raise ValueError: If ``sink`` is ``None``.
+        """
+        super().__init__()
+        self._sink: Sink[_PDT] = ensure_not_none(
+            sink,
+            "'sink' MUST not be None.",
+        )
+        self._executor: Executor | None = executor
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._sink.is_disposed
+
+    @not_disposed
+    @override
+    async def drain(self, processed_data: _PDT) -> None:
+        return await _run_in_executor(
+            self._executor,
+            self._sink.drain,
+            processed_data,
+        )
+
+    @not_disposed
+    @override
+    async def drain_stream(
+        self,
+        processed_data_chunks: AsyncIterable[_PDT],
+    ) -> None:
+        return await _run_in_executor(
+            self._executor,
+            self._sink.drain_stream,
+            _iterate_on_loop(processed_data_chunks),
+        )
+
+    @override
+    def dispose(self) -> None:
+        self._sink.dispose()
+
+
+# =============================================================================
+# ASYNC TO SYNC ADAPTERS
+# =============================================================================
+
+
+class FromAsyncSource(Source[_RDT], Generic[_RDT]):
+    """A synchronous ``Source`` that wraps an :class:`AsyncSource`.
+
+    Each call blocks until the corresponding coroutine of the wrapped
+    ``AsyncSource`` completes. When an event loop is given, the coroutines
+    are submitted to it and it MUST therefore be running on a different
+    thread. Otherwise, a private event loop owned by this adapter is used and
+    closed when this adapter is disposed; in that case, this adapter MUST NOT
+    be used from a thread that is already running an event loop. Disposing
+    this adapter also disposes the wrapped ``AsyncSource``.
+    """
+
+    __slots__ = ("_bridge", "_source")
+
+    def __init__(
+        self,
+        source: AsyncSource[_RDT],
+        loop: asyncio.AbstractEventLoop | None = None,
+    ) -> None:
+        """Create a new ``FromAsyncSource`` instance.
+
+        :param source: The ``AsyncSource`` to wrap. MUST not be ``None``.
+        :param loop: An optional event loop, running on a different thread,
+            on which to run the coroutines of the wrapped ``AsyncSource``.
+
+        :raise ValueError: If ``source`` is ``None``.
+        """
+        super().__init__()
+        self._source: AsyncSource[_RDT] = ensure_not_none(
+            source,
+            "'source' MUST not be None.",
+        )
+        self._bridge: _AsyncToSyncBridge = _AsyncToSyncBridge(loop)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._source.is_disposed
+
+    @not_disposed
+    @override
+    def draw(self) -> _RDT:
+        return self._bridge.run(self._source.draw())
+
+    @override
+    def dispose(self) -> None:
+        self._source.dispose()
+        self._bridge.close()
+
+    @not_disposed
+    @override
+    def stream(self) -> Iterator[_RDT]:
+        yield from self._bridge.iterate(aiter(self._source.stream()))
+
+
+class FromAsyncProcessor(Processor[_RDT, _PDT], Generic[_RDT, _PDT]):
+    """A synchronous ``Processor`` that wraps an :class:`AsyncProcessor`.
+
+    Each call blocks until the corresponding coroutine of the wrapped
+    ``AsyncProcessor`` completes. The event loop semantics are the same as
+    those of :class:`FromAsyncSource`. Disposing this adapter also disposes
+    the wrapped ``AsyncProcessor``.
+    """
+
+    __slots__ = ("_bridge", "_processor")
+
+    def __init__(
+        self,
+        processor: AsyncProcessor[_RDT, _PDT],
+        loop: asyncio.AbstractEventLoop | None = None,
+    ) -> None:
+        """Create a new ``FromAsyncProcessor`` instance.
+
+        :param processor: The ``AsyncProcessor`` to wrap. MUST not be
+            ``None``.
+        :param loop: An optional event loop, running on a different thread,
+            on which to run the coroutines of the wrapped ``AsyncProcessor``.
+
+        :raise ValueError: If ``processor`` is ``None``.
+        """
+        super().__init__()
+        self._processor: AsyncProcessor[_RDT, _PDT] = ensure_not_none(
+            processor,
+            "'processor' MUST not be None.",
+        )
+        self._bridge: _AsyncToSyncBridge = _AsyncToSyncBridge(loop)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._processor.is_disposed
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: _RDT) -> _PDT:
+        return self._bridge.run(self._processor.apply(raw_data))
+
+    @not_disposed
+    @override
+    def apply_stream(self, raw_data_chunks: Iterable[_RDT]) -> Iterator[_PDT]:
+        raw_chunks = _iterate_in_executor(None, iter(raw_data_chunks))
+        yield from self._bridge.iterate(
+            aiter(self._processor.apply_stream(raw_chunks)),
+        )
+
+    @override
+    def dispose(self) -> None:
+        self._processor.dispose()
+        self._bridge.close()
+
+
+class FromAsyncSink(Sink[_PDT], Generic[_PDT]):
+    """A synchronous ``Sink`` that wraps an :class:`AsyncSink`.
+
+    Each call blocks until the corresponding coroutine of the wrapped
+    ``AsyncSink`` completes. The event loop semantics are the same as those
+    of :class:`FromAsyncSource`. Disposing this adapter also disposes the
+    wrapped ``AsyncSink``.
+    """
+
+    __slots__ = ("_bridge", "_sink")
+
+    def __init__(
+        self,
+        sink: AsyncSink[_PDT],
+        loop: asyncio.AbstractEventLoop | None = None,
+    ) -> None:
+        """Create a new ``FromAsyncSink`` instance.
+
+        :param sink: The ``AsyncSink`` to wrap. MUST not be ``None``.
+        :param loop: An optional event loop, running on a different thread,
+            on which to run the coroutines of the wrapped ``AsyncSink``.
+
+        :raise ValueError: If ``sink`` is ``None``.
+        """
+        super().__init__()
+        self._sink: AsyncSink[_PDT] = ensure_not_none(
+            sink,
+            "'sink' MUST not be None.",
+        )
+        self._bridge: _AsyncToSyncBridge = _AsyncToSyncBridge(loop)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._sink.is_disposed
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: _PDT) -> None:
+        return self._bridge.run(self._sink.drain(processed_data))
+
+    @not_disposed
+    @override
+    def drain_stream(self, processed_data_chunks: Iterable[_PDT]) -> None:
+        processed_chunks = _iterate_in_executor(
+            None,
+            iter(processed_data_chunks),
+        )
+        return self._bridge.run(self._sink.drain_stream(processed_chunks))
+
+    @override
+    def dispose(self) -> None:
+        self._sink.dispose()
+        self._bridge.close()
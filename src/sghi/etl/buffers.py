@@ -0,0 +1,335 @@
+"""Buffers for handing chunks of data between the stages of a workflow.
+
+When a stage is slower than the stage feeding it, the chunks produced in
+the meantime have to be held somewhere. Holding them all in memory risks
+running out of it, while blocking the faster stage slows down the whole
+workflow. A :class:`SpillBuffer` keeps chunks in memory up to a budget and
+writes the rest to a temporary file, reading them back through a memory map
+when they are needed, so that workflows larger than the available memory can
+run to completion.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import pickle
+import queue
+import sys
+import tempfile
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Any, Generic, TypeVar
+
+from typing_extensions import override
+
+from sghi.disposable import Disposable, not_disposed
+from sghi.utils import ensure_not_none, type_fqn
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True, slots=True)
+class _SpilledChunk:
+    """The location of a chunk written to the spill file."""
+
+    offset: int
+    size: int
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+def estimate_size(obj: object) -> int:
+    """Estimate the memory used by an object and the objects it contains.
+
+    Containers, i.e. lists, tuples, sets and dictionaries, are traversed
+    recursively, while the sizes of :class:`memoryview` instances are those
+    of the memory they expose. Every object is counted at most once. The
+    result is an approximation meant for budgeting, not an exact figure.
+
+    :param obj: The object to measure.
+
+    :return: The estimated size of the object, in bytes.
+
+    .. versionadded:: 1.3.0
+    """
+    seen: set[int] = set()
+    pending: list[object] = [obj]
+    size: int = 0
+    while pending:
+        current = pending.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, memoryview):
+            size += sys.getsizeof(current) + current.nbytes
+            continue
+        size += sys.getsizeof(current)
+        if isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, list | tuple | set | frozenset):
+            pending.extend(current)
+    return size
+
+
+# =============================================================================
+# BUFFERS
+# =============================================================================
+
+
+class SpillBuffer(Disposable, Generic[_T]):
+    """A first-in, first-out buffer that spills to disk once a memory budget
+    is exceeded.
+
+    Chunks are kept in memory for as long as their total estimated size
+    stays within ``memory_budget``. Chunks that would exceed the budget are
+    pickled and appended to a temporary file instead. They are read back,
+    through a memory map of that file, when their turn to be taken comes, so
+    consumers see every chunk in the order it was added regardless of where
+    it was kept. The file is truncated whenever all the spilled chunks have
+    been taken. Chunks that may be spilled MUST therefore be picklable.
+
+    A ``SpillBuffer`` is unbounded, so producers never block. Consumers
+    block in :meth:`get` until a chunk is available, or until the buffer is
+    closed and empty. It is safe for use by a producer and a consumer on
+    different threads.
+
+    Disposing a ``SpillBuffer`` discards any chunks left in it and deletes
+    its temporary file.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_chunks",
+        "_condition",
+        "_directory",
+        "_file",
+        "_is_closed",
+        "_is_disposed",
+        "_logger",
+        "_map",
+        "_memory_budget",
+        "_memory_usage",
+        "_sizer",
+        "_spilled_chunks",
+    )
+
+    def __init__(
+        self,
+        memory_budget: int,
+        directory: str | None = None,
+        sizer: Callable[[Any], int] = estimate_size,
+    ) -> None:
+        """Create a new ``SpillBuffer`` instance.
+
+        :param memory_budget: The maximum total size, in bytes, of the
+            chunks kept in memory. MUST not be negative. A value of zero
+            spills every chunk.
+        :param directory: The directory in which to create the spill file.
+            Defaults to the platform's temporary directory.
+        :param sizer: A function that estimates the size, in bytes, of a
+            chunk. MUST not be ``None``. Defaults to :func:`estimate_size`.
+
+        :raise ValueError: If ``memory_budget`` is negative or if ``sizer``
+            is ``None``.
+        """
+        super().__init__()
+        if memory_budget < 0:
+            _err_msg: str = "'memory_budget' MUST not be negative."
+            raise ValueError(_err_msg)
+        self._memory_budget: int = memory_budget
+        self._directory: str | None = directory
+        self._sizer: Callable[[Any], int] = ensure_not_none(
+            sizer,
+            "'sizer' MUST not be None.",
+        )
+        self._chunks: deque[tuple[Any, int]] = deque()
+        self._memory_usage: int = 0
+        self._spilled_chunks: int = 0
+        self._file: IO[bytes] | None = None
+        self._map: mmap.mmap | None = None
+        self._is_closed: bool = False
+        self._is_disposed: bool = False
+        self._condition: threading.Condition = threading.Condition()
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    def __iter__(self) -> Iterator[_T]:
+        """Take chunks from this buffer until it is closed and empty.
+
+        :return: An iterator over the chunks of this buffer.
+        """
+        while True:
+            try:
+                yield self.get()
+            except EOFError:
+                return
+
+    def __len__(self) -> int:
+        """Return the number of chunks held in memory or on disk."""
+        with self._condition:
+            return len(self._chunks)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def memory_usage(self) -> int:
+        """The estimated total size, in bytes, of the chunks held in memory.
+
+        :return: The estimated total size of the chunks held in memory.
+        """
+        with self._condition:
+            return self._memory_usage
+
+    @property
+    def spilled_chunks(self) -> int:
+        """The number of chunks currently held on disk.
+
+        :return: The number of chunks currently held on disk.
+        """
+        with self._condition:
+            return self._spilled_chunks
+
+    @not_disposed
+    def close(self) -> None:
+        """Mark the end of the chunks added to this buffer.
+
+        Consumers can still take the remaining chunks, after which
+        :meth:`get` raises an :exc:`EOFError`.
+
+        :return: None.
+        """
+        with self._condition:
+            self._is_closed = True
+            self._condition.notify_all()
+
+    @override
+    def dispose(self) -> None:
+        with self._condition:
+            if self._is_disposed:
+                return
+            self._is_disposed = True
+            self._chunks.clear()
+            self._memory_usage = self._spilled_chunks = 0
+            self._release_spill_file()
+            self._condition.notify_all()
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    def get(self, timeout: float | None = None) -> _T:
+        """Take the oldest chunk from this buffer, waiting for one to be
+        added if the buffer is empty.
+
+        :param timeout: The maximum time, in seconds, to wait for a chunk.
+            Defaults to waiting indefinitely.
+
+        :return: The oldest chunk in this buffer.
+
+        :raise EOFError: If this buffer is closed and empty.
+        :raise queue.Empty: If no chunk is added within ``timeout`` seconds.
+        """  # noqa: D205
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._chunks or self._is_closed or self._is_disposed,
+                timeout=timeout,
+            ):
+                raise queue.Empty
+            if not self._chunks:
+                _err_msg: str = "The buffer is closed and empty."
+                raise EOFError(_err_msg)
+            chunk, size = self._chunks.popleft()
+            if not isinstance(chunk, _SpilledChunk):
+                self._memory_usage -= size
+                return chunk
+            data: bytes = self._read(chunk)
+            self._spilled_chunks -= 1
+            if not self._spilled_chunks:
+                self._reset_spill_file()
+        return pickle.loads(data)  # noqa: S301
+
+    @not_disposed
+    def put(self, chunk: _T) -> None:
+        """Add a chunk to this buffer.
+
+        The chunk is kept in memory if that does not exceed the memory
+        budget, otherwise it is written to disk.
+
+        :param chunk: The chunk to add.
+
+        :return: None.
+
+        :raise ValueError: If this buffer is closed.
+        """
+        size: int = self._sizer(chunk)
+        with self._condition:
+            if self._is_closed:
+                _err_msg: str = "Cannot add chunks to a closed buffer."
+                raise ValueError(_err_msg)
+            if self._memory_usage + size <= self._memory_budget:
+                self._chunks.append((chunk, size))
+                self._memory_usage += size
+            else:
+                self._chunks.append((self._write(chunk), 0))
+                self._spilled_chunks += 1
+            self._condition.notify_all()
+
+    def _read(self, chunk: _SpilledChunk) -> bytes:
+        end: int = chunk.offset + chunk.size
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+            assert self._file is not None
+            self._map = mmap.mmap(
+                self._file.fileno(),
+                0,
+                access=mmap.ACCESS_READ,
+            )
+        return self._map[chunk.offset : end]
+
+    def _release_spill_file(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _reset_spill_file(self) -> None:
+        # Only called once a spilled chunk has been read, by which time both
+        # the spill file and its memory map exist.
+        assert self._file is not None
+        assert self._map is not None
+        self._map.close()
+        self._map = None
+        self._file.seek(0)
+        self._file.truncate()
+
+    def _write(self, chunk: _T) -> _SpilledChunk:
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(  # noqa: SIM115
+                prefix="sghi-etl-spill-",
+                dir=self._directory,
+            )
+            self._logger.debug("Memory budget exceeded, spilling to disk.")
+        data: bytes = pickle.dumps(chunk, protocol=pickle.HIGHEST_PROTOCOL)
+        offset: int = self._file.seek(0, 2)
+        self._file.write(data)
+        self._file.flush()
+        return _SpilledChunk(offset=offset, size=len(data))
@@ -0,0 +1,632 @@
+"""A columnar record batch contract for passing data between stages.
+
+Handing data between stages as lists of dictionaries is convenient but
+expensive: every record carries its own copy of the keys, and every stage
+that touches the data rebuilds it. A :class:`RecordBatch` instead stores a
+batch of records column by column. Numeric columns are kept in contiguous
+buffers exposed through the Python buffer protocol, as :class:`memoryview`
+instances, so that they can be sliced, shared between stages and handed to
+vectorized libraries such as NumPy or Apache Arrow without being copied.
+
+Components declare that they produce or consume record batches by
+implementing :class:`ColumnarSource`, :class:`ColumnarProcessor` or
+:class:`ColumnarSink`. The :class:`RecordsToBatch` and
+:class:`BatchToRecords` processors convert between record batches and lists
+of records, so that columnar components can be mixed with record-oriented
+ones.
+
+`Apache Arrow`_ support is optional and requires the ``pyarrow`` package,
+available through the ``arrow`` extra, to be installed. Everything else in
+this module only depends on the standard library.
+
+.. _Apache Arrow: https://arrow.apache.org/
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+from array import array
+from collections.abc import Iterable, Mapping, Sequence
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Literal, TypeAlias
+
+from typing_extensions import override
+
+from sghi.disposable import not_disposed
+from sghi.etl.core import Processor, Sink, Source
+from sghi.utils import ensure_not_none, ensure_not_none_nor_empty, type_fqn
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_BufferFormat: TypeAlias = Literal[
+    "b",
+    "B",
+    "d",
+    "f",
+    "h",
+    "H",
+    "i",
+    "I",
+    "q",
+    "Q",
+]
+"""The :mod:`struct` format characters of the buffer columns shared with
+Arrow.
+"""
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+
+_ARROW_TYPE_TO_FORMAT: Mapping[str, _BufferFormat] = MappingProxyType(
+    {
+        "double": "d",
+        "float": "f",
+        "int8": "b",
+        "int16": "h",
+        "int32": "i",
+        "int64": "q",
+        "uint8": "B",
+        "uint16": "H",
+        "uint32": "I",
+        "uint64": "Q",
+    },
+)
+"""Arrow primitive types whose values can be shared with Python without
+copying, mapped to their :mod:`struct` format characters.
+"""
+
+_INTEGER_FORMATS: Mapping[int, tuple[_BufferFormat, _BufferFormat]] = (
+    MappingProxyType(
+        {1: ("b", "B"), 2: ("h", "H"), 4: ("i", "I"), 8: ("q", "Q")}
+    )
+)
+"""The signed and unsigned :mod:`struct` format characters of the buffer
+columns shared with Arrow, keyed by the size of their items in bytes.
+"""
+
+_NATIVE_ORDER_PREFIXES: str = "@=<" if sys.byteorder == "little" else "@=>!"
+"""The :mod:`struct` byte order prefixes that denote the native byte
+order, which is the byte order used by Arrow buffers.
+"""
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+def _as_column(values: Sequence[Any]) -> Sequence[Any]:
+    """Return the given column values in the form stored by a
+    :class:`RecordBatch`.
+
+    Values that support the buffer protocol are wrapped in a
+    :class:`memoryview`, without being copied. Other sequences are stored
+    as is.
+    """  # noqa: D205
+    try:
+        view = memoryview(values)  # pyright: ignore[reportArgumentType]
+    except (TypeError, ValueError):
+        return values
+    if view.ndim != 1:
+        _err_msg: str = "Buffer columns MUST be one-dimensional."
+        raise ValueError(_err_msg)
+    return values if isinstance(values, memoryview) else view
+
+
+def _compact(values: list[Any]) -> Sequence[Any]:
+    """Pack a list of plain integers or floats into a contiguous buffer.
+
+    Lists containing any other values, including ``None`` and booleans, are
+    returned unchanged.
+    """
+    if values and all(type(_value) is int for _value in values):
+        try:
+            return memoryview(array("q", values))
+        except OverflowError:
+            return values
+    if values and all(type(_value) is float for _value in values):
+        return memoryview(array("d", values))
+    return values
+
+
+def _buffer_format(view: memoryview) -> _BufferFormat | None:
+    """Return the format of a buffer column in the form used by
+    :data:`_ARROW_TYPE_TO_FORMAT`, or ``None`` if Arrow cannot share it.
+
+    Buffers report their format as it was declared, e.g. ``"l"`` for an
+    ``array("l")`` or ``"<q"`` for a NumPy ``int64`` array. The byte order
+    prefix is dropped if it denotes the native byte order, and integer
+    formats are mapped to the format with the same item size.
+    """  # noqa: D205
+    format_: str = view.format
+    if format_[:1] in _NATIVE_ORDER_PREFIXES:
+        format_ = format_[1:]
+    if not view.contiguous or len(format_) != 1:
+        return None
+    if format_ in "bhilqnBHILQN":
+        signed, unsigned = _INTEGER_FORMATS.get(view.itemsize, (None, None))
+        return signed if format_.islower() else unsigned
+    if format_ in ("d", "f"):
+        return format_
+    return None
+
+
+def _import_pyarrow() -> Any:  # noqa: ANN401
+    try:
+        import pyarrow
+    except ImportError as exp:
+        _err_msg: str = (
+            "The 'pyarrow' package is required for Apache Arrow support. "
+            "Install it using the 'arrow' extra."
+        )
+        raise ImportError(_err_msg) from exp
+    return pyarrow
+
+
+# =============================================================================
+# RECORD BATCH
+# =============================================================================
+
+
+class RecordBatch:
+    """An immutable batch of records stored column by column.
+
+    Each column is a sequence of values, one per record, and all the columns
+    of a batch have the same length. Columns that support the buffer
+    protocol, e.g. :class:`array.array` instances or NumPy arrays, are
+    stored as :class:`memoryview` instances that share memory with the
+    original object. Other sequences, e.g. lists, are stored as given.
+
+    Operations that derive a new batch from an existing one, such as
+    :meth:`select`, :meth:`with_column` and :meth:`slice`, reuse the
+    existing columns rather than copying them, except that slicing a
+    non-buffer column creates a new list. Columns MUST therefore NOT be
+    modified once they have been added to a batch.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = ("_columns", "_num_rows")
+
+    def __init__(self, columns: Mapping[str, Sequence[Any]]) -> None:
+        """Create a new ``RecordBatch`` instance.
+
+        :param columns: A mapping of column names to column values. MUST not
+            be ``None``. All the columns MUST have the same length, and
+            buffer columns MUST be one-dimensional.
+
+        :raise ValueError: If ``columns`` is ``None``, if the columns have
+            different lengths or if a buffer column is NOT one-dimensional.
+        """
+        super().__init__()
+        ensure_not_none(columns, "'columns' MUST not be None.")
+        self._columns: dict[str, Sequence[Any]] = {
+            _name: _as_column(_values) for _name, _values in columns.items()
+        }
+        lengths: set[int] = {len(_col) for _col in self._columns.values()}
+        if len(lengths) > 1:
+            _err_msg: str = "All columns MUST have the same length."
+            raise ValueError(_err_msg)
+        self._num_rows: int = lengths.pop() if lengths else 0
+
+    def __contains__(self, name: object) -> bool:
+        """Check whether this batch has a column with the given name."""
+        return name in self._columns
+
+    def __eq__(self, other: object) -> bool:
+        """Compare two batches by their column names and values."""
+        if not isinstance(other, RecordBatch):
+            return NotImplemented
+        return self.column_names == other.column_names and all(
+            list(self._columns[_name]) == list(other._columns[_name])
+            for _name in self._columns
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __len__(self) -> int:
+        """Return the number of records in this batch."""
+        return self._num_rows
+
+    def __repr__(self) -> str:
+        """Return a summary of the columns and size of this batch."""
+        return (
+            f"RecordBatch(column_names={self.column_names!r}, "
+            f"num_rows={self._num_rows})"
+        )
+
+    @property
+    def column_names(self) -> tuple[str, ...]:
+        """The names of the columns of this batch, in order.
+
+        :return: The names of the columns of this batch, in order.
+        """
+        return tuple(self._columns)
+
+    @property
+    def columns(self) -> Mapping[str, Sequence[Any]]:
+        """A read-only mapping of the column names to their values.
+
+        :return: A read-only mapping of the column names to their values.
+        """
+        return MappingProxyType(self._columns)
+
+    @property
+    def num_rows(self) -> int:
+        """The number of records in this batch.
+
+        :return: The number of records in this batch.
+        """
+        return self._num_rows
+
+    def column(self, name: str) -> Sequence[Any]:
+        """Return the values of the given column.
+
+        :param name: The name of the column.
+
+        :return: The values of the column. Buffer columns are returned as
+            :class:`memoryview` instances.
+
+        :raise KeyError: If this batch has no column with the given name.
+        """
+        try:
+            return self._columns[name]
+        except KeyError:
+            _err_msg: str = f"No column named '{name}' exists in the batch."
+            raise KeyError(_err_msg) from None
+
+    def iter_records(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the records of this batch, one dictionary per record.
+
+        :return: An iterator over the records of this batch.
+        """
+        names: tuple[str, ...] = self.column_names
+        for values in zip(*self._columns.values(), strict=True):
+            yield dict(zip(names, values, strict=True))
+
+    def select(self, names: Iterable[str]) -> RecordBatch:
+        """Return a batch with only the given columns, in the given order.
+
+        The columns are shared with this batch, not copied.
+
+        :param names: The names of the columns to keep.
+
+        :return: A batch with only the given columns.
+
+        :raise KeyError: If any of the columns does not exist.
+        """
+        return RecordBatch({_name: self.column(_name) for _name in names})
+
+    def slice(self, start: int, stop: int | None = None) -> RecordBatch:
+        """Return a batch with the records between ``start`` and ``stop``.
+
+        Buffer columns are sliced without being copied.
+
+        :param start: The index of the first record to include.
+        :param stop: The index after the last record to include. Defaults
+            to the end of the batch.
+
+        :return: A batch with the records in the given range.
+        """
+        return RecordBatch(
+            {
+                _name: _values[start:stop]
+                for _name, _values in self._columns.items()
+            },
+        )
+
+    def to_arrow(self) -> Any:  # noqa: ANN401
+        """Convert this batch to a ``pyarrow.RecordBatch``.
+
+        Contiguous buffer columns of native byte order whose format matches
+        an Arrow primitive type, e.g. ``array("l")`` or NumPy ``int64``
+        columns, are handed to Arrow without being copied. The other columns
+        are converted.
+
+        :return: An equivalent ``pyarrow.RecordBatch``.
+
+        :raise ImportError: If ``pyarrow`` is not installed.
+        """
+        pa = _import_pyarrow()
+        types: dict[str, str] = {
+            _format: _type for _type, _format in _ARROW_TYPE_TO_FORMAT.items()
+        }
+        arrays: list[Any] = []
+        for values in self._columns.values():
+            format_: _BufferFormat | None = (
+                _buffer_format(values)
+                if isinstance(values, memoryview)
+                else None
+            )
+            if format_ is not None:
+                arrays.append(
+                    pa.Array.from_buffers(
+                        pa.type_for_alias(types[format_]),
+                        len(values),
+                        [None, pa.py_buffer(values)],
+                    ),
+                )
+            else:
+                arrays.append(pa.array(list(values)))
+        return pa.RecordBatch.from_arrays(arrays, names=self.column_names)
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """Return the records of this batch as a list of dictionaries.
+
+        :return: The records of this batch.
+        """
+        return list(self.iter_records())
+
+    def with_column(self, name: str, values: Sequence[Any]) -> RecordBatch:
+        """Return a batch with the given column added, or replaced if a
+        column with the same name already exists.
+
+        The other columns are shared with this batch, not copied.
+
+        :param name: The name of the column.
+        :param values: The values of the column. MUST have as many values as
+            this batch has records.
+
+        :return: A batch with the given column.
+
+        :raise ValueError: If ``values`` has the wrong length.
+        """  # noqa: D205
+        return RecordBatch({**self._columns, name: values})
+
+    @classmethod
+    def from_arrow(cls, data: Any) -> RecordBatch:  # noqa: ANN401
+        """Create a batch from a ``pyarrow.RecordBatch`` or
+        ``pyarrow.Table``.
+
+        Columns of primitive numeric types without null values are shared
+        with Arrow without being copied. The other columns are converted to
+        lists.
+
+        :param data: The Arrow batch or table to convert. MUST not be
+            ``None``.
+
+        :return: An equivalent ``RecordBatch``.
+
+        :raise ValueError: If ``data`` is ``None``.
+        """  # noqa: D205
+        ensure_not_none(data, "'data' MUST not be None.")
+        columns: dict[str, Sequence[Any]] = {}
+        for name, values in zip(data.schema.names, data.columns, strict=True):
+            if hasattr(values, "combine_chunks"):
+                values = values.combine_chunks()  # noqa: PLW2901
+            format_: _BufferFormat | None = _ARROW_TYPE_TO_FORMAT.get(
+                str(values.type),
+            )
+            if format_ is not None and values.null_count == 0:
+                view = memoryview(values.buffers()[1]).cast(format_)
+                start: int = values.offset
+                columns[name] = view[start : start + len(values)]
+            else:
+                columns[name] = values.to_pylist()
+        return cls(columns)
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Mapping[str, Any]],
+        column_names: Sequence[str] | None = None,
+    ) -> RecordBatch:
+        """Create a batch from an iterable of records.
+
+        Columns made up entirely of integers or entirely of floats are
+        packed into contiguous buffers. Missing values are set to ``None``.
+
+        :param records: The records to include. MUST not be ``None``.
+        :param column_names: The columns to include, in order. Defaults to
+            the keys of the first record.
+
+        :return: A batch with the given records.
+
+        :raise ValueError: If ``records`` is ``None``.
+        """
+        ensure_not_none(records, "'records' MUST not be None.")
+        rows: list[Mapping[str, Any]] = list(records)
+        names: Sequence[str] = (
+            column_names
+            if column_names is not None
+            else (tuple(rows[0]) if rows else ())
+        )
+        return cls(
+            {
+                _name: _compact([_row.get(_name) for _row in rows])
+                for _name in names
+            },
+        )
+
+
+# =============================================================================
+# COLUMNAR COMPONENTS
+# =============================================================================
+
+
+class ColumnarSource(Source[RecordBatch]):
+    """A :class:`~sghi.etl.core.Source` that produces :class:`RecordBatch`
+    instances.
+
+    Implementing this interface declares that the ``Source`` draws, or
+    streams, its data as record batches.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ()
+
+
+class ColumnarProcessor(Processor[RecordBatch, RecordBatch]):
+    """A :class:`~sghi.etl.core.Processor` that transforms
+    :class:`RecordBatch` instances.
+
+    Implementing this interface declares that the ``Processor`` both
+    consumes and produces record batches. Implementations SHOULD operate on
+    whole columns and reuse the columns they do not change.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ()
+
+
+class ColumnarSink(Sink[RecordBatch]):
+    """A :class:`~sghi.etl.core.Sink` that consumes :class:`RecordBatch`
+    instances.
+
+    Implementing this interface declares that the ``Sink`` drains its data
+    as record batches.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ()
+
+
+class ColumnTransform(ColumnarProcessor):
+    """A :class:`ColumnarProcessor` that applies a vectorized function to a
+    column.
+
+    The function receives a whole column, e.g. a :class:`memoryview` that
+    can be wrapped by ``numpy.frombuffer`` without copying, and returns the
+    transformed column. The result is stored under ``output``, or replaces
+    the input column if no ``output`` is given. All the other columns are
+    passed through untouched.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ("_column", "_function", "_is_disposed", "_logger", "_output")
+
+    def __init__(
+        self,
+        column: str,
+        function: Callable[[Sequence[Any]], Sequence[Any]],
+        output: str | None = None,
+    ) -> None:
+        """Create a new ``ColumnTransform`` instance.
+
+        :param column: The name of the column to transform. MUST not be
+            ``None`` or empty.
+        :param function: The function to apply to the column. It MUST
+            return as many values as it receives. MUST not be ``None``.
+        :param output: The name of the column to store the result in.
+            Defaults to ``column``.
+
+        :raise ValueError: If ``column`` is ``None`` or empty, or if
+            ``function`` is ``None``.
+        """
+        super().__init__()
+        self._column: str = ensure_not_none_nor_empty(
+            column,
+            "'column' MUST not be None or empty.",
+        )
+        self._function: Callable[[Sequence[Any]], Sequence[Any]] = (
+            ensure_not_none(function, "'function' MUST not be None.")
+        )
+        self._output: str = output or column
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: RecordBatch) -> RecordBatch:
+        return raw_data.with_column(
+            self._output,
+            self._function(raw_data.column(self._column)),
+        )
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        self._logger.debug("Disposal complete.")
+
+
+class RecordsToBatch(Processor[Iterable[Mapping[str, Any]], RecordBatch]):
+    """A :class:`~sghi.etl.core.Processor` that converts records into a
+    :class:`RecordBatch`.
+
+    Use this ``Processor`` to feed the output of a record-oriented
+    component to columnar ones.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ("_column_names", "_is_disposed", "_logger")
+
+    def __init__(self, column_names: Sequence[str] | None = None) -> None:
+        """Create a new ``RecordsToBatch`` instance.
+
+        :param column_names: The columns to include, in order. Defaults to
+            the keys of the first record of each chunk.
+        """
+        super().__init__()
+        self._column_names: Sequence[str] | None = column_names
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: Iterable[Mapping[str, Any]]) -> RecordBatch:
+        return RecordBatch.from_records(raw_data, self._column_names)
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        self._logger.debug("Disposal complete.")
+
+
+class BatchToRecords(Processor[RecordBatch, list[dict[str, Any]]]):
+    """A :class:`~sghi.etl.core.Processor` that converts a
+    :class:`RecordBatch` into a list of records.
+
+    Use this ``Processor`` to feed the output of columnar components to a
+    record-oriented one.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ("_is_disposed", "_logger")
+
+    def __init__(self) -> None:
+        """Create a new ``BatchToRecords`` instance."""
+        super().__init__()
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: RecordBatch) -> list[dict[str, Any]]:
+        return raw_data.to_records()
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        self._logger.debug("Disposal complete.")
@@ -3,14 +3,14 @@
 from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
-from typing import TYPE_CHECKING, Generic, TypeVar
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
 
 from typing_extensions import deprecated
 
 from sghi.disposable import Disposable
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterable, Iterator
 
 # =============================================================================
 # TYPES
@@ -77,6 +77,26 @@ class Source(Disposable, Generic[_RDT], metaclass=ABCMeta):
         """
         ...
 
+    def stream(self) -> Iterator[_RDT]:
+        """Obtain raw data from this :class:`data source<Source>` in chunks.
+
+        This is the streaming counterpart of :meth:`draw`. Each yielded chunk
+        is itself an instance of the raw data type, i.e. a partial draw, and
+        chunks are only obtained as they are requested. This allows workflows
+        that process large amounts of data to run in bounded memory, provided
+        that the downstream :class:`Processor` and :class:`Sink` consume the
+        chunks as they arrive.
+
+        The default implementation yields the result of a single call to
+        :meth:`draw` as the only chunk. Subclasses that can provide their data
+        incrementally should override this method.
+
+        .. versionadded:: 1.3.0
+
+        :return: An iterator of raw data chunks from this `Source`.
+        """
+        yield self.draw()
+
 
 class Processor(Disposable, Generic[_RDT, _PDT], metaclass=ABCMeta):
     """The post-extraction transformation(s)/ops performed on raw data.
@@ -114,6 +134,31 @@ class Processor(Disposable, Generic[_RDT, _PDT], metaclass=ABCMeta):
         """
         return self.apply(raw_data)
 
+    def __rshift__(
+        self,
+        processor: Processor[Any, Any],
+    ) -> Processor[_RDT, Any]:
+        """Compose this ``Processor`` with another ``Processor``.
+
+        The result is a :class:`~sghi.etl.processors.ProcessorPipe` that
+        feeds the output of this ``Processor`` to the given ``Processor``.
+        This allows pipes to be written as ``first >> second >> third``.
+
+        .. versionadded:: 1.3.0
+
+        :param processor: The ``Processor`` to apply to the output of this
+            ``Processor``. It MUST accept the output of this ``Processor``,
+            e.g. a ``Processor`` of iterables accepts the lists produced by
+            an :class:`~sghi.etl.processors.ElementwiseProcessor`.
+
+        :return: A ``Processor`` that applies this ``Processor`` followed by
+            the given ``Processor``.
+        """
+        # Imported here to avoid a circular import.
+        from sghi.etl.processors import ProcessorPipe
+
+        return ProcessorPipe([self, processor])
+
     @abstractmethod
     def apply(self, raw_data: _RDT) -> _PDT:
         """Transform raw data into processed, clean data and return it.
@@ -130,6 +175,30 @@ class Processor(Disposable, Generic[_RDT, _PDT], metaclass=ABCMeta):
         """
         ...
 
+    def apply_stream(self, raw_data_chunks: Iterable[_RDT]) -> Iterator[_PDT]:
+        """Transform chunks of raw data into chunks of processed data.
+
+        This is the streaming counterpart of :meth:`apply`. The chunks are
+        transformed lazily, one at a time, as the returned iterator is
+        consumed. Typically, the chunks come from :meth:`Source.stream` and
+        the returned iterator is consumed by :meth:`Sink.drain_stream`.
+
+        The default implementation applies :meth:`apply` to each chunk in
+        turn. Subclasses that need to carry state across chunks, or that can
+        transform the chunks more efficiently together, may override this
+        method.
+
+        .. versionadded:: 1.3.0
+
+        :param raw_data_chunks: An iterable of unprocessed data chunks drawn
+            from a `Source`.
+
+        :return: An iterator of processed data chunks that are ready for
+            further consumption downstream.
+        """
+        for raw_data in raw_data_chunks:
+            yield self.apply(raw_data)
+
     @deprecated('Use "apply" instead. Will be removed in 2.0', stacklevel=1)
     def process(self, raw_data: _RDT) -> _PDT:
         """Transform raw data into processed, clean data and return it.
@@ -197,6 +266,27 @@ class Sink(Disposable, Generic[_PDT], metaclass=ABCMeta):
         """
         ...
 
+    def drain_stream(self, processed_data_chunks: Iterable[_PDT]) -> None:
+        """Consume chunks of processed data.
+
+        This is the streaming counterpart of :meth:`drain`. The given chunks
+        are consumed as they arrive and this method only returns once all the
+        chunks have been consumed.
+
+        The default implementation calls :meth:`drain` once for each chunk.
+        Subclasses that can consume the chunks more efficiently, e.g. by
+        reusing a single transaction or connection, may override this method.
+
+        .. versionadded:: 1.3.0
+
+        :param processed_data_chunks: An iterable of processed data chunks to
+            be consumed.
+
+        :return: None.
+        """
+        for processed_data in processed_data_chunks:
+            self.drain(processed_data)
+
 
 class WorkflowDefinition(Generic[_RDT, _PDT], metaclass=ABCMeta):
     """An object that defines the components of an SGHI ETL Workflow.
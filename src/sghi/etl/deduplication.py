@@ -0,0 +1,948 @@
+"""Removal of records that have already been seen.
+
+Upstream systems often deliver the same records more than once, e.g. after
+retries or overlapping extraction windows. A :class:`DeduplicatingProcessor`
+drops such records before they reach the :class:`~sghi.etl.core.Sink`, so
+that sinks do not have to compensate with expensive upserts. It derives a
+key from each record and checks it against a :class:`KeyFilter`, which
+remembers the keys seen so far. Two filters are provided:
+
+- an :class:`ExactKeyFilter`, which never drops a record that has not been
+  seen before. It keeps keys in memory up to a limit and overflows the rest
+  to an SQLite database on disk;
+- a :class:`BloomKeyFilter`, which uses a fixed amount of memory regardless
+  of the number of keys, at the cost of dropping a small, configurable,
+  fraction of the new records.
+
+Keys added to a filter are first *staged* and only become permanent when
+the filter is committed, so that the records of a failed run are not
+treated as seen by the next one. Both filters can persist their committed
+state to disk, in which case deduplication carries over across runs, and
+processes. A :class:`DeduplicatingWorkflowDefinition` ties this together
+for a whole workflow: it deduplicates the output of the workflow's
+:class:`~sghi.etl.core.Processor`, commits the filter once the ``Sink`` has
+drained the data, and discards the staged keys at the start of each run.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import threading
+from abc import ABCMeta, abstractmethod
+from collections import deque
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, Generic, TypeVar
+
+from typing_extensions import override
+
+from sghi.disposable import Disposable, not_disposed
+from sghi.etl.core import Processor, Sink, WorkflowDefinition
+from sghi.etl.processors import ProcessorPipe
+from sghi.utils import ensure_greater_than, ensure_not_none, type_fqn
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+
+    from sghi.etl.core import Source
+
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_RDT = TypeVar("_RDT")
+"""Raw Data Type."""
+
+_T = TypeVar("_T")
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+
+_BLOOM_FILE_MAGIC: Final[bytes] = b"SGHIBLM1"
+"""Identifies the files written by :class:`BloomKeyFilter`."""
+
+_DIGEST_SIZE: Final[int] = 16
+"""The size, in bytes, of the digests that keys are reduced to."""
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+def _digest(key: Any) -> bytes:  # noqa: ANN401
+    """Reduce a record key to a fixed size digest.
+
+    ``bytes`` and ``str`` keys are hashed directly. Any other key is hashed
+    using its :func:`repr`, which is stable across processes for integers
+    and for tuples of strings, bytes and integers.
+    """
+    if isinstance(key, bytes):
+        data: bytes = key
+    elif isinstance(key, str):
+        data = key.encode("utf-8")
+    else:
+        data = repr(key).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=_DIGEST_SIZE).digest()
+
+
+# =============================================================================
+# KEY FILTERS
+# =============================================================================
+
+
+class KeyFilter(Disposable, metaclass=ABCMeta):
+    """Remembers the keys of the records seen so far.
+
+    Keys are added in batches using :meth:`add_all`, which reports which of
+    them have been seen before. Added keys are staged until :meth:`commit`
+    is called, and staged keys are forgotten by :meth:`rollback`. Staged
+    keys are nonetheless reported as seen by later calls to
+    :meth:`add_all`, so duplicates within a run are detected too.
+
+    Implementations MUST be safe to use from multiple threads.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    def add_all(self, keys: Sequence[bytes]) -> list[bool]:
+        """Add the given keys to this filter, in order.
+
+        :param keys: The keys to add. Keys are digests of the record keys,
+            see :class:`DeduplicatingProcessor`.
+
+        :return: A list holding, for each key, ``True`` if the key had been
+            seen before, including earlier in ``keys``, and ``False``
+            otherwise.
+        """
+        ...
+
+    @abstractmethod
+    def commit(self) -> None:
+        """Make the staged keys permanent, persisting them if this filter is
+        persistent.
+
+        :return: None.
+        """  # noqa: D205
+        ...
+
+    @abstractmethod
+    def rollback(self) -> None:
+        """Forget the keys staged since the last commit.
+
+        :return: None.
+        """
+        ...
+
+
+class ExactKeyFilter(KeyFilter):
+    """A :class:`KeyFilter` that remembers every key.
+
+    Keys are reduced to 128-bit digests and kept in memory for as long as
+    there are at most ``max_keys_in_memory`` of them. Beyond that, keys
+    overflow to an SQLite database, which is then consulted for the keys not
+    found in memory. The chance of two different keys sharing a digest is
+    negligible, so this filter never drops a new record in practice.
+
+    When a ``database`` path is given, committed keys are also stored in
+    that database, under the given ``namespace``, and are remembered by
+    later instances using the same database and namespace. Using the id of
+    a workflow as the namespace lets several workflows share one database.
+    Otherwise, a private temporary database is used for the overflow and
+    the keys are forgotten once this filter is disposed.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = (
+        "_cache",
+        "_connection",
+        "_database",
+        "_is_disposed",
+        "_lock",
+        "_logger",
+        "_max_keys_in_memory",
+        "_namespace",
+        "_spilled",
+        "_staged",
+        "_staged_spilled",
+    )
+
+    def __init__(
+        self,
+        database: str | os.PathLike[str] | None = None,
+        namespace: str = "",
+        max_keys_in_memory: int = 1_000_000,
+    ) -> None:
+        """Create a new ``ExactKeyFilter`` instance.
+
+        :param database: The path of an SQLite database file to persist the
+            committed keys to. The file is created if it does not exist.
+            Defaults to not persisting the keys.
+        :param namespace: The namespace of the keys in ``database``. MUST
+            not be ``None``. Defaults to an empty string.
+        :param max_keys_in_memory: The maximum number of keys to keep in
+            memory. MUST be greater than zero. Defaults to one million,
+            i.e. roughly 100 MiB.
+
+        :raise ValueError: If ``namespace`` is ``None`` or if
+            ``max_keys_in_memory`` is NOT greater than zero.
+        """
+        super().__init__()
+        self._namespace: str = ensure_not_none(
+            namespace,
+            "'namespace' MUST not be None.",
+        )
+        self._max_keys_in_memory: int = ensure_greater_than(
+            value=max_keys_in_memory,
+            base_value=0,
+            message="'max_keys_in_memory' MUST be greater than zero (0).",
+        )
+        self._database: Path | None = (
+            Path(database) if database is not None else None
+        )
+        # An empty name opens a private, temporary, on-disk database.
+        self._connection: sqlite3.Connection = sqlite3.connect(
+            self._database if self._database is not None else "",
+            check_same_thread=False,
+        )
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS seen_keys ("
+                "namespace TEXT NOT NULL, "
+                "key BLOB NOT NULL, "
+                "PRIMARY KEY (namespace, key)"
+                ") WITHOUT ROWID",
+            )
+            self._connection.execute(
+                "CREATE TEMP TABLE staged_keys ("
+                "key BLOB PRIMARY KEY"
+                ") WITHOUT ROWID",
+            )
+        # Committed keys held in memory.
+        self._cache: set[bytes] = set()
+        # Staged keys held in memory.
+        self._staged: set[bytes] = set()
+        # Whether the database holds committed keys that are not in memory.
+        self._spilled: bool = self._has_stored_keys()
+        # Whether the database holds staged keys.
+        self._staged_spilled: bool = False
+        self._lock: threading.Lock = threading.Lock()
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    def database(self) -> Path | None:
+        """The path of the database that committed keys are persisted to.
+
+        :return: The path of the database that committed keys are persisted
+            to, or ``None`` if the keys are not persisted.
+        """
+        return self._database
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def namespace(self) -> str:
+        """The namespace of the keys of this filter in the database.
+
+        :return: The namespace of the keys of this filter in the database.
+        """
+        return self._namespace
+
+    @not_disposed
+    @override
+    def add_all(self, keys: Sequence[bytes]) -> list[bool]:
+        with self._lock:
+            stored: set[bytes] = self._find_stored(keys)
+            results: list[bool] = []
+            for key in keys:
+                seen: bool = (
+                    key in self._staged or key in self._cache or key in stored
+                )
+                if not seen:
+                    self._staged.add(key)
+                    if (
+                        len(self._cache) + len(self._staged)
+                        > self._max_keys_in_memory
+                    ):
+                        self._overflow()
+                        stored = self._find_stored(keys)
+                results.append(seen)
+            return results
+
+    @not_disposed
+    @override
+    def commit(self) -> None:
+        with self._lock, self._connection:
+            if self._staged_spilled:
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO seen_keys (namespace, key) "
+                    "SELECT ?, key FROM staged_keys",
+                    (self._namespace,),
+                )
+                self._connection.execute("DELETE FROM staged_keys")
+                self._staged_spilled = False
+                self._spilled = True
+            if self._database is not None:
+                self._store(self._staged)
+            self._cache.update(self._staged)
+            self._staged.clear()
+
+    @override
+    def dispose(self) -> None:
+        with self._lock:
+            if self._is_disposed:
+                return
+            self._is_disposed = True
+            self._cache.clear()
+            self._staged.clear()
+            self._connection.close()
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def rollback(self) -> None:
+        with self._lock:
+            self._staged.clear()
+            if self._staged_spilled:
+                with self._connection:
+                    self._connection.execute("DELETE FROM staged_keys")
+                self._staged_spilled = False
+
+    def _find_stored(self, keys: Sequence[bytes]) -> set[bytes]:
+        """Return those of the given keys that are held in the database."""
+        if not (self._spilled or self._staged_spilled):
+            return set()
+        found: set[bytes] = set()
+        # Stay within the default limit on the number of SQL parameters.
+        for start in range(0, len(keys), 450):
+            batch: Sequence[bytes] = keys[start : start + 450]
+            placeholders: str = ", ".join("?" * len(batch))
+            found.update(
+                _row[0]
+                for _row in self._connection.execute(
+                    "SELECT key FROM seen_keys WHERE namespace = ? AND key "  # noqa: S608
+                    f"IN ({placeholders}) UNION "
+                    "SELECT key FROM staged_keys WHERE key "
+                    f"IN ({placeholders})",
+                    (self._namespace, *batch, *batch),
+                )
+            )
+        return found
+
+    def _has_stored_keys(self) -> bool:
+        return (
+            self._connection.execute(
+                "SELECT 1 FROM seen_keys WHERE namespace = ? LIMIT 1",
+                (self._namespace,),
+            ).fetchone()
+            is not None
+        )
+
+    def _overflow(self) -> None:
+        """Move all the keys held in memory to the database."""
+        self._logger.debug(
+            "Memory limit reached, moving %d key(s) to disk.",
+            len(self._cache) + len(self._staged),
+        )
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO staged_keys (key) VALUES (?)",
+                ((_key,) for _key in self._staged),
+            )
+            if self._database is None:
+                # Otherwise, the committed keys are in the database already.
+                self._store(self._cache)
+        self._staged.clear()
+        self._cache.clear()
+        self._staged_spilled = True
+        self._spilled = True
+
+    def _store(self, keys: Iterable[bytes]) -> None:
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO seen_keys (namespace, key) VALUES (?, ?)",
+            ((self._namespace, _key) for _key in keys),
+        )
+
+
+class BloomKeyFilter(KeyFilter):
+    """A :class:`KeyFilter` that uses a fixed amount of memory.
+
+    Keys are remembered using a Bloom filter sized for ``capacity`` keys
+    and the given ``false_positive_rate``. Up to ``capacity`` keys, the
+    chance of a new key being reported as seen, and the record being
+    dropped, stays below ``false_positive_rate``. It increases beyond that.
+    Keys that have been seen are always reported as such. The filter takes
+    about ``1.44 * log2(1 / false_positive_rate)`` bits per key, i.e. under
+    2 MiB per million keys at a 1% rate, twice over since the committed
+    state is kept apart from the staged one.
+
+    When a ``path`` is given, the committed state is written to that file
+    on every commit, atomically, and loaded from it on creation. Naming the
+    file after the id of a workflow gives each workflow its own filter.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = (
+        "_bit_count",
+        "_bits",
+        "_capacity",
+        "_committed",
+        "_false_positive_rate",
+        "_hash_count",
+        "_is_disposed",
+        "_lock",
+        "_logger",
+        "_path",
+    )
+
+    def __init__(
+        self,
+        capacity: int,
+        false_positive_rate: float = 0.01,
+        path: str | os.PathLike[str] | None = None,
+    ) -> None:
+        """Create a new ``BloomKeyFilter`` instance.
+
+        :param capacity: The number of keys the filter is sized for. MUST be
+            greater than zero.
+        :param false_positive_rate: The maximum fraction of new keys to
+            report as seen while the filter holds at most ``capacity`` keys.
+            MUST be greater than zero and less than one. Defaults to 0.01.
+        :param path: The path of a file to persist the committed state to.
+            Defaults to not persisting the state.
+
+        :raise ValueError: If ``capacity`` or ``false_positive_rate`` is
+            invalid, or if the file at ``path`` is not a filter with the
+            same ``capacity`` and ``false_positive_rate``.
+        """
+        super().__init__()
+        self._capacity: int = ensure_greater_than(
+            value=capacity,
+            base_value=0,
+            message="'capacity' MUST be greater than zero (0).",
+        )
+        if not 0 < false_positive_rate < 1:
+            _err_msg: str = (
+                "'false_positive_rate' MUST be greater than zero (0) and "
+                "less than one (1)."
+            )
+            raise ValueError(_err_msg)
+        self._false_positive_rate: float = false_positive_rate
+        self._bit_count: int = math.ceil(
+            -capacity * math.log(false_positive_rate) / math.log(2) ** 2,
+        )
+        self._hash_count: int = max(
+            1,
+            round(self._bit_count / capacity * math.log(2)),
+        )
+        self._path: Path | None = Path(path) if path is not None else None
+        self._committed: bytes = self._load()
+        self._bits: bytearray = bytearray(self._committed)
+        self._lock: threading.Lock = threading.Lock()
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    def capacity(self) -> int:
+        """The number of keys this filter is sized for.
+
+        :return: The number of keys this filter is sized for.
+        """
+        return self._capacity
+
+    @property
+    def false_positive_rate(self) -> float:
+        """The false positive rate of this filter when holding at most
+        :attr:`capacity` keys.
+
+        :return: The false positive rate of this filter.
+        """  # noqa: D205
+        return self._false_positive_rate
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def path(self) -> Path | None:
+        """The path of the file that the committed state is persisted to.
+
+        :return: The path of the file that the committed state is persisted
+            to, or ``None`` if the state is not persisted.
+        """
+        return self._path
+
+    @not_disposed
+    @override
+    def add_all(self, keys: Sequence[bytes]) -> list[bool]:
+        bits: bytearray = self._bits
+        bit_count: int = self._bit_count
+        results: list[bool] = []
+        with self._lock:
+            for key in keys:
+                # Derive all the positions from two hashes, as described by
+                # Kirsch and Mitzenmacher, instead of hashing k times.
+                first: int = int.from_bytes(key[:8], "little")
+                second: int = int.from_bytes(key[8:16], "little") | 1
+                seen: bool = True
+                for index in range(self._hash_count):
+                    position: int = (first + index * second) % bit_count
+                    mask: int = 1 << (position & 7)
+                    if not bits[position >> 3] & mask:
+                        seen = False
+                        bits[position >> 3] |= mask
+                results.append(seen)
+        return results
+
+    @not_disposed
+    @override
+    def commit(self) -> None:
+        with self._lock:
+            self._committed = bytes(self._bits)
+            if self._path is not None:
+                self._write(self._committed)
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def rollback(self) -> None:
+        with self._lock:
+            self._bits[:] = self._committed
+
+    def _header(self) -> bytes:
+        return (
+            _BLOOM_FILE_MAGIC
+            + self._bit_count.to_bytes(8, "little")
+            + self._hash_count.to_bytes(8, "little")
+        )
+
+    def _load(self) -> bytes:
+        size: int = (self._bit_count + 7) // 8
+        if self._path is None or not self._path.exists():
+            return bytes(size)
+        header: bytes = self._header()
+        data: bytes = self._path.read_bytes()
+        if data[: len(header)] != header or len(data) != len(header) + size:
+            _err_msg: str = (
+                f"The file '{self._path}' is not a Bloom filter with the "
+                "given capacity and false positive rate."
+            )
+            raise ValueError(_err_msg)
+        return data[len(header) :]
+
+    def _write(self, bits: bytes) -> None:
+        assert self._path is not None
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self._path.with_name(
+            f".{self._path.name}.{os.getpid()}.{threading.get_ident()}.tmp",
+        )
+        with temp_path.open("wb") as filter_file:
+            filter_file.write(self._header())
+            filter_file.write(bits)
+        temp_path.replace(self._path)
+
+
+# =============================================================================
+# PROCESSOR
+# =============================================================================
+
+
+class DeduplicatingProcessor(Processor[Iterable[_T], list[_T]], Generic[_T]):
+    """A :class:`~sghi.etl.core.Processor` that drops the records whose keys
+    have already been seen.
+
+    Each chunk is an iterable of records. The key of each record is derived
+    using the given ``key`` function, reduced to a digest and checked
+    against the given :class:`KeyFilter`. Records with keys that have been
+    seen before, including earlier in the same chunk, are dropped. The
+    remaining records are returned in their original order.
+
+    Keys SHOULD be strings, bytes, integers or tuples of those, see
+    :func:`repr` for why.
+
+    The filter is NOT committed nor disposed by this ``Processor`` since it
+    outlives a single run. See :class:`DeduplicatingWorkflowDefinition`.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ("_dropped", "_is_disposed", "_key", "_key_filter", "_logger")
+
+    def __init__(
+        self,
+        key_filter: KeyFilter,
+        key: Callable[[_T], Any] | None = None,
+    ) -> None:
+        """Create a new ``DeduplicatingProcessor`` instance.
+
+        :param key_filter: The filter remembering the keys seen so far. MUST
+            not be ``None``.
+        :param key: A function returning the key of a record. Defaults to
+            using the records themselves as keys.
+
+        :raise ValueError: If ``key_filter`` is ``None``.
+        """
+        super().__init__()
+        self._key_filter: KeyFilter = ensure_not_none(
+            key_filter,
+            "'key_filter' MUST not be None.",
+        )
+        self._key: Callable[[_T], Any] | None = key
+        self._dropped: int = 0
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    def dropped(self) -> int:
+        """The number of records dropped by this ``Processor`` so far.
+
+        :return: The number of records dropped by this ``Processor`` so far.
+        """
+        return self._dropped
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: Iterable[_T]) -> list[_T]:
+        records: list[_T] = list(raw_data)
+        key: Callable[[_T], Any] | None = self._key
+        keys: list[bytes] = [
+            _digest(key(_record) if key is not None else _record)
+            for _record in records
+        ]
+        seen: list[bool] = self._add_all(keys)
+        unique: list[_T] = [
+            _record
+            for _record, _seen in zip(records, seen, strict=True)
+            if not _seen
+        ]
+        self._dropped += len(records) - len(unique)
+        return unique
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        self._logger.debug(
+            "Disposal complete, %d duplicate record(s) dropped.",
+            self._dropped,
+        )
+
+    def _add_all(self, keys: Sequence[bytes]) -> list[bool]:
+        """Add the keys of a chunk to the filter and report the seen ones."""
+        return self._key_filter.add_all(keys)
+
+
+class _CommittingProcessor(DeduplicatingProcessor[_T], Generic[_T]):
+    """A :class:`DeduplicatingProcessor` that can commit the keys of the
+    chunks it applied first, and only those.
+    """  # noqa: D205
+
+    __slots__ = ("_chunk_keys", "_lock")
+
+    def __init__(
+        self,
+        key_filter: KeyFilter,
+        key: Callable[[_T], Any] | None = None,
+    ) -> None:
+        super().__init__(key_filter, key)
+        # The new keys of each chunk applied since the last commit.
+        self._chunk_keys: deque[list[bytes]] = deque()
+        self._lock: threading.Lock = threading.Lock()
+
+    def commit(self, chunks: int | None = None) -> None:
+        """Commit the keys of the first ``chunks`` chunks applied since the
+        last commit, or of all of them if ``chunks`` is ``None``.
+        """  # noqa: D205
+        with self._lock:
+            if chunks is None or chunks >= len(self._chunk_keys):
+                self._chunk_keys.clear()
+                self._key_filter.commit()
+                return
+            loaded: list[bytes] = [
+                _key
+                for _ in range(chunks)
+                for _key in self._chunk_keys.popleft()
+            ]
+            # Filters only commit all their staged keys at once. Stage the
+            # keys of the loaded chunks alone, commit them and then stage
+            # the keys of the remaining chunks again.
+            self._key_filter.rollback()
+            self._key_filter.add_all(loaded)
+            self._key_filter.commit()
+            self._key_filter.add_all(
+                [_key for _keys in self._chunk_keys for _key in _keys],
+            )
+
+    @override
+    def _add_all(self, keys: Sequence[bytes]) -> list[bool]:
+        with self._lock:
+            seen: list[bool] = self._key_filter.add_all(keys)
+            self._chunk_keys.append(
+                [
+                    _key
+                    for _key, _seen in zip(keys, seen, strict=True)
+                    if not _seen
+                ],
+            )
+        return seen
+
+
+# =============================================================================
+# WORKFLOW DEFINITION
+# =============================================================================
+
+
+class _CommittingSink(Sink[list[_T]], Generic[_T]):
+    """Commits the keys of the data that a wrapped ``Sink`` has drained.
+
+    When streaming, only the keys of the chunks that the wrapped ``Sink``
+    actually took are committed, so the records of the chunks processed
+    ahead of a ``Sink`` that returns early are loaded by the next run.
+    """
+
+    __slots__ = ("_processor", "_sink")
+
+    def __init__(
+        self,
+        sink: Sink[Iterable[_T]],
+        processor: _CommittingProcessor[_T],
+    ) -> None:
+        super().__init__()
+        self._sink: Sink[Iterable[_T]] = sink
+        self._processor: _CommittingProcessor[_T] = processor
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._sink.is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._sink.dispose()
+
+    @override
+    def drain(self, processed_data: list[_T]) -> None:
+        self._sink.drain(processed_data)
+        self._processor.commit()
+
+    @override
+    def drain_stream(self, processed_data_chunks: Iterable[list[_T]]) -> None:
+        # The number of chunks taken by the wrapped sink so far.
+        consumed: int = 0
+
+        def count_consumed() -> Iterator[list[_T]]:
+            nonlocal consumed
+            for processed_data in processed_data_chunks:
+                consumed += 1
+                yield processed_data
+
+        self._sink.drain_stream(count_consumed())
+        self._processor.commit(consumed)
+
+
+class DeduplicatingWorkflowDefinition(
+    WorkflowDefinition[_RDT, list[_T]],
+    Disposable,
+    Generic[_RDT, _T],
+):
+    """A :class:`~sghi.etl.core.WorkflowDefinition` that drops the records of
+    a wrapped workflow that have already been loaded.
+
+    The output of each ``Processor`` of the wrapped workflow, which MUST be
+    an iterable of records, is passed through a
+    :class:`DeduplicatingProcessor` using the given :class:`KeyFilter`. The
+    keys of the records are committed once the ``Sink`` has drained them,
+    and the filter is rolled back at the start of each run, so that the
+    records of a failed run are loaded again by the next one. When
+    streaming, only the keys of the chunks that the ``Sink`` actually took
+    are committed. Each chunk drained by the ``Sink`` MUST therefore be the
+    output of exactly one call to the ``Processor``, which holds for all
+    the existing :mod:`executors<sghi.etl.executors>`. Runs of the same
+    instance MUST not overlap.
+
+    When no filter is given, an :class:`ExactKeyFilter` is created that
+    stores the keys under the id of the wrapped workflow, in the given
+    ``database`` if any. The state of the filter, and thus deduplication,
+    then carries over across all the runs of workflows with that id. The
+    created filter is disposed along with this workflow definition. A
+    given filter is NOT disposed by this class since it may outlive it.
+
+    The processor and the sink of a run are bound to each other on the
+    thread that created them, in that order, as all the existing executors
+    do.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_is_disposed",
+        "_key",
+        "_key_filter",
+        "_local",
+        "_owns_key_filter",
+        "_workflow",
+    )
+
+    def __init__(
+        self,
+        workflow: WorkflowDefinition[_RDT, Iterable[_T]],
+        key_filter: KeyFilter | None = None,
+        key: Callable[[_T], Any] | None = None,
+        *,
+        database: str | os.PathLike[str] | None = None,
+    ) -> None:
+        """Create a new ``DeduplicatingWorkflowDefinition`` instance.
+
+        :param workflow: The workflow whose output to deduplicate. MUST not
+            be ``None``.
+        :param key_filter: The filter remembering the keys of the records
+            loaded so far. Defaults to an ``ExactKeyFilter`` storing the
+            keys under the id of ``workflow``.
+        :param key: A function returning the key of a record. Defaults to
+            using the records themselves as keys.
+        :param database: The path of the SQLite database that the default
+            filter persists the keys to. MUST not be given together with a
+            ``key_filter``. Defaults to not persisting the keys.
+
+        :raise ValueError: If ``workflow`` is ``None``, or if both
+            ``key_filter`` and ``database`` are given.
+        """
+        super().__init__()
+        self._workflow: WorkflowDefinition[_RDT, Iterable[_T]] = (
+            ensure_not_none(workflow, "'workflow' MUST not be None.")
+        )
+        if key_filter is not None and database is not None:
+            _err_msg: str = (
+                "'database' MUST not be given together with a 'key_filter'."
+            )
+            raise ValueError(_err_msg)
+        self._owns_key_filter: bool = key_filter is None
+        self._key_filter: KeyFilter = (
+            key_filter
+            if key_filter is not None
+            else ExactKeyFilter(database, namespace=workflow.id)
+        )
+        self._key: Callable[[_T], Any] | None = key
+        self._local: threading.local = threading.local()
+        self._is_disposed: bool = False
+
+    @property
+    @override
+    def id(self) -> str:
+        return self._workflow.id
+
+    @property
+    @override
+    def name(self) -> str:
+        return self._workflow.name
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return self._workflow.description
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def key_filter(self) -> KeyFilter:
+        """The filter remembering the keys of the records loaded so far.
+
+        :return: The filter remembering the keys of the records loaded so
+            far.
+        """
+        return self._key_filter
+
+    @property
+    @override
+    def source_factory(self) -> Callable[[], Source[_RDT]]:
+        return self._workflow.source_factory
+
+    @property
+    @override
+    def processor_factory(self) -> Callable[[], Processor[_RDT, list[_T]]]:
+        return self._create_processor
+
+    @property
+    @override
+    def sink_factory(self) -> Callable[[], Sink[list[_T]]]:
+        return self._create_sink
+
+    @property
+    @override
+    def prologue(self) -> Callable[[], None]:
+        def _prologue() -> None:
+            self._key_filter.rollback()
+            self._workflow.prologue()
+
+        return _prologue
+
+    @property
+    @override
+    def epilogue(self) -> Callable[[], None]:
+        return self._workflow.epilogue
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        if self._owns_key_filter:
+            self._key_filter.dispose()
+
+    def _create_processor(self) -> Processor[_RDT, list[_T]]:
+        wrapped: Processor[_RDT, Iterable[_T]] = (
+            self._workflow.processor_factory()
+        )
+        processor: _CommittingProcessor[_T] = _CommittingProcessor(
+            self._key_filter,
+            self._key,
+        )
+        self._local.processor = processor
+        return ProcessorPipe([wrapped, processor])
+
+    def _create_sink(self) -> Sink[list[_T]]:
+        processor: _CommittingProcessor[_T] | None = getattr(
+            self._local,
+            "processor",
+            None,
+        )
+        if processor is None:
+            _err_msg: str = (
+                "The processor of a deduplicating workflow MUST be created "
+                "before its sink, on the same thread."
+            )
+            raise RuntimeError(_err_msg)
+        self._local.processor = None
+        return _CommittingSink(self._workflow.sink_factory(), processor)
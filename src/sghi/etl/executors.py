@@ -0,0 +1,1758 @@
+"""Reference executors of SGHI ETL workflows."""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import pickle
+import queue
+import sys
+import threading
+import time
+import traceback
+from abc import ABCMeta, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, closing, suppress
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, Generic, Literal, TypeVar, cast
+
+from typing_extensions import override
+
+from sghi.disposable import Disposable, ResourceDisposedError, not_disposed
+from sghi.etl import instrumentation, profiling
+from sghi.etl.buffers import SpillBuffer
+from sghi.etl.core import Processor, Sink
+from sghi.etl.graphs import ProcessorNode, SinkNode, SourceNode
+from sghi.etl.registry import LazyWorkflowDefinition, WorkflowReference
+from sghi.etl.sources import PartitionedSource
+from sghi.exceptions import SGHIError
+from sghi.utils import ensure_greater_than, ensure_not_none, type_fqn
+
+if TYPE_CHECKING:
+    from collections.abc import (
+        Callable,
+        Generator,
+        Iterable,
+        Iterator,
+        Sequence,
+    )
+    from concurrent.futures import Future
+    from multiprocessing.connection import Connection
+    from multiprocessing.context import (
+        DefaultContext,
+        ForkContext,
+        ForkServerContext,
+        SpawnContext,
+    )
+    from multiprocessing.process import BaseProcess
+
+    from sghi.etl.core import Source, WorkflowDefinition
+    from sghi.etl.graphs import GraphWorkflowDefinition, Node
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_PDT = TypeVar("_PDT")
+"""Processed Data Type."""
+
+_RDT = TypeVar("_RDT")
+"""Raw Data Type."""
+
+_T = TypeVar("_T")
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+
+_END_OF_STREAM: Final[object] = object()
+"""Marks the end of the chunks flowing through a :class:`_Channel`."""
+
+_MAX_PARTITION_CRASHES: Final[int] = 2
+"""The number of worker processes a partition may kill before giving up."""
+
+_POLL_INTERVAL: Final[float] = 0.1
+"""The maximum time, in seconds, a stage blocks before checking for a stop."""
+
+_WORKER_STOP_TIMEOUT: Final[float] = 10.0
+"""The time, in seconds, a worker process is given to exit when stopped."""
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+class _StageStoppedError(Exception):
+    """Raised inside a stage when the pipeline it belongs to is stopped."""
+
+
+class _Channel(Generic[_T]):
+    """A bounded hand-off queue between two adjacent pipeline stages.
+
+    Producers block when the channel is full, i.e. backpressure is applied,
+    and consumers block when it is empty. Both give up, by raising a
+    :class:`_StageStoppedError`, once the given stop event is set.
+    """
+
+    __slots__ = ("_is_abandoned", "_queue", "_stop_event")
+
+    def __init__(self, max_size: int, stop_event: threading.Event) -> None:
+        super().__init__()
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max_size)
+        self._stop_event: threading.Event = stop_event
+        self._is_abandoned: bool = False
+
+    def __iter__(self) -> Iterator[_T]:
+        while True:
+            try:
+                item = self._queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if self._stop_event.is_set():
+                    raise _StageStoppedError from None
+                continue
+            if item is _END_OF_STREAM:
+                return
+            yield item
+
+    @property
+    def is_abandoned(self) -> bool:
+        return self._is_abandoned
+
+    def abandon(self) -> None:
+        """Signal that the consumer will not take any more items.
+
+        Items put into the channel afterwards are discarded.
+        """
+        self._is_abandoned = True
+        with suppress(queue.Empty):
+            while True:
+                self._queue.get_nowait()
+
+    def close(self) -> None:
+        self._put(_END_OF_STREAM)
+
+    def put(self, item: _T) -> None:
+        self._put(item)
+
+    def _put(self, item: Any) -> None:  # noqa: ANN401
+        while not self._stop_event.is_set():
+            if self._is_abandoned:
+                return
+            try:
+                self._queue.put(item, timeout=_POLL_INTERVAL)
+            except queue.Full:
+                continue
+            return
+        raise _StageStoppedError
+
+
+class _SpillingChannel(Generic[_T]):
+    """An unbounded hand-off between two adjacent pipeline stages that
+    spills to disk once a memory budget is exceeded.
+
+    Producers never block, while consumers block when the channel is empty.
+    Both give up, by raising a :class:`_StageStoppedError`, once the given
+    stop event is set.
+    """  # noqa: D205
+
+    __slots__ = ("_buffer", "_stop_event")
+
+    def __init__(
+        self,
+        buffer: SpillBuffer[_T],
+        stop_event: threading.Event,
+    ) -> None:
+        super().__init__()
+        self._buffer: SpillBuffer[_T] = buffer
+        self._stop_event: threading.Event = stop_event
+
+    def __iter__(self) -> Iterator[_T]:
+        while True:
+            try:
+                item = self._buffer.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if self._stop_event.is_set():
+                    raise _StageStoppedError from None
+                continue
+            except EOFError:
+                return
+            yield item
+
+    def close(self) -> None:
+        self._buffer.close()
+
+    def put(self, item: _T) -> None:
+        if self._stop_event.is_set():
+            raise _StageStoppedError
+        self._buffer.put(item)
+
+
+def _run_stage(
+    stage: Callable[[], None],
+    stop_event: threading.Event,
+) -> BaseException | None:
+    """Run a pipeline stage and return the error it raised, if any.
+
+    The stop event is set whenever the stage fails so that the other stages
+    of the same pipeline can stop promptly instead of blocking forever.
+    """
+    try:
+        stage()
+    except BaseException as exp:  # noqa: BLE001
+        stop_event.set()
+        return exp
+    return None
+
+
+# =============================================================================
+# EXECUTOR INTERFACE
+# =============================================================================
+
+
+class WorkflowExecutor(metaclass=ABCMeta):
+    """An entity that runs :class:`WorkflowDefinition` instances.
+
+    Implementations of this interface should honor the semantics documented
+    on the ``WorkflowDefinition`` interface. That is, the
+    :attr:`~sghi.etl.core.WorkflowDefinition.prologue` should be invoked
+    first, and if it fails, the rest of the workflow should not be executed.
+    The :attr:`~sghi.etl.core.WorkflowDefinition.epilogue` should always be
+    invoked last, regardless of the outcome of the rest of the workflow.
+    Finally, all the components created by the workflow's factories should
+    be disposed once they are no longer needed.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = ()
+
+    def __call__(self, workflow: WorkflowDefinition[_RDT, _PDT]) -> None:
+        """Execute the given workflow.
+
+        Call this ``WorkflowExecutor`` as a callable. Delegate actual call to
+        :meth:`execute`.
+
+        :param workflow: The workflow to execute. MUST not be ``None``.
+
+        :return: None.
+        """
+        return self.execute(workflow)
+
+    @abstractmethod
+    def execute(self, workflow: WorkflowDefinition[_RDT, _PDT]) -> None:
+        """Execute the given workflow.
+
+        Any error raised during the execution of the workflow is propagated
+        to the caller of this method.
+
+        :param workflow: The workflow to execute. MUST not be ``None``.
+
+        :return: None.
+        """
+        ...
+
+
+# =============================================================================
+# EXECUTORS
+# =============================================================================
+
+
+class PipelinedWorkflowExecutor(WorkflowExecutor):
+    """A :class:`WorkflowExecutor` that overlaps the stages of a workflow.
+
+    The `Extract`, `Transform` and `Load` stages of a workflow are run
+    concurrently, each on its own thread, using the streaming methods of the
+    workflow's components, i.e. :meth:`~sghi.etl.core.Source.stream`,
+    :meth:`~sghi.etl.core.Processor.apply_stream` and
+    :meth:`~sghi.etl.core.Sink.drain_stream`. Chunks are handed from one
+    stage to the next over bounded queues. A stage that gets ahead of its
+    successor blocks once the queue between the two is full. This keeps the
+    number of in-flight chunks, and thus memory usage, bounded while allowing
+    the total execution time to approach that of the slowest stage.
+
+    If any of the stages fails, the remaining stages are stopped and the
+    error raised by the failing stage is propagated to the caller.
+
+    When :mod:`instrumentation<sghi.etl.instrumentation>` is enabled, the
+    workflow's components are observed for the duration of the run.
+    Similarly, when :mod:`profiling<sghi.etl.profiling>` is enabled for the
+    workflow, each phase of the run is profiled.
+
+    Alternatively, when a ``memory_budget`` is given, the chunks waiting
+    between two adjacent stages are held in a
+    :class:`~sghi.etl.buffers.SpillBuffer` instead. Faster stages then never
+    block. Chunks are kept in memory up to the budget and spilled to
+    temporary files beyond it, so that a slow stage does not hold back the
+    stages before it. Chunks MUST be picklable in this mode.
+
+    .. note::
+
+        Components that do not override the default streaming methods
+        produce and consume a single chunk. Such workflows still run
+        correctly, but their stages cannot overlap.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = (
+        "_logger",
+        "_memory_budget",
+        "_queue_size",
+        "_spill_directory",
+    )
+
+    def __init__(
+        self,
+        queue_size: int = 2,
+        memory_budget: int | None = None,
+        spill_directory: str | None = None,
+    ) -> None:
+        """Create a new ``PipelinedWorkflowExecutor`` instance.
+
+        :param queue_size: The maximum number of chunks that can be waiting
+            between two adjacent stages. MUST be greater than zero. Defaults
+            to 2. Ignored when a ``memory_budget`` is given.
+        :param memory_budget: An optional maximum size, in bytes, of the
+            chunks kept in memory between each pair of adjacent stages. When
+            given, chunks beyond the budget are spilled to disk rather than
+            blocking the faster stage. MUST not be negative.
+        :param spill_directory: The directory in which to create spill files.
+            Defaults to the platform's temporary directory.
+
+        :raise ValueError: If ``queue_size`` is NOT greater than zero or if
+            ``memory_budget`` is negative.
+        """
+        super().__init__()
+        self._queue_size: int = ensure_greater_than(
+            value=queue_size,
+            base_value=0,
+            message="'queue_size' MUST be greater than zero (0).",
+        )
+        if memory_budget is not None and memory_budget < 0:
+            _err_msg: str = "'memory_budget' MUST not be negative."
+            raise ValueError(_err_msg)
+        self._memory_budget: int | None = memory_budget
+        self._spill_directory: str | None = spill_directory
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    def memory_budget(self) -> int | None:
+        """The maximum size of the chunks kept in memory between two adjacent
+        stages, if spilling to disk is enabled.
+
+        :return: The memory budget, in bytes, or ``None`` if spilling to disk
+            is disabled.
+        """  # noqa: D205
+        return self._memory_budget
+
+    @property
+    def queue_size(self) -> int:
+        """The maximum number of chunks waiting between two adjacent stages.
+
+        :return: The maximum number of chunks waiting between two adjacent
+            stages.
+        """
+        return self._queue_size
+
+    def execute(self, workflow: WorkflowDefinition[_RDT, _PDT]) -> None:
+        """Execute the given workflow with its stages overlapping.
+
+        :param workflow: The workflow to execute. MUST not be ``None``.
+
+        :return: None.
+
+        :raise ValueError: If ``workflow`` is ``None``.
+        """
+        ensure_not_none(workflow, "'workflow' MUST not be None.")
+
+        profiling_settings = profiling.get_settings(workflow.id)
+        if profiling_settings is not None:
+            workflow = profiling.ProfiledWorkflowDefinition(
+                workflow,
+                profiling_settings,
+            )
+
+        self._logger.info("[%s] Starting workflow.", workflow.id)
+        try:
+            workflow.prologue()
+            source: Source[_RDT]
+            processor: Processor[_RDT, _PDT]
+            sink: Sink[_PDT]
+            with (
+                workflow.source_factory() as source,
+                workflow.processor_factory() as processor,
+                workflow.sink_factory() as sink,
+            ):
+                self.run_pipeline(workflow.id, source, processor, sink)
+        finally:
+            workflow.epilogue()
+        self._logger.info("[%s] Workflow completed.", workflow.id)
+
+    def run_pipeline(
+        self,
+        workflow_id: str,
+        source: Source[_RDT],
+        processor: Processor[_RDT, _PDT],
+        sink: Sink[_PDT],
+    ) -> None:
+        """Run the stages of a workflow using already created components.
+
+        Unlike :meth:`execute`, this neither runs the prologue and epilogue
+        of the workflow nor creates, or disposes, its components. This
+        allows callers to reuse components across several runs. The
+        components are still instrumented when
+        :mod:`instrumentation<sghi.etl.instrumentation>` is enabled, but
+        :mod:`profiling<sghi.etl.profiling>` is not applied.
+
+        :param workflow_id: The id of the workflow being run.
+        :param source: The ``Source`` of the workflow.
+        :param processor: The ``Processor`` of the workflow.
+        :param sink: The ``Sink`` of the workflow.
+
+        :return: None.
+        """
+        if instrumentation.is_enabled():
+            source = instrumentation.InstrumentedSource(source, workflow_id)
+            processor = instrumentation.InstrumentedProcessor(
+                processor,
+                workflow_id,
+            )
+            sink = instrumentation.InstrumentedSink(sink, workflow_id)
+        stop_event = threading.Event()
+        with ExitStack() as exit_stack:
+            raw_chunks = self._make_channel(stop_event, exit_stack)
+            processed_chunks = self._make_channel(stop_event, exit_stack)
+            self._run_stages(
+                workflow_id,
+                source,
+                processor,
+                sink,
+                raw_chunks,
+                processed_chunks,
+                stop_event,
+            )
+
+    def _make_channel(
+        self,
+        stop_event: threading.Event,
+        exit_stack: ExitStack,
+    ) -> _Channel[Any] | _SpillingChannel[Any]:
+        if self._memory_budget is None:
+            return _Channel(self._queue_size, stop_event)
+        buffer: SpillBuffer[Any] = exit_stack.enter_context(
+            SpillBuffer(self._memory_budget, self._spill_directory),
+        )
+        return _SpillingChannel(buffer, stop_event)
+
+    def _run_stages(  # noqa: PLR0913
+        self,
+        workflow_id: str,
+        source: Source[_RDT],
+        processor: Processor[_RDT, _PDT],
+        sink: Sink[_PDT],
+        raw_chunks: _Channel[_RDT] | _SpillingChannel[_RDT],
+        processed_chunks: _Channel[_PDT] | _SpillingChannel[_PDT],
+        stop_event: threading.Event,
+    ) -> None:
+        def extract() -> None:
+            for raw_data in source.stream():
+                raw_chunks.put(raw_data)
+            raw_chunks.close()
+
+        def transform() -> None:
+            for processed_data in processor.apply_stream(raw_chunks):
+                processed_chunks.put(processed_data)
+            processed_chunks.close()
+
+        def load() -> None:
+            sink.drain_stream(processed_chunks)
+
+        with ThreadPoolExecutor(
+            max_workers=2,
+            thread_name_prefix=f"sghi-etl-{workflow_id}",
+        ) as executor:
+            upstream_stages = [
+                executor.submit(_run_stage, stage, stop_event)
+                for stage in (extract, transform)
+            ]
+            load_error: BaseException | None = _run_stage(load, stop_event)
+            # Release any upstream stage still blocked on a hand-off, e.g.
+            # when the sink returned without consuming every chunk.
+            stop_event.set()
+            errors = [_f.result() for _f in upstream_stages] + [load_error]
+
+        for error in errors:
+            if error is not None and not isinstance(error, _StageStoppedError):
+                raise error
+
+
+class _FanOut(Generic[_T]):
+    """Hands each chunk produced by a graph node to all its consumers."""
+
+    __slots__ = ("_channels",)
+
+    def __init__(self, channels: Sequence[_Channel[_T]]) -> None:
+        super().__init__()
+        self._channels: Sequence[_Channel[_T]] = channels
+
+    def close(self) -> None:
+        for channel in self._channels:
+            channel.close()
+
+    def put(self, item: _T) -> bool:
+        """Hand the given item to all the consumers still taking items.
+
+        :return: ``False`` if all the consumers have stopped taking items,
+            ``True`` otherwise.
+        """
+        for channel in self._channels:
+            channel.put(item)
+        return not all(_channel.is_abandoned for _channel in self._channels)
+
+
+def _check_graph(nodes: Sequence[Node]) -> dict[str, Node]:
+    """Ensure that the given nodes form a valid workflow graph.
+
+    :return: The given nodes, keyed by their ids.
+
+    :raise ValueError: If the nodes do not form a valid workflow graph.
+    """
+    by_id: dict[str, Node] = _check_node_ids(nodes)
+    consumed: set[str] = _check_node_inputs(by_id)
+    _check_no_cycles(by_id)
+    _check_nodes_consumed(by_id, consumed)
+    return by_id
+
+
+def _check_node_ids(nodes: Sequence[Node]) -> dict[str, Node]:
+    """Ensure that the given nodes are not ``None`` and have unique ids.
+
+    :return: The given nodes, keyed by their ids.
+
+    :raise ValueError: If a node is ``None`` or if two nodes share an id.
+    """
+    by_id: dict[str, Node] = {}
+    for node in nodes:
+        ensure_not_none(node, "'nodes' MUST not contain None.")
+        if node.id in by_id:
+            _err_msg: str = f"The node id '{node.id}' is not unique."
+            raise ValueError(_err_msg)
+        by_id[node.id] = node
+    return by_id
+
+
+def _check_node_inputs(nodes: dict[str, Node]) -> set[str]:
+    """Ensure that the inputs of the given nodes are source or processor
+    nodes of the graph.
+
+    :return: The ids of the nodes used as an input by some node.
+
+    :raise ValueError: If an input is not a source or processor node of the
+        graph.
+    """  # noqa: D205
+    consumed: set[str] = set()
+    for node in nodes.values():
+        if isinstance(node, SourceNode):
+            continue
+        upstream: Node | None = nodes.get(node.input)
+        if upstream is None or isinstance(upstream, SinkNode):
+            _err_msg: str = (
+                f"The input of node '{node.id}' MUST be the id of a source "
+                f"or processor node, got '{node.input}'."
+            )
+            raise ValueError(_err_msg)
+        consumed.add(upstream.id)
+    return consumed
+
+
+def _check_no_cycles(nodes: dict[str, Node]) -> None:
+    """Ensure that the inputs of the given nodes do not form a cycle.
+
+    The inputs of the nodes MUST have been checked already.
+
+    :raise ValueError: If the inputs of the nodes form a cycle.
+    """
+    for node in nodes.values():
+        # Every node has a single input, so following the inputs either
+        # reaches a source or loops.
+        upstream: Node = node
+        visited: set[str] = set()
+        while isinstance(upstream, ProcessorNode):
+            if upstream.id in visited:
+                _err_msg: str = (
+                    "The graph contains a cycle involving node "
+                    f"'{upstream.id}'."
+                )
+                raise ValueError(_err_msg)
+            visited.add(upstream.id)
+            upstream = nodes[upstream.input]
+
+
+def _check_nodes_consumed(nodes: dict[str, Node], consumed: set[str]) -> None:
+    """Ensure that the output of every source and processor node is
+    consumed, and that the graph has at least one sink node.
+
+    :raise ValueError: If a source or processor node is not consumed or if
+        the graph has no sink node.
+    """  # noqa: D205
+    for node in nodes.values():
+        if not isinstance(node, SinkNode) and node.id not in consumed:
+            _err_msg: str = (
+                f"The node '{node.id}' is not consumed by any node."
+            )
+            raise ValueError(_err_msg)
+    if not any(isinstance(_node, SinkNode) for _node in nodes.values()):
+        _err_msg = "The graph MUST have at least one sink node."
+        raise ValueError(_err_msg)
+
+
+class GraphWorkflowExecutor:
+    """Runs :class:`~sghi.etl.graphs.GraphWorkflowDefinition` instances.
+
+    All the nodes of a graph run concurrently, each on its own thread, using
+    the streaming methods of their components, in the same way as the stages
+    of a :class:`PipelinedWorkflowExecutor`. Each source is streamed exactly
+    once per run, and each chunk is handed to every node consuming that
+    source over a bounded queue per consumer. Independent branches thus run
+    in parallel, while a slow node slows down the nodes feeding it, but not
+    the unrelated branches. A node whose consumers have all returned early
+    stops being fed.
+
+    The components of a graph are created, in dependency order, before any
+    of them runs. Whatever happens, all the components that were created are
+    disposed once the run ends, in the reverse order of their creation.
+
+    If any node fails, the whole run is stopped and the error raised by the
+    failing node is propagated to the caller.
+
+    When :mod:`instrumentation<sghi.etl.instrumentation>` is enabled, each
+    component is observed under the ``<workflow id>/<node id>`` workflow id.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = ("_logger", "_queue_size")
+
+    def __init__(self, queue_size: int = 2) -> None:
+        """Create a new ``GraphWorkflowExecutor`` instance.
+
+        :param queue_size: The maximum number of chunks that can be waiting
+            between a node and each of its consumers. MUST be greater than
+            zero. Defaults to 2.
+
+        :raise ValueError: If ``queue_size`` is NOT greater than zero.
+        """
+        super().__init__()
+        self._queue_size: int = ensure_greater_than(
+            value=queue_size,
+            base_value=0,
+            message="'queue_size' MUST be greater than zero (0).",
+        )
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    def __call__(self, workflow: GraphWorkflowDefinition) -> None:
+        """Execute the given graph workflow.
+
+        Call this ``GraphWorkflowExecutor`` as a callable. Delegate actual
+        call to :meth:`execute`.
+
+        :param workflow: The workflow to execute. MUST not be ``None``.
+
+        :return: None.
+        """
+        return self.execute(workflow)
+
+    @property
+    def queue_size(self) -> int:
+        """The maximum number of chunks waiting between a node and each of its
+        consumers.
+
+        :return: The maximum number of chunks waiting between a node and each
+            of its consumers.
+        """  # noqa: D205
+        return self._queue_size
+
+    def execute(self, workflow: GraphWorkflowDefinition) -> None:
+        """Execute the given graph workflow.
+
+        :param workflow: The workflow to execute. MUST not be ``None``.
+
+        :return: None.
+
+        :raise ValueError: If ``workflow`` is ``None`` or if its nodes do not
+            form a valid graph.
+        """
+        ensure_not_none(workflow, "'workflow' MUST not be None.")
+        nodes: dict[str, Node] = _check_graph(workflow.nodes)
+
+        self._logger.info("[%s] Starting workflow.", workflow.id)
+        try:
+            workflow.prologue()
+            with ExitStack() as exit_stack:
+                components: dict[str, Any] = {}
+                for node in self._in_dependency_order(nodes):
+                    component = exit_stack.enter_context(node.factory())
+                    components[node.id] = self._instrument(
+                        component,
+                        f"{workflow.id}/{node.id}",
+                    )
+                self._run_nodes(workflow.id, nodes, components)
+        finally:
+            workflow.epilogue()
+        self._logger.info("[%s] Workflow completed.", workflow.id)
+
+    @staticmethod
+    def _in_dependency_order(nodes: dict[str, Node]) -> list[Node]:
+        ordered: list[Node] = [
+            _node for _node in nodes.values() if isinstance(_node, SourceNode)
+        ]
+        for node in ordered:
+            ordered.extend(
+                _node
+                for _node in nodes.values()
+                if not isinstance(_node, SourceNode) and _node.input == node.id
+            )
+        return ordered
+
+    @staticmethod
+    def _instrument(component: Any, workflow_id: str) -> Any:  # noqa: ANN401
+        if not instrumentation.is_enabled():
+            return component
+        if isinstance(component, Sink):
+            return instrumentation.InstrumentedSink(component, workflow_id)
+        if isinstance(component, Processor):
+            return instrumentation.InstrumentedProcessor(
+                component,
+                workflow_id,
+            )
+        return instrumentation.InstrumentedSource(component, workflow_id)
+
+    def _run_nodes(
+        self,
+        workflow_id: str,
+        nodes: dict[str, Node],
+        components: dict[str, Any],
+    ) -> None:
+        stop_event = threading.Event()
+        inputs: dict[str, _Channel[Any]] = {
+            _node_id: _Channel(self._queue_size, stop_event)
+            for _node_id, _node in nodes.items()
+            if not isinstance(_node, SourceNode)
+        }
+        outputs: dict[str, _FanOut[Any]] = {
+            _node_id: _FanOut(
+                [
+                    inputs[_consumer.id]
+                    for _consumer in nodes.values()
+                    if not isinstance(_consumer, SourceNode)
+                    and _consumer.input == _node_id
+                ],
+            )
+            for _node_id, _node in nodes.items()
+            if not isinstance(_node, SinkNode)
+        }
+
+        def run(node: Node) -> None:
+            component = components[node.id]
+            chunks: Iterable[Any]
+            match node:
+                case SourceNode():
+                    chunks = component.stream()
+                case ProcessorNode():
+                    chunks = component.apply_stream(inputs[node.id])
+                case SinkNode():  # pragma: no branch
+                    component.drain_stream(inputs[node.id])
+                    # Release the upstream node if the sink returned without
+                    # consuming every chunk.
+                    inputs[node.id].abandon()
+                    return
+            for chunk in chunks:
+                if not outputs[node.id].put(chunk):
+                    break
+            outputs[node.id].close()
+            if node.id in inputs:
+                inputs[node.id].abandon()
+
+        with ThreadPoolExecutor(
+            max_workers=len(nodes),
+            thread_name_prefix=f"sghi-etl-{workflow_id}",
+        ) as executor:
+            futures = [
+                executor.submit(_run_stage, partial(run, _node), stop_event)
+                for _node in nodes.values()
+            ]
+            errors = [_future.result() for _future in futures]
+
+        for error in errors:
+            if error is not None and not isinstance(error, _StageStoppedError):
+                raise error
+
+
+# =============================================================================
+# PROCESS POOL
+# =============================================================================
+
+
+class WorkerError(SGHIError):
+    """Raised when a workflow fails in a worker process in a way that cannot
+    be reported using the original error, e.g. when the worker process dies.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+
+@dataclass(frozen=True, slots=True)
+class _Outcome:
+    """The result of running a workflow in a worker process."""
+
+    error: BaseException | None
+    memory_usage: int
+
+
+@dataclass(frozen=True, slots=True)
+class _Task:
+    """A request to run a workflow in a worker process."""
+
+    workflow_id: str
+    payload: WorkflowReference | bytes
+    """A reference to the workflow, or the pickled workflow."""
+
+    @classmethod
+    def of(cls, workflow: WorkflowDefinition[Any, Any]) -> _Task:
+        """Create a task to run the given workflow.
+
+        :raise TypeError: If the workflow cannot be sent to a worker.
+        """
+        if isinstance(workflow, LazyWorkflowDefinition):
+            return cls(workflow.id, workflow.reference)
+        try:
+            return cls(workflow.id, pickle.dumps(workflow))
+        except Exception as exp:
+            _err_msg: str = (
+                f"The workflow '{workflow.id}' cannot be sent to a worker "
+                "process. Workflows MUST be picklable or be loaded from a "
+                "'WorkflowReference'."
+            )
+            raise TypeError(_err_msg) from exp
+
+    def load(self) -> WorkflowDefinition[Any, Any]:
+        """Load the workflow to run."""
+        if isinstance(self.payload, WorkflowReference):
+            return self.payload.load()
+        return pickle.loads(self.payload)  # noqa: S301
+
+
+def _memory_usage() -> int:
+    """Return the memory used by the current process, in bytes.
+
+    The resident set size is used where available. Elsewhere, the peak
+    resident set size is used instead.
+    """
+    try:
+        statm: str = Path("/proc/self/statm").read_text(encoding="ascii")
+    except OSError:
+        import resource
+
+        peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return int(statm.split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _transferable(error: BaseException) -> BaseException:
+    """Return an error that can be sent back to the parent process.
+
+    The traceback of the error is attached to it as a note since tracebacks
+    cannot be sent across processes. Errors that cannot be pickled are
+    replaced with a :class:`WorkerError` describing them.
+    """
+    details: str = "".join(traceback.format_exception(error))
+    try:
+        error.add_note(f"Raised in worker process {os.getpid()}:\n{details}")
+        pickle.loads(pickle.dumps(error))  # noqa: S301
+    except Exception:  # noqa: BLE001
+        return WorkerError(
+            f"Raised in worker process {os.getpid()}:\n{details}",
+        )
+    return error
+
+
+class _WorkerRuntime:
+    """Runs workflows inside a worker process."""
+
+    __slots__ = ("_components", "_executor", "_logger", "_reuse_components")
+
+    def __init__(self, reuse_components: bool) -> None:  # noqa: FBT001
+        super().__init__()
+        self._reuse_components: bool = reuse_components
+        self._executor: PipelinedWorkflowExecutor = PipelinedWorkflowExecutor()
+        self._components: dict[
+            str,
+            tuple[Source[Any], Processor[Any, Any], Sink[Any]],
+        ] = {}
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    def dispose(self) -> None:
+        for workflow_id in list(self._components):
+            self._discard_components(workflow_id)
+
+    def run(self, task: _Task) -> None:
+        workflow: WorkflowDefinition[Any, Any] = task.load()
+        if not self._reuse_components:
+            self._executor.execute(workflow)
+            return
+
+        self._logger.info("[%s] Starting workflow.", workflow.id)
+        try:
+            workflow.prologue()
+            source, processor, sink = self._get_components(workflow)
+            try:
+                self._executor.run_pipeline(
+                    workflow.id,
+                    source,
+                    processor,
+                    sink,
+                )
+            except BaseException:
+                # A failed run may leave the components in an unusable
+                # state, start afresh on the next run.
+                self._discard_components(workflow.id)
+                raise
+        finally:
+            workflow.epilogue()
+        self._logger.info("[%s] Workflow completed.", workflow.id)
+
+    def _discard_components(self, workflow_id: str) -> None:
+        components = self._components.pop(workflow_id, ())
+        with ExitStack() as exit_stack:
+            # Callbacks run in reverse, register them so that the components
+            # are disposed in order.
+            for component in reversed(components):
+                exit_stack.callback(component.dispose)
+
+    def _get_components(
+        self,
+        workflow: WorkflowDefinition[Any, Any],
+    ) -> tuple[Source[Any], Processor[Any, Any], Sink[Any]]:
+        components = self._components.get(workflow.id)
+        if components is not None and not any(
+            _component.is_disposed for _component in components
+        ):
+            return components
+        self._discard_components(workflow.id)
+        with ExitStack() as exit_stack:
+            components = (
+                exit_stack.enter_context(workflow.source_factory()),
+                exit_stack.enter_context(workflow.processor_factory()),
+                exit_stack.enter_context(workflow.sink_factory()),
+            )
+            exit_stack.pop_all()
+        self._components[workflow.id] = components
+        return components
+
+
+def _run_worker(
+    connection: Connection,
+    reuse_components: bool,  # noqa: FBT001
+) -> None:
+    """Run the workflows received over the given connection.
+
+    This is the entry point of worker processes. Workflows are run one at a
+    time, until asked to stop or until the connection is closed.
+    """
+    runtime = _WorkerRuntime(reuse_components)
+    try:
+        while (task := connection.recv()) is not None:
+            error: BaseException | None = None
+            try:
+                runtime.run(task)
+            except BaseException as exp:  # noqa: BLE001
+                error = _transferable(exp)
+            connection.send(_Outcome(error, _memory_usage()))
+    except EOFError:
+        pass
+    finally:
+        runtime.dispose()
+        connection.close()
+
+
+@dataclass(eq=False, slots=True)
+class _Worker:
+    """The parent's handle to a worker process."""
+
+    process: BaseProcess
+    connection: Connection
+    runs: int = 0
+    warm_workflow_ids: set[str] = field(default_factory=set)
+
+
+def _stop_workers(workers: list[_Worker]) -> None:
+    """Ask the given workers to stop and wait for them to exit."""
+    for worker in workers:
+        with suppress(OSError):
+            worker.connection.send(None)
+    for worker in workers:
+        worker.process.join(timeout=_WORKER_STOP_TIMEOUT)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join()
+        worker.connection.close()
+    workers.clear()
+
+
+class ProcessPoolWorkflowExecutor(WorkflowExecutor, Disposable):
+    """A :class:`WorkflowExecutor` that runs workflows in a pool of
+    long-lived worker processes.
+
+    Each workflow run is handed to a worker process, which runs it using a
+    :class:`PipelinedWorkflowExecutor`. Workers are started on demand, up to
+    ``max_workers``, and are kept alive between runs. This isolates the
+    parent process, and the other workflows, from crashes and memory leaks
+    of a workflow, while avoiding the cost of starting a new interpreter,
+    and importing the workflow's dependencies, for every run. A run is
+    preferably handed to an idle worker that has already run the same
+    workflow, i.e. one with a matching ``id``.
+
+    Workflows MUST either be
+    :class:`~sghi.etl.registry.LazyWorkflowDefinition` instances, in which
+    case only their :class:`~sghi.etl.registry.WorkflowReference` is sent to
+    the worker, or be picklable.
+
+    When ``reuse_components`` is ``True``, the components created by the
+    factories of a workflow are kept by the worker and reused by later runs
+    of the workflow with the same ``id`` on that worker, instead of being
+    disposed after each run. This saves re-establishing connections, for
+    example. Components MUST then support being used for several runs. They
+    are disposed, and created afresh on the next run, when a run fails, and
+    are otherwise disposed when the worker stops. Note that in this mode,
+    :mod:`profiling<sghi.etl.profiling>` is not applied.
+
+    Workers are recycled, i.e. stopped and replaced, after
+    ``max_runs_per_worker`` runs or when their memory usage after a run
+    exceeds ``memory_limit``, so that leaks cannot accumulate indefinitely.
+    A worker that dies while running a workflow is replaced and a
+    :exc:`WorkerError` is raised.
+
+    :meth:`execute` blocks until the workflow has run and is safe to call
+    from several threads at once. :meth:`submit` runs workflows in the
+    background. Disposing this executor stops all the workers, waiting for
+    the runs in progress to complete.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_condition",
+        "_exit_hook",
+        "_idle_workers",
+        "_is_disposed",
+        "_logger",
+        "_max_runs_per_worker",
+        "_max_workers",
+        "_memory_limit",
+        "_mp_context",
+        "_reuse_components",
+        "_submit_executor",
+        "_workers",
+    )
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        *,
+        max_runs_per_worker: int | None = None,
+        memory_limit: int | None = None,
+        reuse_components: bool = False,
+        start_method: Literal["fork", "forkserver", "spawn"] | None = None,
+    ) -> None:
+        """Create a new ``ProcessPoolWorkflowExecutor`` instance.
+
+        :param max_workers: The maximum number of worker processes. MUST be
+            greater than zero when provided. Defaults to the number of CPUs.
+        :param max_runs_per_worker: An optional number of runs after which a
+            worker is recycled. MUST be greater than zero when provided.
+        :param memory_limit: An optional memory usage, in bytes, above which
+            a worker is recycled once its current run completes. MUST be
+            greater than zero when provided.
+        :param reuse_components: Whether workers keep the components of a
+            workflow for use by its later runs. Defaults to ``False``.
+        :param start_method: The :mod:`multiprocessing` start method used to
+            create the workers, e.g. ``"spawn"``. Defaults to the platform's
+            default start method.
+
+        :raise ValueError: If any of the arguments has an invalid value.
+        """
+        super().__init__()
+        self._max_workers: int = (
+            ensure_greater_than(
+                value=max_workers,
+                base_value=0,
+                message="'max_workers' MUST be greater than zero (0).",
+            )
+            if max_workers is not None
+            else os.cpu_count() or 1
+        )
+        self._max_runs_per_worker: int | None = (
+            ensure_greater_than(
+                value=max_runs_per_worker,
+                base_value=0,
+                message="'max_runs_per_worker' MUST be greater than zero (0).",
+            )
+            if max_runs_per_worker is not None
+            else None
+        )
+        self._memory_limit: int | None = (
+            ensure_greater_than(
+                value=memory_limit,
+                base_value=0,
+                message="'memory_limit' MUST be greater than zero (0).",
+            )
+            if memory_limit is not None
+            else None
+        )
+        self._reuse_components: bool = reuse_components
+        self._mp_context: (
+            DefaultContext | ForkContext | ForkServerContext | SpawnContext
+        ) = multiprocessing.get_context(start_method)
+        self._workers: list[_Worker] = []
+        self._idle_workers: list[_Worker] = []
+        self._condition: threading.Condition = threading.Condition()
+        self._submit_executor: ThreadPoolExecutor | None = None
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+        # Stop the workers at exit, before multiprocessing waits for them,
+        # in case this executor is never disposed.
+        self._exit_hook: Callable[[], None] = partial(
+            _stop_workers,
+            self._workers,
+        )
+        atexit.register(self._exit_hook)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def max_workers(self) -> int:
+        """The maximum number of worker processes.
+
+        :return: The maximum number of worker processes.
+        """
+        return self._max_workers
+
+    @property
+    def reuse_components(self) -> bool:
+        """Whether workers reuse the components of a workflow across runs.
+
+        :return: ``True`` if workers reuse the components of a workflow
+            across runs, ``False`` otherwise.
+        """
+        return self._reuse_components
+
+    @override
+    def dispose(self) -> None:
+        with self._condition:
+            if self._is_disposed:
+                return
+            self._is_disposed = True
+            self._condition.notify_all()
+        if self._submit_executor is not None:
+            self._submit_executor.shutdown(wait=True, cancel_futures=True)
+        with self._condition:
+            # Busy workers are stopped once their runs complete.
+            idle_workers: list[_Worker] = list(self._idle_workers)
+            self._idle_workers.clear()
+            for worker in idle_workers:
+                self._workers.remove(worker)
+        _stop_workers(idle_workers)
+        with self._condition:
+            self._condition.wait_for(lambda: not self._workers)
+        atexit.unregister(self._exit_hook)
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def execute(self, workflow: WorkflowDefinition[_RDT, _PDT]) -> None:
+        """Execute the given workflow in a worker process.
+
+        :param workflow: The workflow to execute. MUST not be ``None``.
+
+        :return: None.
+
+        :raise ValueError: If ``workflow`` is ``None``.
+        :raise TypeError: If ``workflow`` cannot be sent to a worker.
+        :raise WorkerError: If the worker dies while running the workflow.
+        """
+        ensure_not_none(workflow, "'workflow' MUST not be None.")
+        task: _Task = _Task.of(workflow)
+
+        worker: _Worker = self._acquire_worker(task.workflow_id)
+        outcome: _Outcome | None = None
+        try:
+            self._logger.info(
+                "[%s] Running workflow in worker process %s.",
+                task.workflow_id,
+                worker.process.pid,
+            )
+            worker.connection.send(task)
+            outcome = cast("_Outcome", worker.connection.recv())
+        except (EOFError, OSError):
+            worker.process.join()
+            _err_msg: str = (
+                f"The worker process running workflow '{task.workflow_id}' "
+                f"exited unexpectedly with code {worker.process.exitcode}."
+            )
+            raise WorkerError(_err_msg) from None
+        else:
+            if outcome.error is not None:
+                raise outcome.error
+        finally:
+            self._release_worker(worker, task.workflow_id, outcome)
+
+    @not_disposed
+    def submit(self, workflow: WorkflowDefinition[_RDT, _PDT]) -> Future[None]:
+        """Execute the given workflow in a worker process, in the background.
+
+        :param workflow: The workflow to execute. MUST not be ``None``.
+
+        :return: A future that completes once the workflow has run, holding
+            the error raised by the run, if any.
+
+        :raise ValueError: If ``workflow`` is ``None``.
+        """
+        ensure_not_none(workflow, "'workflow' MUST not be None.")
+        with self._condition:
+            if self._submit_executor is None:
+                self._submit_executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="sghi-etl-process-pool",
+                )
+        return self._submit_executor.submit(self.execute, workflow)
+
+    def _acquire_worker(self, workflow_id: str) -> _Worker:
+        with self._condition:
+            while True:
+                if self._is_disposed:
+                    _err_msg: str = "The executor has been disposed."
+                    raise ResourceDisposedError(_err_msg)
+                if self._idle_workers:
+                    worker: _Worker = next(
+                        (
+                            _worker
+                            for _worker in self._idle_workers
+                            if workflow_id in _worker.warm_workflow_ids
+                        ),
+                        self._idle_workers[-1],
+                    )
+                    self._idle_workers.remove(worker)
+                    return worker
+                if len(self._workers) < self._max_workers:
+                    worker = self._start_worker()
+                    self._workers.append(worker)
+                    return worker
+                self._condition.wait()
+
+    def _release_worker(
+        self,
+        worker: _Worker,
+        workflow_id: str,
+        outcome: _Outcome | None,
+    ) -> None:
+        worker.runs += 1
+        worker.warm_workflow_ids.add(workflow_id)
+        recycle: bool = (
+            outcome is None
+            or (
+                self._max_runs_per_worker is not None
+                and worker.runs >= self._max_runs_per_worker
+            )
+            or (
+                self._memory_limit is not None
+                and outcome.memory_usage > self._memory_limit
+            )
+        )
+        with self._condition:
+            if recycle or self._is_disposed:
+                self._workers.remove(worker)
+            else:
+                self._idle_workers.append(worker)
+            self._condition.notify_all()
+        if recycle or self._is_disposed:
+            self._logger.debug(
+                "Recycling worker process %s after %d run(s).",
+                worker.process.pid,
+                worker.runs,
+            )
+            _stop_workers([worker])
+
+    def _start_worker(self) -> _Worker:
+        parent_connection, child_connection = self._mp_context.Pipe()
+        process: BaseProcess = self._mp_context.Process(
+            target=_run_worker,
+            args=(child_connection, self._reuse_components),
+            name="sghi-etl-worker",
+        )
+        process.start()
+        child_connection.close()
+        self._logger.debug("Started worker process %s.", process.pid)
+        return _Worker(process=process, connection=parent_connection)
+
+
+# =============================================================================
+# DISTRIBUTED
+# =============================================================================
+
+
+@dataclass(frozen=True, slots=True)
+class _PartitionOutcome:
+    """The result of processing a partition in a worker process.
+
+    An ``index`` of ``None`` reports an error raised while setting up the
+    worker, i.e. before any partition could be processed.
+    """
+
+    index: int | None
+    data: Any = None
+    error: BaseException | None = None
+
+
+def _as_partitioned(
+    source: Source[Any],
+    workflow_id: str,
+) -> PartitionedSource[Any, Any]:
+    """Return the given source of a distributed workflow.
+
+    :raise TypeError: If the source is not a ``PartitionedSource``.
+    """
+    if not isinstance(source, PartitionedSource):
+        _err_msg: str = (
+            f"The source of workflow '{workflow_id}' MUST be a "
+            f"'{type_fqn(PartitionedSource)}' to be distributed, got "
+            f"'{type_fqn(type(source))}' instead."
+        )
+        raise TypeError(_err_msg)
+    return source
+
+
+def _process_partition(
+    source: PartitionedSource[Any, Any],
+    processor: Processor[Any, Any],
+    index: int,
+    partition: Any,  # noqa: ANN401
+) -> _PartitionOutcome:
+    """Draw and process a single partition."""
+    try:
+        data: Any = processor.apply(source.draw_partition(partition))
+    except BaseException as exp:  # noqa: BLE001
+        return _PartitionOutcome(index, error=_transferable(exp))
+    return _PartitionOutcome(index, data=data)
+
+
+def _send_outcome(connection: Connection, outcome: _PartitionOutcome) -> None:
+    """Send the given outcome, or an error if its data cannot be pickled."""
+    try:
+        connection.send(outcome)
+    except (AttributeError, TypeError, pickle.PicklingError) as exp:
+        connection.send(
+            _PartitionOutcome(outcome.index, error=_transferable(exp)),
+        )
+
+
+def _run_partition_worker(connection: Connection, task: _Task) -> None:
+    """Run a worker process of a distributed run.
+
+    Create the source and processor of the workflow, then draw and process
+    the partitions received over the given connection, one at a time, until
+    asked to stop or until the connection is closed.
+    """
+    try:
+        with ExitStack() as exit_stack:
+            try:
+                workflow: WorkflowDefinition[Any, Any] = task.load()
+                source = _as_partitioned(
+                    exit_stack.enter_context(workflow.source_factory()),
+                    task.workflow_id,
+                )
+                processor: Processor[Any, Any] = exit_stack.enter_context(
+                    workflow.processor_factory(),
+                )
+            except BaseException as exp:  # noqa: BLE001
+                connection.send(
+                    _PartitionOutcome(None, error=_transferable(exp)),
+                )
+                return
+            while (assignment := connection.recv()) is not None:
+                index, partition = assignment
+                _send_outcome(
+                    connection,
+                    _process_partition(source, processor, index, partition),
+                )
+    except (EOFError, OSError):
+        # The coordinator has gone away, there is no one left to report to.
+        pass
+    finally:
+        connection.close()
+
+
+class _Coordinator:
+    """Hands out the partitions of a distributed run to worker processes
+    and gathers their results.
+    """  # noqa: D205
+
+    __slots__ = (
+        "_crashes",
+        "_done",
+        "_idle",
+        "_logger",
+        "_max_workers",
+        "_ordered",
+        "_partitions",
+        "_pending",
+        "_running",
+        "_speculated",
+        "_start_worker",
+        "_straggler_timeout",
+        "_workers",
+        "_workflow_id",
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        workflow_id: str,
+        partitions: Sequence[Any],
+        start_worker: Callable[[], _Worker],
+        logger: logging.Logger,
+        *,
+        max_workers: int,
+        ordered: bool,
+        straggler_timeout: float | None,
+    ) -> None:
+        super().__init__()
+        self._workflow_id: str = workflow_id
+        self._partitions: Sequence[Any] = partitions
+        self._start_worker: Callable[[], _Worker] = start_worker
+        self._logger: logging.Logger = logger
+        self._max_workers: int = max_workers
+        self._ordered: bool = ordered
+        self._straggler_timeout: float | None = straggler_timeout
+        self._pending: deque[int] = deque(range(len(partitions)))
+        self._running: dict[_Worker, tuple[int, float]] = {}
+        self._speculated: set[int] = set()
+        self._crashes: dict[int, int] = {}
+        self._done: set[int] = set()
+        self._workers: list[_Worker] = []
+        self._idle: list[_Worker] = []
+
+    def run(self) -> Generator[Any, None, None]:
+        """Process all the partitions, yielding the result of each."""
+        results: dict[int, Any] = {}
+        next_index: int = 0
+        try:
+            workers: int = min(self._max_workers, len(self._partitions))
+            for _ in range(workers):
+                self._add_worker()
+            while len(self._done) < len(self._partitions):
+                self._assign()
+                for index, data in self._collect():
+                    if not self._ordered:
+                        yield data
+                        continue
+                    results[index] = data
+                    while next_index in results:
+                        yield results.pop(next_index)
+                        next_index += 1
+        finally:
+            # Workers still busy are either running a redundant copy of a
+            # partition or the run has failed, their results are not needed.
+            for worker in self._running:
+                worker.process.terminate()
+            _stop_workers(self._workers)
+
+    def _add_worker(self) -> None:
+        worker: _Worker = self._start_worker()
+        self._workers.append(worker)
+        self._idle.append(worker)
+
+    def _assign(self) -> None:
+        while self._idle:
+            index: int | None = self._next_partition()
+            if index is None:
+                return
+            worker: _Worker = self._idle.pop()
+            self._running[worker] = (index, time.monotonic())
+            # A worker that has died is detected when collecting results.
+            with suppress(OSError):
+                worker.connection.send((index, self._partitions[index]))
+
+    def _collect(self) -> Iterator[tuple[int, Any]]:
+        """Wait for workers to report, yielding the index and data of first
+        results only.
+        """  # noqa: D205
+        by_connection: dict[Any, _Worker] = {
+            _worker.connection: _worker for _worker in self._running
+        }
+        for connection in multiprocessing.connection.wait(
+            list(by_connection),
+            timeout=_POLL_INTERVAL,
+        ):
+            worker: _Worker = by_connection[connection]
+            index, _ = self._running.pop(worker)
+            try:
+                outcome: _PartitionOutcome = worker.connection.recv()
+            except (EOFError, OSError):
+                self._replace(worker, index)
+                continue
+            if outcome.error is not None:
+                raise outcome.error
+            self._idle.append(worker)
+            worker.runs += 1
+            if index in self._done:
+                # A redundant copy of the partition completed first.
+                continue
+            self._done.add(index)
+            yield index, outcome.data
+
+    def _is_running(self, index: int) -> bool:
+        return any(_index == index for _index, _ in self._running.values())
+
+    def _next_partition(self) -> int | None:
+        if self._pending:
+            return self._pending.popleft()
+        straggler_timeout: float | None = self._straggler_timeout
+        if straggler_timeout is None:
+            return None
+        # Speculatively run a copy of the partition that has been running
+        # the longest, once it is late, on the idle worker.
+        now: float = time.monotonic()
+        stragglers: list[tuple[float, int]] = [
+            (_started_at, _index)
+            for _index, _started_at in self._running.values()
+            if _index not in self._speculated
+            and now - _started_at >= straggler_timeout
+        ]
+        if not stragglers:
+            return None
+        _, index = min(stragglers)
+        self._speculated.add(index)
+        self._logger.debug(
+            "[%s] Partition %d is late, running a copy of it.",
+            self._workflow_id,
+            index,
+        )
+        return index
+
+    def _replace(self, worker: _Worker, index: int) -> None:
+        """Replace a worker that died while processing the given partition,
+        and process the partition again if need be.
+        """  # noqa: D205
+        self._workers.remove(worker)
+        worker.process.join()
+        worker.connection.close()
+        self._crashes[index] = self._crashes.get(index, 0) + 1
+        _err_msg: str = (
+            f"The worker process running partition {index} of workflow "
+            f"'{self._workflow_id}' exited unexpectedly with code "
+            f"{worker.process.exitcode}."
+        )
+        if self._crashes[index] >= _MAX_PARTITION_CRASHES:
+            raise WorkerError(_err_msg)
+        self._logger.warning(
+            "%s Retrying the partition.",
+            _err_msg,
+        )
+        self._add_worker()
+        if index not in self._done and not self._is_running(index):
+            self._pending.appendleft(index)
+
+
+class DistributedWorkflowExecutor(WorkflowExecutor):
+    """A :class:`WorkflowExecutor` that spreads the partitions of a workflow
+    across several worker processes.
+
+    The source of the workflow MUST be a
+    :class:`~sghi.etl.sources.PartitionedSource`. The executor, acting as
+    the coordinator, lists the partitions of the source and starts up to
+    ``workers`` worker processes. Each worker creates its own source and
+    processor, using the factories of the workflow, then repeatedly receives
+    a partition from the coordinator, draws it, processes it and sends the
+    result back. The results are aggregated by draining them, one chunk per
+    partition, into the sink of the workflow, which only the coordinator
+    creates. The prologue and epilogue of the workflow also only run in the
+    coordinator.
+
+    Partitions are handed out one at a time, as workers become free, so
+    that faster workers process more partitions. Once no partitions are left
+    to hand out, a free worker steals the partition that has been running
+    the longest, provided it has been running for at least
+    ``straggler_timeout`` seconds, and processes a copy of it. Whichever
+    copy completes first is used and the other is discarded. Drawing and
+    processing a partition SHOULD thus have no side effects. A partition
+    whose worker dies is handed to a replacement worker, unless its worker
+    dies a second time in which case a :exc:`WorkerError` is raised. If
+    processing any partition fails, the run is aborted and the error is
+    propagated to the caller.
+
+    The workers and coordinator communicate over :mod:`multiprocessing`
+    pipes. Workflows, partitions and processed data MUST therefore be
+    picklable, or, for workflows, be
+    :class:`~sghi.etl.registry.LazyWorkflowDefinition` instances.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_logger",
+        "_mp_context",
+        "_ordered",
+        "_straggler_timeout",
+        "_workers",
+    )
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        *,
+        ordered: bool = False,
+        straggler_timeout: float | None = 30.0,
+        start_method: Literal["fork", "forkserver", "spawn"] | None = None,
+    ) -> None:
+        """Create a new ``DistributedWorkflowExecutor`` instance.
+
+        :param workers: The maximum number of worker processes. MUST be
+            greater than zero when provided. Defaults to the number of CPUs.
+        :param ordered: When ``True``, the results are drained in the same
+            order as the partitions. When ``False``, the default, they are
+            drained in the order in which they complete.
+        :param straggler_timeout: The number of seconds after which a
+            partition that is still running is processed again by a free
+            worker. MUST be greater than zero when provided. ``None``
+            disables this. Defaults to 30 seconds.
+        :param start_method: The :mod:`multiprocessing` start method used to
+            create the workers, e.g. ``"spawn"``. Defaults to the platform's
+            default start method.
+
+        :raise ValueError: If any of the arguments has an invalid value.
+        """
+        super().__init__()
+        self._workers: int = (
+            ensure_greater_than(
+                value=workers,
+                base_value=0,
+                message="'workers' MUST be greater than zero (0).",
+            )
+            if workers is not None
+            else os.cpu_count() or 1
+        )
+        self._ordered: bool = ordered
+        self._straggler_timeout: float | None = (
+            ensure_greater_than(
+                value=straggler_timeout,
+                base_value=0,
+                message="'straggler_timeout' MUST be greater than zero (0).",
+            )
+            if straggler_timeout is not None
+            else None
+        )
+        self._mp_context: (
+            DefaultContext | ForkContext | ForkServerContext | SpawnContext
+        ) = multiprocessing.get_context(start_method)
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    def ordered(self) -> bool:
+        """Whether the results are drained in the same order as the
+        partitions.
+
+        :return: ``True`` if the results are drained in the same order as the
+            partitions, ``False`` if they are drained in the order in which
+            they complete.
+        """  # noqa: D205
+        return self._ordered
+
+    @property
+    def straggler_timeout(self) -> float | None:
+        """The number of seconds after which a running partition is processed
+        again by a free worker, if enabled.
+
+        :return: The straggler timeout, in seconds, or ``None`` if partitions
+            are never processed again.
+        """  # noqa: D205
+        return self._straggler_timeout
+
+    @property
+    def workers(self) -> int:
+        """The maximum number of worker processes.
+
+        :return: The maximum number of worker processes.
+        """
+        return self._workers
+
+    @override
+    def execute(self, workflow: WorkflowDefinition[_RDT, _PDT]) -> None:
+        """Execute the given workflow, spreading its partitions across
+        worker processes.
+
+        :param workflow: The workflow to execute. MUST not be ``None``.
+
+        :return: None.
+
+        :raise ValueError: If ``workflow`` is ``None``.
+        :raise TypeError: If ``workflow`` cannot be sent to a worker or if
+            its source is not a ``PartitionedSource``.
+        :raise WorkerError: If a partition repeatedly kills its worker.
+        """  # noqa: D205
+        ensure_not_none(workflow, "'workflow' MUST not be None.")
+        task: _Task = _Task.of(workflow)
+
+        self._logger.info("[%s] Starting workflow.", workflow.id)
+        try:
+            workflow.prologue()
+            sink: Sink[_PDT]
+            with workflow.source_factory() as source:
+                partitions: list[Any] = list(
+                    _as_partitioned(source, workflow.id).partitions(),
+                )
+            self._logger.info(
+                "[%s] Distributing %d partition(s).",
+                workflow.id,
+                len(partitions),
+            )
+            coordinator = _Coordinator(
+                workflow.id,
+                partitions,
+                partial(self._start_worker, task),
+                self._logger,
+                max_workers=self._workers,
+                ordered=self._ordered,
+                straggler_timeout=self._straggler_timeout,
+            )
+            with (
+                workflow.sink_factory() as sink,
+                closing(coordinator.run()) as results,
+            ):
+                sink.drain_stream(results)
+        finally:
+            workflow.epilogue()
+        self._logger.info("[%s] Workflow completed.", workflow.id)
+
+    def _start_worker(self, task: _Task) -> _Worker:
+        parent_connection, child_connection = self._mp_context.Pipe()
+        process: BaseProcess = self._mp_context.Process(
+            target=_run_partition_worker,
+            args=(child_connection, task),
+            name="sghi-etl-partition-worker",
+        )
+        process.start()
+        child_connection.close()
+        self._logger.debug("Started worker process %s.", process.pid)
+        return _Worker(process=process, connection=parent_connection)
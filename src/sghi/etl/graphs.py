@@ -0,0 +1,195 @@
+"""Workflows shaped as dataflow graphs.
+
+A :class:`~sghi.etl.core.WorkflowDefinition` connects exactly one
+:class:`~sghi.etl.core.Source` to one :class:`~sghi.etl.core.Processor` and
+one :class:`~sghi.etl.core.Sink`. Workflows that need the same extract for
+several purposes therefore either duplicate the extract, or cram unrelated
+transformations into a single ``Processor``.
+
+A :class:`GraphWorkflowDefinition` instead describes a directed acyclic
+graph of *nodes*. :class:`SourceNode` instances are the roots of the graph.
+Each :class:`ProcessorNode` and :class:`SinkNode` consumes the output of
+exactly one upstream source or processor node, while any source or
+processor node may feed several downstream nodes. The data drawn from a
+source is thus shared by all the branches hanging off it, and every
+branch ends at a sink.
+
+Graph workflows are run by a
+:class:`~sghi.etl.executors.GraphWorkflowExecutor`.
+
+.. versionadded:: 1.3.0
+"""
+
+from __future__ import annotations
+
+from abc import ABCMeta, abstractmethod
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, TypeAlias
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from sghi.etl.core import Processor, Sink, Source
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+def _noop() -> None:
+    """Do nothing."""
+    ...
+
+
+# =============================================================================
+# NODES
+# =============================================================================
+
+
+@dataclass(frozen=True, slots=True)
+class SourceNode:
+    """A node of a :class:`GraphWorkflowDefinition` that draws data.
+
+    The :meth:`~sghi.etl.core.Source.stream` of the ``Source`` is consumed
+    once per run and each chunk is handed to every node consuming this one.
+
+    .. versionadded:: 1.3.0
+    """
+
+    id: str
+    """The unique identifier of this node within its graph."""
+
+    factory: Callable[[], Source[Any]]
+    """The factory that creates the ``Source`` of this node."""
+
+
+@dataclass(frozen=True, slots=True)
+class ProcessorNode:
+    """A node of a :class:`GraphWorkflowDefinition` that transforms the data
+    of an upstream node.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    id: str
+    """The unique identifier of this node within its graph."""
+
+    factory: Callable[[], Processor[Any, Any]]
+    """The factory that creates the ``Processor`` of this node."""
+
+    input: str
+    """The id of the source or processor node whose output to transform."""
+
+
+@dataclass(frozen=True, slots=True)
+class SinkNode:
+    """A node of a :class:`GraphWorkflowDefinition` that consumes the data
+    of an upstream node.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    id: str
+    """The unique identifier of this node within its graph."""
+
+    factory: Callable[[], Sink[Any]]
+    """The factory that creates the ``Sink`` of this node."""
+
+    input: str
+    """The id of the source or processor node whose output to consume."""
+
+
+Node: TypeAlias = SourceNode | ProcessorNode | SinkNode
+"""Any node of a :class:`GraphWorkflowDefinition`.
+
+.. versionadded:: 1.3.0
+"""
+
+
+# =============================================================================
+# GRAPH WORKFLOW DEFINITION
+# =============================================================================
+
+
+class GraphWorkflowDefinition(metaclass=ABCMeta):
+    """An object that defines an SGHI ETL Workflow as a graph of nodes.
+
+    The graph MUST have at least one :class:`SinkNode`, node ids MUST be
+    unique, and every source and processor node MUST be consumed by at least
+    one other node. Since every processor and sink node has a single input,
+    each node is reachable from exactly one source node.
+
+    Chunks are shared, not copied, between the nodes consuming the same
+    upstream node, which MUST therefore not modify the data they are given.
+
+    As with a :class:`~sghi.etl.core.WorkflowDefinition`, the
+    :attr:`prologue` runs before any component is created and, if it
+    fails, nothing else but the :attr:`epilogue` runs. The ``epilogue``
+    always runs last.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = ()
+
+    @property
+    @abstractmethod
+    def id(self) -> str:
+        """The unique identifier of this workflow.
+
+        :return: The unique identifier of this workflow.
+        """
+        ...
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """The name of this workflow.
+
+        :return: The name of this workflow.
+        """
+        ...
+
+    @property
+    @abstractmethod
+    def description(self) -> str | None:
+        """The description of this workflow, if available.
+
+        :return: The description of this workflow or ``None`` if not
+            available.
+        """
+        ...
+
+    @property
+    @abstractmethod
+    def nodes(self) -> Sequence[Node]:
+        """The nodes of this workflow.
+
+        The order of the nodes does not matter.
+
+        :return: The nodes of this workflow.
+        """
+        ...
+
+    @property
+    def prologue(self) -> Callable[[], None]:
+        """A callable to be executed at the beginning of the workflow.
+
+        The default implementation of this property returns a callable that
+        does nothing.
+
+        :return: A callable to be executed at the beginning of the workflow.
+        """
+        return _noop
+
+    @property
+    def epilogue(self) -> Callable[[], None]:
+        """A callable to be executed at the end of the workflow.
+
+        The default implementation of this property returns a callable that
+        does nothing.
+
+        :return: A callable to be executed at the end of the workflow.
+        """
+        return _noop
@@ -0,0 +1,765 @@
+"""Incremental extraction using persisted watermarks.
+
+An :class:`IncrementalSource` draws only the data that is newer than a given
+*watermark*, e.g. a timestamp, an offset or a cursor, and reports the
+watermark to resume from on the next run. A :class:`CheckpointStore`
+persists these watermarks between runs. An
+:class:`IncrementalWorkflowDefinition` ties the two together so that the new
+watermark is only committed to the store once the workflow's
+:class:`~sghi.etl.core.Sink` has successfully drained the data, meaning that
+reruns only process the data that has not been loaded yet.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from abc import ABCMeta, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+from typing_extensions import override
+
+from sghi.disposable import Disposable, not_disposed
+from sghi.etl.core import Sink, Source, WorkflowDefinition
+from sghi.utils import ensure_not_none, ensure_not_none_nor_empty, type_fqn
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from sghi.etl.core import Processor
+
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_PDT = TypeVar("_PDT")
+"""Processed Data Type."""
+
+_RDT = TypeVar("_RDT")
+"""Raw Data Type."""
+
+_WT = TypeVar("_WT")
+"""Watermark Type."""
+
+
+@dataclass(frozen=True, slots=True)
+class Increment(Generic[_RDT, _WT]):
+    """The data drawn by an :class:`IncrementalSource` together with the
+    watermark to resume from afterwards.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    data: _RDT
+    """The newly drawn data."""
+
+    watermark: _WT | None
+    """The watermark to resume from once :attr:`data` has been loaded, or
+    ``None`` to keep the previous watermark.
+    """
+
+
+# =============================================================================
+# INCREMENTAL SOURCE
+# =============================================================================
+
+
+class IncrementalSource(Source[_RDT], Generic[_RDT, _WT], metaclass=ABCMeta):
+    """A :class:`~sghi.etl.core.Source` that can draw only the data that is
+    newer than a given watermark.
+
+    Subclasses MUST implement :meth:`draw_since` and MAY override
+    :meth:`stream_since` to provide the new data in chunks. Watermarks are
+    opaque to this library, but MUST be serializable by the
+    :class:`CheckpointStore` in use. The stores provided by this module
+    require JSON serializable watermarks, e.g. ISO 8601 timestamps, numeric
+    offsets or string cursors.
+
+    When used as a regular ``Source``, i.e. through :meth:`draw` or
+    :meth:`stream`, all the available data is drawn.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ()
+
+    @override
+    def draw(self) -> _RDT:
+        """Draw all the available data.
+
+        This is equivalent to calling :meth:`draw_since` without a
+        watermark and discarding the returned watermark.
+
+        :return: All the available data.
+        """
+        return self.draw_since(None).data
+
+    @abstractmethod
+    def draw_since(self, watermark: _WT | None) -> Increment[_RDT, _WT]:
+        """Draw the data that is newer than the given watermark.
+
+        :param watermark: The watermark to resume from, or ``None`` to draw
+            all the available data, e.g. on the very first run.
+
+        :return: The new data together with the watermark to resume from
+            once that data has been loaded.
+        """
+        ...
+
+    @override
+    def stream(self) -> Iterator[_RDT]:
+        """Draw all the available data in chunks.
+
+        This is equivalent to calling :meth:`stream_since` without a
+        watermark and discarding the returned watermarks.
+
+        :return: An iterator of raw data chunks.
+        """
+        for increment in self.stream_since(None):
+            yield increment.data
+
+    def stream_since(
+        self,
+        watermark: _WT | None,
+    ) -> Iterator[Increment[_RDT, _WT]]:
+        """Draw the data that is newer than the given watermark in chunks.
+
+        Each yielded increment carries the watermark to resume from once its
+        data, and that of all the preceding increments, has been loaded.
+
+        The default implementation yields the result of a single call to
+        :meth:`draw_since` as the only increment.
+
+        :param watermark: The watermark to resume from, or ``None`` to draw
+            all the available data, e.g. on the very first run.
+
+        :return: An iterator of increments.
+        """
+        yield self.draw_since(watermark)
+
+
+# =============================================================================
+# CHECKPOINT STORES
+# =============================================================================
+
+
+class CheckpointStore(Disposable, metaclass=ABCMeta):
+    """Persistent storage for watermarks, keyed by a user-supplied key.
+
+    Implementations MUST be safe to use from multiple threads.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the watermark stored under the given key, if any.
+
+        :param key: The key of the watermark to remove.
+
+        :return: None.
+        """
+        ...
+
+    @abstractmethod
+    def load(self, key: str) -> Any | None:  # noqa: ANN401
+        """Return the watermark stored under the given key.
+
+        :param key: The key of the watermark to return.
+
+        :return: The stored watermark or ``None`` if no watermark has been
+            stored under the given key.
+        """
+        ...
+
+    @abstractmethod
+    def save(self, key: str, watermark: Any) -> None:  # noqa: ANN401
+        """Store a watermark under the given key, replacing any existing one.
+
+        :param key: The key to store the watermark under.
+        :param watermark: The watermark to store. MUST not be ``None``.
+
+        :return: None.
+        """
+        ...
+
+
+class FileCheckpointStore(CheckpointStore):
+    """A :class:`CheckpointStore` that keeps all the watermarks in a single
+    JSON file.
+
+    The file is rewritten atomically on every change so that a crash never
+    leaves it partially written. This store is well suited to a modest
+    number of workflows running on a single host. Prefer a
+    :class:`SQLiteCheckpointStore` when several processes share the same
+    checkpoints.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ("_is_disposed", "_lock", "_logger", "_path")
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Create a new ``FileCheckpointStore`` instance.
+
+        :param path: The path of the JSON file to keep the watermarks in. The
+            file, and its parent directories, are created when the first
+            watermark is saved. MUST not be ``None``.
+
+        :raise ValueError: If ``path`` is ``None``.
+        """
+        super().__init__()
+        ensure_not_none(path, "'path' MUST not be None.")
+        self._path: Path = Path(path)
+        self._lock: threading.Lock = threading.Lock()
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def path(self) -> Path:
+        """The path of the JSON file that the watermarks are kept in.
+
+        :return: The path of the JSON file that the watermarks are kept in.
+        """
+        return self._path
+
+    @not_disposed
+    @override
+    def delete(self, key: str) -> None:
+        with self._lock:
+            checkpoints = self._read()
+            if checkpoints.pop(key, None) is not None:
+                self._write(checkpoints)
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def load(self, key: str) -> Any | None:
+        with self._lock:
+            return self._read().get(key)
+
+    @not_disposed
+    @override
+    def save(self, key: str, watermark: Any) -> None:
+        ensure_not_none(watermark, "'watermark' MUST not be None.")
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints[key] = watermark
+            self._write(checkpoints)
+
+    def _read(self) -> dict[str, Any]:
+        try:
+            with self._path.open("r", encoding="utf-8") as checkpoints_file:
+                return json.load(checkpoints_file)
+        except FileNotFoundError:
+            return {}
+
+    def _write(self, checkpoints: dict[str, Any]) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self._path.with_name(
+            f".{self._path.name}.{os.getpid()}.{threading.get_ident()}.tmp",
+        )
+        with temp_path.open("w", encoding="utf-8") as checkpoints_file:
+            json.dump(checkpoints, checkpoints_file, indent=2, sort_keys=True)
+        temp_path.replace(self._path)
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """A :class:`CheckpointStore` that keeps the watermarks in an SQLite
+    database.
+
+    Watermarks are serialized to JSON and stored in a ``checkpoints`` table,
+    which is created if it does not exist. Every change is committed
+    immediately, which allows several processes to safely share the same
+    database file.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ("_connection", "_is_disposed", "_lock", "_logger")
+
+    def __init__(self, database: str | os.PathLike[str]) -> None:
+        """Create a new ``SQLiteCheckpointStore`` instance.
+
+        :param database: The path of the SQLite database file to keep the
+            watermarks in, or ``":memory:"`` for a private in-memory
+            database. MUST not be ``None``.
+
+        :raise ValueError: If ``database`` is ``None``.
+        """
+        super().__init__()
+        ensure_not_none(database, "'database' MUST not be None.")
+        self._connection: sqlite3.Connection = sqlite3.connect(
+            database,
+            check_same_thread=False,
+        )
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "key TEXT PRIMARY KEY, "
+                "watermark TEXT NOT NULL, "
+                "updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP"
+                ")",
+            )
+        self._lock: threading.Lock = threading.Lock()
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @not_disposed
+    @override
+    def delete(self, key: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM checkpoints WHERE key = ?",
+                (key,),
+            )
+
+    @override
+    def dispose(self) -> None:
+        with self._lock:
+            if self._is_disposed:
+                return
+            self._is_disposed = True
+            self._connection.close()
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def load(self, key: str) -> Any | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT watermark FROM checkpoints WHERE key = ?",
+                (key,),
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    @not_disposed
+    @override
+    def save(self, key: str, watermark: Any) -> None:
+        ensure_not_none(watermark, "'watermark' MUST not be None.")
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO checkpoints (key, watermark) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "watermark = excluded.watermark, "
+                "updated_at = CURRENT_TIMESTAMP",
+                (key, json.dumps(watermark)),
+            )
+
+
+# =============================================================================
+# CHECKPOINTED COMPONENTS
+# =============================================================================
+
+
+class CheckpointedSource(Source[_RDT], Generic[_RDT, _WT]):
+    """A :class:`~sghi.etl.core.Source` that resumes a wrapped
+    :class:`IncrementalSource` from the watermark held in a
+    :class:`CheckpointStore`.
+
+    Drawing from this ``Source`` loads the stored watermark, draws the data
+    newer than it from the wrapped ``IncrementalSource`` and keeps the
+    returned watermark as *pending*. The pending watermark is only saved to
+    the store when :meth:`commit` is called, which SHOULD happen once the
+    drawn data has been loaded, see :class:`CommittingSink`. The watermark
+    of every streamed chunk is also remembered so that :meth:`commit` can
+    save the watermark of only the chunks that have been loaded.
+
+    Disposing this ``Source`` disposes the wrapped ``IncrementalSource`` but
+    NOT the store, since it may be shared. Uncommitted watermarks are
+    discarded.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_is_disposed",
+        "_key",
+        "_lock",
+        "_logger",
+        "_pending_watermark",
+        "_source",
+        "_store",
+        "_streamed_watermarks",
+    )
+
+    def __init__(
+        self,
+        source: IncrementalSource[_RDT, _WT],
+        store: CheckpointStore,
+        key: str,
+    ) -> None:
+        """Create a new ``CheckpointedSource`` instance.
+
+        :param source: The ``IncrementalSource`` to resume. MUST not be
+            ``None``.
+        :param store: The store holding the watermarks. MUST not be
+            ``None``.
+        :param key: The key of this ``Source``'s watermark in the store. MUST
+            not be ``None`` or empty.
+
+        :raise ValueError: If ``source`` or ``store`` is ``None``, or if
+            ``key`` is ``None`` or empty.
+        """
+        super().__init__()
+        self._source: IncrementalSource[_RDT, _WT] = ensure_not_none(
+            source,
+            "'source' MUST not be None.",
+        )
+        self._store: CheckpointStore = ensure_not_none(
+            store,
+            "'store' MUST not be None.",
+        )
+        self._key: str = ensure_not_none_nor_empty(
+            key,
+            "'key' MUST not be None or empty.",
+        )
+        self._pending_watermark: _WT | None = None
+        self._streamed_watermarks: deque[_WT | None] = deque()
+        self._lock: threading.Lock = threading.Lock()
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def key(self) -> str:
+        """The key of this ``Source``'s watermark in the store.
+
+        :return: The key of this ``Source``'s watermark in the store.
+        """
+        return self._key
+
+    @property
+    def pending_watermark(self) -> _WT | None:
+        """The latest watermark that has been drawn but not yet committed.
+
+        :return: The latest uncommitted watermark or ``None`` if there is
+            none.
+        """
+        with self._lock:
+            return self._pending_watermark
+
+    @not_disposed
+    def commit(self, chunks: int | None = None) -> None:
+        """Save the pending watermark, if any, to the store.
+
+        When ``chunks`` is given, the latest watermark of only the first
+        ``chunks`` streamed, but not yet committed, chunks is saved instead.
+        This allows the watermark of chunks that have been drawn ahead of
+        the loaded data to be kept for a later commit, or a later run.
+
+        :param chunks: The number of streamed chunks whose data has been
+            loaded, or ``None`` to commit the latest drawn watermark.
+            Defaults to ``None``.
+
+        :return: None.
+        """
+        with self._lock:
+            if chunks is None:
+                watermark = self._pending_watermark
+                self._streamed_watermarks.clear()
+            else:
+                watermark = self._pop_streamed_watermark(chunks)
+            if watermark is None:
+                return
+            self._store.save(self._key, watermark)
+            if not self._streamed_watermarks:
+                self._pending_watermark = None
+        self._logger.info(
+            "Committed the watermark '%s' for key '%s'.",
+            watermark,
+            self._key,
+        )
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        self._source.dispose()
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def draw(self) -> _RDT:
+        increment = self._source.draw_since(self._store.load(self._key))
+        self._set_pending(increment.watermark)
+        return increment.data
+
+    @not_disposed
+    @override
+    def stream(self) -> Iterator[_RDT]:
+        watermark: _WT | None = self._store.load(self._key)
+        for increment in self._source.stream_since(watermark):
+            with self._lock:
+                self._streamed_watermarks.append(increment.watermark)
+            self._set_pending(increment.watermark)
+            yield increment.data
+
+    def _pop_streamed_watermark(self, chunks: int) -> _WT | None:
+        watermark: _WT | None = None
+        for _ in range(min(chunks, len(self._streamed_watermarks))):
+            chunk_watermark = self._streamed_watermarks.popleft()
+            if chunk_watermark is not None:
+                watermark = chunk_watermark
+        return watermark
+
+    def _set_pending(self, watermark: _WT | None) -> None:
+        if watermark is None:
+            return
+        with self._lock:
+            self._pending_watermark = watermark
+
+
+class CommittingSink(Sink[_PDT], Generic[_PDT]):
+    """A :class:`~sghi.etl.core.Sink` that commits the watermark of a
+    :class:`CheckpointedSource` once the wrapped ``Sink`` has successfully
+    drained the data.
+
+    A commit happens after each successful call to :meth:`drain` and, when
+    streaming, once the wrapped ``Sink``'s
+    :meth:`~sghi.etl.core.Sink.drain_stream` returns. Only the watermark of
+    the chunks that the wrapped ``Sink`` actually took is committed, so the
+    chunks that the ``CheckpointedSource`` drew ahead of a ``Sink`` that
+    returns early are drawn again on the next run. Each chunk drained by
+    this ``Sink`` MUST therefore correspond to exactly one chunk streamed by
+    the ``CheckpointedSource``, which holds for processors that transform
+    chunks one-to-one. Nothing is committed if the wrapped ``Sink`` fails,
+    so the same data is drawn again on the next run.
+
+    Disposing this ``Sink`` disposes the wrapped ``Sink`` but NOT the
+    ``CheckpointedSource``.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ("_is_disposed", "_logger", "_sink", "_source")
+
+    def __init__(
+        self,
+        sink: Sink[_PDT],
+        source: CheckpointedSource[Any, Any],
+    ) -> None:
+        """Create a new ``CommittingSink`` instance.
+
+        :param sink: The ``Sink`` to drain data to. MUST not be ``None``.
+        :param source: The ``CheckpointedSource`` whose watermark to commit.
+            MUST not be ``None``.
+
+        :raise ValueError: If ``sink`` or ``source`` is ``None``.
+        """
+        super().__init__()
+        self._sink: Sink[_PDT] = ensure_not_none(
+            sink,
+            "'sink' MUST not be None.",
+        )
+        self._source: CheckpointedSource[Any, Any] = ensure_not_none(
+            source,
+            "'source' MUST not be None.",
+        )
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        self._sink.dispose()
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: _PDT) -> None:
+        self._sink.drain(processed_data)
+        self._source.commit()
+
+    @not_disposed
+    @override
+    def drain_stream(self, processed_data_chunks: Iterable[_PDT]) -> None:
+        # The number of chunks taken by the wrapped sink so far.
+        consumed: int = 0
+
+        def count_consumed() -> Iterator[_PDT]:
+            nonlocal consumed
+            for processed_data in processed_data_chunks:
+                consumed += 1
+                yield processed_data
+
+        self._sink.drain_stream(count_consumed())
+        self._source.commit(consumed)
+
+
+# =============================================================================
+# WORKFLOW DEFINITION
+# =============================================================================
+
+
+class IncrementalWorkflowDefinition(WorkflowDefinition[_RDT, _PDT]):
+    """A :class:`~sghi.etl.core.WorkflowDefinition` that runs a wrapped
+    workflow incrementally.
+
+    The wrapped workflow's ``source_factory`` MUST create
+    :class:`IncrementalSource` instances. Each created ``Source`` is wrapped
+    in a :class:`CheckpointedSource` that resumes from the watermark stored
+    under ``key`` in the given :class:`CheckpointStore`, and the ``Sink``
+    created next on the same thread is wrapped in a :class:`CommittingSink`
+    bound to it. The new watermark is therefore only committed once the
+    ``Sink`` has drained the new data. All the existing
+    :mod:`executors<sghi.etl.executors>` create the components of a workflow
+    run in that order, on the same thread.
+
+    The store is NOT disposed by this class since it may be shared between
+    workflows.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ("_key", "_local", "_store", "_workflow")
+
+    def __init__(
+        self,
+        workflow: WorkflowDefinition[_RDT, _PDT],
+        store: CheckpointStore,
+        key: str | None = None,
+    ) -> None:
+        """Create a new ``IncrementalWorkflowDefinition`` instance.
+
+        :param workflow: The workflow to run incrementally. MUST not be
+            ``None``.
+        :param store: The store holding the watermarks. MUST not be
+            ``None``.
+        :param key: The key of the workflow's watermark in the store. MUST
+            not be empty when provided. Defaults to the workflow's id.
+
+        :raise ValueError: If ``workflow`` or ``store`` is ``None``, or if
+            ``key`` is empty.
+        """
+        super().__init__()
+        self._workflow: WorkflowDefinition[_RDT, _PDT] = ensure_not_none(
+            workflow,
+            "'workflow' MUST not be None.",
+        )
+        self._store: CheckpointStore = ensure_not_none(
+            store,
+            "'store' MUST not be None.",
+        )
+        self._key: str = (
+            ensure_not_none_nor_empty(key, "'key' MUST not be None or empty.")
+            if key is not None
+            else workflow.id
+        )
+        self._local: threading.local = threading.local()
+
+    @property
+    @override
+    def id(self) -> str:
+        return self._workflow.id
+
+    @property
+    @override
+    def name(self) -> str:
+        return self._workflow.name
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return self._workflow.description
+
+    @property
+    def key(self) -> str:
+        """The key of the workflow's watermark in the store.
+
+        :return: The key of the workflow's watermark in the store.
+        """
+        return self._key
+
+    @property
+    @override
+    def source_factory(self) -> Callable[[], Source[_RDT]]:
+        return self._create_source
+
+    @property
+    @override
+    def processor_factory(self) -> Callable[[], Processor[_RDT, _PDT]]:
+        return self._workflow.processor_factory
+
+    @property
+    @override
+    def sink_factory(self) -> Callable[[], Sink[_PDT]]:
+        return self._create_sink
+
+    @property
+    @override
+    def prologue(self) -> Callable[[], None]:
+        return self._workflow.prologue
+
+    @property
+    @override
+    def epilogue(self) -> Callable[[], None]:
+        return self._workflow.epilogue
+
+    def _create_sink(self) -> Sink[_PDT]:
+        source: CheckpointedSource[_RDT, Any] | None = getattr(
+            self._local,
+            "source",
+            None,
+        )
+        if source is None:
+            _err_msg: str = (
+                "The source of an incremental workflow MUST be created "
+                "before its sink, on the same thread."
+            )
+            raise RuntimeError(_err_msg)
+        self._local.source = None
+        return CommittingSink(self._workflow.sink_factory(), source)
+
+    def _create_source(self) -> Source[_RDT]:
+        source = self._workflow.source_factory()
+        if not isinstance(source, IncrementalSource):
+            source.dispose()
+            _err_msg: str = (
+                f"The source of the workflow '{self.id}' MUST be an "
+                f"IncrementalSource, got '{type_fqn(type(source))}'."
+            )
+            raise TypeError(_err_msg)
+        checkpointed: CheckpointedSource[_RDT, Any] = CheckpointedSource(
+            source,
+            self._store,
+            self._key,
+        )
+        self._local.source = checkpointed
+        return checkpointed
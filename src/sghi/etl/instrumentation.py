@@ -0,0 +1,737 @@
+"""Opt-in instrumentation of the stages of SGHI ETL workflows.
+
+Instrumentation is disabled by default and is enabled by registering one or
+more :class:`InstrumentationExporter` instances using
+:func:`register_exporter`. Once enabled, the components of a workflow can be
+wrapped using :class:`InstrumentedSource`, :class:`InstrumentedProcessor` and
+:class:`InstrumentedSink`, which emit a :class:`StageEvent` to every
+registered exporter for each call (or chunk) they observe. The executors in
+:mod:`sghi.etl.executors` do this automatically whenever instrumentation is
+enabled, so that workflows run by them are only instrumented on demand and
+pay no cost otherwise.
+
+.. versionadded:: 1.3.0
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from abc import ABCMeta, abstractmethod
+from collections.abc import Sized
+from dataclasses import dataclass
+from enum import Enum, unique
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, Generic, TypeVar
+
+from typing_extensions import override
+
+from sghi.etl.core import Processor, Sink, Source
+from sghi.utils import ensure_not_none, type_fqn
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Callable, Iterable, Iterator
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_PDT = TypeVar("_PDT")
+"""Processed Data Type."""
+
+_RDT = TypeVar("_RDT")
+"""Raw Data Type."""
+
+
+@unique
+class Stage(Enum):
+    """The stages of an SGHI ETL workflow."""
+
+    DRAW = "draw"
+    """The `Extract` stage, performed by a :class:`~sghi.etl.core.Source`."""
+
+    APPLY = "apply"
+    """The `Transform` stage, performed by a
+    :class:`~sghi.etl.core.Processor`.
+    """
+
+    DRAIN = "drain"
+    """The `Load` stage, performed by a :class:`~sghi.etl.core.Sink`."""
+
+
+@dataclass(frozen=True, slots=True)
+class StageEvent:
+    """A record of a single observed call, or chunk, of a workflow stage."""
+
+    workflow_id: str | None
+    """The id of the workflow the component belongs to, if known."""
+
+    stage: Stage
+    """The stage that was observed."""
+
+    component: str
+    """The fully qualified name of the type of the observed component."""
+
+    duration: float
+    """How long, in seconds, the call or chunk took."""
+
+    item_count: int | None = None
+    """The number of items in the data produced or consumed, if known."""
+
+    payload_size: int | None = None
+    """The size, in bytes, of the data produced or consumed, if known."""
+
+    error: BaseException | None = None
+    """The error raised by the call, if it failed."""
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+
+_EXPORTERS_LOCK: Final[threading.Lock] = threading.Lock()
+
+_LOGGER: Final[logging.Logger] = logging.getLogger(__name__)
+
+
+# =============================================================================
+# EXPORTER INTERFACE & REGISTRY
+# =============================================================================
+
+
+class InstrumentationExporter(metaclass=ABCMeta):
+    """An entity that receives the :class:`StageEvent` instances emitted by
+    instrumented components.
+
+    Implementations MUST be safe to use from multiple threads concurrently.
+    Errors raised by an exporter are logged and otherwise ignored so that
+    they never disrupt the workflow being observed.
+    """  # noqa: D205
+
+    __slots__ = ()
+
+    @abstractmethod
+    def export(self, event: StageEvent) -> None:
+        """Receive an event emitted by an instrumented component.
+
+        :param event: The emitted event.
+
+        :return: None.
+        """
+        ...
+
+
+_exporters: tuple[InstrumentationExporter, ...] = ()
+
+
+def is_enabled() -> bool:
+    """Check whether instrumentation is enabled.
+
+    Instrumentation is enabled when at least one exporter is registered.
+
+    :return: ``True`` if instrumentation is enabled, ``False`` otherwise.
+    """
+    return bool(_exporters)
+
+
+def register_exporter(exporter: InstrumentationExporter) -> None:
+    """Register an exporter, enabling instrumentation if it was disabled.
+
+    Registering an already registered exporter has no effect.
+
+    :param exporter: The exporter to register. MUST not be ``None``.
+
+    :return: None.
+
+    :raise ValueError: If ``exporter`` is ``None``.
+    """
+    global _exporters  # noqa: PLW0603
+    ensure_not_none(exporter, "'exporter' MUST not be None.")
+    with _EXPORTERS_LOCK:
+        if exporter not in _exporters:
+            _exporters = (*_exporters, exporter)
+
+
+def unregister_exporter(exporter: InstrumentationExporter) -> None:
+    """Unregister an exporter.
+
+    Instrumentation is disabled once the last exporter is unregistered.
+    Unregistering an exporter that is not registered has no effect.
+
+    :param exporter: The exporter to unregister.
+
+    :return: None.
+    """
+    global _exporters  # noqa: PLW0603
+    with _EXPORTERS_LOCK:
+        _exporters = tuple(_e for _e in _exporters if _e is not exporter)
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+def _default_size_of(data: Any) -> int | None:  # noqa: ANN401
+    """Return the size of byte or string payloads, ``None`` otherwise."""
+    if isinstance(data, bytes | bytearray | str):
+        return len(data)
+    if isinstance(data, memoryview):
+        return data.nbytes
+    return None
+
+
+def _escape_label(value: str) -> str:
+    """Escape a label value for use in the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Recorder:
+    """Build and emit the events of a single instrumented component."""
+
+    __slots__ = ("_component", "_size_of", "_workflow_id")
+
+    def __init__(
+        self,
+        component: object,
+        workflow_id: str | None,
+        size_of: Callable[[Any], int | None],
+    ) -> None:
+        super().__init__()
+        self._component: str = type_fqn(type(component))
+        self._workflow_id: str | None = workflow_id
+        self._size_of: Callable[[Any], int | None] = size_of
+
+    def failure(
+        self,
+        stage: Stage,
+        duration: float,
+        error: BaseException,
+    ) -> None:
+        self._emit(
+            StageEvent(
+                workflow_id=self._workflow_id,
+                stage=stage,
+                component=self._component,
+                duration=duration,
+                error=error,
+            ),
+        )
+
+    def success(
+        self,
+        stage: Stage,
+        duration: float,
+        data: Any,  # noqa: ANN401
+    ) -> None:
+        self._emit(
+            StageEvent(
+                workflow_id=self._workflow_id,
+                stage=stage,
+                component=self._component,
+                duration=duration,
+                item_count=len(data) if isinstance(data, Sized) else None,
+                payload_size=self._size_of(data),
+            ),
+        )
+
+    @staticmethod
+    def _emit(event: StageEvent) -> None:
+        for exporter in _exporters:
+            try:
+                exporter.export(event)
+            except Exception:
+                _LOGGER.exception(
+                    "Exporter '%s' failed to export an event.",
+                    type_fqn(type(exporter)),
+                )
+
+
+class _TimedInput(Generic[_RDT]):
+    """Track the time spent waiting for the chunks of an input iterable.
+
+    This allows the time a component spends working to be told apart from
+    the time it spends waiting for its upstream component.
+    """
+
+    __slots__ = ("failed", "waited")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.failed: bool = False
+        self.waited: float = 0.0
+
+    def wrap(self, chunks: Iterable[_RDT]) -> Iterator[_RDT]:
+        iterator = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            except BaseException:
+                self.failed = True
+                raise
+            finally:
+                self.waited += time.perf_counter() - start
+            yield chunk
+
+
+# =============================================================================
+# INSTRUMENTED COMPONENTS
+# =============================================================================
+
+
+class InstrumentedSource(Source[_RDT], Generic[_RDT]):
+    """A :class:`~sghi.etl.core.Source` that observes a wrapped ``Source``.
+
+    A :attr:`Stage.DRAW` event is emitted for each call to :meth:`draw` and
+    for each chunk yielded by :meth:`stream`. Disposing this ``Source`` also
+    disposes the wrapped ``Source``.
+    """
+
+    __slots__ = ("_recorder", "_source")
+
+    def __init__(
+        self,
+        source: Source[_RDT],
+        workflow_id: str | None = None,
+        size_of: Callable[[Any], int | None] = _default_size_of,
+    ) -> None:
+        """Create a new ``InstrumentedSource`` instance.
+
+        :param source: The ``Source`` to observe. MUST not be ``None``.
+        :param workflow_id: The id of the workflow the ``Source`` belongs to,
+            if any.
+        :param size_of: A callable that returns the size, in bytes, of the
+            drawn data or ``None`` if unknown. By default, only the sizes of
+            byte and string payloads are reported.
+
+        :raise ValueError: If ``source`` is ``None``.
+        """
+        super().__init__()
+        self._source: Source[_RDT] = ensure_not_none(
+            source,
+            "'source' MUST not be None.",
+        )
+        self._recorder: _Recorder = _Recorder(source, workflow_id, size_of)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._source.is_disposed
+
+    @override
+    def draw(self) -> _RDT:
+        start = time.perf_counter()
+        try:
+            raw_data = self._source.draw()
+        except BaseException as exp:
+            self._recorder.failure(
+                Stage.DRAW,
+                time.perf_counter() - start,
+                exp,
+            )
+            raise
+        self._recorder.success(
+            Stage.DRAW,
+            time.perf_counter() - start,
+            raw_data,
+        )
+        return raw_data
+
+    @override
+    def dispose(self) -> None:
+        self._source.dispose()
+
+    @override
+    def stream(self) -> Iterator[_RDT]:
+        chunks = iter(self._source.stream())
+        while True:
+            start = time.perf_counter()
+            try:
+                raw_data = next(chunks)
+            except StopIteration:
+                return
+            except BaseException as exp:
+                self._recorder.failure(
+                    Stage.DRAW,
+                    time.perf_counter() - start,
+                    exp,
+                )
+                raise
+            self._recorder.success(
+                Stage.DRAW,
+                time.perf_counter() - start,
+                raw_data,
+            )
+            yield raw_data
+
+
+class InstrumentedProcessor(Processor[_RDT, _PDT], Generic[_RDT, _PDT]):
+    """A :class:`~sghi.etl.core.Processor` that observes a wrapped
+    ``Processor``.
+
+    A :attr:`Stage.APPLY` event is emitted for each call to :meth:`apply`
+    and for each chunk yielded by :meth:`apply_stream`. In the latter case,
+    the time spent waiting for input chunks is excluded from the reported
+    durations. Disposing this ``Processor`` also disposes the wrapped
+    ``Processor``.
+    """  # noqa: D205
+
+    __slots__ = ("_processor", "_recorder")
+
+    def __init__(
+        self,
+        processor: Processor[_RDT, _PDT],
+        workflow_id: str | None = None,
+        size_of: Callable[[Any], int | None] = _default_size_of,
+    ) -> None:
+        """Create a new ``InstrumentedProcessor`` instance.
+
+        :param processor: The ``Processor`` to observe. MUST not be ``None``.
+        :param workflow_id: The id of the workflow the ``Processor`` belongs
+            to, if any.
+        :param size_of: A callable that returns the size, in bytes, of the
+            processed data or ``None`` if unknown. By default, only the sizes
+            of byte and string payloads are reported.
+
+        :raise ValueError: If ``processor`` is ``None``.
+        """
+        super().__init__()
+        self._processor: Processor[_RDT, _PDT] = ensure_not_none(
+            processor,
+            "'processor' MUST not be None.",
+        )
+        self._recorder: _Recorder = _Recorder(processor, workflow_id, size_of)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._processor.is_disposed
+
+    @override
+    def apply(self, raw_data: _RDT) -> _PDT:
+        start = time.perf_counter()
+        try:
+            processed_data = self._processor.apply(raw_data)
+        except BaseException as exp:
+            self._recorder.failure(
+                Stage.APPLY,
+                time.perf_counter() - start,
+                exp,
+            )
+            raise
+        self._recorder.success(
+            Stage.APPLY,
+            time.perf_counter() - start,
+            processed_data,
+        )
+        return processed_data
+
+    @override
+    def apply_stream(self, raw_data_chunks: Iterable[_RDT]) -> Iterator[_PDT]:
+        timed_input: _TimedInput[_RDT] = _TimedInput()
+        chunks = iter(
+            self._processor.apply_stream(timed_input.wrap(raw_data_chunks)),
+        )
+        while True:
+            timed_input.waited = 0.0
+            start = time.perf_counter()
+            try:
+                processed_data = next(chunks)
+            except StopIteration:
+                return
+            except BaseException as exp:
+                if not timed_input.failed:
+                    self._recorder.failure(
+                        Stage.APPLY,
+                        time.perf_counter() - start - timed_input.waited,
+                        exp,
+                    )
+                raise
+            self._recorder.success(
+                Stage.APPLY,
+                time.perf_counter() - start - timed_input.waited,
+                processed_data,
+            )
+            yield processed_data
+
+    @override
+    def dispose(self) -> None:
+        self._processor.dispose()
+
+
+class InstrumentedSink(Sink[_PDT], Generic[_PDT]):
+    """A :class:`~sghi.etl.core.Sink` that observes a wrapped ``Sink``.
+
+    A :attr:`Stage.DRAIN` event is emitted for each call to :meth:`drain`
+    and for each chunk consumed by :meth:`drain_stream`. In the latter case,
+    the reported duration of a chunk is the time between the chunk being
+    handed to the wrapped ``Sink`` and the wrapped ``Sink`` requesting the
+    next chunk. Disposing this ``Sink`` also disposes the wrapped ``Sink``.
+    """
+
+    __slots__ = ("_recorder", "_sink")
+
+    def __init__(
+        self,
+        sink: Sink[_PDT],
+        workflow_id: str | None = None,
+        size_of: Callable[[Any], int | None] = _default_size_of,
+    ) -> None:
+        """Create a new ``InstrumentedSink`` instance.
+
+        :param sink: The ``Sink`` to observe. MUST not be ``None``.
+        :param workflow_id: The id of the workflow the ``Sink`` belongs to, if
+            any.
+        :param size_of: A callable that returns the size, in bytes, of the
+            consumed data or ``None`` if unknown. By default, only the sizes
+            of byte and string payloads are reported.
+
+        :raise ValueError: If ``sink`` is ``None``.
+        """
+        super().__init__()
+        self._sink: Sink[_PDT] = ensure_not_none(
+            sink,
+            "'sink' MUST not be None.",
+        )
+        self._recorder: _Recorder = _Recorder(sink, workflow_id, size_of)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._sink.is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._sink.dispose()
+
+    @override
+    def drain(self, processed_data: _PDT) -> None:
+        start = time.perf_counter()
+        try:
+            self._sink.drain(processed_data)
+        except BaseException as exp:
+            self._recorder.failure(
+                Stage.DRAIN,
+                time.perf_counter() - start,
+                exp,
+            )
+            raise
+        self._recorder.success(
+            Stage.DRAIN,
+            time.perf_counter() - start,
+            processed_data,
+        )
+
+    @override
+    def drain_stream(self, processed_data_chunks: Iterable[_PDT]) -> None:
+        # The chunk currently being consumed by the wrapped sink, if any, and
+        # the time at which it was handed over to the wrapped sink.
+        current: list[Any] = []
+
+        def observe() -> Iterator[_PDT]:
+            for processed_data in processed_data_chunks:
+                current[:] = [processed_data, time.perf_counter()]
+                yield processed_data
+                self._recorder.success(
+                    Stage.DRAIN,
+                    time.perf_counter() - current[1],
+                    current[0],
+                )
+                current.clear()
+
+        try:
+            self._sink.drain_stream(observe())
+        except BaseException as exp:
+            if current:
+                self._recorder.failure(
+                    Stage.DRAIN,
+                    time.perf_counter() - current[1],
+                    exp,
+                )
+            raise
+        if current:
+            # The wrapped sink returned without requesting another chunk.
+            self._recorder.success(
+                Stage.DRAIN,
+                time.perf_counter() - current[1],
+                current[0],
+            )
+
+
+# =============================================================================
+# EXPORTERS
+# =============================================================================
+
+
+class InMemoryExporter(InstrumentationExporter):
+    """An :class:`InstrumentationExporter` that keeps events in memory.
+
+    This is mostly useful for tests and for ad hoc inspection of workflows.
+    """
+
+    __slots__ = ("_events", "_lock")
+
+    def __init__(self) -> None:
+        """Create a new, empty, ``InMemoryExporter`` instance."""
+        super().__init__()
+        self._events: list[StageEvent] = []
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def events(self) -> list[StageEvent]:
+        """The events received so far, in the order in which they arrived.
+
+        :return: A copy of the events received so far.
+        """
+        with self._lock:
+            return list(self._events)
+
+    def clear(self) -> None:
+        """Discard all the events received so far.
+
+        :return: None.
+        """
+        with self._lock:
+            self._events.clear()
+
+    @override
+    def export(self, event: StageEvent) -> None:
+        with self._lock:
+            self._events.append(event)
+
+
+class LoggingExporter(InstrumentationExporter):
+    """An :class:`InstrumentationExporter` that logs every event."""
+
+    __slots__ = ("_level", "_logger")
+
+    def __init__(
+        self,
+        logger: logging.Logger | None = None,
+        level: int = logging.INFO,
+    ) -> None:
+        """Create a new ``LoggingExporter`` instance.
+
+        :param logger: The logger to log events to. Defaults to this
+            module's logger when not provided.
+        :param level: The level at which successful calls are logged. Failed
+            calls are always logged at the ``ERROR`` level. Defaults to
+            ``INFO``.
+        """
+        super().__init__()
+        self._logger: logging.Logger = logger or _LOGGER
+        self._level: int = level
+
+    @override
+    def export(self, event: StageEvent) -> None:
+        level = self._level if event.error is None else logging.ERROR
+        self._logger.log(
+            level,
+            "[%s] %s %s took %.6fs (items=%s, bytes=%s, error=%r).",
+            event.workflow_id,
+            event.component,
+            event.stage.value,
+            event.duration,
+            event.item_count,
+            event.payload_size,
+            event.error,
+        )
+
+
+class PrometheusTextFileExporter(InstrumentationExporter):
+    """An :class:`InstrumentationExporter` that aggregates events into metrics
+    written using the Prometheus text exposition format.
+
+    The metrics are kept in memory and written to a file, replacing its
+    previous contents atomically, each time :meth:`write` is called. This
+    makes the file suitable for use with the textfile collector of the
+    Prometheus node exporter. The following metrics are maintained, each
+    labeled by workflow id and stage:
+
+    - ``sghi_etl_stage_calls_total``
+    - ``sghi_etl_stage_errors_total``
+    - ``sghi_etl_stage_duration_seconds_total``
+    - ``sghi_etl_stage_items_total``
+    - ``sghi_etl_stage_payload_bytes_total``
+    """  # noqa: D205
+
+    __slots__ = ("_lock", "_metrics", "_path")
+
+    _METRICS: Final[tuple[tuple[str, str], ...]] = (
+        ("calls", "Number of observed stage calls or chunks."),
+        ("errors", "Number of observed stage calls that failed."),
+        ("duration_seconds", "Total time spent in the stage."),
+        ("items", "Total number of items produced or consumed."),
+        ("payload_bytes", "Total size of the payloads produced or consumed."),
+    )
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Create a new ``PrometheusTextFileExporter`` instance.
+
+        :param path: The path of the file to write the metrics to. MUST not
+            be ``None``.
+
+        :raise ValueError: If ``path`` is ``None``.
+        """
+        super().__init__()
+        ensure_not_none(path, "'path' MUST not be None.")
+        self._path: Path = Path(path)
+        self._lock: threading.Lock = threading.Lock()
+        self._metrics: dict[tuple[str, str], dict[str, float]] = {}
+
+    @property
+    def path(self) -> Path:
+        """The path of the file the metrics are written to.
+
+        :return: The path of the file the metrics are written to.
+        """
+        return self._path
+
+    @override
+    def export(self, event: StageEvent) -> None:
+        key = (event.workflow_id or "", event.stage.value)
+        with self._lock:
+            metrics = self._metrics.setdefault(
+                key,
+                dict.fromkeys((_m for _m, _ in self._METRICS), 0.0),
+            )
+            metrics["calls"] += 1
+            metrics["errors"] += event.error is not None
+            metrics["duration_seconds"] += event.duration
+            metrics["items"] += event.item_count or 0
+            metrics["payload_bytes"] += event.payload_size or 0
+
+    def render(self) -> str:
+        """Render the current metrics using the Prometheus text format.
+
+        :return: The current metrics in the Prometheus text format.
+        """
+        lines: list[str] = []
+        with self._lock:
+            for metric, help_text in self._METRICS:
+                name = f"sghi_etl_stage_{metric}_total"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (workflow_id, stage), metrics in self._metrics.items():
+                    labels = (
+                        f'workflow_id="{_escape_label(workflow_id)}",'
+                        f'stage="{stage}"'
+                    )
+                    lines.append(f"{name}{{{labels}}} {metrics[metric]!r}")
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        """Write the current metrics to :attr:`path`, atomically.
+
+        :return: None.
+        """
+        temp_path = self._path.with_name(f".{self._path.name}.tmp")
+        temp_path.write_text(self.render(), encoding="utf-8")
+        temp_path.replace(self._path)
@@ -0,0 +1,1001 @@
+"""Pooling of the components of SGHI ETL workflows across runs.
+
+Executors create the :class:`~sghi.etl.core.Source`,
+:class:`~sghi.etl.core.Processor` and :class:`~sghi.etl.core.Sink` of a
+workflow afresh for every run, using the factories of the workflow, and
+dispose them once the run ends. For components that are expensive to set up,
+e.g. ones that open database connections, HTTP sessions or load large
+models, and for workflows that run frequently, that setup can dominate the
+cost of a run.
+
+A :class:`ComponentPool` keeps such components alive between uses. Callers
+:meth:`lease<ComponentPool.lease>` a component from the pool and
+:meth:`release<ComponentPool.release>` it back once done, instead of
+creating and disposing it. The pool creates components on demand, up to a
+maximum size, keeps a minimum number of them warm, checks that idle
+components are still healthy before handing them out, and evicts components
+that have been idle for too long. Components are only disposed when they
+are evicted, found unhealthy, or when the pool itself is disposed.
+
+A :class:`PooledWorkflowDefinition` wraps a workflow so that its components
+are leased from a pool instead, which lets any executor benefit from pooling
+without changes.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+from typing_extensions import override
+
+from sghi.disposable import Disposable, ResourceDisposedError, not_disposed
+from sghi.etl.core import Processor, Sink, Source, WorkflowDefinition
+from sghi.exceptions import SGHIError
+from sghi.utils import ensure_greater_than, ensure_not_none, type_fqn
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Iterable, Iterator
+
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_DT = TypeVar("_DT", bound=Disposable)
+"""Disposable Type."""
+
+_PDT = TypeVar("_PDT")
+"""Processed Data Type."""
+
+_RDT = TypeVar("_RDT")
+"""Raw Data Type."""
+
+_T = TypeVar("_T")
+
+
+class PoolExhaustedError(SGHIError):
+    """Raised when no component of a :class:`ComponentPool` becomes available
+    within the allowed time.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+def _is_not_disposed(component: Disposable) -> bool:
+    """Check that a component is not disposed.
+
+    This is the default health check of a :class:`ComponentPool`.
+    """
+    return not component.is_disposed
+
+
+# =============================================================================
+# POOL
+# =============================================================================
+
+
+class ComponentPool(Disposable, Generic[_DT]):
+    """A thread-safe pool of reusable :class:`~sghi.disposable.Disposable`
+    components.
+
+    Components are created using the given ``factory`` when a lease is
+    requested and no idle component is available, up to ``max_size``
+    components in total. When the pool is full, :meth:`lease` waits for a
+    component to be released. Released components are kept idle for later
+    leases, the most recently released one being leased first so that
+    rarely needed components stay idle and can be evicted.
+
+    Before an idle component is leased, it is checked using the given
+    ``health_check``. Components that fail the check, or that are released
+    with ``discard=True``, are disposed and replaced. Components idle for
+    longer than ``max_idle_time`` are evicted, i.e. disposed, whenever the
+    pool is used or :meth:`evict_idle` is called, as long as at least
+    ``min_size`` components remain. The pool is filled up to ``min_size``
+    components on creation, and topped up again whenever components are
+    disposed on release or evicted.
+
+    Disposing the pool disposes its idle components. Components that are
+    leased at that time are disposed when they are released.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_condition",
+        "_factory",
+        "_health_check",
+        "_idle",
+        "_is_disposed",
+        "_leased",
+        "_logger",
+        "_max_idle_time",
+        "_max_size",
+        "_min_size",
+        "_pending",
+    )
+
+    def __init__(
+        self,
+        factory: Callable[[], _DT],
+        min_size: int = 0,
+        max_size: int = 8,
+        *,
+        health_check: Callable[[_DT], bool] = _is_not_disposed,
+        max_idle_time: float | None = None,
+    ) -> None:
+        """Create a new ``ComponentPool`` instance.
+
+        :param factory: A function that creates new components. MUST not be
+            ``None``.
+        :param min_size: The number of components to create upfront and to
+            keep when evicting idle components. MUST not be negative nor
+            greater than ``max_size``. Defaults to zero.
+        :param max_size: The maximum number of components, both idle and
+            leased, in the pool. MUST be greater than zero. Defaults to 8.
+        :param health_check: A function that returns ``True`` if a component
+            can still be used. MUST not be ``None``. Defaults to checking
+            that the component is not disposed.
+        :param max_idle_time: An optional time, in seconds, after which idle
+            components are evicted. MUST be greater than zero when provided.
+
+        :raise ValueError: If any of the arguments has an invalid value.
+        :raise Exception: Any error raised by ``factory`` while creating the
+            first ``min_size`` components. The components already created
+            are disposed.
+        """
+        super().__init__()
+        self._factory: Callable[[], _DT] = ensure_not_none(
+            factory,
+            "'factory' MUST not be None.",
+        )
+        self._max_size: int = ensure_greater_than(
+            value=max_size,
+            base_value=0,
+            message="'max_size' MUST be greater than zero (0).",
+        )
+        if not 0 <= min_size <= max_size:
+            _err_msg: str = (
+                "'min_size' MUST not be negative nor greater than 'max_size'."
+            )
+            raise ValueError(_err_msg)
+        self._min_size: int = min_size
+        self._health_check: Callable[[_DT], bool] = ensure_not_none(
+            health_check,
+            "'health_check' MUST not be None.",
+        )
+        self._max_idle_time: float | None = (
+            ensure_greater_than(
+                value=max_idle_time,
+                base_value=0,
+                message="'max_idle_time' MUST be greater than zero (0).",
+            )
+            if max_idle_time is not None
+            else None
+        )
+        # Idle components, with the time they were released, oldest first.
+        self._idle: deque[tuple[_DT, float]] = deque()
+        # Leased components, keyed by identity. Holding on to them keeps
+        # their identities from being reused while they are leased.
+        self._leased: dict[int, _DT] = {}
+        # Components being created, which count towards the size limit.
+        self._pending: int = 0
+        self._is_disposed: bool = False
+        self._condition: threading.Condition = threading.Condition()
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+        try:
+            for _ in range(min_size):
+                self._idle.append((self._create(), time.monotonic()))
+        except BaseException:
+            self.dispose()
+            raise
+
+    @property
+    def idle_count(self) -> int:
+        """The number of idle components in this pool.
+
+        :return: The number of idle components in this pool.
+        """
+        with self._condition:
+            return len(self._idle)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def leased_count(self) -> int:
+        """The number of components currently leased from this pool.
+
+        :return: The number of components currently leased from this pool.
+        """
+        with self._condition:
+            return len(self._leased)
+
+    @property
+    def max_size(self) -> int:
+        """The maximum number of components in this pool.
+
+        :return: The maximum number of components in this pool.
+        """
+        return self._max_size
+
+    @property
+    def min_size(self) -> int:
+        """The number of components kept when evicting idle components.
+
+        :return: The number of components kept when evicting idle components.
+        """
+        return self._min_size
+
+    @property
+    def size(self) -> int:
+        """The total number of components, idle and leased, in this pool.
+
+        :return: The total number of components in this pool.
+        """
+        with self._condition:
+            return len(self._idle) + len(self._leased) + self._pending
+
+    @override
+    def dispose(self) -> None:
+        with self._condition:
+            if self._is_disposed:
+                return
+            self._is_disposed = True
+            idle: list[_DT] = [_component for _component, _ in self._idle]
+            self._idle.clear()
+            self._condition.notify_all()
+        for component in idle:
+            self._dispose_component(component)
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    def evict_idle(self) -> int:
+        """Dispose the components that have been idle for longer than the
+        maximum idle time, keeping at least the minimum number of components.
+
+        This happens automatically whenever this pool is used. Calling this
+        method periodically also evicts components from pools that are not
+        used for a while.
+
+        :return: The number of evicted components.
+        """  # noqa: D205
+        with self._condition:
+            evicted: list[_DT] = self._take_expired()
+        for component in evicted:
+            self._dispose_component(component)
+        self._top_up()
+        return len(evicted)
+
+    @not_disposed
+    def lease(self, timeout: float | None = None) -> _DT:
+        """Take a component from this pool, creating one if none is idle and
+        the pool is not full.
+
+        :param timeout: The maximum time, in seconds, to wait for a component
+            when the pool is full. Defaults to waiting indefinitely.
+
+        :return: A healthy component. It MUST be returned to this pool using
+            :meth:`release` once no longer needed.
+
+        :raise PoolExhaustedError: If no component becomes available within
+            ``timeout`` seconds.
+        """  # noqa: D205
+        deadline: float | None = (
+            time.monotonic() + timeout if timeout is not None else None
+        )
+        while True:
+            with self._condition:
+                evicted: list[_DT] = self._take_expired()
+                candidate: _DT | None = self._wait_for_candidate(deadline)
+                if candidate is None:
+                    self._pending += 1
+            for component in evicted:
+                self._dispose_component(component)
+
+            if candidate is None:
+                return self._create_leased()
+            if self._is_healthy(candidate):
+                return candidate
+            self._logger.debug("Discarding an unhealthy component.")
+            self.release(candidate, discard=True)
+
+    @contextmanager
+    def leased(
+        self,
+        timeout: float | None = None,
+    ) -> Generator[_DT, None, None]:
+        """Lease a component for the duration of a ``with`` block.
+
+        The component is released when the block exits. It is discarded if
+        the block raises an error.
+
+        :param timeout: The maximum time, in seconds, to wait for a component
+            when the pool is full. Defaults to waiting indefinitely.
+
+        :return: A context manager yielding a healthy component.
+
+        :raise PoolExhaustedError: If no component becomes available within
+            ``timeout`` seconds.
+        """
+        component: _DT = self.lease(timeout=timeout)
+        try:
+            yield component
+        except BaseException:
+            self.release(component, discard=True)
+            raise
+        self.release(component)
+
+    def release(self, component: _DT, *, discard: bool = False) -> None:
+        """Return a leased component to this pool.
+
+        The component is disposed instead of being kept if ``discard`` is
+        ``True``, if it is disposed already or if this pool is disposed. New
+        components are then created, if need be, to keep at least
+        ``min_size`` components in this pool. Errors raised while creating
+        them are logged, not raised.
+
+        :param component: A component leased from this pool. MUST not be
+            ``None``.
+        :param discard: Whether to dispose the component instead of keeping
+            it for later leases, e.g. because it failed. Defaults to
+            ``False``.
+
+        :return: None.
+
+        :raise ValueError: If ``component`` is ``None`` or was not leased
+            from this pool.
+        """
+        ensure_not_none(component, "'component' MUST not be None.")
+        with self._condition:
+            if id(component) not in self._leased:
+                _err_msg: str = "The component was not leased from this pool."
+                raise ValueError(_err_msg)
+            del self._leased[id(component)]
+            keep: bool = not (
+                discard or component.is_disposed or self._is_disposed
+            )
+            if keep:
+                self._idle.append((component, time.monotonic()))
+            evicted: list[_DT] = self._take_expired()
+            self._condition.notify_all()
+        if not keep:
+            self._dispose_component(component)
+        for _component in evicted:
+            self._dispose_component(_component)
+        self._top_up()
+
+    def _create(self) -> _DT:
+        component: _DT = self._factory()
+        self._logger.debug("Created a new component.")
+        return component
+
+    def _create_leased(self) -> _DT:
+        try:
+            component: _DT = self._create()
+        except BaseException:
+            with self._condition:
+                self._pending -= 1
+                self._condition.notify_all()
+            raise
+        with self._condition:
+            self._pending -= 1
+            self._leased[id(component)] = component
+        return component
+
+    def _dispose_component(self, component: _DT) -> None:
+        try:
+            component.dispose()
+        except Exception:
+            self._logger.exception("Error disposing a pooled component.")
+
+    def _is_healthy(self, component: _DT) -> bool:
+        try:
+            return not component.is_disposed and self._health_check(component)
+        except Exception:
+            self._logger.exception("Error checking a pooled component.")
+            return False
+
+    def _top_up(self) -> None:
+        """Create idle components until this pool holds at least the minimum
+        number of components.
+
+        MUST NOT be called while holding the lock of this pool.
+        """  # noqa: D205
+        while True:
+            with self._condition:
+                size: int = len(self._idle) + len(self._leased) + self._pending
+                if self._is_disposed or size >= self._min_size:
+                    return
+                self._pending += 1
+            try:
+                component: _DT = self._create()
+            except Exception:
+                self._logger.exception("Error topping up the pool.")
+                with self._condition:
+                    self._pending -= 1
+                    self._condition.notify_all()
+                return
+            with self._condition:
+                self._pending -= 1
+                keep: bool = not self._is_disposed
+                if keep:
+                    self._idle.append((component, time.monotonic()))
+                self._condition.notify_all()
+            if not keep:
+                self._dispose_component(component)
+
+    def _take_expired(self) -> list[_DT]:
+        """Remove and return the idle components to evict.
+
+        MUST be called while holding the lock of this pool.
+        """
+        if self._max_idle_time is None:
+            return []
+        horizon: float = time.monotonic() - self._max_idle_time
+        expired: list[_DT] = []
+        while (
+            self._idle
+            and self._idle[0][1] < horizon
+            and len(self._idle) + len(self._leased) + self._pending
+            > self._min_size
+        ):
+            expired.append(self._idle.popleft()[0])
+        return expired
+
+    def _wait_for_candidate(self, deadline: float | None) -> _DT | None:
+        """Wait for an idle component, or for room for a new one, and lease
+        it.
+
+        MUST be called while holding the lock of this pool.
+
+        :return: The leased idle component, or ``None`` if a new component
+            should be created.
+        """  # noqa: D205
+        while True:
+            if self._is_disposed:
+                raise ResourceDisposedError
+            if self._idle:
+                component: _DT = self._idle.pop()[0]
+                self._leased[id(component)] = component
+                return component
+            if len(self._leased) + self._pending < self._max_size:
+                return None
+            remaining: float | None = (
+                deadline - time.monotonic() if deadline is not None else None
+            )
+            if remaining is not None and remaining <= 0:
+                _err_msg: str = (
+                    "No pooled component became available in time, all "
+                    f"{self._max_size} components are leased."
+                )
+                raise PoolExhaustedError(_err_msg)
+            self._condition.wait(timeout=remaining)
+
+
+# =============================================================================
+# POOLED WORKFLOW DEFINITION
+# =============================================================================
+
+
+class WorkflowComponents(Disposable, Generic[_RDT, _PDT]):
+    """The :class:`~sghi.etl.core.Source`,
+    :class:`~sghi.etl.core.Processor` and :class:`~sghi.etl.core.Sink` of a
+    workflow, created together and pooled as a single unit by a
+    :class:`PooledWorkflowDefinition`.
+
+    Disposing this disposes the sink, the processor and then the source,
+    even if disposing one of them fails.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ("_is_disposed", "_processor", "_sink", "_source")
+
+    def __init__(
+        self,
+        source: Source[_RDT],
+        processor: Processor[_RDT, _PDT],
+        sink: Sink[_PDT],
+    ) -> None:
+        """Create a new ``WorkflowComponents`` instance.
+
+        :param source: The source of the workflow. MUST not be ``None``.
+        :param processor: The processor of the workflow. MUST not be
+            ``None``.
+        :param sink: The sink of the workflow. MUST not be ``None``.
+
+        :raise ValueError: If any of the components is ``None``.
+        """
+        super().__init__()
+        self._source: Source[_RDT] = ensure_not_none(
+            source,
+            "'source' MUST not be None.",
+        )
+        self._processor: Processor[_RDT, _PDT] = ensure_not_none(
+            processor,
+            "'processor' MUST not be None.",
+        )
+        self._sink: Sink[_PDT] = ensure_not_none(
+            sink,
+            "'sink' MUST not be None.",
+        )
+        self._is_disposed: bool = False
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def processor(self) -> Processor[_RDT, _PDT]:
+        """The processor of the workflow.
+
+        :return: The processor of the workflow.
+        """
+        return self._processor
+
+    @property
+    def sink(self) -> Sink[_PDT]:
+        """The sink of the workflow.
+
+        :return: The sink of the workflow.
+        """
+        return self._sink
+
+    @property
+    def source(self) -> Source[_RDT]:
+        """The source of the workflow.
+
+        :return: The source of the workflow.
+        """
+        return self._source
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        with ExitStack() as exit_stack:
+            # Callbacks run in reverse order, as when the components are
+            # created and disposed by an executor.
+            exit_stack.callback(self._source.dispose)
+            exit_stack.callback(self._processor.dispose)
+            exit_stack.callback(self._sink.dispose)
+
+
+class _Lease(Generic[_RDT, _PDT]):
+    """Tracks a set of components leased from a pool on behalf of the
+    wrappers handed out for them.
+
+    The components are returned to the pool once every wrapper handed out
+    has been disposed.
+    """  # noqa: D205
+
+    __slots__ = (
+        "_components",
+        "_discard",
+        "_failed",
+        "_handed_out",
+        "_lock",
+        "_outstanding",
+        "_pool",
+        "_released",
+    )
+
+    def __init__(
+        self,
+        pool: ComponentPool[WorkflowComponents[_RDT, _PDT]],
+        *,
+        discard: bool,
+    ) -> None:
+        super().__init__()
+        self._pool: ComponentPool[WorkflowComponents[_RDT, _PDT]] = pool
+        self._components: WorkflowComponents[_RDT, _PDT] = pool.lease()
+        self._discard: bool = discard
+        self._failed: bool = False
+        # The kinds of components handed out so far.
+        self._handed_out: set[str] = set()
+        # The number of wrappers handed out and not yet disposed.
+        self._outstanding: int = 0
+        self._released: bool = False
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def components(self) -> WorkflowComponents[_RDT, _PDT]:
+        return self._components
+
+    def call(self, function: Callable[..., _T], *args: object) -> _T:
+        try:
+            return function(*args)
+        except BaseException:
+            self._failed = True
+            raise
+
+    def done(self) -> None:
+        """Record that a wrapper has been disposed."""
+        with self._lock:
+            self._outstanding -= 1
+            if self._outstanding:
+                return
+            self._released = True
+        # A component that failed may have left the others, which it may
+        # be bound to, in an inconsistent state.
+        self._pool.release(
+            self._components,
+            discard=self._discard or self._failed,
+        )
+
+    def iterate(self, iterable: Iterable[_T]) -> Iterator[_T]:
+        try:
+            yield from iterable
+        except GeneratorExit:
+            raise
+        except BaseException:
+            self._failed = True
+            raise
+
+    def take(self, kind: str) -> bool:
+        """Hand out the component of the given kind if it is available.
+
+        :return: ``True`` if the component can be handed out, ``False`` if
+            it has been handed out already or the components have been
+            returned to the pool.
+        """
+        with self._lock:
+            if self._released or kind in self._handed_out:
+                return False
+            self._handed_out.add(kind)
+            self._outstanding += 1
+            return True
+
+
+class _PooledSource(Source[_RDT], Generic[_RDT]):
+    """A ``Source`` leased from a pool and returned to it on disposal."""
+
+    __slots__ = ("_is_disposed", "_lease")
+
+    def __init__(self, lease: _Lease[_RDT, Any]) -> None:
+        super().__init__()
+        self._lease: _Lease[_RDT, Any] = lease
+        self._is_disposed: bool = False
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        self._lease.done()
+
+    @not_disposed
+    @override
+    def draw(self) -> _RDT:
+        return self._lease.call(self._lease.components.source.draw)
+
+    @not_disposed
+    @override
+    def stream(self) -> Iterator[_RDT]:
+        return self._lease.iterate(
+            self._lease.call(self._lease.components.source.stream),
+        )
+
+
+class _PooledProcessor(Processor[_RDT, _PDT], Generic[_RDT, _PDT]):
+    """A ``Processor`` leased from a pool and returned to it on disposal."""
+
+    __slots__ = ("_is_disposed", "_lease")
+
+    def __init__(self, lease: _Lease[_RDT, _PDT]) -> None:
+        super().__init__()
+        self._lease: _Lease[_RDT, _PDT] = lease
+        self._is_disposed: bool = False
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: _RDT) -> _PDT:
+        return self._lease.call(
+            self._lease.components.processor.apply,
+            raw_data,
+        )
+
+    @not_disposed
+    @override
+    def apply_stream(self, raw_data_chunks: Iterable[_RDT]) -> Iterator[_PDT]:
+        return self._lease.iterate(
+            self._lease.call(
+                self._lease.components.processor.apply_stream,
+                raw_data_chunks,
+            ),
+        )
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        self._lease.done()
+
+
+class _PooledSink(Sink[_PDT], Generic[_PDT]):
+    """A ``Sink`` leased from a pool and returned to it on disposal."""
+
+    __slots__ = ("_is_disposed", "_lease")
+
+    def __init__(self, lease: _Lease[Any, _PDT]) -> None:
+        super().__init__()
+        self._lease: _Lease[Any, _PDT] = lease
+        self._is_disposed: bool = False
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        self._lease.done()
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: _PDT) -> None:
+        self._lease.call(self._lease.components.sink.drain, processed_data)
+
+    @not_disposed
+    @override
+    def drain_stream(self, processed_data_chunks: Iterable[_PDT]) -> None:
+        self._lease.call(
+            self._lease.components.sink.drain_stream,
+            processed_data_chunks,
+        )
+
+
+class PooledWorkflowDefinition(
+    WorkflowDefinition[_RDT, _PDT],
+    Disposable,
+    Generic[_RDT, _PDT],
+):
+    """A :class:`~sghi.etl.core.WorkflowDefinition` that leases the
+    components of a wrapped ``WorkflowDefinition`` from a pool.
+
+    The source, processor and sink of the wrapped workflow are created
+    together, using its factories in that order and on the same thread, and
+    pooled as a single :class:`WorkflowComponents` unit in a
+    :class:`ComponentPool`. This keeps components that are bound to each
+    other when created, e.g. by an
+    :class:`~sghi.etl.incremental.IncrementalWorkflowDefinition`, together
+    across runs. The :attr:`source_factory` of this workflow leases such a
+    unit, and the :attr:`processor_factory` and :attr:`sink_factory` called
+    next on the same thread hand out the rest of it, as all the existing
+    :mod:`executors<sghi.etl.executors>` do. The components are handed out
+    behind thin wrappers whose ``dispose()`` returns the unit to the pool,
+    once all of them have been disposed, instead of disposing them, so
+    executors can treat them as usual. A unit with a component that raised
+    an error while in use is discarded instead of being returned for reuse.
+
+    Instances SHOULD be kept and executed repeatedly for the pool to be of
+    use, and MUST be disposed once no longer needed so that the pooled
+    components are disposed.
+
+    .. warning::
+
+        The ``Sink`` interface has no means of flushing a sink other than
+        disposing it. Pooled sinks that buffer data until they are disposed,
+        e.g. to write it in batches, therefore hold on to the data of a run
+        after the run completes, until they are evicted or the pool is
+        disposed. Set ``pool_sinks`` to ``False`` for such sinks, so that
+        the components are disposed at the end of each run. Since a sink
+        may be bound to the source and processor created along with it, they
+        are disposed with it, and the pool then only limits the number of
+        concurrent runs.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_health_check",
+        "_is_disposed",
+        "_local",
+        "_logger",
+        "_pool",
+        "_pool_sinks",
+        "_workflow",
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        workflow: WorkflowDefinition[_RDT, _PDT],
+        min_size: int = 0,
+        max_size: int = 1,
+        *,
+        health_check: Callable[[Disposable], bool] = _is_not_disposed,
+        max_idle_time: float | None = None,
+        pool_sinks: bool = True,
+    ) -> None:
+        """Create a new ``PooledWorkflowDefinition`` instance.
+
+        :param workflow: The workflow whose components to pool. MUST not be
+            ``None``.
+        :param min_size: The minimum number of sets of components to keep.
+            Ignored when ``pool_sinks`` is ``False``. Defaults to zero.
+        :param max_size: The maximum number of sets of components, i.e. the
+            maximum number of concurrent runs of this workflow. Defaults to
+            one.
+        :param health_check: A function that returns ``True`` if a pooled
+            component can still be used. A set of components is only reused
+            if all of them pass the check. Defaults to checking that the
+            component is not disposed.
+        :param max_idle_time: An optional time, in seconds, after which idle
+            sets of components are evicted.
+        :param pool_sinks: Whether to keep the components of the wrapped
+            workflow for later runs. When ``False``, the components are
+            disposed at the end of the run that used them. Defaults to
+            ``True``.
+
+        :raise ValueError: If any of the arguments has an invalid value. See
+            :class:`ComponentPool` for details.
+        :raise Exception: Any error raised by the factories of the wrapped
+            workflow while filling the pool up to ``min_size``. The
+            components already created are disposed.
+        """
+        super().__init__()
+        self._workflow: WorkflowDefinition[_RDT, _PDT] = ensure_not_none(
+            workflow,
+            "'workflow' MUST not be None.",
+        )
+        self._health_check: Callable[[Disposable], bool] = ensure_not_none(
+            health_check,
+            "'health_check' MUST not be None.",
+        )
+        self._pool_sinks: bool = pool_sinks
+        self._local: threading.local = threading.local()
+        self._pool: ComponentPool[WorkflowComponents[_RDT, _PDT]] = (
+            ComponentPool(
+                factory=self._create_components,
+                # Components disposed after each run cannot be kept warm.
+                min_size=min_size if pool_sinks else 0,
+                max_size=max_size,
+                health_check=self._is_healthy,
+                max_idle_time=max_idle_time,
+            )
+        )
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def id(self) -> str:
+        return self._workflow.id
+
+    @property
+    @override
+    def name(self) -> str:
+        return self._workflow.name
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return self._workflow.description
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def pool(self) -> ComponentPool[WorkflowComponents[_RDT, _PDT]]:
+        """The pool of the components of the wrapped workflow.
+
+        :return: The pool of the components of the wrapped workflow.
+        """
+        return self._pool
+
+    @property
+    def pool_sinks(self) -> bool:
+        """Whether the components of the wrapped workflow, including its
+        sinks, are kept across runs.
+
+        :return: ``True`` if the components are kept across runs, ``False``
+            if they are disposed at the end of each run.
+        """  # noqa: D205
+        return self._pool_sinks
+
+    @property
+    @override
+    def source_factory(self) -> Callable[[], Source[_RDT]]:
+        return lambda: _PooledSource(self._lease("source", new=True))
+
+    @property
+    @override
+    def processor_factory(self) -> Callable[[], Processor[_RDT, _PDT]]:
+        return lambda: _PooledProcessor(self._lease("processor"))
+
+    @property
+    @override
+    def sink_factory(self) -> Callable[[], Sink[_PDT]]:
+        def _sink_factory() -> Sink[_PDT]:
+            sink: Sink[_PDT] = _PooledSink(self._lease("sink"))
+            # The sink is the last component created for a run.
+            self._local.lease = None
+            return sink
+
+        return _sink_factory
+
+    @property
+    @override
+    def prologue(self) -> Callable[[], None]:
+        return self._workflow.prologue
+
+    @property
+    @override
+    def epilogue(self) -> Callable[[], None]:
+        return self._workflow.epilogue
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        self._pool.dispose()
+        self._logger.debug("Disposal complete.")
+
+    def _create_components(self) -> WorkflowComponents[_RDT, _PDT]:
+        with ExitStack() as exit_stack:
+            # Dispose the components created so far if creating the next
+            # one fails.
+            source: Source[_RDT] = exit_stack.enter_context(
+                self._workflow.source_factory(),
+            )
+            processor: Processor[_RDT, _PDT] = exit_stack.enter_context(
+                self._workflow.processor_factory(),
+            )
+            sink: Sink[_PDT] = exit_stack.enter_context(
+                self._workflow.sink_factory(),
+            )
+            exit_stack.pop_all()
+        return WorkflowComponents(source, processor, sink)
+
+    def _is_healthy(self, components: WorkflowComponents[_RDT, _PDT]) -> bool:
+        return all(
+            self._health_check(_component)
+            for _component in (
+                components.source,
+                components.processor,
+                components.sink,
+            )
+        )
+
+    def _lease(self, kind: str, *, new: bool = False) -> _Lease[_RDT, _PDT]:
+        """Return the lease of the components of the current run on this
+        thread, leasing new components if need be, and take the component
+        of the given kind from it.
+        """  # noqa: D205
+        lease: _Lease[_RDT, _PDT] | None = getattr(self._local, "lease", None)
+        if new or lease is None or not lease.take(kind):
+            lease = _Lease(self._pool, discard=not self._pool_sinks)
+            lease.take(kind)
+            self._local.lease = lease
+        return lease
@@ -0,0 +1,438 @@
+"""Common :class:`~sghi.etl.core.Processor` implementations."""
+
+from __future__ import annotations
+
+import logging
+import os
+from abc import abstractmethod
+from collections import deque
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import wait as futures_wait
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+from typing_extensions import override
+
+from sghi.disposable import ResourceDisposedError, not_disposed
+from sghi.etl.core import Processor
+from sghi.utils import (
+    ensure_greater_than,
+    ensure_not_none,
+    ensure_not_none_nor_empty,
+    type_fqn,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+    from concurrent.futures import Executor, Future
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_PDT = TypeVar("_PDT")
+"""Processed Data Type."""
+
+_RDT = TypeVar("_RDT")
+"""Raw Data Type."""
+
+
+@dataclass(frozen=True, slots=True)
+class _Stage:
+    """A step of a :class:`ProcessorPipe`."""
+
+    apply: Callable[[Any], Any]
+    """Transform a single chunk of data."""
+
+    apply_stream: Callable[[Iterable[Any]], Iterator[Any]]
+    """Transform chunks of data lazily."""
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+def _fuse(processors: Sequence[ElementwiseProcessor[Any, Any]]) -> _Stage:
+    """Combine consecutive element-wise processors into a single stage.
+
+    The returned stage passes each element through all the given processors
+    before moving on to the next element, so that a single list is built
+    regardless of how many processors are fused.
+    """
+    functions = tuple(_processor.apply_element for _processor in processors)
+
+    def apply(raw_data: Iterable[Any]) -> list[Any]:
+        # The members are bypassed, so they cannot check this themselves.
+        if any(_processor.is_disposed for _processor in processors):
+            _err_msg: str = "A fused processor has been disposed."
+            raise ResourceDisposedError(_err_msg)
+        processed_data: list[Any] = []
+        for element in raw_data:
+            for function in functions:
+                element = function(element)  # noqa: PLW2901
+            processed_data.append(element)
+        return processed_data
+
+    def apply_stream(raw_data_chunks: Iterable[Any]) -> Iterator[Any]:
+        return map(apply, raw_data_chunks)
+
+    return _Stage(apply=apply, apply_stream=apply_stream)
+
+
+def _is_fusable(processor: Processor[Any, Any]) -> bool:
+    """Check whether a processor can be fused with adjacent processors.
+
+    Fusing calls :meth:`ElementwiseProcessor.apply_element` directly, so
+    only element-wise processors that do not override :meth:`apply` or
+    :meth:`apply_stream` qualify.
+    """
+    processor_type = type(processor)
+    return (
+        isinstance(processor, ElementwiseProcessor)
+        and processor_type.apply is ElementwiseProcessor.apply
+        and processor_type.apply_stream is ElementwiseProcessor.apply_stream
+    )
+
+
+# =============================================================================
+# PROCESSORS
+# =============================================================================
+
+
+class ElementwiseProcessor(
+    Processor[Iterable[_RDT], list[_PDT]],
+    Generic[_RDT, _PDT],
+):
+    """A :class:`Processor` that transforms each element of its input
+    independently of the others.
+
+    Subclasses MUST implement :meth:`apply_element`. The default
+    :meth:`apply` method transforms each element of the given iterable in
+    turn and returns the results as a list.
+
+    Consecutive ``ElementwiseProcessor`` instances in a
+    :class:`ProcessorPipe` are fused. That is, each element is passed through
+    all of them before the next element is transformed, so that no
+    intermediate collections are built between them. Subclasses that
+    override :meth:`apply` or :meth:`~sghi.etl.core.Processor.apply_stream`
+    are not fused, so that their overrides are honored.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ()
+
+    @override
+    def apply(self, raw_data: Iterable[_RDT]) -> list[_PDT]:
+        return [self.apply_element(_element) for _element in raw_data]
+
+    @abstractmethod
+    def apply_element(self, raw_element: _RDT) -> _PDT:
+        """Transform a single element of raw data and return the result.
+
+        :param raw_element: A single element of raw data.
+
+        :return: The processed element.
+        """
+        ...
+
+
+class ParallelProcessor(
+    Processor[Iterable[_RDT], list[_PDT]],
+    Generic[_RDT, _PDT],
+):
+    """A :class:`Processor` that applies a wrapped ``Processor`` in parallel.
+
+    This ``Processor`` takes an iterable of raw data chunks and dispatches
+    each chunk to the :meth:`~sghi.etl.core.Processor.apply` method of the
+    wrapped ``Processor`` on a :class:`concurrent.futures.Executor`. The
+    results are then reassembled into a list, either in the same order as the
+    chunks they were computed from (the default), or in the order in which
+    they complete. At most ``max_in_flight`` chunks are submitted to the
+    executor at any one time, so that the input is consumed no faster than
+    it is processed.
+
+    When a thread pool is used, the wrapped ``Processor`` MUST be safe to use
+    from multiple threads concurrently. When a process pool is used, the
+    wrapped ``Processor``, the chunks and the results MUST all be picklable.
+    Note that, in the latter case, the wrapped ``Processor`` is pickled along
+    with each chunk, so every chunk is processed by a fresh copy of it. Such
+    a ``Processor`` SHOULD therefore be cheap to pickle, and any changes to
+    its state are neither kept across chunks nor visible to the caller.
+
+    If processing any of the chunks fails, the chunks that are yet to start
+    are cancelled and the error is propagated to the caller.
+
+    Disposing this ``Processor`` shuts down the executor, waiting for any
+    pending work to finish, and then disposes the wrapped ``Processor``.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = (
+        "_executor",
+        "_is_disposed",
+        "_logger",
+        "_max_in_flight",
+        "_ordered",
+        "_processor",
+    )
+
+    def __init__(
+        self,
+        processor: Processor[_RDT, _PDT],
+        executor_factory: Callable[[], Executor] = ThreadPoolExecutor,
+        *,
+        max_in_flight: int | None = None,
+        ordered: bool = True,
+    ) -> None:
+        """Create a new ``ParallelProcessor`` instance.
+
+        :param processor: The ``Processor`` to apply to each chunk of raw
+            data. MUST not be ``None``.
+        :param executor_factory: A factory function that returns the executor
+            on which the chunks are processed. The returned executor is owned
+            by this ``ParallelProcessor`` and is shut down when it is
+            disposed. Use a :class:`~concurrent.futures.ProcessPoolExecutor`
+            factory for CPU-bound transformations. MUST not be ``None``.
+            Defaults to :class:`~concurrent.futures.ThreadPoolExecutor`.
+        :param max_in_flight: The maximum number of chunks submitted to the
+            executor and not yet collected at any one time. MUST be greater
+            than zero when provided. Defaults to twice the default number of
+            workers of a :class:`~concurrent.futures.ThreadPoolExecutor`.
+        :param ordered: When ``True``, the default, the results are returned
+            in the same order as their chunks. When ``False``, the results are
+            returned in the order in which they complete.
+
+        :raise ValueError: If ``processor`` or ``executor_factory`` is
+            ``None``, or if ``max_in_flight`` is NOT greater than zero.
+        """
+        super().__init__()
+        self._processor: Processor[_RDT, _PDT] = ensure_not_none(
+            processor,
+            "'processor' MUST not be None.",
+        )
+        ensure_not_none(
+            executor_factory,
+            "'executor_factory' MUST not be None.",
+        )
+        self._max_in_flight: int = (
+            ensure_greater_than(
+                value=max_in_flight,
+                base_value=0,
+                message="'max_in_flight' MUST be greater than zero (0).",
+            )
+            if max_in_flight is not None
+            else 2 * min(32, (os.cpu_count() or 1) + 4)
+        )
+        self._ordered: bool = ordered
+        self._executor: Executor = executor_factory()
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def max_in_flight(self) -> int:
+        """The maximum number of chunks in flight at any one time.
+
+        :return: The maximum number of chunks submitted to the executor and
+            not yet collected at any one time.
+        """
+        return self._max_in_flight
+
+    @property
+    def ordered(self) -> bool:
+        """Whether the results are returned in the same order as their chunks.
+
+        :return: ``True`` if the results are returned in the same order as
+            their chunks, ``False`` if they are returned in the order in which
+            they complete.
+        """
+        return self._ordered
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: Iterable[_RDT]) -> list[_PDT]:
+        """Apply the wrapped ``Processor`` to each chunk in parallel.
+
+        :param raw_data: An iterable of raw data chunks to process.
+
+        :return: A list of the processed chunks, ordered according to
+            :attr:`ordered`.
+        """
+        self._logger.debug("Dispatching raw data chunks for processing.")
+        in_flight: deque[Future[_PDT]] = deque()
+        results: list[_PDT] = []
+        try:
+            for chunk in raw_data:
+                if len(in_flight) >= self._max_in_flight:
+                    results.extend(self._collect(in_flight))
+                in_flight.append(
+                    self._executor.submit(self._processor.apply, chunk),
+                )
+            while in_flight:
+                results.extend(self._collect(in_flight))
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            raise
+        return results
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        self._executor.shutdown(wait=True)
+        self._processor.dispose()
+        self._logger.debug("Disposal complete.")
+
+    def _collect(self, in_flight: deque[Future[_PDT]]) -> list[_PDT]:
+        """Wait for the next result(s), according to :attr:`ordered`, and
+        remove their futures from ``in_flight``.
+        """  # noqa: D205
+        if self._ordered:
+            return [in_flight.popleft().result()]
+        done, _ = futures_wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            in_flight.remove(future)
+        return [_future.result() for _future in done]
+
+
+class ProcessorPipe(Processor[_RDT, _PDT], Generic[_RDT, _PDT]):
+    """A :class:`Processor` that applies several ``Processor`` instances in
+    sequence, feeding the output of each to the next.
+
+    Chained ``Processor`` instances are fused where possible so that data
+    passes through the whole pipe in a single pass:
+
+    - when streaming, each chunk flows through all the members before the
+      next chunk is requested, so only one chunk is held at a time;
+    - runs of consecutive :class:`ElementwiseProcessor` instances are
+      combined so that each element passes through all of them before the
+      next one is transformed, without intermediate collections.
+
+    Pipes are usually created by composing ``Processor`` instances using the
+    ``>>`` operator, e.g. ``clean >> validate >> enrich``. Nested pipes are
+    flattened.
+
+    This ``Processor`` owns its members, including nested pipes. Disposing it
+    disposes all the members, in order, even if disposing some of them fails,
+    and marks the nested pipes as disposed.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_flattened",
+        "_is_disposed",
+        "_logger",
+        "_processors",
+        "_stages",
+    )
+
+    def __init__(self, processors: Sequence[Processor[Any, Any]]) -> None:
+        """Create a new ``ProcessorPipe`` instance.
+
+        :param processors: The ``Processor`` instances to apply, in order.
+            MUST not be ``None`` or empty, and MUST not contain ``None``.
+
+        :raise ValueError: If ``processors`` is ``None``, empty or contains
+            ``None``.
+        """
+        super().__init__()
+        ensure_not_none_nor_empty(
+            processors,
+            "'processors' MUST not be None or empty.",
+        )
+        members: list[Processor[Any, Any]] = []
+        flattened: list[ProcessorPipe[Any, Any]] = []
+        for processor in processors:
+            ensure_not_none(
+                processor,
+                "'processors' MUST not contain None.",
+            )
+            if isinstance(processor, ProcessorPipe):
+                members.extend(processor.processors)
+                flattened.extend((processor, *processor._flattened))
+            else:
+                members.append(processor)
+        self._processors: tuple[Processor[Any, Any], ...] = tuple(members)
+        self._flattened: tuple[ProcessorPipe[Any, Any], ...] = tuple(flattened)
+        self._stages: tuple[_Stage, ...] = self._build_stages()
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def processors(self) -> tuple[Processor[Any, Any], ...]:
+        """The ``Processor`` instances applied by this pipe, in order.
+
+        :return: The ``Processor`` instances applied by this pipe, in order.
+        """
+        return self._processors
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: _RDT) -> _PDT:
+        data: Any = raw_data
+        for stage in self._stages:
+            data = stage.apply(data)
+        return data
+
+    @not_disposed
+    @override
+    def apply_stream(self, raw_data_chunks: Iterable[_RDT]) -> Iterator[_PDT]:
+        chunks: Iterable[Any] = raw_data_chunks
+        for stage in self._stages:
+            chunks = stage.apply_stream(chunks)
+        yield from chunks
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        # The nested pipes share the members disposed below.
+        for pipe in self._flattened:
+            pipe._is_disposed = True
+        with ExitStack() as exit_stack:
+            # Callbacks run in reverse, register them so that the members
+            # are disposed in order.
+            for processor in reversed(self._processors):
+                exit_stack.callback(processor.dispose)
+        self._logger.debug("Disposal complete.")
+
+    def _build_stages(self) -> tuple[_Stage, ...]:
+        # Group runs of consecutive element-wise processors together.
+        groups: list[list[Processor[Any, Any]]] = []
+        for processor in self._processors:
+            if (
+                groups
+                and _is_fusable(processor)
+                and _is_fusable(groups[-1][-1])
+            ):
+                groups[-1].append(processor)
+            else:
+                groups.append([processor])
+        return tuple(
+            _fuse(_group)  # type: ignore[arg-type]
+            if len(_group) > 1
+            else _Stage(
+                apply=_group[0].apply,
+                apply_stream=_group[0].apply_stream,
+            )
+            for _group in groups
+        )
@@ -0,0 +1,711 @@
+"""Opt-in profiling of SGHI ETL workflow runs.
+
+Profiling is disabled by default and is enabled per workflow, by workflow
+id, using :func:`enable_profiling`. Once enabled, the executors in
+:mod:`sghi.etl.executors` wrap the workflow in a
+:class:`ProfiledWorkflowDefinition`, which profiles each phase of the run,
+i.e. the prologue, the component factories, the ``draw``, ``apply`` and
+``drain`` calls, and the epilogue, using :mod:`cProfile` and, optionally,
+:mod:`tracemalloc`. Once the run ends, a report is written to a new
+directory under the configured output directory. It contains:
+
+- a ``<phase>.pstats`` file per phase, which can be loaded using
+  :class:`pstats.Stats` or any tool that understands that format;
+- a ``summary.json`` file with the time spent in, the peak memory allocated
+  by, and the top allocation sites of, each phase.
+
+Since :mod:`tracemalloc` tracks the memory of the whole process, and
+:mod:`cProfile` cannot profile several threads at once on recent Python
+versions, profiled phases never run concurrently. Time a phase spends
+waiting for its upstream phase is excluded, so stages can still hand chunks
+to each other, but the stages of a profiled workflow do not overlap.
+Profiling, and memory tracing in particular, also slow workflows down
+noticeably. It is therefore meant for diagnosing workflows, not for routine
+runs.
+
+.. versionadded:: 1.3.0
+"""
+
+from __future__ import annotations
+
+import cProfile
+import itertools
+import json
+import logging
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, Generic, TypeVar
+
+from typing_extensions import override
+
+from sghi.etl.core import Processor, Sink, Source, WorkflowDefinition
+from sghi.utils import (
+    ensure_greater_than,
+    ensure_not_none,
+    ensure_not_none_nor_empty,
+    type_fqn,
+)
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Callable, Generator, Iterable, Iterator
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_PDT = TypeVar("_PDT")
+"""Processed Data Type."""
+
+_RDT = TypeVar("_RDT")
+"""Raw Data Type."""
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True, slots=True)
+class ProfilingSettings:
+    """Describes how the runs of a workflow are profiled."""
+
+    output_directory: Path
+    """The directory under which the reports are written."""
+
+    trace_memory: bool = True
+    """Whether to trace memory allocations using :mod:`tracemalloc`."""
+
+    top_allocations: int = 10
+    """The number of top allocation sites to report per phase. MUST be
+    greater than zero.
+    """
+
+    def __post_init__(self) -> None:
+        """Validate the settings.
+
+        :raise ValueError: If any of the fields has an invalid value.
+        """
+        ensure_not_none(
+            self.output_directory,
+            "'output_directory' MUST not be None.",
+        )
+        ensure_greater_than(
+            value=self.top_allocations,
+            base_value=0,
+            message="'top_allocations' MUST be greater than zero (0).",
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class AllocationSite:
+    """The memory allocated at a single source code location."""
+
+    location: str
+    """The source code location, as ``<file>:<line>``."""
+
+    size: int
+    """The net size, in bytes, of the memory allocated at the location."""
+
+    count: int
+    """The net number of memory blocks allocated at the location."""
+
+
+@dataclass(frozen=True, slots=True)
+class PhaseReport:
+    """The profiling results of a single phase of a workflow run."""
+
+    phase: str
+    """The name of the phase, e.g. ``"draw"``."""
+
+    duration: float
+    """The total time, in seconds, spent in the phase."""
+
+    stats_file: Path
+    """The path of the file holding the CPU profile of the phase."""
+
+    peak_memory: int | None = None
+    """The highest amount of memory, in bytes, allocated at once by a single
+    call of the phase, or ``None`` if memory was not traced.
+    """
+
+    top_allocations: tuple[AllocationSite, ...] = field(default=())
+    """The locations that allocated the most memory, still held after the
+    call of the phase that reached :attr:`peak_memory`, in descending order
+    of size.
+    """
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+
+_PROFILER_LOCK: Final[threading.Lock] = threading.Lock()
+"""Ensures that only a single phase is profiled at any given time."""
+
+_SETTINGS_LOCK: Final[threading.Lock] = threading.Lock()
+
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+
+_settings: dict[str, ProfilingSettings] = {}
+
+_tracemalloc_users: int = 0
+
+_owns_tracemalloc: bool = False
+
+
+def disable_profiling(workflow_id: str) -> None:
+    """Stop profiling the runs of the workflow with the given id.
+
+    Runs already in progress are unaffected. Disabling profiling for a
+    workflow that is not profiled has no effect.
+
+    :param workflow_id: The id of the workflow.
+
+    :return: None.
+    """
+    with _SETTINGS_LOCK:
+        _settings.pop(workflow_id, None)
+
+
+def enable_profiling(
+    workflow_id: str,
+    output_directory: str | os.PathLike[str],
+    *,
+    trace_memory: bool = True,
+    top_allocations: int = 10,
+) -> ProfilingSettings:
+    """Profile the future runs of the workflow with the given id.
+
+    Enabling profiling for a workflow that is already profiled replaces its
+    settings.
+
+    :param workflow_id: The id of the workflow to profile. MUST not be
+        ``None`` or empty.
+    :param output_directory: The directory under which the reports are
+        written. It is created if it does not exist. MUST not be ``None``.
+    :param trace_memory: Whether to trace memory allocations. Defaults to
+        ``True``.
+    :param top_allocations: The number of top allocation sites to report per
+        phase. MUST be greater than zero. Defaults to 10.
+
+    :return: The settings used to profile the workflow.
+
+    :raise ValueError: If any of the arguments has an invalid value.
+    """
+    ensure_not_none_nor_empty(
+        workflow_id,
+        "'workflow_id' MUST not be None or empty.",
+    )
+    ensure_not_none(output_directory, "'output_directory' MUST not be None.")
+    settings = ProfilingSettings(
+        output_directory=Path(output_directory),
+        trace_memory=trace_memory,
+        top_allocations=top_allocations,
+    )
+    with _SETTINGS_LOCK:
+        _settings[workflow_id] = settings
+    return settings
+
+
+def get_settings(workflow_id: str) -> ProfilingSettings | None:
+    """Return the profiling settings of the workflow with the given id.
+
+    :param workflow_id: The id of the workflow.
+
+    :return: The profiling settings of the workflow, or ``None`` if the
+        workflow is not profiled.
+    """
+    with _SETTINGS_LOCK:
+        return _settings.get(workflow_id)
+
+
+def is_enabled(workflow_id: str) -> bool:
+    """Check whether the runs of the workflow with the given id are profiled.
+
+    :param workflow_id: The id of the workflow.
+
+    :return: ``True`` if the workflow is profiled, ``False`` otherwise.
+    """
+    return get_settings(workflow_id) is not None
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+def _start_tracing_memory() -> None:
+    global _owns_tracemalloc, _tracemalloc_users  # noqa: PLW0603
+    with _SETTINGS_LOCK:
+        if not _tracemalloc_users:
+            # Leave tracing alone if it was started by someone else.
+            _owns_tracemalloc = not tracemalloc.is_tracing()
+            if _owns_tracemalloc:
+                tracemalloc.start()
+        _tracemalloc_users += 1
+
+
+def _stop_tracing_memory() -> None:
+    global _tracemalloc_users  # noqa: PLW0603
+    with _SETTINGS_LOCK:
+        _tracemalloc_users -= 1
+        if not _tracemalloc_users and _owns_tracemalloc:
+            tracemalloc.stop()
+
+
+class _Phase:
+    """Accumulates the CPU profile and memory usage of a single phase."""
+
+    __slots__ = (
+        "_baseline",
+        "_duration",
+        "_memory_at_start",
+        "_name",
+        "_peak_memory",
+        "_profile",
+        "_snapshot",
+        "_started_at",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        baseline: tracemalloc.Snapshot | None,
+    ) -> None:
+        super().__init__()
+        self._name: str = name
+        self._baseline: tracemalloc.Snapshot | None = baseline
+        self._duration: float = 0.0
+        self._memory_at_start: int = 0
+        self._peak_memory: int = 0
+        self._profile: cProfile.Profile = cProfile.Profile()
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._started_at: float = 0.0
+
+    def exclude(self, chunks: Iterable[_T]) -> Iterator[_T]:
+        """Pause this phase while waiting for each of the given chunks."""
+        iterator: Iterator[_T] = iter(chunks)
+        while True:
+            self._pause()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._resume()
+            yield chunk
+
+    @contextmanager
+    def measure(self) -> Generator[None, None, None]:
+        """Profile the code executed within the ``with`` block."""
+        self._resume()
+        try:
+            yield
+        finally:
+            self._pause()
+
+    def report(
+        self,
+        directory: Path,
+        top_allocations: int,
+    ) -> PhaseReport:
+        stats_file: Path = directory / f"{self._name}.pstats"
+        self._profile.dump_stats(stats_file)
+        if self._baseline is None:
+            return PhaseReport(self._name, self._duration, stats_file)
+        allocations: list[AllocationSite] = []
+        if self._snapshot is not None:
+            stats: Iterator[tracemalloc.StatisticDiff] = (
+                _stat
+                for _stat in self._snapshot.compare_to(
+                    self._baseline, "lineno"
+                )
+                if _stat.size_diff > 0
+            )
+            for stat in itertools.islice(stats, top_allocations):
+                frame = stat.traceback[0]
+                allocations.append(
+                    AllocationSite(
+                        location=f"{frame.filename}:{frame.lineno}",
+                        size=stat.size_diff,
+                        count=stat.count_diff,
+                    ),
+                )
+        return PhaseReport(
+            phase=self._name,
+            duration=self._duration,
+            stats_file=stats_file,
+            peak_memory=self._peak_memory,
+            top_allocations=tuple(allocations),
+        )
+
+    def _pause(self) -> None:
+        self._profile.disable()
+        self._duration += time.perf_counter() - self._started_at
+        if self._baseline is not None:
+            peak: int = tracemalloc.get_traced_memory()[1]
+            # Snapshots are expensive, only take one when the peak rises.
+            if peak - self._memory_at_start > self._peak_memory:
+                self._peak_memory = peak - self._memory_at_start
+                self._snapshot = tracemalloc.take_snapshot()
+        _PROFILER_LOCK.release()
+
+    def _resume(self) -> None:
+        _PROFILER_LOCK.acquire()
+        if self._baseline is not None:
+            tracemalloc.reset_peak()
+            self._memory_at_start = tracemalloc.get_traced_memory()[0]
+        self._started_at = time.perf_counter()
+        self._profile.enable()
+
+
+class _Session:
+    """The phases of a single profiled workflow run."""
+
+    __slots__ = ("_baseline", "_lock", "_phases", "_settings")
+
+    def __init__(self, settings: ProfilingSettings) -> None:
+        super().__init__()
+        self._settings: ProfilingSettings = settings
+        self._baseline: tracemalloc.Snapshot | None = None
+        if settings.trace_memory:
+            _start_tracing_memory()
+            self._baseline = tracemalloc.take_snapshot()
+        self._phases: dict[str, _Phase] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def phase(self, name: str) -> _Phase:
+        with self._lock:
+            if name not in self._phases:
+                self._phases[name] = _Phase(name, self._baseline)
+            return self._phases[name]
+
+    def finish(self, workflow_id: str) -> Path:
+        if self._baseline is not None:
+            _stop_tracing_memory()
+        timestamp: str = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%fZ")
+        directory: Path = (
+            self._settings.output_directory
+            / re.sub(r"[^\w.-]", "_", workflow_id)
+            / timestamp
+        )
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            reports: list[PhaseReport] = [
+                _phase.report(directory, self._settings.top_allocations)
+                for _phase in self._phases.values()
+            ]
+        summary: dict[str, Any] = {
+            "workflow_id": workflow_id,
+            "phases": [
+                {
+                    "phase": _report.phase,
+                    "duration_seconds": _report.duration,
+                    "stats_file": _report.stats_file.name,
+                    "peak_memory_bytes": _report.peak_memory,
+                    "top_allocations": [
+                        {
+                            "location": _site.location,
+                            "size_bytes": _site.size,
+                            "count": _site.count,
+                        }
+                        for _site in _report.top_allocations
+                    ],
+                }
+                for _report in reports
+            ],
+        }
+        (directory / "summary.json").write_text(
+            json.dumps(summary, indent=2),
+            encoding="utf-8",
+        )
+        return directory
+
+
+# =============================================================================
+# PROFILED COMPONENTS
+# =============================================================================
+
+
+class _ProfiledSource(Source[_RDT], Generic[_RDT]):
+    """Profiles the draws of a wrapped ``Source``."""
+
+    __slots__ = ("_phase", "_source")
+
+    def __init__(self, source: Source[_RDT], phase: _Phase) -> None:
+        super().__init__()
+        self._source: Source[_RDT] = source
+        self._phase: _Phase = phase
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._source.is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._source.dispose()
+
+    @override
+    def draw(self) -> _RDT:
+        with self._phase.measure():
+            return self._source.draw()
+
+    @override
+    def stream(self) -> Iterator[_RDT]:
+        with self._phase.measure():
+            chunks: Iterator[_RDT] = iter(self._source.stream())
+        while True:
+            with self._phase.measure():
+                try:
+                    raw_data = next(chunks)
+                except StopIteration:
+                    return
+            yield raw_data
+
+
+class _ProfiledProcessor(Processor[_RDT, _PDT], Generic[_RDT, _PDT]):
+    """Profiles the calls of a wrapped ``Processor``."""
+
+    __slots__ = ("_phase", "_processor")
+
+    def __init__(
+        self,
+        processor: Processor[_RDT, _PDT],
+        phase: _Phase,
+    ) -> None:
+        super().__init__()
+        self._processor: Processor[_RDT, _PDT] = processor
+        self._phase: _Phase = phase
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._processor.is_disposed
+
+    @override
+    def apply(self, raw_data: _RDT) -> _PDT:
+        with self._phase.measure():
+            return self._processor.apply(raw_data)
+
+    @override
+    def apply_stream(self, raw_data_chunks: Iterable[_RDT]) -> Iterator[_PDT]:
+        with self._phase.measure():
+            chunks: Iterator[_PDT] = iter(
+                self._processor.apply_stream(
+                    self._phase.exclude(raw_data_chunks),
+                ),
+            )
+        while True:
+            with self._phase.measure():
+                try:
+                    processed_data = next(chunks)
+                except StopIteration:
+                    return
+            yield processed_data
+
+    @override
+    def dispose(self) -> None:
+        self._processor.dispose()
+
+
+class _ProfiledSink(Sink[_PDT], Generic[_PDT]):
+    """Profiles the calls of a wrapped ``Sink``."""
+
+    __slots__ = ("_phase", "_sink")
+
+    def __init__(self, sink: Sink[_PDT], phase: _Phase) -> None:
+        super().__init__()
+        self._sink: Sink[_PDT] = sink
+        self._phase: _Phase = phase
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._sink.is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._sink.dispose()
+
+    @override
+    def drain(self, processed_data: _PDT) -> None:
+        with self._phase.measure():
+            self._sink.drain(processed_data)
+
+    @override
+    def drain_stream(self, processed_data_chunks: Iterable[_PDT]) -> None:
+        with self._phase.measure():
+            self._sink.drain_stream(
+                self._phase.exclude(processed_data_chunks),
+            )
+
+
+# =============================================================================
+# PROFILED WORKFLOW DEFINITION
+# =============================================================================
+
+
+class ProfiledWorkflowDefinition(
+    WorkflowDefinition[_RDT, _PDT],
+    Generic[_RDT, _PDT],
+):
+    """A :class:`~sghi.etl.core.WorkflowDefinition` that profiles the runs of
+    a wrapped ``WorkflowDefinition``.
+
+    Each run starts with the :attr:`prologue`, which begins a new profiling
+    session, and ends with the :attr:`epilogue`, which writes the report of
+    the session to a new directory, available afterwards as
+    :attr:`last_report_directory`. The phases of a run are named
+    ``prologue``, ``source_factory``, ``processor_factory``,
+    ``sink_factory``, ``draw``, ``apply``, ``drain`` and ``epilogue``.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_last_report_directory",
+        "_lock",
+        "_logger",
+        "_session",
+        "_settings",
+        "_workflow",
+    )
+
+    def __init__(
+        self,
+        workflow: WorkflowDefinition[_RDT, _PDT],
+        settings: ProfilingSettings,
+    ) -> None:
+        """Create a new ``ProfiledWorkflowDefinition`` instance.
+
+        :param workflow: The workflow to profile. MUST not be ``None``.
+        :param settings: How to profile the workflow. MUST not be ``None``.
+
+        :raise ValueError: If ``workflow`` or ``settings`` is ``None``.
+        """
+        super().__init__()
+        self._workflow: WorkflowDefinition[_RDT, _PDT] = ensure_not_none(
+            workflow,
+            "'workflow' MUST not be None.",
+        )
+        self._settings: ProfilingSettings = ensure_not_none(
+            settings,
+            "'settings' MUST not be None.",
+        )
+        self._session: _Session | None = None
+        self._last_report_directory: Path | None = None
+        self._lock: threading.Lock = threading.Lock()
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def id(self) -> str:
+        return self._workflow.id
+
+    @property
+    @override
+    def name(self) -> str:
+        return self._workflow.name
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return self._workflow.description
+
+    @property
+    def last_report_directory(self) -> Path | None:
+        """The directory holding the report of the last completed run.
+
+        :return: The directory holding the report of the last completed run,
+            or ``None`` if no run has completed yet.
+        """
+        return self._last_report_directory
+
+    @property
+    def settings(self) -> ProfilingSettings:
+        """The settings used to profile the wrapped workflow.
+
+        :return: The settings used to profile the wrapped workflow.
+        """
+        return self._settings
+
+    @property
+    @override
+    def source_factory(self) -> Callable[[], Source[_RDT]]:
+        def _source_factory() -> Source[_RDT]:
+            session: _Session = self._current_session()
+            with session.phase("source_factory").measure():
+                source = self._workflow.source_factory()
+            return _ProfiledSource(source, session.phase("draw"))
+
+        return _source_factory
+
+    @property
+    @override
+    def processor_factory(self) -> Callable[[], Processor[_RDT, _PDT]]:
+        def _processor_factory() -> Processor[_RDT, _PDT]:
+            session: _Session = self._current_session()
+            with session.phase("processor_factory").measure():
+                processor = self._workflow.processor_factory()
+            return _ProfiledProcessor(processor, session.phase("apply"))
+
+        return _processor_factory
+
+    @property
+    @override
+    def sink_factory(self) -> Callable[[], Sink[_PDT]]:
+        def _sink_factory() -> Sink[_PDT]:
+            session: _Session = self._current_session()
+            with session.phase("sink_factory").measure():
+                sink = self._workflow.sink_factory()
+            return _ProfiledSink(sink, session.phase("drain"))
+
+        return _sink_factory
+
+    @property
+    @override
+    def prologue(self) -> Callable[[], None]:
+        def _prologue() -> None:
+            with self._lock:
+                self._session = _Session(self._settings)
+            with self._current_session().phase("prologue").measure():
+                self._workflow.prologue()
+
+        return _prologue
+
+    @property
+    @override
+    def epilogue(self) -> Callable[[], None]:
+        def _epilogue() -> None:
+            session: _Session = self._current_session()
+            try:
+                with session.phase("epilogue").measure():
+                    self._workflow.epilogue()
+            finally:
+                with self._lock:
+                    self._session = None
+                self._last_report_directory = session.finish(self.id)
+                self._logger.info(
+                    "[%s] Profiling report written to '%s'.",
+                    self.id,
+                    self._last_report_directory,
+                )
+
+        return _epilogue
+
+    def _current_session(self) -> _Session:
+        with self._lock:
+            if self._session is None:
+                self._session = _Session(self._settings)
+            return self._session
@@ -0,0 +1,474 @@
+"""Lazy discovery of :class:`~sghi.etl.core.WorkflowDefinition` instances.
+
+Modules that define workflows tend to import heavy dependencies, e.g. data
+frame libraries or database drivers. This module allows workflows to be
+listed and selected by their :attr:`~sghi.etl.core.WorkflowDefinition.id`
+using only lightweight metadata, declared either through `entry points`_ or
+a manifest file. The module defining a workflow is only imported once that
+workflow is actually used.
+
+.. _entry points: https://packaging.python.org/specifications/entry-points/
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import logging
+import threading
+import tomllib
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from typing_extensions import override
+
+from sghi.etl.core import WorkflowDefinition
+from sghi.utils import ensure_not_none, ensure_not_none_nor_empty, type_fqn
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Callable, Iterable, Iterator
+
+    from sghi.etl.core import Processor, Sink, Source
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+
+DEFAULT_ENTRY_POINTS_GROUP: str = "sghi.etl.workflows"
+"""The default entry points group used to discover workflows.
+
+.. versionadded:: 1.3.0
+"""
+
+
+# =============================================================================
+# REFERENCES
+# =============================================================================
+
+
+@dataclass(frozen=True, slots=True)
+class WorkflowReference:
+    """Metadata describing a workflow, and where to find it, without loading
+    it.
+
+    The ``target`` is an object reference of the form
+    ``"package.module:attribute"``, where the attribute may be a dotted path.
+    The referenced object can either be a
+    :class:`~sghi.etl.core.WorkflowDefinition` instance, or a callable that
+    takes no arguments and returns one, e.g. a ``WorkflowDefinition``
+    subclass.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    id: str
+    """The unique identifier of the referenced workflow."""
+
+    target: str
+    """The ``"package.module:attribute"`` reference to the workflow."""
+
+    name: str | None = None
+    """The name of the referenced workflow. Defaults to its :attr:`id` when
+    not provided.
+    """
+
+    description: str | None = None
+    """The description of the referenced workflow, if available."""
+
+    def __post_init__(self) -> None:
+        """Validate the reference.
+
+        :raise ValueError: If ``id`` is ``None`` or empty, or if ``target``
+            is not of the form ``"package.module:attribute"``.
+        """
+        ensure_not_none_nor_empty(self.id, "'id' MUST not be None or empty.")
+        module_name, _, attribute = ensure_not_none(
+            self.target,
+            "'target' MUST not be None.",
+        ).partition(":")
+        if not (module_name and attribute):
+            _err_msg: str = (
+                "'target' MUST be of the form 'package.module:attribute', "
+                f"got '{self.target}'."
+            )
+            raise ValueError(_err_msg)
+
+    def load(self) -> WorkflowDefinition[Any, Any]:
+        """Import and return the referenced workflow.
+
+        :return: The referenced ``WorkflowDefinition``.
+
+        :raise ImportError: If the module containing the workflow cannot be
+            imported.
+        :raise AttributeError: If the module does not have the referenced
+            attribute.
+        :raise TypeError: If the referenced object is neither a
+            ``WorkflowDefinition`` nor a callable that returns one.
+        :raise ValueError: If the loaded workflow's id does not match this
+            reference's id.
+        """
+        module_name, _, attribute = self.target.partition(":")
+        target: Any = importlib.import_module(module_name)
+        for part in attribute.split("."):
+            target = getattr(target, part)
+
+        workflow: Any = target
+        if not isinstance(workflow, WorkflowDefinition):
+            if not callable(workflow):
+                _err_msg: str = (
+                    f"'{self.target}' MUST reference a WorkflowDefinition or "
+                    "a callable that returns one."
+                )
+                raise TypeError(_err_msg)
+            workflow = workflow()
+        if not isinstance(workflow, WorkflowDefinition):
+            _err_msg: str = (
+                f"'{self.target}' returned a '{type_fqn(type(workflow))}' "
+                "instead of a WorkflowDefinition."
+            )
+            raise TypeError(_err_msg)
+        if workflow.id != self.id:
+            _err_msg: str = (
+                f"The workflow loaded from '{self.target}' has the id "
+                f"'{workflow.id}' but was expected to have the id '{self.id}'."
+            )
+            raise ValueError(_err_msg)
+        return workflow
+
+
+# =============================================================================
+# LAZY WORKFLOW DEFINITION
+# =============================================================================
+
+
+class LazyWorkflowDefinition(WorkflowDefinition[Any, Any]):
+    """A :class:`~sghi.etl.core.WorkflowDefinition` that loads the workflow
+    it stands for on first use.
+
+    The :attr:`id`, :attr:`name` and :attr:`description` are served from a
+    :class:`WorkflowReference` without importing anything. The referenced
+    workflow is only loaded, exactly once, when any of the remaining
+    properties is first accessed, e.g. when the workflow is executed. This
+    means that instances of this class can be passed anywhere a
+    ``WorkflowDefinition`` is expected.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ("_lock", "_logger", "_reference", "_workflow")
+
+    def __init__(self, reference: WorkflowReference) -> None:
+        """Create a new ``LazyWorkflowDefinition`` instance.
+
+        :param reference: The reference of the workflow to load on first
+            use. MUST not be ``None``.
+
+        :raise ValueError: If ``reference`` is ``None``.
+        """
+        super().__init__()
+        self._reference: WorkflowReference = ensure_not_none(
+            reference,
+            "'reference' MUST not be None.",
+        )
+        self._workflow: WorkflowDefinition[Any, Any] | None = None
+        self._lock: threading.Lock = threading.Lock()
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def id(self) -> str:
+        return self._reference.id
+
+    @property
+    @override
+    def name(self) -> str:
+        return self._reference.name or self._reference.id
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return self._reference.description
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the referenced workflow has been loaded.
+
+        :return: ``True`` if the referenced workflow has been loaded,
+            ``False`` otherwise.
+        """
+        return self._workflow is not None
+
+    @property
+    def reference(self) -> WorkflowReference:
+        """The reference of the workflow that this instance stands for.
+
+        :return: The reference of the workflow that this instance stands for.
+        """
+        return self._reference
+
+    @property
+    @override
+    def source_factory(self) -> Callable[[], Source[Any]]:
+        return self.load().source_factory
+
+    @property
+    @override
+    def processor_factory(self) -> Callable[[], Processor[Any, Any]]:
+        return self.load().processor_factory
+
+    @property
+    @override
+    def sink_factory(self) -> Callable[[], Sink[Any]]:
+        return self.load().sink_factory
+
+    @property
+    @override
+    def prologue(self) -> Callable[[], None]:
+        return self.load().prologue
+
+    @property
+    @override
+    def epilogue(self) -> Callable[[], None]:
+        return self.load().epilogue
+
+    def load(self) -> WorkflowDefinition[Any, Any]:
+        """Load the referenced workflow if it has not been loaded yet and
+        return it.
+
+        :return: The referenced ``WorkflowDefinition``.
+
+        :raise ImportError: If the module containing the workflow cannot be
+            imported.
+        :raise AttributeError: If the module does not have the referenced
+            attribute.
+        :raise TypeError: If the referenced object is neither a
+            ``WorkflowDefinition`` nor a callable that returns one.
+        :raise ValueError: If the loaded workflow's id does not match the
+            reference's id.
+        """  # noqa: D205
+        with self._lock:
+            if self._workflow is None:
+                self._logger.debug(
+                    "Loading workflow '%s' from '%s'.",
+                    self._reference.id,
+                    self._reference.target,
+                )
+                self._workflow = self._reference.load()
+            return self._workflow
+
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+
+class WorkflowRegistry:
+    """A collection of lazily loaded workflows, keyed by their ids.
+
+    Workflows are registered using :class:`WorkflowReference` instances and
+    retrieved as :class:`LazyWorkflowDefinition` instances. Listing,
+    looking up and selecting workflows never imports the modules defining
+    them, only running (or explicitly loading) a workflow does.
+
+    Registries can be populated from `entry points`_ using
+    :meth:`from_entry_points`, or from a manifest file using
+    :meth:`from_manifest`. More workflows can then be added using
+    :meth:`register` and :meth:`register_all`.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = ("_lock", "_workflows")
+
+    def __init__(self, references: Iterable[WorkflowReference] = ()) -> None:
+        """Create a new ``WorkflowRegistry`` instance.
+
+        :param references: The references of the workflows to register.
+            Defaults to an empty iterable.
+
+        :raise ValueError: If ``references`` is ``None`` or contains
+            references with duplicate ids.
+        """
+        super().__init__()
+        self._workflows: dict[str, LazyWorkflowDefinition] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self.register_all(
+            ensure_not_none(references, "'references' MUST not be None."),
+        )
+
+    def __contains__(self, workflow_id: object) -> bool:
+        """Check whether a workflow with the given id is registered.
+
+        :param workflow_id: The id of the workflow to check.
+
+        :return: ``True`` if a workflow with the given id is registered,
+            ``False`` otherwise.
+        """
+        return workflow_id in self._workflows
+
+    def __iter__(self) -> Iterator[LazyWorkflowDefinition]:
+        """Iterate over the registered workflows in registration order.
+
+        :return: An iterator over the registered workflows.
+        """
+        return iter(tuple(self._workflows.values()))
+
+    def __len__(self) -> int:
+        """Return the number of registered workflows.
+
+        :return: The number of registered workflows.
+        """
+        return len(self._workflows)
+
+    def get(self, workflow_id: str) -> LazyWorkflowDefinition:
+        """Return the registered workflow with the given id.
+
+        The returned workflow is NOT loaded by this method. The same instance
+        is returned on every call, so that a workflow is loaded at most once.
+
+        :param workflow_id: The id of the workflow to return.
+
+        :return: The registered workflow with the given id.
+
+        :raise KeyError: If no workflow with the given id is registered.
+        """
+        try:
+            return self._workflows[workflow_id]
+        except KeyError:
+            _err_msg: str = f"No workflow with the id '{workflow_id}' exists."
+            raise KeyError(_err_msg) from None
+
+    def register(self, reference: WorkflowReference) -> LazyWorkflowDefinition:
+        """Register a workflow using its reference.
+
+        :param reference: The reference of the workflow to register. MUST not
+            be ``None``.
+
+        :return: The registered workflow.
+
+        :raise ValueError: If ``reference`` is ``None`` or if a workflow with
+            the same id is already registered.
+        """
+        ensure_not_none(reference, "'reference' MUST not be None.")
+        with self._lock:
+            if reference.id in self._workflows:
+                _err_msg: str = (
+                    f"A workflow with the id '{reference.id}' is already "
+                    "registered."
+                )
+                raise ValueError(_err_msg)
+            workflow = LazyWorkflowDefinition(reference)
+            self._workflows[reference.id] = workflow
+            return workflow
+
+    def register_all(self, references: Iterable[WorkflowReference]) -> None:
+        """Register several workflows using their references.
+
+        :param references: The references of the workflows to register. MUST
+            not be ``None``.
+
+        :return: None.
+
+        :raise ValueError: If ``references`` is ``None`` or if a workflow
+            with the same id as one of the references is already registered.
+        """
+        ensure_not_none(references, "'references' MUST not be None.")
+        for reference in references:
+            self.register(reference)
+
+    @classmethod
+    def from_entry_points(
+        cls,
+        group: str = DEFAULT_ENTRY_POINTS_GROUP,
+    ) -> WorkflowRegistry:
+        """Create a registry from the entry points of the installed
+        distributions.
+
+        Each entry point in the given group declares a single workflow. The
+        entry point's name is the workflow's id and its value is the
+        workflow's ``target``, e.g. in a ``pyproject.toml`` file:
+
+        .. code-block:: toml
+
+            [project.entry-points."sghi.etl.workflows"]
+            daily-sales = "my_project.workflows:DailySalesWorkflow"
+
+        Since entry points carry no other metadata, the workflows' names
+        default to their ids and their descriptions are not available. Use
+        a manifest, see :meth:`from_manifest`, when these are needed without
+        loading the workflows. The entry points themselves are NOT loaded by
+        this method.
+
+        :param group: The entry points group to discover workflows from.
+            MUST not be ``None`` or empty. Defaults to
+            :data:`DEFAULT_ENTRY_POINTS_GROUP`.
+
+        :return: A new registry containing the discovered workflows.
+
+        :raise ValueError: If ``group`` is ``None`` or empty, if an entry
+            point does not reference an attribute, or if several entry
+            points share the same name.
+        """  # noqa: D205
+        ensure_not_none_nor_empty(group, "'group' MUST not be None or empty.")
+        return cls(
+            WorkflowReference(
+                id=entry_point.name,
+                target=f"{entry_point.module}:{entry_point.attr or ''}",
+            )
+            for entry_point in entry_points(group=group)
+        )
+
+    @classmethod
+    def from_manifest(cls, path: str | os.PathLike[str]) -> WorkflowRegistry:
+        """Create a registry from a manifest file.
+
+        A manifest is a TOML or JSON file, chosen by the file's extension,
+        containing a ``workflows`` array. Each entry of the array declares a
+        workflow using the fields of :class:`WorkflowReference`. For example:
+
+        .. code-block:: toml
+
+            [[workflows]]
+            id = "daily-sales"
+            name = "Daily Sales"
+            description = "Load the previous day's sales to the warehouse."
+            target = "my_project.workflows:DailySalesWorkflow"
+
+        :param path: The path of the manifest file. Files whose extension is
+            ``.json`` are read as JSON, all other files as TOML.
+
+        :return: A new registry containing the declared workflows.
+
+        :raise OSError: If the manifest file cannot be read.
+        :raise ValueError: If the manifest is malformed or contains
+            workflows with duplicate ids.
+        """
+        manifest_path = Path(path)
+        content: Any
+        with manifest_path.open("rb") as manifest_file:
+            if manifest_path.suffix.lower() == ".json":
+                content = json.load(manifest_file)
+            else:
+                content = tomllib.load(manifest_file)
+
+        workflows: Any = (
+            content.get("workflows") if isinstance(content, dict) else None
+        )
+        if not isinstance(workflows, list) or not all(
+            isinstance(workflow, dict) for workflow in workflows
+        ):
+            _err_msg: str = (
+                f"The manifest '{manifest_path}' MUST contain a 'workflows' "
+                "array of tables/objects."
+            )
+            raise ValueError(_err_msg)
+        try:
+            return cls(WorkflowReference(**workflow) for workflow in workflows)
+        except TypeError as exp:
+            _err_msg: str = f"The manifest '{manifest_path}' is malformed."
+            raise ValueError(_err_msg) from exp
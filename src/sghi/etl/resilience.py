@@ -0,0 +1,665 @@
+"""Retries, timeouts and circuit breaking for sources and sinks.
+
+Transient failures of the dependencies that a :class:`~sghi.etl.core.Source`
+or a :class:`~sghi.etl.core.Sink` calls, e.g. a dropped connection, SHOULD
+not abort a whole workflow. The :class:`ResilientSource`
+and :class:`ResilientSink` wrappers guard each call to a wrapped component
+with an optional per-call timeout, retries with exponential backoff and
+jitter, as described by a :class:`RetryPolicy`, and an optional
+:class:`CircuitBreaker` that short-circuits calls to a dependency that keeps
+failing. Every retry is reported to an optional hook as a
+:class:`RetryEvent`.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import Enum, unique
+from functools import partial
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+from typing_extensions import override
+
+from sghi.disposable import not_disposed
+from sghi.etl.core import Sink, Source
+from sghi.exceptions import SGHIError
+from sghi.utils import ensure_greater_than, ensure_not_none, type_fqn
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_PDT = TypeVar("_PDT")
+"""Processed Data Type."""
+
+_RDT = TypeVar("_RDT")
+"""Raw Data Type."""
+
+_T = TypeVar("_T")
+
+
+@unique
+class CircuitState(Enum):
+    """The states of a :class:`CircuitBreaker`.
+
+    .. versionadded:: 1.3.0
+    """
+
+    CLOSED = "closed"
+    """Calls are allowed through."""
+
+    OPEN = "open"
+    """Calls are rejected without being attempted."""
+
+    HALF_OPEN = "half_open"
+    """A single trial call is allowed through to check whether the
+    dependency has recovered.
+    """
+
+
+@dataclass(frozen=True, slots=True)
+class RetryEvent:
+    """Describes a failed call that is about to be retried.
+
+    .. versionadded:: 1.3.0
+    """
+
+    operation: str
+    """A description of the failed call, e.g. ``"my.module.MySource.draw"``.
+    """
+
+    attempt: int
+    """The number of the attempt that failed, starting from 1."""
+
+    error: BaseException
+    """The error raised by the failed attempt."""
+
+    delay: float
+    """The time, in seconds, to wait before the next attempt."""
+
+
+class CircuitOpenError(SGHIError):
+    """Raised when a call is rejected by an open :class:`CircuitBreaker`.
+
+    .. versionadded:: 1.3.0
+    """
+
+
+# =============================================================================
+# POLICIES
+# =============================================================================
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """Describes when and how often a failed call is retried.
+
+    The delay before the ``n``-th retry is
+    ``initial_delay * multiplier ** (n - 1)``, capped at ``max_delay``. A
+    random fraction of up to ``jitter`` of that delay is then subtracted so
+    that many clients failing at the same time do not all retry at the same
+    time.
+
+    .. versionadded:: 1.3.0
+    """
+
+    max_attempts: int = 3
+    """The maximum number of attempts, including the first one. MUST be
+    greater than zero. A value of 1 disables retries.
+    """
+
+    initial_delay: float = 0.5
+    """The delay, in seconds, before the first retry. MUST not be negative.
+    """
+
+    max_delay: float = 30.0
+    """The maximum delay, in seconds, between two attempts. MUST not be
+    less than ``initial_delay``.
+    """
+
+    multiplier: float = 2.0
+    """The factor by which the delay grows after each retry. MUST not be
+    less than 1.
+    """
+
+    jitter: float = 0.5
+    """The maximum fraction of each delay to randomly subtract. MUST be
+    between 0 and 1, inclusive.
+    """
+
+    retry_on: tuple[type[BaseException], ...] = field(
+        default=(Exception,),
+    )
+    """The types of errors that are retried. Other errors are propagated
+    immediately. Errors raised by an open :class:`CircuitBreaker` are never
+    retried.
+    """
+
+    def __post_init__(self) -> None:
+        """Validate the policy.
+
+        :raise ValueError: If any of the fields has an invalid value.
+        """
+        ensure_greater_than(
+            value=self.max_attempts,
+            base_value=0,
+            message="'max_attempts' MUST be greater than zero (0).",
+        )
+        if self.initial_delay < 0:
+            _err_msg: str = "'initial_delay' MUST not be negative."
+            raise ValueError(_err_msg)
+        if self.max_delay < self.initial_delay:
+            _err_msg: str = (
+                "'max_delay' MUST not be less than 'initial_delay'."
+            )
+            raise ValueError(_err_msg)
+        if self.multiplier < 1:
+            _err_msg: str = "'multiplier' MUST not be less than one (1)."
+            raise ValueError(_err_msg)
+        if not 0 <= self.jitter <= 1:
+            _err_msg: str = "'jitter' MUST be between zero (0) and one (1)."
+            raise ValueError(_err_msg)
+
+    def delay_for(self, attempt: int) -> float:
+        """Return the delay, in seconds, to wait after the given failed
+        attempt.
+
+        :param attempt: The number of the failed attempt, starting from 1.
+
+        :return: The delay, in seconds, to wait before the next attempt.
+        """  # noqa: D205
+        delay = min(
+            self.max_delay,
+            self.initial_delay * self.multiplier ** (attempt - 1),
+        )
+        return delay * (1 - self.jitter * random.random())  # noqa: S311
+
+
+class CircuitBreaker:
+    """Stops calls to a dependency that keeps failing.
+
+    The breaker starts :attr:`~CircuitState.CLOSED`. Once
+    ``failure_threshold`` consecutive calls have failed, it becomes
+    :attr:`~CircuitState.OPEN` and rejects all calls with a
+    :exc:`CircuitOpenError`, without attempting them, for ``reset_timeout``
+    seconds. It then becomes :attr:`~CircuitState.HALF_OPEN` and lets a
+    single trial call through. If that call succeeds the breaker closes,
+    otherwise it opens again.
+
+    A ``CircuitBreaker`` is safe to share between threads and between
+    components that call the same dependency.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = (
+        "_failure_threshold",
+        "_failures",
+        "_lock",
+        "_logger",
+        "_opened_at",
+        "_reset_timeout",
+        "_state",
+    )
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ) -> None:
+        """Create a new ``CircuitBreaker`` instance.
+
+        :param failure_threshold: The number of consecutive failures after
+            which the breaker opens. MUST be greater than zero. Defaults to 5.
+        :param reset_timeout: The time, in seconds, for which the breaker
+            stays open before allowing a trial call. MUST be greater than
+            zero. Defaults to 30.
+
+        :raise ValueError: If ``failure_threshold`` or ``reset_timeout`` is
+            NOT greater than zero.
+        """
+        super().__init__()
+        self._failure_threshold: int = ensure_greater_than(
+            value=failure_threshold,
+            base_value=0,
+            message="'failure_threshold' MUST be greater than zero (0).",
+        )
+        self._reset_timeout: float = ensure_greater_than(
+            value=reset_timeout,
+            base_value=0,
+            message="'reset_timeout' MUST be greater than zero (0).",
+        )
+        self._failures: int = 0
+        self._opened_at: float = 0.0
+        self._state: CircuitState = CircuitState.CLOSED
+        self._lock: threading.Lock = threading.Lock()
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    def state(self) -> CircuitState:
+        """The current state of this breaker.
+
+        :return: The current state of this breaker.
+        """
+        with self._lock:
+            if self._state is CircuitState.OPEN and self._can_retry():
+                return CircuitState.HALF_OPEN
+            return self._state
+
+    def call(
+        self,
+        function: Callable[..., _T],
+        *args: Any,  # noqa: ANN401
+    ) -> _T:
+        """Call the given function unless this breaker is open.
+
+        :param function: The function to call.
+        :param args: The positional arguments to call the function with.
+
+        :return: The value returned by the function.
+
+        :raise CircuitOpenError: If this breaker is open, or half-open with
+            a trial call already in progress.
+        """
+        with self._lock:
+            if self._state is CircuitState.OPEN and self._can_retry():
+                self._state = CircuitState.HALF_OPEN
+                self._logger.info("Circuit half-open, allowing a trial call.")
+            elif self._state is not CircuitState.CLOSED:
+                _err_msg: str = "The circuit is open, the call was rejected."
+                raise CircuitOpenError(_err_msg)
+        try:
+            result = function(*args)
+        except BaseException:
+            self._on_failure()
+            raise
+        self._on_success()
+        return result
+
+    def _can_retry(self) -> bool:
+        return time.monotonic() - self._opened_at >= self._reset_timeout
+
+    def _on_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if (
+                self._state is CircuitState.HALF_OPEN
+                or self._failures >= self._failure_threshold
+            ):
+                if self._state is not CircuitState.OPEN:
+                    self._logger.warning(
+                        "Circuit opened after %d consecutive failure(s).",
+                        self._failures,
+                    )
+                self._state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+
+    def _on_success(self) -> None:
+        with self._lock:
+            if self._state is not CircuitState.CLOSED:
+                self._logger.info("Circuit closed.")
+            self._failures = 0
+            self._state = CircuitState.CLOSED
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+def _call_with_timeout(
+    function: Callable[..., _T],
+    args: tuple[Any, ...],
+    timeout: float,
+) -> _T:
+    """Call the given function on a separate thread and wait, for at most
+    ``timeout`` seconds, for it to return.
+
+    Python threads cannot be interrupted, so a call that times out keeps
+    running in the background until it returns on its own.
+
+    :raise _AttemptTimeoutError: If the call does not return in time.
+    """  # noqa: D205
+    future: Future[_T] = Future()
+
+    def run() -> None:
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(function(*args))
+        except BaseException as exp:  # noqa: BLE001
+            future.set_exception(exp)
+
+    threading.Thread(target=run, name="resilient-call", daemon=True).start()
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        _err_msg: str = f"The call did not complete within {timeout} seconds."
+        raise _AttemptTimeoutError(_err_msg) from None
+
+
+class _AttemptTimeoutError(TimeoutError):
+    """Raised when a guarded call is abandoned because it timed out.
+
+    Unlike other :exc:`TimeoutError` instances, which may be raised by the
+    guarded component itself, this error means that the call is still
+    running in the background.
+    """
+
+
+class _Guard:
+    """Applies a timeout, retries and a circuit breaker to calls."""
+
+    __slots__ = (
+        "_circuit_breaker",
+        "_logger",
+        "_on_retry",
+        "_reentrant",
+        "_retries",
+        "_retry_policy",
+        "_timeout",
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        retry_policy: RetryPolicy,
+        timeout: float | None,
+        circuit_breaker: CircuitBreaker | None,
+        on_retry: Callable[[RetryEvent], None] | None,
+        *,
+        reentrant: bool,
+        logger: logging.Logger,
+    ) -> None:
+        super().__init__()
+        self._retry_policy: RetryPolicy = ensure_not_none(
+            retry_policy,
+            "'retry_policy' MUST not be None.",
+        )
+        self._timeout: float | None = (
+            ensure_greater_than(
+                value=timeout,
+                base_value=0,
+                message="'timeout' MUST be greater than zero (0).",
+            )
+            if timeout is not None
+            else None
+        )
+        self._circuit_breaker: CircuitBreaker | None = circuit_breaker
+        self._on_retry: Callable[[RetryEvent], None] | None = on_retry
+        self._reentrant: bool = reentrant
+        self._retries: int = 0
+        self._logger: logging.Logger = logger
+
+    @property
+    def retries(self) -> int:
+        return self._retries
+
+    def __call__(
+        self,
+        operation: str,
+        function: Callable[..., _T],
+        *args: Any,  # noqa: ANN401
+    ) -> _T:
+        attempt: int = 1
+        while True:
+            try:
+                return self._attempt(function, args)
+            except CircuitOpenError:
+                raise
+            except self._retry_policy.retry_on as exp:
+                if attempt >= self._retry_policy.max_attempts:
+                    raise
+                timed_out = isinstance(exp, _AttemptTimeoutError)
+                if timed_out and not self._reentrant:
+                    self._logger.warning(
+                        "Attempt %d of '%s' timed out and is still running, "
+                        "not retrying a component that is not reentrant.",
+                        attempt,
+                        operation,
+                    )
+                    raise
+                delay = self._retry_policy.delay_for(attempt)
+                self._retries += 1
+                self._logger.warning(
+                    "Attempt %d of '%s' failed, retrying in %.3fs: %s",
+                    attempt,
+                    operation,
+                    delay,
+                    exp,
+                )
+                if self._on_retry is not None:
+                    self._on_retry(RetryEvent(operation, attempt, exp, delay))
+                time.sleep(delay)
+                attempt += 1
+
+    def _attempt(
+        self,
+        function: Callable[..., _T],
+        args: tuple[Any, ...],
+    ) -> _T:
+        call: Callable[[], _T] = (
+            partial(_call_with_timeout, function, args, self._timeout)
+            if self._timeout is not None
+            else partial(function, *args)
+        )
+        if self._circuit_breaker is not None:
+            return self._circuit_breaker.call(call)
+        return call()
+
+
+# =============================================================================
+# RESILIENT COMPONENTS
+# =============================================================================
+
+
+class ResilientSource(Source[_RDT], Generic[_RDT]):
+    """A :class:`~sghi.etl.core.Source` that guards draws from a wrapped
+    ``Source`` against transient failures.
+
+    Each call to :meth:`draw` is attempted, and retried, according to the
+    given :class:`RetryPolicy`. Each attempt is bounded by the given
+    ``timeout``, if any, and goes through the given :class:`CircuitBreaker`,
+    if any.
+
+    An attempt that times out cannot be interrupted and keeps running in the
+    background. Retrying it would call the wrapped ``Source`` again while
+    the abandoned call is still running. Timed-out attempts are therefore
+    only retried when the wrapped ``Source`` is declared ``reentrant``, i.e.
+    safe to call concurrently.
+
+    Retrying a partially consumed stream is not possible in general, so this
+    ``Source`` does NOT delegate :meth:`stream` to the wrapped ``Source``.
+    Instead, it uses the default implementation which yields the result of a
+    single guarded draw.
+
+    Disposing this ``Source`` disposes the wrapped ``Source``.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ("_guard", "_is_disposed", "_logger", "_source")
+
+    def __init__(  # noqa: PLR0913
+        self,
+        source: Source[_RDT],
+        retry_policy: RetryPolicy | None = None,
+        timeout: float | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        on_retry: Callable[[RetryEvent], None] | None = None,
+        *,
+        reentrant: bool = False,
+    ) -> None:
+        """Create a new ``ResilientSource`` instance.
+
+        :param source: The ``Source`` to guard. MUST not be ``None``.
+        :param retry_policy: When and how often to retry failed draws.
+            Defaults to a :class:`RetryPolicy` with the default settings.
+        :param timeout: An optional maximum time, in seconds, that each
+            attempt may take. MUST be greater than zero when provided.
+        :param circuit_breaker: An optional ``CircuitBreaker`` to route the
+            attempts through. It may be shared with other components calling
+            the same dependency.
+        :param on_retry: An optional hook called with a
+            :class:`RetryEvent` before each retry.
+        :param reentrant: Whether the wrapped component can safely be called
+            while a timed-out call to it is still running. Timed-out
+            attempts are only retried when this is ``True``. Defaults to
+            ``False``.
+
+        :raise ValueError: If ``source`` is ``None`` or if ``timeout`` is NOT
+            greater than zero.
+        """
+        super().__init__()
+        self._source: Source[_RDT] = ensure_not_none(
+            source,
+            "'source' MUST not be None.",
+        )
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+        self._guard: _Guard = _Guard(
+            retry_policy=retry_policy or RetryPolicy(),
+            timeout=timeout,
+            circuit_breaker=circuit_breaker,
+            on_retry=on_retry,
+            reentrant=reentrant,
+            logger=self._logger,
+        )
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def retries(self) -> int:
+        """The total number of retries performed by this ``Source``.
+
+        :return: The total number of retries performed by this ``Source``.
+        """
+        return self._guard.retries
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        self._source.dispose()
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def draw(self) -> _RDT:
+        return self._guard(
+            f"{type_fqn(type(self._source))}.draw",
+            self._source.draw,
+        )
+
+
+class ResilientSink(Sink[_PDT], Generic[_PDT]):
+    """A :class:`~sghi.etl.core.Sink` that guards drains to a wrapped
+    ``Sink`` against transient failures.
+
+    Each call to :meth:`drain` is attempted, and retried, according to the
+    given :class:`RetryPolicy`. Each attempt is bounded by the given
+    ``timeout``, if any, and goes through the given :class:`CircuitBreaker`,
+    if any. Since failed drains may be retried, the wrapped ``Sink`` SHOULD
+    be idempotent.
+
+    An attempt that times out cannot be interrupted and keeps running in the
+    background. Retrying it would call the wrapped ``Sink`` again while the
+    abandoned call is still running, possibly draining the same data twice
+    at the same time. Timed-out attempts are therefore only retried when the
+    wrapped ``Sink`` is declared ``reentrant``, i.e. safe to call
+    concurrently.
+
+    This ``Sink`` does NOT delegate :meth:`drain_stream` to the wrapped
+    ``Sink``. Instead, it uses the default implementation which makes one
+    guarded drain per chunk, so that only the failed chunk is retried.
+
+    Disposing this ``Sink`` disposes the wrapped ``Sink``.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ("_guard", "_is_disposed", "_logger", "_sink")
+
+    def __init__(  # noqa: PLR0913
+        self,
+        sink: Sink[_PDT],
+        retry_policy: RetryPolicy | None = None,
+        timeout: float | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        on_retry: Callable[[RetryEvent], None] | None = None,
+        *,
+        reentrant: bool = False,
+    ) -> None:
+        """Create a new ``ResilientSink`` instance.
+
+        :param sink: The ``Sink`` to guard. MUST not be ``None``.
+        :param retry_policy: When and how often to retry failed drains.
+            Defaults to a :class:`RetryPolicy` with the default settings.
+        :param timeout: An optional maximum time, in seconds, that each
+            attempt may take. MUST be greater than zero when provided.
+        :param circuit_breaker: An optional ``CircuitBreaker`` to route the
+            attempts through. It may be shared with other components calling
+            the same dependency.
+        :param on_retry: An optional hook called with a
+            :class:`RetryEvent` before each retry.
+        :param reentrant: Whether the wrapped component can safely be called
+            while a timed-out call to it is still running. Timed-out
+            attempts are only retried when this is ``True``. Defaults to
+            ``False``.
+
+        :raise ValueError: If ``sink`` is ``None`` or if ``timeout`` is NOT
+            greater than zero.
+        """
+        super().__init__()
+        self._sink: Sink[_PDT] = ensure_not_none(
+            sink,
+            "'sink' MUST not be None.",
+        )
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+        self._guard: _Guard = _Guard(
+            retry_policy=retry_policy or RetryPolicy(),
+            timeout=timeout,
+            circuit_breaker=circuit_breaker,
+            on_retry=on_retry,
+            reentrant=reentrant,
+            logger=self._logger,
+        )
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def retries(self) -> int:
+        """The total number of retries performed by this ``Sink``.
+
+        :return: The total number of retries performed by this ``Sink``.
+        """
+        return self._guard.retries
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        self._sink.dispose()
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: _PDT) -> None:
+        self._guard(
+            f"{type_fqn(type(self._sink))}.drain",
+            self._sink.drain,
+            processed_data,
+        )
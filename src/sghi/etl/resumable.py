@@ -0,0 +1,495 @@
+"""Resumption of interrupted chunked workflows.
+
+A long-running workflow that streams its data in chunks can be wrapped in a
+:class:`ResumableWorkflowDefinition`. As the workflow's
+:class:`~sghi.etl.core.Sink` drains chunks, the number of drained, i.e.
+*acknowledged*, chunks is recorded in a
+:class:`~sghi.etl.incremental.CheckpointStore`. When a run fails, the next run
+of the same workflow skips the chunks that were already acknowledged instead
+of processing and draining them again. Sources that can start streaming from
+a given chunk, i.e. :class:`SeekableSource` instances, resume without drawing
+the acknowledged chunks at all. Once a run completes, its progress is cleared
+so that the following run starts from the beginning.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from abc import ABCMeta, abstractmethod
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+from typing_extensions import override
+
+from sghi.disposable import not_disposed
+from sghi.etl.core import Sink, Source, WorkflowDefinition
+from sghi.utils import (
+    ensure_greater_than,
+    ensure_not_none,
+    ensure_not_none_nor_empty,
+    type_fqn,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from sghi.etl.core import Processor
+    from sghi.etl.incremental import CheckpointStore
+
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_PDT = TypeVar("_PDT")
+"""Processed Data Type."""
+
+_RDT = TypeVar("_RDT")
+"""Raw Data Type."""
+
+
+# =============================================================================
+# SEEKABLE SOURCE
+# =============================================================================
+
+
+class SeekableSource(Source[_RDT], Generic[_RDT], metaclass=ABCMeta):
+    """A :class:`~sghi.etl.core.Source` that can start streaming from any of
+    its chunks.
+
+    Subclasses MUST implement :meth:`stream_from`. A
+    :class:`ResumableSource` wrapping a ``SeekableSource`` uses that method
+    to resume an interrupted run instead of drawing, and discarding, the
+    chunks that were already acknowledged. This is worthwhile for sources
+    whose chunks are expensive to draw but cheap to locate, e.g. pages of a
+    paginated API or row groups of a file.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ()
+
+    @override
+    def stream(self) -> Iterator[_RDT]:
+        """Draw all the available data in chunks.
+
+        This is equivalent to calling :meth:`stream_from` with a position of
+        zero.
+
+        :return: An iterator of raw data chunks.
+        """
+        return self.stream_from(0)
+
+    @abstractmethod
+    def stream_from(self, position: int) -> Iterator[_RDT]:
+        """Draw the data in chunks, starting from the chunk at the given
+        position.
+
+        The yielded chunks MUST be the same as the chunks that :meth:`stream`
+        yields after skipping ``position`` chunks.
+
+        :param position: The zero-based position of the first chunk to
+            yield. Positions past the last chunk yield nothing.
+
+        :return: An iterator of raw data chunks.
+        """  # noqa: D205
+        ...
+
+
+# =============================================================================
+# RESUMABLE COMPONENTS
+# =============================================================================
+
+
+class ResumableSource(Source[_RDT], Generic[_RDT]):
+    """A :class:`~sghi.etl.core.Source` that skips the chunks of a wrapped
+    ``Source`` that were acknowledged by a previous run.
+
+    When streaming, the number of acknowledged chunks is read from the given
+    :class:`~sghi.etl.incremental.CheckpointStore` and that many chunks are
+    drawn from the wrapped ``Source`` and discarded before the remaining
+    chunks are yielded. The wrapped ``Source`` MUST therefore yield the same
+    chunks, in the same order, on every run. Skipped chunks are still drawn,
+    but are neither processed nor drained again, unless the wrapped
+    ``Source`` is a :class:`SeekableSource`, in which case streaming starts
+    directly from the first unacknowledged chunk.
+
+    Only streaming is resumable; :meth:`draw` simply draws from the wrapped
+    ``Source``.
+
+    Disposing this ``Source`` disposes the wrapped ``Source`` but NOT the
+    store, since it may be shared.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_is_disposed",
+        "_key",
+        "_logger",
+        "_resumed_from",
+        "_source",
+        "_store",
+    )
+
+    def __init__(
+        self,
+        source: Source[_RDT],
+        store: CheckpointStore,
+        key: str,
+    ) -> None:
+        """Create a new ``ResumableSource`` instance.
+
+        :param source: The ``Source`` to resume. MUST not be ``None``.
+        :param store: The store holding the progress. MUST not be ``None``.
+        :param key: The key of the progress in the store. MUST not be
+            ``None`` or empty.
+
+        :raise ValueError: If ``source`` or ``store`` is ``None``, or if
+            ``key`` is ``None`` or empty.
+        """
+        super().__init__()
+        self._source: Source[_RDT] = ensure_not_none(
+            source,
+            "'source' MUST not be None.",
+        )
+        self._store: CheckpointStore = ensure_not_none(
+            store,
+            "'store' MUST not be None.",
+        )
+        self._key: str = ensure_not_none_nor_empty(
+            key,
+            "'key' MUST not be None or empty.",
+        )
+        self._resumed_from: int = 0
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def key(self) -> str:
+        """The key of the progress in the store.
+
+        :return: The key of the progress in the store.
+        """
+        return self._key
+
+    @property
+    def resumed_from(self) -> int:
+        """The number of chunks skipped by the latest call to :meth:`stream`.
+
+        :return: The number of chunks skipped by the latest call to
+            ``stream``, i.e. the position of the first yielded chunk.
+        """
+        return self._resumed_from
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        self._source.dispose()
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def draw(self) -> _RDT:
+        return self._source.draw()
+
+    @not_disposed
+    @override
+    def stream(self) -> Iterator[_RDT]:
+        acknowledged: int = self._store.load(self._key) or 0
+        self._resumed_from = acknowledged
+        if acknowledged:
+            self._logger.info(
+                "Resuming '%s' after %d acknowledged chunk(s).",
+                self._key,
+                acknowledged,
+            )
+        if isinstance(self._source, SeekableSource):
+            yield from self._source.stream_from(acknowledged)
+            return
+        for position, raw_data in enumerate(self._source.stream()):
+            if position >= acknowledged:
+                yield raw_data
+
+
+class AcknowledgingSink(Sink[_PDT], Generic[_PDT]):
+    """A :class:`~sghi.etl.core.Sink` that records the chunks drained by a
+    wrapped ``Sink`` so that an interrupted run can be resumed by a
+    :class:`ResumableSource`.
+
+    Chunks given to :meth:`drain_stream` are drained one at a time using the
+    wrapped ``Sink``'s :meth:`~sghi.etl.core.Sink.drain` method, so that
+    every acknowledged chunk has been fully drained. The count of
+    acknowledged chunks, which starts from the position that the
+    ``ResumableSource`` resumed from, is saved to the store every
+    ``checkpoint_interval`` chunks and whenever a drain fails. Once all the
+    chunks have been drained, the progress is removed from the store. Each
+    chunk drained by this ``Sink`` MUST correspond to exactly one chunk
+    yielded by the ``ResumableSource``, which holds for processors that
+    transform chunks one-to-one.
+
+    Disposing this ``Sink`` disposes the wrapped ``Sink`` but NOT the
+    ``ResumableSource`` or the store.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_checkpoint_interval",
+        "_is_disposed",
+        "_logger",
+        "_sink",
+        "_source",
+        "_store",
+    )
+
+    def __init__(
+        self,
+        sink: Sink[_PDT],
+        source: ResumableSource[Any],
+        store: CheckpointStore,
+        checkpoint_interval: int = 1,
+    ) -> None:
+        """Create a new ``AcknowledgingSink`` instance.
+
+        :param sink: The ``Sink`` to drain data to. MUST not be ``None``.
+        :param source: The ``ResumableSource`` that the drained chunks come
+            from. MUST not be ``None``.
+        :param store: The store holding the progress. MUST not be ``None``.
+        :param checkpoint_interval: How many chunks to drain between saves
+            of the progress. MUST be greater than zero. Defaults to 1.
+
+        :raise ValueError: If ``sink``, ``source`` or ``store`` is ``None``,
+            or if ``checkpoint_interval`` is NOT greater than zero.
+        """
+        super().__init__()
+        self._sink: Sink[_PDT] = ensure_not_none(
+            sink,
+            "'sink' MUST not be None.",
+        )
+        self._source: ResumableSource[Any] = ensure_not_none(
+            source,
+            "'source' MUST not be None.",
+        )
+        self._store: CheckpointStore = ensure_not_none(
+            store,
+            "'store' MUST not be None.",
+        )
+        self._checkpoint_interval: int = ensure_greater_than(
+            value=checkpoint_interval,
+            base_value=0,
+            message="'checkpoint_interval' MUST be greater than zero (0).",
+        )
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        self._sink.dispose()
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: _PDT) -> None:
+        self._sink.drain(processed_data)
+
+    @not_disposed
+    @override
+    def drain_stream(self, processed_data_chunks: Iterable[_PDT]) -> None:
+        key = self._source.key
+        saved: int = 0
+        acknowledged: int | None = None
+        try:
+            for processed_data in processed_data_chunks:
+                if acknowledged is None:
+                    # Read lazily, the source only resumes once it streams.
+                    acknowledged = saved = self._source.resumed_from
+                self._sink.drain(processed_data)
+                acknowledged += 1
+                if acknowledged - saved >= self._checkpoint_interval:
+                    self._store.save(key, acknowledged)
+                    saved = acknowledged
+        except BaseException:
+            if acknowledged is not None and acknowledged != saved:
+                self._store.save(key, acknowledged)
+            if acknowledged is not None:
+                self._logger.warning(
+                    "Draining failed, %d chunk(s) of '%s' acknowledged.",
+                    acknowledged,
+                    key,
+                )
+            raise
+        self._store.delete(key)
+
+
+# =============================================================================
+# WORKFLOW DEFINITION
+# =============================================================================
+
+
+class ResumableWorkflowDefinition(WorkflowDefinition[_RDT, _PDT]):
+    """A :class:`~sghi.etl.core.WorkflowDefinition` whose runs can resume
+    where a previous, failed, run stopped.
+
+    Each ``Source`` created by the wrapped workflow is wrapped in a
+    :class:`ResumableSource`, and the ``Sink`` created next on the same
+    thread is wrapped in an :class:`AcknowledgingSink` bound to it. Progress
+    is kept under ``key`` in the given
+    :class:`~sghi.etl.incremental.CheckpointStore`, which SHOULD be durable,
+    e.g. a :class:`~sghi.etl.incremental.SQLiteCheckpointStore`.
+
+    Resumption requires the workflow to be run using the streaming methods
+    of its components, e.g. using a
+    :class:`~sghi.etl.executors.PipelinedWorkflowExecutor`, with a
+    ``Source`` that yields the same chunks on every run and a ``Processor``
+    that transforms chunks one-to-one.
+
+    The store is NOT disposed by this class since it may be shared between
+    workflows.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_checkpoint_interval",
+        "_key",
+        "_local",
+        "_store",
+        "_workflow",
+    )
+
+    def __init__(
+        self,
+        workflow: WorkflowDefinition[_RDT, _PDT],
+        store: CheckpointStore,
+        key: str | None = None,
+        checkpoint_interval: int = 1,
+    ) -> None:
+        """Create a new ``ResumableWorkflowDefinition`` instance.
+
+        :param workflow: The workflow to make resumable. MUST not be
+            ``None``.
+        :param store: The store holding the progress. MUST not be ``None``.
+        :param key: The key of the workflow's progress in the store. MUST not
+            be empty when provided. Defaults to the workflow's id suffixed
+            with ``":progress"``.
+        :param checkpoint_interval: How many chunks to drain between saves
+            of the progress. MUST be greater than zero. Defaults to 1.
+
+        :raise ValueError: If ``workflow`` or ``store`` is ``None``, if
+            ``key`` is empty or if ``checkpoint_interval`` is NOT greater
+            than zero.
+        """
+        super().__init__()
+        self._workflow: WorkflowDefinition[_RDT, _PDT] = ensure_not_none(
+            workflow,
+            "'workflow' MUST not be None.",
+        )
+        self._store: CheckpointStore = ensure_not_none(
+            store,
+            "'store' MUST not be None.",
+        )
+        self._key: str = (
+            ensure_not_none_nor_empty(key, "'key' MUST not be None or empty.")
+            if key is not None
+            else f"{workflow.id}:progress"
+        )
+        self._checkpoint_interval: int = ensure_greater_than(
+            value=checkpoint_interval,
+            base_value=0,
+            message="'checkpoint_interval' MUST be greater than zero (0).",
+        )
+        self._local: threading.local = threading.local()
+
+    @property
+    @override
+    def id(self) -> str:
+        return self._workflow.id
+
+    @property
+    @override
+    def name(self) -> str:
+        return self._workflow.name
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return self._workflow.description
+
+    @property
+    def key(self) -> str:
+        """The key of the workflow's progress in the store.
+
+        :return: The key of the workflow's progress in the store.
+        """
+        return self._key
+
+    @property
+    @override
+    def source_factory(self) -> Callable[[], Source[_RDT]]:
+        return self._create_source
+
+    @property
+    @override
+    def processor_factory(self) -> Callable[[], Processor[_RDT, _PDT]]:
+        return self._workflow.processor_factory
+
+    @property
+    @override
+    def sink_factory(self) -> Callable[[], Sink[_PDT]]:
+        return self._create_sink
+
+    @property
+    @override
+    def prologue(self) -> Callable[[], None]:
+        return self._workflow.prologue
+
+    @property
+    @override
+    def epilogue(self) -> Callable[[], None]:
+        return self._workflow.epilogue
+
+    def _create_sink(self) -> Sink[_PDT]:
+        source: ResumableSource[_RDT] | None = getattr(
+            self._local,
+            "source",
+            None,
+        )
+        if source is None:
+            _err_msg: str = (
+                "The source of a resumable workflow MUST be created before "
+                "its sink, on the same thread."
+            )
+            raise RuntimeError(_err_msg)
+        self._local.source = None
+        return AcknowledgingSink(
+            self._workflow.sink_factory(),
+            source,
+            self._store,
+            self._checkpoint_interval,
+        )
+
+    def _create_source(self) -> Source[_RDT]:
+        source: ResumableSource[_RDT] = ResumableSource(
+            self._workflow.source_factory(),
+            self._store,
+            self._key,
+        )
+        self._local.source = source
+        return source
@@ -0,0 +1,373 @@
+"""Concurrent execution of many SGHI ETL workflows."""
+
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from enum import Enum, unique
+from typing import TYPE_CHECKING, Any
+
+from sghi.etl.executors import PipelinedWorkflowExecutor
+from sghi.utils import ensure_greater_than, ensure_not_none, type_fqn
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from concurrent.futures import Future
+
+    from sghi.etl.core import WorkflowDefinition
+    from sghi.etl.executors import WorkflowExecutor
+
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+@unique
+class WorkflowStatus(Enum):
+    """The final status of a workflow run by a :class:`WorkflowScheduler`."""
+
+    SUCCEEDED = "succeeded"
+    """The workflow ran to completion."""
+
+    FAILED = "failed"
+    """The workflow ran but raised an error."""
+
+    SKIPPED = "skipped"
+    """The workflow never ran because one of its dependencies did not
+    succeed.
+    """
+
+
+@dataclass(frozen=True, slots=True)
+class ScheduledWorkflow:
+    """A workflow together with the information needed to schedule it.
+
+    .. versionadded:: 1.3.0
+    """
+
+    workflow: WorkflowDefinition[Any, Any]
+    """The workflow to run."""
+
+    depends_on: frozenset[str] = field(default_factory=frozenset)
+    """The ids of the workflows that MUST succeed before this one starts."""
+
+    tags: frozenset[str] = field(default_factory=frozenset)
+    """Resource tags used to limit how many workflows run concurrently, e.g.
+    the name of a database that the workflow reads from or writes to.
+    """
+
+    @property
+    def id(self) -> str:
+        """The unique identifier of the scheduled workflow.
+
+        :return: The unique identifier of the scheduled workflow.
+        """
+        return self.workflow.id
+
+
+@dataclass(frozen=True, slots=True)
+class WorkflowOutcome:
+    """The outcome of a workflow run by a :class:`WorkflowScheduler`.
+
+    .. versionadded:: 1.3.0
+    """
+
+    workflow_id: str
+    """The unique identifier of the workflow."""
+
+    status: WorkflowStatus
+    """The final status of the workflow."""
+
+    started_at: datetime | None = None
+    """When the workflow started running or ``None`` if it was skipped."""
+
+    duration: float = 0.0
+    """How long, in seconds, the workflow ran for."""
+
+    error: BaseException | None = None
+    """The error raised by the workflow, if it failed."""
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+def _check_dependencies(workflows: Mapping[str, ScheduledWorkflow]) -> None:
+    """Ensure that all dependencies are known and that there are no cycles.
+
+    :raise ValueError: If a workflow depends on an unknown workflow or if
+        the dependencies contain a cycle.
+    """
+    for workflow in workflows.values():
+        unknown = workflow.depends_on - workflows.keys()
+        if unknown:
+            _err_msg: str = (
+                f"Workflow '{workflow.id}' depends on the unknown "
+                f"workflow(s): {', '.join(sorted(unknown))}."
+            )
+            raise ValueError(_err_msg)
+
+    visited: set[str] = set()
+    in_progress: set[str] = set()
+
+    def visit(workflow_id: str) -> None:
+        if workflow_id in visited:
+            return
+        if workflow_id in in_progress:
+            _err_msg: str = (
+                "The workflow dependencies contain a cycle involving "
+                f"workflow '{workflow_id}'."
+            )
+            raise ValueError(_err_msg)
+        in_progress.add(workflow_id)
+        for dependency in sorted(workflows[workflow_id].depends_on):
+            visit(dependency)
+        in_progress.remove(workflow_id)
+        visited.add(workflow_id)
+
+    for workflow_id in workflows:
+        visit(workflow_id)
+
+
+# =============================================================================
+# SCHEDULER
+# =============================================================================
+
+
+class WorkflowScheduler:
+    """Run many workflows concurrently, subject to resource limits.
+
+    Workflows are run on a pool of at most ``max_workers`` threads using the
+    given :class:`~sghi.etl.executors.WorkflowExecutor`. A workflow only
+    starts once all the workflows it depends on have succeeded; if any of
+    them fails or is skipped, the workflow is skipped too. Additionally, for
+    each tag with a configured limit, no more than that number of workflows
+    bearing the tag run at the same time.
+
+    Among the workflows that are ready to run, those given first are started
+    first. The failure of one workflow does not stop the others, instead, the
+    outcome of every workflow is reported to the caller.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = ("_executor", "_logger", "_max_workers", "_tag_limits")
+
+    def __init__(
+        self,
+        executor: WorkflowExecutor | None = None,
+        max_workers: int = 4,
+        tag_limits: Mapping[str, int] | None = None,
+    ) -> None:
+        """Create a new ``WorkflowScheduler`` instance.
+
+        :param executor: The ``WorkflowExecutor`` used to run each workflow.
+            It MUST be safe to use from multiple threads concurrently.
+            Defaults to a
+            :class:`~sghi.etl.executors.PipelinedWorkflowExecutor` when not
+            provided.
+        :param max_workers: The maximum number of workflows to run at the
+            same time. MUST be greater than zero. Defaults to 4.
+        :param tag_limits: An optional mapping of tags to the maximum number
+            of workflows bearing the tag that may run at the same time. Every
+            limit MUST be greater than zero. Tags without a limit are only
+            bound by ``max_workers``.
+
+        :raise ValueError: If ``max_workers`` or any of the tag limits is NOT
+            greater than zero.
+        """
+        super().__init__()
+        self._executor: WorkflowExecutor = (
+            executor if executor is not None else PipelinedWorkflowExecutor()
+        )
+        self._max_workers: int = ensure_greater_than(
+            value=max_workers,
+            base_value=0,
+            message="'max_workers' MUST be greater than zero (0).",
+        )
+        self._tag_limits: dict[str, int] = {
+            _tag: ensure_greater_than(
+                value=_limit,
+                base_value=0,
+                message=f"The limit of tag '{_tag}' MUST be greater than 0.",
+            )
+            for _tag, _limit in (tag_limits or {}).items()
+        }
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    def max_workers(self) -> int:
+        """The maximum number of workflows to run at the same time.
+
+        :return: The maximum number of workflows to run at the same time.
+        """
+        return self._max_workers
+
+    @property
+    def tag_limits(self) -> Mapping[str, int]:
+        """The maximum number of concurrent workflows per tag.
+
+        :return: A copy of the mapping of tags to their concurrency limits.
+        """
+        return dict(self._tag_limits)
+
+    def run(
+        self,
+        workflows: Iterable[ScheduledWorkflow],
+    ) -> dict[str, WorkflowOutcome]:
+        """Run the given workflows and wait for all of them to finish.
+
+        :param workflows: The workflows to run. Each workflow's id MUST be
+            unique. MUST not be ``None``.
+
+        :return: A mapping of each workflow's id to its outcome, in the order
+            in which the workflows finished.
+
+        :raise ValueError: If ``workflows`` is ``None``, contains duplicate
+            ids, has dependencies on unknown workflows or has cyclic
+            dependencies.
+        """
+        ensure_not_none(workflows, "'workflows' MUST not be None.")
+        pending: dict[str, ScheduledWorkflow] = {}
+        for workflow in workflows:
+            if workflow.id in pending:
+                _err_msg: str = f"Duplicate workflow id '{workflow.id}'."
+                raise ValueError(_err_msg)
+            pending[workflow.id] = workflow
+        _check_dependencies(pending)
+
+        return _SchedulerRun(
+            executor=self._executor,
+            max_workers=self._max_workers,
+            tag_limits=self._tag_limits,
+            pending=pending,
+            logger=self._logger,
+        ).run()
+
+
+class _SchedulerRun:
+    """The state of a single :meth:`WorkflowScheduler.run` invocation."""
+
+    __slots__ = (
+        "_executor",
+        "_logger",
+        "_max_workers",
+        "_outcomes",
+        "_pending",
+        "_running",
+        "_tag_limits",
+        "_tags",
+    )
+
+    def __init__(
+        self,
+        executor: WorkflowExecutor,
+        max_workers: int,
+        tag_limits: Mapping[str, int],
+        pending: dict[str, ScheduledWorkflow],
+        logger: logging.Logger,
+    ) -> None:
+        super().__init__()
+        self._executor: WorkflowExecutor = executor
+        self._max_workers: int = max_workers
+        self._tag_limits: Mapping[str, int] = tag_limits
+        self._pending: dict[str, ScheduledWorkflow] = pending
+        self._logger: logging.Logger = logger
+        self._running: dict[Future[WorkflowOutcome], ScheduledWorkflow] = {}
+        self._outcomes: dict[str, WorkflowOutcome] = {}
+        self._tags: dict[str, int] = dict.fromkeys(tag_limits, 0)
+
+    def run(self) -> dict[str, WorkflowOutcome]:
+        with ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix="sghi-etl-scheduler",
+        ) as pool:
+            while self._pending or self._running:
+                self._skip_blocked()
+                self._start_ready(pool)
+                if not self._running:
+                    continue
+                done, _ = wait(self._running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._finish(future)
+        return self._outcomes
+
+    def _execute(self, workflow: ScheduledWorkflow) -> WorkflowOutcome:
+        started_at = datetime.now(tz=UTC)
+        start = time.perf_counter()
+        try:
+            self._executor.execute(workflow.workflow)
+        except Exception as exp:
+            self._logger.exception("[%s] Workflow failed.", workflow.id)
+            return WorkflowOutcome(
+                workflow_id=workflow.id,
+                status=WorkflowStatus.FAILED,
+                started_at=started_at,
+                duration=time.perf_counter() - start,
+                error=exp,
+            )
+        return WorkflowOutcome(
+            workflow_id=workflow.id,
+            status=WorkflowStatus.SUCCEEDED,
+            started_at=started_at,
+            duration=time.perf_counter() - start,
+        )
+
+    def _finish(self, future: Future[WorkflowOutcome]) -> None:
+        workflow = self._running.pop(future)
+        for tag in workflow.tags & self._tags.keys():
+            self._tags[tag] -= 1
+        self._outcomes[workflow.id] = future.result()
+
+    def _has_capacity(self, workflow: ScheduledWorkflow) -> bool:
+        return all(
+            self._tags[_tag] < self._tag_limits[_tag]
+            for _tag in workflow.tags & self._tags.keys()
+        )
+
+    def _is_ready(self, workflow: ScheduledWorkflow) -> bool:
+        return all(
+            _dep in self._outcomes
+            and self._outcomes[_dep].status is WorkflowStatus.SUCCEEDED
+            for _dep in workflow.depends_on
+        )
+
+    def _skip_blocked(self) -> None:
+        # Skipping a workflow may block others, so repeat until stable.
+        while True:
+            blocked = [
+                _workflow
+                for _workflow in self._pending.values()
+                if any(
+                    _dep in self._outcomes
+                    and self._outcomes[_dep].status
+                    is not WorkflowStatus.SUCCEEDED
+                    for _dep in _workflow.depends_on
+                )
+            ]
+            if not blocked:
+                return
+            for workflow in blocked:
+                del self._pending[workflow.id]
+                self._outcomes[workflow.id] = WorkflowOutcome(
+                    workflow_id=workflow.id,
+                    status=WorkflowStatus.SKIPPED,
+                )
+
+    def _start_ready(self, pool: ThreadPoolExecutor) -> None:
+        for workflow in list(self._pending.values()):
+            if len(self._running) >= self._max_workers:
+                return
+            if not (self._is_ready(workflow) and self._has_capacity(workflow)):
+                continue
+            del self._pending[workflow.id]
+            for tag in workflow.tags & self._tags.keys():
+                self._tags[tag] += 1
+            self._logger.info("[%s] Scheduling workflow.", workflow.id)
+            future = pool.submit(self._execute, workflow)
+            self._running[future] = workflow
@@ -0,0 +1,436 @@
+"""Common :class:`~sghi.etl.core.Sink` implementations."""
+
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_EXCEPTION,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import ExitStack
+from enum import Enum, unique
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+from typing_extensions import override
+
+from sghi.disposable import not_disposed
+from sghi.etl.core import Sink
+from sghi.utils import (
+    ensure_greater_than,
+    ensure_not_none,
+    ensure_not_none_nor_empty,
+    type_fqn,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from concurrent.futures import Future
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_PDT = TypeVar("_PDT")
+"""Processed Data Type."""
+
+
+@unique
+class FailurePolicy(Enum):
+    """How a :class:`FanOutSink` reacts when some of its sinks fail.
+
+    .. versionadded:: 1.3.0
+    """
+
+    FAIL_FAST = "fail_fast"
+    """Stop on the first failure and propagate its error. Sinks that have not
+    started draining are skipped, while those already draining are allowed
+    to finish.
+    """
+
+    BEST_EFFORT = "best_effort"
+    """Drain to all the sinks regardless of failures, and then propagate all
+    the errors together in an :exc:`ExceptionGroup`.
+    """
+
+
+# =============================================================================
+# SINKS
+# =============================================================================
+
+
+class BatchingSink(Sink[_PDT], Generic[_PDT]):
+    """A :class:`Sink` that drains processed data to a wrapped ``Sink`` in
+    batches.
+
+    Each piece of processed data given to this ``Sink`` is buffered and the
+    buffer is only drained, as a list, to the wrapped ``Sink`` once any of
+    the following thresholds is reached:
+
+    - the buffer holds ``max_items`` pieces of processed data;
+    - the combined size of the buffered data, as measured by ``size_of``,
+      reaches ``max_bytes``, if set;
+    - the oldest piece of buffered data has waited for ``max_latency``
+      seconds, if set. This check is performed on a background thread so that
+      data is not held back indefinitely when no new data arrives.
+
+    The buffer can also be drained explicitly using :meth:`flush`. Disposing
+    this ``Sink`` drains whatever is left in the buffer before disposing the
+    wrapped ``Sink``, so that no data is lost on shutdown.
+
+    Buffered data is only discarded once the wrapped ``Sink`` has drained it
+    successfully. When draining fails, the data stays in the buffer and is
+    drained again, together with any data buffered since, by the next flush.
+    A failure on the background thread is logged and the batch is retried
+    on the next call to :meth:`drain`, :meth:`flush` or :meth:`dispose`,
+    which raise the error of the retry if it fails too. In particular,
+    :meth:`dispose` raises when the final flush fails, after disposing the
+    wrapped ``Sink``.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_buffer",
+        "_buffer_size",
+        "_condition",
+        "_deadline",
+        "_is_disposed",
+        "_logger",
+        "_max_bytes",
+        "_max_items",
+        "_max_latency",
+        "_retry_pending",
+        "_sink",
+        "_size_of",
+        "_timer",
+    )
+
+    def __init__(
+        self,
+        sink: Sink[list[_PDT]],
+        max_items: int = 1000,
+        max_bytes: int | None = None,
+        max_latency: float | None = None,
+        size_of: Callable[[_PDT], int] = sys.getsizeof,
+    ) -> None:
+        """Create a new ``BatchingSink`` instance.
+
+        :param sink: The ``Sink`` to drain batches of processed data to. MUST
+            not be ``None``.
+        :param max_items: The maximum number of pieces of processed data to
+            buffer before draining them. MUST be greater than zero. Defaults
+            to 1000.
+        :param max_bytes: An optional maximum combined size of the buffered
+            data before draining it. MUST be greater than zero when provided.
+        :param max_latency: An optional maximum time, in seconds, that
+            buffered data may wait before it is drained. MUST be greater than
+            zero when provided.
+        :param size_of: A callable used to measure the size, in bytes, of each
+            piece of processed data. Only used when ``max_bytes`` is provided.
+            Defaults to :func:`sys.getsizeof`.
+
+        :raise ValueError: If ``sink`` or ``size_of`` is ``None``, or if any
+            of the thresholds is NOT greater than zero.
+        """
+        super().__init__()
+        self._sink: Sink[list[_PDT]] = ensure_not_none(
+            sink,
+            "'sink' MUST not be None.",
+        )
+        self._max_items: int = ensure_greater_than(
+            value=max_items,
+            base_value=0,
+            message="'max_items' MUST be greater than zero (0).",
+        )
+        self._max_bytes: int | None = (
+            ensure_greater_than(
+                value=max_bytes,
+                base_value=0,
+                message="'max_bytes' MUST be greater than zero (0).",
+            )
+            if max_bytes is not None
+            else None
+        )
+        self._max_latency: float | None = (
+            ensure_greater_than(
+                value=max_latency,
+                base_value=0,
+                message="'max_latency' MUST be greater than zero (0).",
+            )
+            if max_latency is not None
+            else None
+        )
+        self._size_of: Callable[[_PDT], int] = ensure_not_none(
+            size_of,
+            "'size_of' MUST not be None.",
+        )
+        self._buffer: list[_PDT] = []
+        self._buffer_size: int = 0
+        self._deadline: float | None = None
+        self._retry_pending: bool = False
+        self._is_disposed: bool = False
+        self._condition: threading.Condition = threading.Condition()
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+        self._timer: threading.Thread | None = None
+        if self._max_latency is not None:
+            self._timer = threading.Thread(
+                target=self._flush_on_deadline,
+                name=f"{type(self).__name__}-timer",
+                daemon=True,
+            )
+            self._timer.start()
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: _PDT) -> None:
+        """Buffer the given processed data, draining the buffer to the
+        wrapped ``Sink`` if any of the thresholds is reached.
+
+        :param processed_data: The processed data to buffer.
+
+        :return: None.
+        """  # noqa: D205
+        with self._condition:
+            if self._retry_pending:
+                self._flush()
+            self._buffer.append(processed_data)
+            if self._max_bytes is not None:
+                self._buffer_size += self._size_of(processed_data)
+            if self._should_flush():
+                self._flush()
+            elif self._max_latency is not None and self._deadline is None:
+                self._deadline = time.monotonic() + self._max_latency
+                self._condition.notify_all()
+
+    @override
+    def dispose(self) -> None:
+        with self._condition:
+            if self._is_disposed:
+                return
+            self._is_disposed = True
+            self._condition.notify_all()
+        if self._timer is not None:
+            self._timer.join()
+        try:
+            with self._condition:
+                self._flush()
+        finally:
+            self._sink.dispose()
+            self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    def flush(self) -> None:
+        """Drain any buffered data to the wrapped ``Sink`` immediately.
+
+        :return: None.
+        """
+        with self._condition:
+            self._flush()
+
+    def _flush(self) -> None:
+        # MUST be called while holding the condition's lock.
+        self._retry_pending = False
+        if not self._buffer:
+            return
+        try:
+            self._sink.drain(self._buffer)
+        except BaseException:
+            # Keep the batch so that the next flush retries it, but stop the
+            # background thread from retrying it in a tight loop.
+            self._deadline = None
+            raise
+        self._buffer = []
+        self._buffer_size = 0
+        self._deadline = None
+
+    def _flush_on_deadline(self) -> None:
+        with self._condition:
+            while not self._is_disposed:
+                if self._deadline is None:
+                    self._condition.wait()
+                    continue
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(timeout=remaining)
+                    continue
+                try:
+                    self._flush()
+                except Exception:
+                    self._logger.exception(
+                        "Draining a batch in the background failed, it will "
+                        "be retried by the next drain, flush or disposal.",
+                    )
+                    self._retry_pending = True
+
+    def _should_flush(self) -> bool:
+        return len(self._buffer) >= self._max_items or (
+            self._max_bytes is not None
+            and self._buffer_size >= self._max_bytes
+        )
+
+
+class FanOutSink(Sink[_PDT], Generic[_PDT]):
+    """A :class:`Sink` that drains the same processed data to several wrapped
+    ``Sink`` instances concurrently.
+
+    Each call to :meth:`drain` hands the processed data to all the wrapped
+    ``Sink`` instances on a thread pool and only returns once they are done.
+    The wrapped ``Sink`` instances MUST therefore not modify the processed
+    data. When streaming, each chunk is drained to all the wrapped ``Sink``
+    instances before the next chunk is requested.
+
+    Failures are handled according to the given :class:`FailurePolicy`.
+
+    This ``Sink`` owns the wrapped ``Sink`` instances. Disposing it shuts down
+    the thread pool and then disposes all the wrapped ``Sink`` instances, in
+    the order in which they were given, even if disposing some of them fails.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_executor",
+        "_failure_policy",
+        "_is_disposed",
+        "_logger",
+        "_sinks",
+    )
+
+    def __init__(
+        self,
+        sinks: Sequence[Sink[_PDT]],
+        failure_policy: FailurePolicy = FailurePolicy.FAIL_FAST,
+        max_workers: int | None = None,
+    ) -> None:
+        """Create a new ``FanOutSink`` instance.
+
+        :param sinks: The ``Sink`` instances to drain processed data to. MUST
+            not be ``None`` or empty, and MUST not contain ``None``.
+        :param failure_policy: How to react when some of the wrapped ``Sink``
+            instances fail. MUST not be ``None``. Defaults to
+            :attr:`FailurePolicy.FAIL_FAST`.
+        :param max_workers: The maximum number of wrapped ``Sink`` instances
+            to drain to concurrently. MUST be greater than zero when
+            provided. Defaults to the number of wrapped ``Sink`` instances.
+
+        :raise ValueError: If ``sinks`` is ``None``, empty or contains
+            ``None``, if ``failure_policy`` is ``None`` or if ``max_workers``
+            is NOT greater than zero.
+        """
+        super().__init__()
+        ensure_not_none_nor_empty(sinks, "'sinks' MUST not be None or empty.")
+        for sink in sinks:
+            ensure_not_none(sink, "'sinks' MUST not contain None.")
+        self._sinks: tuple[Sink[_PDT], ...] = tuple(sinks)
+        self._failure_policy: FailurePolicy = ensure_not_none(
+            failure_policy,
+            "'failure_policy' MUST not be None.",
+        )
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=(
+                ensure_greater_than(
+                    value=max_workers,
+                    base_value=0,
+                    message="'max_workers' MUST be greater than zero (0).",
+                )
+                if max_workers is not None
+                else len(self._sinks)
+            ),
+            thread_name_prefix=type(self).__name__,
+        )
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    def failure_policy(self) -> FailurePolicy:
+        """How this ``Sink`` reacts when some of the wrapped sinks fail.
+
+        :return: How this ``Sink`` reacts when some of the wrapped sinks
+            fail.
+        """
+        return self._failure_policy
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def sinks(self) -> tuple[Sink[_PDT], ...]:
+        """The ``Sink`` instances that processed data is drained to.
+
+        :return: The ``Sink`` instances that processed data is drained to.
+        """
+        return self._sinks
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with ExitStack() as exit_stack:
+            # Callbacks run in reverse, register them so that the sinks are
+            # disposed in order.
+            for sink in reversed(self._sinks):
+                exit_stack.callback(sink.dispose)
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: _PDT) -> None:
+        """Drain the given processed data to all the wrapped ``Sink``
+        instances concurrently.
+
+        :param processed_data: The processed data to drain.
+
+        :return: None.
+
+        :raise ExceptionGroup: If the failure policy is
+            :attr:`FailurePolicy.BEST_EFFORT` and some of the wrapped
+            ``Sink`` instances failed.
+        """  # noqa: D205
+        futures: list[Future[None]] = [
+            self._executor.submit(_sink.drain, processed_data)
+            for _sink in self._sinks
+        ]
+        if self._failure_policy is FailurePolicy.FAIL_FAST:
+            self._drain_fail_fast(futures)
+        else:
+            self._drain_best_effort(futures)
+
+    def _drain_best_effort(self, futures: list[Future[None]]) -> None:
+        wait(futures, return_when=ALL_COMPLETED)
+        errors: list[BaseException] = [
+            _error
+            for _future in futures
+            if (_error := _future.exception()) is not None
+        ]
+        if errors:
+            _err_msg: str = (
+                f"Draining failed for {len(errors)} out of {len(futures)} "
+                "sink(s)."
+            )
+            self._logger.error(_err_msg)
+            raise BaseExceptionGroup(_err_msg, errors)
+
+    def _drain_fail_fast(self, futures: list[Future[None]]) -> None:
+        _, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in not_done:
+            future.cancel()
+        # Let the sinks that are already draining finish before returning.
+        wait(not_done, return_when=ALL_COMPLETED)
+        # Raise the error of the first failed sink, in the order given.
+        for future in [_f for _f in futures if not _f.cancelled()]:
+            future.result()
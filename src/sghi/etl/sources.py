@@ -0,0 +1,701 @@
+"""Common :class:`~sghi.etl.core.Source` implementations."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from abc import abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, contextmanager, suppress
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Generic, TypeVar, cast
+
+from typing_extensions import override
+
+from sghi.disposable import Disposable, not_disposed
+from sghi.etl.core import Source
+from sghi.utils import (
+    ensure_greater_than,
+    ensure_not_none,
+    ensure_not_none_nor_empty,
+    type_fqn,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import (
+        Callable,
+        Generator,
+        Iterable,
+        Iterator,
+        Sequence,
+    )
+    from concurrent.futures import Future
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_PT = TypeVar("_PT")
+"""Partition Type."""
+
+_RDT = TypeVar("_RDT")
+"""Raw Data Type."""
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+class _KeyLock:
+    """A lock serializing the draws of a single key of a
+    :class:`SourceCache`, together with the number of callers using it.
+    """  # noqa: D205
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.lock: threading.Lock = threading.Lock()
+        self.users: int = 0
+
+
+def _modification_time(path: Path) -> float:
+    """Return the modification time of a file, or zero if it is missing."""
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+
+class SourceCache(Disposable):
+    """A thread-safe store of drawn data, keyed by a user-supplied key.
+
+    Entries are kept in memory and expire ``ttl`` seconds after they are
+    stored, if a ``ttl`` is given. When more than ``max_entries`` entries are
+    held in memory, the least recently used ones are evicted.
+
+    When a ``directory`` is given, every stored entry is also written to it,
+    using :mod:`pickle`, so that it survives the current process and can be
+    shared with other processes using the same directory. Entries missing
+    from memory are then looked up on disk before being reported as missing.
+    When more than ``max_disk_entries`` entries are held on disk, the least
+    recently used ones are removed. Uses are tracked through the
+    modification times of the entry files, so that they are shared between
+    processes too. Entries on disk that cannot be loaded, e.g. because they
+    are corrupt, are treated as missing. Since loading a pickle can execute
+    arbitrary code, the directory MUST only be writable by trusted parties.
+
+    A single ``SourceCache`` is meant to be shared by many
+    :class:`CachingSource` instances, e.g. across repeated runs of the same
+    workflows. Disposing it discards the in-memory entries, the entries on
+    disk are left intact.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = (
+        "_directory",
+        "_entries",
+        "_is_disposed",
+        "_key_locks",
+        "_lock",
+        "_logger",
+        "_max_disk_entries",
+        "_max_entries",
+        "_ttl",
+    )
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        ttl: float | None = None,
+        directory: str | os.PathLike[str] | None = None,
+        max_disk_entries: int | None = None,
+    ) -> None:
+        """Create a new ``SourceCache`` instance.
+
+        :param max_entries: The maximum number of entries to keep in memory.
+            MUST be greater than zero. Defaults to 128.
+        :param ttl: An optional time, in seconds, after which entries expire.
+            MUST be greater than zero when provided. Entries never expire when
+            not provided.
+        :param directory: An optional directory in which entries are also
+            persisted. It is created if it does not exist.
+        :param max_disk_entries: The maximum number of entries to keep in the
+            ``directory``. MUST be greater than zero when provided. Defaults
+            to ``max_entries``.
+
+        :raise ValueError: If ``max_entries``, ``ttl`` or
+            ``max_disk_entries`` is NOT greater than zero.
+        """
+        super().__init__()
+        self._max_entries: int = ensure_greater_than(
+            value=max_entries,
+            base_value=0,
+            message="'max_entries' MUST be greater than zero (0).",
+        )
+        self._ttl: float | None = (
+            ensure_greater_than(
+                value=ttl,
+                base_value=0,
+                message="'ttl' MUST be greater than zero (0).",
+            )
+            if ttl is not None
+            else None
+        )
+        self._max_disk_entries: int = (
+            ensure_greater_than(
+                value=max_disk_entries,
+                base_value=0,
+                message="'max_disk_entries' MUST be greater than zero (0).",
+            )
+            if max_disk_entries is not None
+            else self._max_entries
+        )
+        self._directory: Path | None = None
+        if directory is not None:
+            self._directory = Path(directory)
+            self._directory.mkdir(parents=True, exist_ok=True)
+        # Maps keys to (expiry time, value) pairs. Expiry times are wall-clock
+        # times so that they remain meaningful across processes.
+        self._entries: OrderedDict[str, tuple[float | None, Any]] = (
+            OrderedDict()
+        )
+        # Only holds the keys being drawn, see `_key_lock()`.
+        self._key_locks: dict[str, _KeyLock] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    def __contains__(self, key: str) -> bool:
+        """Check whether an unexpired entry exists for the given key.
+
+        :param key: The key to check.
+
+        :return: ``True`` if an unexpired entry exists for the given key,
+            ``False`` otherwise.
+        """
+        found, _ = self._get(key)
+        return found
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def max_disk_entries(self) -> int:
+        """The maximum number of entries to keep in the directory.
+
+        :return: The maximum number of entries to keep in the directory.
+        """
+        return self._max_disk_entries
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        # The key locks are left to the draws still in flight, which remove
+        # them once done.
+        with self._lock:
+            self._entries.clear()
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    def get_or_draw(self, key: str, source: Source[_RDT]) -> _RDT:
+        """Return the entry for the given key, drawing it if it is missing.
+
+        When the entry is missing or has expired, it is drawn from the given
+        ``Source`` and stored. Concurrent calls for the same missing key only
+        draw from the ``Source`` once.
+
+        :param key: The key of the entry.
+        :param source: The ``Source`` to draw the entry from if it is
+            missing.
+
+        :return: The cached or freshly drawn data.
+        """
+        found, value = self._get(key)
+        if found:
+            return value
+        with self._key_lock(key):
+            # Another caller may have drawn the entry while we waited.
+            found, value = self._get(key)
+            if found:
+                return value
+            self._logger.debug("Cache miss for key '%s', drawing.", key)
+            value = source.draw()
+            self._put(key, value)
+            return value
+
+    @not_disposed
+    def invalidate(self, key: str) -> None:
+        """Remove the entry for the given key, from memory and disk.
+
+        Invalidating a key that has no entry has no effect.
+
+        :param key: The key of the entry to remove.
+
+        :return: None.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            if self._directory is not None:
+                self._path_of(key).unlink(missing_ok=True)
+
+    def _evict_from_disk(self) -> None:
+        assert self._directory is not None
+        paths = list(self._directory.glob("*.pickle"))
+        excess = len(paths) - self._max_disk_entries
+        if excess <= 0:
+            return
+        for path in sorted(paths, key=_modification_time)[:excess]:
+            path.unlink(missing_ok=True)
+            self._logger.debug("Evicted '%s' from disk.", path.name)
+
+    def _get(self, key: str) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+        from_disk: bool = entry is None
+        if entry is None:
+            # Loaded without holding the lock so that hits on other keys do
+            # not wait for the disk.
+            entry = self._load(key)
+            if entry is None:
+                return False, None
+        expires_at, value = entry
+        with self._lock:
+            if expires_at is not None and expires_at <= time.time():
+                self._entries.pop(key, None)
+                if self._directory is not None:
+                    self._path_of(key).unlink(missing_ok=True)
+                return False, None
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            elif from_disk and not self._is_disposed:
+                self._store_in_memory(key, entry)
+            return True, value
+
+    @contextmanager
+    def _key_lock(self, key: str) -> Generator[None, None, None]:
+        """Hold the lock of the given key, removing it once unused."""
+        with self._lock:
+            key_lock = self._key_locks.get(key)
+            if key_lock is None:
+                key_lock = self._key_locks[key] = _KeyLock()
+            key_lock.users += 1
+        try:
+            with key_lock.lock:
+                yield
+        finally:
+            with self._lock:
+                key_lock.users -= 1
+                if not key_lock.users:
+                    del self._key_locks[key]
+
+    def _load(self, key: str) -> tuple[float | None, Any] | None:
+        if self._directory is None:
+            return None
+        path = self._path_of(key)
+        try:
+            with path.open("rb") as entry_file:
+                entry = pickle.load(entry_file)  # noqa: S301
+        except FileNotFoundError:
+            return None
+        except Exception:  # noqa: BLE001
+            self._logger.warning(
+                "Unable to load the entry for key '%s', ignoring it.",
+                key,
+                exc_info=True,
+            )
+            return None
+        if not (isinstance(entry, tuple) and len(entry) == 2):  # noqa: PLR2004
+            self._logger.warning("Ignoring malformed entry for key '%s'.", key)
+            return None
+        # Mark the entry as recently used for the LRU eviction.
+        with suppress(FileNotFoundError):
+            os.utime(path)
+        return cast("tuple[float | None, Any]", entry)
+
+    def _path_of(self, key: str) -> Path:
+        assert self._directory is not None
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self._directory / f"{digest}.pickle"
+
+    def _put(self, key: str, value: Any) -> None:  # noqa: ANN401
+        expires_at = time.time() + self._ttl if self._ttl is not None else None
+        entry = (expires_at, value)
+        with self._lock:
+            if not self._is_disposed:
+                self._store_in_memory(key, entry)
+        if self._directory is not None:
+            path = self._path_of(key)
+            temp_path = path.with_name(
+                f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp",
+            )
+            with temp_path.open("wb") as entry_file:
+                pickle.dump(entry, entry_file)
+            temp_path.replace(path)
+            self._evict_from_disk()
+
+    def _store_in_memory(
+        self,
+        key: str,
+        entry: tuple[float | None, Any],
+    ) -> None:
+        # MUST be called while holding the lock.
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._logger.debug("Evicted key '%s' from memory.", evicted)
+
+
+# =============================================================================
+# SOURCES
+# =============================================================================
+
+
+class CachingSource(Source[_RDT], Generic[_RDT]):
+    """A :class:`~sghi.etl.core.Source` that memoizes a wrapped ``Source``.
+
+    Calls to :meth:`draw` return the entry stored under this ``Source``'s key
+    in the given :class:`SourceCache`, and only draw from the wrapped
+    ``Source`` when the entry is missing or has expired. This is useful for
+    reference data that changes rarely but is expensive to draw.
+
+    Disposing this ``Source`` disposes the wrapped ``Source`` and, if
+    ``invalidate_on_dispose`` is ``True``, removes its entry from the cache.
+    The cache itself is NOT disposed since it may be shared.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = (
+        "_cache",
+        "_invalidate_on_dispose",
+        "_is_disposed",
+        "_key",
+        "_source",
+    )
+
+    def __init__(
+        self,
+        source: Source[_RDT],
+        cache: SourceCache,
+        key: str,
+        *,
+        invalidate_on_dispose: bool = False,
+    ) -> None:
+        """Create a new ``CachingSource`` instance.
+
+        :param source: The ``Source`` to memoize. MUST not be ``None``.
+        :param cache: The cache to store the drawn data in. MUST not be
+            ``None``.
+        :param key: The key under which the drawn data is stored. MUST not be
+            ``None`` or empty.
+        :param invalidate_on_dispose: Whether to remove the cached entry when
+            this ``Source`` is disposed. Defaults to ``False``.
+
+        :raise ValueError: If ``source`` or ``cache`` is ``None``, or if
+            ``key`` is ``None`` or empty.
+        """
+        super().__init__()
+        self._source: Source[_RDT] = ensure_not_none(
+            source,
+            "'source' MUST not be None.",
+        )
+        self._cache: SourceCache = ensure_not_none(
+            cache,
+            "'cache' MUST not be None.",
+        )
+        self._key: str = ensure_not_none_nor_empty(
+            key,
+            "'key' MUST not be None or empty.",
+        )
+        self._invalidate_on_dispose: bool = invalidate_on_dispose
+        self._is_disposed: bool = False
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def key(self) -> str:
+        """The key under which the drawn data is cached.
+
+        :return: The key under which the drawn data is cached.
+        """
+        return self._key
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        try:
+            if self._invalidate_on_dispose and not self._cache.is_disposed:
+                self._cache.invalidate(self._key)
+        finally:
+            self._source.dispose()
+
+    @not_disposed
+    @override
+    def draw(self) -> _RDT:
+        return self._cache.get_or_draw(self._key, self._source)
+
+
+class ScatterGatherSource(Source[list[_RDT]], Generic[_RDT]):
+    """A :class:`~sghi.etl.core.Source` that draws from several child
+    ``Source`` instances, e.g. one per partition of the data, concurrently.
+
+    The children are drawn from on a thread pool of at most ``max_workers``
+    threads. :meth:`draw` returns a list containing the data drawn from each
+    child while :meth:`stream` yields it, wrapped in a single-item list, as
+    soon as it is available. In both cases, the data is either in the same
+    order as the children (the default), or in the order in which the draws
+    complete. Use :meth:`from_partitions` to create the children from a
+    collection of partitions.
+
+    If drawing from any of the children fails, the draws that are yet to
+    start are cancelled and the error is propagated to the caller.
+
+    This ``Source`` owns its children. Disposing it shuts down the thread
+    pool and then disposes all the children, in order, even if disposing
+    some of them fails.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_executor",
+        "_is_disposed",
+        "_logger",
+        "_ordered",
+        "_sources",
+    )
+
+    def __init__(
+        self,
+        sources: Sequence[Source[_RDT]],
+        max_workers: int | None = None,
+        *,
+        ordered: bool = True,
+    ) -> None:
+        """Create a new ``ScatterGatherSource`` instance.
+
+        :param sources: The child ``Source`` instances to draw from. MUST not
+            be ``None`` or empty, and MUST not contain ``None``.
+        :param max_workers: The maximum number of children to draw from
+            concurrently. MUST be greater than zero when provided. Defaults
+            to the number of children.
+        :param ordered: When ``True``, the default, the data is returned in
+            the same order as the children. When ``False``, the data is
+            returned in the order in which the draws complete.
+
+        :raise ValueError: If ``sources`` is ``None``, empty or contains
+            ``None``, or if ``max_workers`` is NOT greater than zero.
+        """
+        super().__init__()
+        ensure_not_none_nor_empty(
+            sources,
+            "'sources' MUST not be None or empty.",
+        )
+        for source in sources:
+            ensure_not_none(source, "'sources' MUST not contain None.")
+        self._sources: tuple[Source[_RDT], ...] = tuple(sources)
+        self._ordered: bool = ordered
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=(
+                ensure_greater_than(
+                    value=max_workers,
+                    base_value=0,
+                    message="'max_workers' MUST be greater than zero (0).",
+                )
+                if max_workers is not None
+                else len(self._sources)
+            ),
+            thread_name_prefix=type(self).__name__,
+        )
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @classmethod
+    def from_partitions(
+        cls,
+        partitions: Iterable[_PT],
+        source_factory: Callable[[_PT], Source[_RDT]],
+        max_workers: int | None = None,
+        *,
+        ordered: bool = True,
+    ) -> ScatterGatherSource[_RDT]:
+        """Create a ``ScatterGatherSource`` with one child per partition.
+
+        :param partitions: The partitions to draw, e.g. county names or
+            dates. MUST not be ``None`` or empty.
+        :param source_factory: A callable that creates the child ``Source``
+            for a given partition. MUST not be ``None``.
+        :param max_workers: The maximum number of partitions to draw
+            concurrently. MUST be greater than zero when provided. Defaults
+            to the number of partitions.
+        :param ordered: When ``True``, the default, the data is returned in
+            the same order as the partitions. When ``False``, the data is
+            returned in the order in which the draws complete.
+
+        :return: A new ``ScatterGatherSource`` instance.
+
+        :raise ValueError: If ``partitions`` or ``source_factory`` is
+            ``None``, if ``partitions`` is empty, or if ``max_workers`` is
+            NOT greater than zero.
+        :raise Exception: Any error raised by ``source_factory``. The child
+            sources already created are disposed.
+        """
+        ensure_not_none(partitions, "'partitions' MUST not be None.")
+        ensure_not_none(source_factory, "'source_factory' MUST not be None.")
+        with ExitStack() as exit_stack:
+            # Dispose the children created so far if a later step fails.
+            instance = cls(
+                [
+                    exit_stack.enter_context(source_factory(_partition))
+                    for _partition in partitions
+                ],
+                max_workers,
+                ordered=ordered,
+            )
+            exit_stack.pop_all()
+        return instance
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @property
+    def ordered(self) -> bool:
+        """Whether the data is returned in the same order as the children.
+
+        :return: ``True`` if the data is returned in the same order as the
+            children, ``False`` if it is returned in the order in which the
+            draws complete.
+        """
+        return self._ordered
+
+    @property
+    def sources(self) -> tuple[Source[_RDT], ...]:
+        """The child ``Source`` instances that this ``Source`` draws from.
+
+        :return: The child ``Source`` instances that this ``Source`` draws
+            from.
+        """
+        return self._sources
+
+    @override
+    def dispose(self) -> None:
+        if self._is_disposed:
+            return
+        self._is_disposed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with ExitStack() as exit_stack:
+            # Callbacks run in reverse, register them so that the children
+            # are disposed in order.
+            for source in reversed(self._sources):
+                exit_stack.callback(source.dispose)
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def draw(self) -> list[_RDT]:
+        """Draw from all the children concurrently.
+
+        :return: A list of the data drawn from each child, ordered according
+            to :attr:`ordered`.
+        """
+        return [_data for _chunk in self.stream() for _data in _chunk]
+
+    @not_disposed
+    @override
+    def stream(self) -> Iterator[list[_RDT]]:
+        """Draw from all the children concurrently, yielding the data drawn
+        from each child as soon as it is available.
+
+        :return: An iterator of single-item lists, each containing the data
+            drawn from one child, ordered according to :attr:`ordered`.
+        """  # noqa: D205
+        self._logger.debug("Drawing from %d source(s).", len(self._sources))
+        futures: list[Future[_RDT]] = [
+            self._executor.submit(_source.draw) for _source in self._sources
+        ]
+        completed: Iterable[Future[_RDT]] = (
+            futures if self._ordered else as_completed(futures)
+        )
+        try:
+            for future in completed:
+                yield [future.result()]
+        finally:
+            # Only has an effect when the draws did not all complete, i.e.
+            # when one of them failed or the stream was closed early.
+            for future in futures:
+                future.cancel()
+
+
+class PartitionedSource(Source[_RDT], Generic[_RDT, _PT]):
+    """A :class:`~sghi.etl.core.Source` whose data is split into independent
+    partitions, e.g. one per county or per date, that can be drawn
+    separately.
+
+    Implementations list their partitions with :meth:`partitions` and draw a
+    single partition with :meth:`draw_partition`. The default
+    implementation of :meth:`stream` draws the partitions one at a time, in
+    order, yielding the data of each. Executors such as the
+    :class:`~sghi.etl.executors.DistributedWorkflowExecutor` instead draw
+    the partitions in several processes at once.
+
+    Partitions MUST be picklable, and drawing a partition SHOULD have no
+    side effects since it may be drawn more than once.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ()
+
+    @abstractmethod
+    def partitions(self) -> Sequence[_PT]:
+        """Return the partitions of the data of this ``Source``.
+
+        :return: The partitions of the data of this ``Source``.
+        """
+        ...
+
+    @abstractmethod
+    def draw_partition(self, partition: _PT) -> _RDT:
+        """Draw the data of a single partition.
+
+        :param partition: One of the partitions returned by
+            :meth:`partitions`.
+
+        :return: The data of the given partition.
+        """
+        ...
+
+    @not_disposed
+    @override
+    def stream(self) -> Iterator[_RDT]:
+        """Draw the partitions one at a time, yielding the data of each.
+
+        :return: An iterator of the data of each partition, in the same order
+            as the partitions.
+        """
+        for partition in self.partitions():
+            yield self.draw_partition(partition)
@@ -0,0 +1,544 @@
+"""Rate limiting and adaptive concurrency control for
+:class:`~sghi.etl.core.Source` and :class:`~sghi.etl.core.Sink` calls.
+
+Upstream services often enforce quotas on how frequently they may be called,
+while downstream stores tend to degrade when written to by too many clients
+at once. This module provides two limiters to cope with these constraints:
+
+- a :class:`RateLimiter`, a token bucket that caps the rate of calls while
+  allowing short bursts;
+- an :class:`AdaptiveConcurrencyLimiter`, which caps the number of calls in
+  flight and tunes that cap at runtime using the additive-increase,
+  multiplicative-decrease (AIMD) algorithm. The cap grows slowly while calls
+  succeed and is cut sharply when they fail or become too slow, so that it
+  settles around the highest level the dependency can sustain.
+
+Both limiters are thread-safe and hold no per-workflow state, so a single
+instance MAY be shared by all the components, and workflows, of a process
+that call the same dependency. The :class:`ThrottledSource` and
+:class:`ThrottledSink` wrappers route the calls of any ``Source`` or
+``Sink`` through these limiters.
+"""  # noqa: D205
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Generic, ParamSpec, TypeVar
+
+from typing_extensions import override
+
+from sghi.disposable import not_disposed
+from sghi.etl.core import Sink, Source
+from sghi.utils import ensure_greater_than, ensure_not_none, type_fqn
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Iterator
+
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_PDT = TypeVar("_PDT")
+"""Processed Data Type."""
+
+_RDT = TypeVar("_RDT")
+"""Raw Data Type."""
+
+_P = ParamSpec("_P")
+
+_T = TypeVar("_T")
+
+
+# =============================================================================
+# LIMITERS
+# =============================================================================
+
+
+class RateLimiter:
+    """A token bucket that limits how frequently calls are made.
+
+    The bucket holds up to ``capacity`` tokens and is refilled continuously
+    at ``rate`` tokens per second. Each call takes one token from the
+    bucket, waiting for it to be refilled when it is empty. Calls can thus
+    burst up to ``capacity`` at once, but are limited to ``rate`` per second
+    on average.
+
+    A ``RateLimiter`` is safe to share between threads, components and
+    workflows.
+
+    .. versionadded:: 1.3.0
+    """
+
+    __slots__ = ("_capacity", "_last_refill", "_lock", "_rate", "_tokens")
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        """Create a new ``RateLimiter`` instance.
+
+        The bucket starts full.
+
+        :param rate: The number of tokens added to the bucket per second.
+            MUST be greater than zero.
+        :param capacity: The maximum number of tokens the bucket can hold,
+            i.e. the largest allowed burst. MUST be greater than zero when
+            provided. Defaults to ``rate``, i.e. one second worth of calls,
+            but no less than 1.
+
+        :raise ValueError: If ``rate`` or ``capacity`` is NOT greater than
+            zero.
+        """
+        super().__init__()
+        self._rate: float = ensure_greater_than(
+            value=rate,
+            base_value=0,
+            message="'rate' MUST be greater than zero (0).",
+        )
+        self._capacity: float = (
+            ensure_greater_than(
+                value=capacity,
+                base_value=0,
+                message="'capacity' MUST be greater than zero (0).",
+            )
+            if capacity is not None
+            else max(rate, 1.0)
+        )
+        self._tokens: float = self._capacity
+        self._last_refill: float = time.monotonic()
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def capacity(self) -> float:
+        """The maximum number of tokens the bucket can hold.
+
+        :return: The maximum number of tokens the bucket can hold.
+        """
+        return self._capacity
+
+    @property
+    def rate(self) -> float:
+        """The number of tokens added to the bucket per second.
+
+        :return: The number of tokens added to the bucket per second.
+        """
+        return self._rate
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Take the given number of tokens from the bucket, waiting until
+        enough tokens are available.
+
+        :param tokens: The number of tokens to take. MUST be greater than
+            zero and MUST not exceed the capacity of the bucket. Defaults
+            to 1.
+
+        :return: The time, in seconds, spent waiting for the tokens.
+
+        :raise ValueError: If ``tokens`` is NOT greater than zero or exceeds
+            the capacity of the bucket.
+        """  # noqa: D205
+        self._ensure_valid_tokens(tokens)
+        waited: float = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self._rate
+            time.sleep(delay)
+            waited += delay
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take the given number of tokens from the bucket if they are
+        available right away.
+
+        :param tokens: The number of tokens to take. MUST be greater than
+            zero and MUST not exceed the capacity of the bucket. Defaults
+            to 1.
+
+        :return: ``True`` if the tokens were taken, ``False`` otherwise.
+
+        :raise ValueError: If ``tokens`` is NOT greater than zero or exceeds
+            the capacity of the bucket.
+        """  # noqa: D205
+        self._ensure_valid_tokens(tokens)
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def _ensure_valid_tokens(self, tokens: float) -> None:
+        ensure_greater_than(
+            value=tokens,
+            base_value=0,
+            message="'tokens' MUST be greater than zero (0).",
+        )
+        if tokens > self._capacity:
+            _err_msg: str = (
+                "'tokens' MUST not exceed the capacity of the bucket."
+            )
+            raise ValueError(_err_msg)
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self._tokens = min(
+            self._capacity,
+            self._tokens + (now - self._last_refill) * self._rate,
+        )
+        self._last_refill = now
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limits the number of calls in flight, adapting the limit to how well
+    the called dependency copes with the load.
+
+    Calls are made within a :meth:`slot`, which blocks while the number of
+    calls in flight is at the current limit. The limit is then adjusted
+    using the additive-increase, multiplicative-decrease (AIMD) algorithm:
+
+    - each successful call raises the limit by ``1 / limit``, i.e. by about
+      one after a full window of successful calls;
+    - each call that fails, or takes longer than ``latency_threshold``, if
+      given, multiplies the limit by ``backoff_ratio``.
+
+    The limit always stays between ``min_limit`` and ``max_limit``.
+
+    An ``AdaptiveConcurrencyLimiter`` is safe to share between threads,
+    components and workflows. Note that it only has an effect when calls are
+    made concurrently, e.g. by several workflows, or by a
+    :class:`~sghi.etl.sinks.FanOutSink` or
+    :class:`~sghi.etl.sources.ScatterGatherSource`.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = (
+        "_backoff_ratio",
+        "_condition",
+        "_in_flight",
+        "_latency_threshold",
+        "_limit",
+        "_logger",
+        "_max_limit",
+        "_min_limit",
+    )
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.5,
+        latency_threshold: float | None = None,
+    ) -> None:
+        """Create a new ``AdaptiveConcurrencyLimiter`` instance.
+
+        :param initial_limit: The limit to start with. MUST be between
+            ``min_limit`` and ``max_limit``, inclusive. Defaults to 4.
+        :param min_limit: The lowest the limit may go. MUST be greater than
+            zero. Defaults to 1.
+        :param max_limit: The highest the limit may go. MUST not be less
+            than ``min_limit``. Defaults to 64.
+        :param backoff_ratio: The factor by which the limit is multiplied
+            when a call fails or is too slow. MUST be greater than zero and
+            less than one. Defaults to 0.5.
+        :param latency_threshold: An optional duration, in seconds, beyond
+            which a successful call is treated as a sign of overload. MUST be
+            greater than zero when provided.
+
+        :raise ValueError: If any of the arguments has an invalid value.
+        """
+        super().__init__()
+        self._min_limit: int = ensure_greater_than(
+            value=min_limit,
+            base_value=0,
+            message="'min_limit' MUST be greater than zero (0).",
+        )
+        if max_limit < min_limit:
+            _err_msg: str = "'max_limit' MUST not be less than 'min_limit'."
+            raise ValueError(_err_msg)
+        if not min_limit <= initial_limit <= max_limit:
+            _err_msg: str = (
+                "'initial_limit' MUST be between 'min_limit' and "
+                "'max_limit'."
+            )
+            raise ValueError(_err_msg)
+        if not 0 < backoff_ratio < 1:
+            _err_msg: str = (
+                "'backoff_ratio' MUST be between zero (0) and one (1), "
+                "exclusive."
+            )
+            raise ValueError(_err_msg)
+        self._max_limit: int = max_limit
+        self._backoff_ratio: float = backoff_ratio
+        self._latency_threshold: float | None = (
+            ensure_greater_than(
+                value=latency_threshold,
+                base_value=0,
+                message="'latency_threshold' MUST be greater than zero (0).",
+            )
+            if latency_threshold is not None
+            else None
+        )
+        self._limit: float = float(initial_limit)
+        self._in_flight: int = 0
+        self._condition: threading.Condition = threading.Condition()
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    def in_flight(self) -> int:
+        """The number of calls currently in flight.
+
+        :return: The number of calls currently in flight.
+        """
+        with self._condition:
+            return self._in_flight
+
+    @property
+    def limit(self) -> int:
+        """The current maximum number of calls in flight.
+
+        :return: The current maximum number of calls in flight.
+        """
+        with self._condition:
+            return int(self._limit)
+
+    @contextmanager
+    def slot(self) -> Generator[None, None, None]:
+        """Wait for a free slot and hold it for the duration of the
+        ``with`` block.
+
+        The outcome of the block, i.e. whether it raised an error and how
+        long it took, is used to adjust the limit.
+
+        :return: A context manager that holds a slot while active.
+        """  # noqa: D205
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+        started_at: float = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            self._release(overloaded=True)
+            raise
+        latency: float = time.monotonic() - started_at
+        self._release(
+            overloaded=(
+                self._latency_threshold is not None
+                and latency > self._latency_threshold
+            ),
+        )
+
+    def _release(self, overloaded: bool) -> None:  # noqa: FBT001
+        with self._condition:
+            self._in_flight -= 1
+            if overloaded:
+                self._limit = max(
+                    float(self._min_limit),
+                    self._limit * self._backoff_ratio,
+                )
+                self._logger.debug(
+                    "Overload detected, limit decreased to %d.",
+                    int(self._limit),
+                )
+            else:
+                self._limit = min(
+                    float(self._max_limit),
+                    self._limit + 1 / self._limit,
+                )
+            self._condition.notify_all()
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+class _Throttle:
+    """Routes calls through an optional rate limiter and an optional
+    concurrency limiter.
+    """  # noqa: D205
+
+    __slots__ = ("_concurrency_limiter", "_rate_limiter")
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter | None,
+        concurrency_limiter: AdaptiveConcurrencyLimiter | None,
+    ) -> None:
+        super().__init__()
+        if rate_limiter is None and concurrency_limiter is None:
+            _err_msg: str = (
+                "At least one of 'rate_limiter' or 'concurrency_limiter' "
+                "MUST be provided."
+            )
+            raise ValueError(_err_msg)
+        self._rate_limiter: RateLimiter | None = rate_limiter
+        self._concurrency_limiter: AdaptiveConcurrencyLimiter | None = (
+            concurrency_limiter
+        )
+
+    def __call__(
+        self,
+        function: Callable[_P, _T],
+        *args: _P.args,
+        **kwargs: _P.kwargs,
+    ) -> _T:
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire()
+        if self._concurrency_limiter is not None:
+            with self._concurrency_limiter.slot():
+                return function(*args, **kwargs)
+        return function(*args, **kwargs)
+
+
+# =============================================================================
+# THROTTLED COMPONENTS
+# =============================================================================
+
+
+class ThrottledSource(Source[_RDT], Generic[_RDT]):
+    """A :class:`~sghi.etl.core.Source` that throttles the calls made to a
+    wrapped ``Source``.
+
+    Each call to :meth:`draw`, and each chunk requested from :meth:`stream`,
+    first takes a token from the given :class:`RateLimiter`, if any, and is
+    then made within a slot of the given
+    :class:`AdaptiveConcurrencyLimiter`, if any.
+
+    Disposing this ``Source`` disposes the wrapped ``Source`` but not the
+    limiters, which may be shared.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ("_is_disposed", "_logger", "_source", "_throttle")
+
+    def __init__(
+        self,
+        source: Source[_RDT],
+        rate_limiter: RateLimiter | None = None,
+        concurrency_limiter: AdaptiveConcurrencyLimiter | None = None,
+    ) -> None:
+        """Create a new ``ThrottledSource`` instance.
+
+        :param source: The ``Source`` to throttle. MUST not be ``None``.
+        :param rate_limiter: An optional ``RateLimiter`` to take a token from
+            before each call.
+        :param concurrency_limiter: An optional
+            ``AdaptiveConcurrencyLimiter`` to make each call within.
+
+        :raise ValueError: If ``source`` is ``None`` or if neither
+            ``rate_limiter`` nor ``concurrency_limiter`` is provided.
+        """
+        super().__init__()
+        self._source: Source[_RDT] = ensure_not_none(
+            source,
+            "'source' MUST not be None.",
+        )
+        self._throttle: _Throttle = _Throttle(
+            rate_limiter,
+            concurrency_limiter,
+        )
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        self._source.dispose()
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def draw(self) -> _RDT:
+        return self._throttle(self._source.draw)
+
+    @not_disposed
+    @override
+    def stream(self) -> Iterator[_RDT]:
+        chunks: Iterator[_RDT] = iter(self._source.stream())
+        sentinel: Any = object()
+        while True:
+            chunk = self._throttle(next, chunks, sentinel)
+            if chunk is sentinel:
+                return
+            yield chunk
+
+
+class ThrottledSink(Sink[_PDT], Generic[_PDT]):
+    """A :class:`~sghi.etl.core.Sink` that throttles the calls made to a
+    wrapped ``Sink``.
+
+    Each call to :meth:`drain` first takes a token from the given
+    :class:`RateLimiter`, if any, and is then made within a slot of the
+    given :class:`AdaptiveConcurrencyLimiter`, if any.
+
+    This ``Sink`` does NOT delegate :meth:`drain_stream` to the wrapped
+    ``Sink``. Instead, it uses the default implementation which makes one
+    throttled drain per chunk.
+
+    Disposing this ``Sink`` disposes the wrapped ``Sink`` but not the
+    limiters, which may be shared.
+
+    .. versionadded:: 1.3.0
+    """  # noqa: D205
+
+    __slots__ = ("_is_disposed", "_logger", "_sink", "_throttle")
+
+    def __init__(
+        self,
+        sink: Sink[_PDT],
+        rate_limiter: RateLimiter | None = None,
+        concurrency_limiter: AdaptiveConcurrencyLimiter | None = None,
+    ) -> None:
+        """Create a new ``ThrottledSink`` instance.
+
+        :param sink: The ``Sink`` to throttle. MUST not be ``None``.
+        :param rate_limiter: An optional ``RateLimiter`` to take a token from
+            before each call.
+        :param concurrency_limiter: An optional
+            ``AdaptiveConcurrencyLimiter`` to make each call within.
+
+        :raise ValueError: If ``sink`` is ``None`` or if neither
+            ``rate_limiter`` nor ``concurrency_limiter`` is provided.
+        """
+        super().__init__()
+        self._sink: Sink[_PDT] = ensure_not_none(
+            sink,
+            "'sink' MUST not be None.",
+        )
+        self._throttle: _Throttle = _Throttle(
+            rate_limiter,
+            concurrency_limiter,
+        )
+        self._is_disposed: bool = False
+        self._logger: logging.Logger = logging.getLogger(type_fqn(type(self)))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        self._sink.dispose()
+        self._logger.debug("Disposal complete.")
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: _PDT) -> None:
+        self._throttle(self._sink.drain, processed_data)
@@ -0,0 +1,480 @@
+"""Tests for the ``sghi.etl.aio`` module."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+from unittest import TestCase
+
+import pytest
+from typing_extensions import override
+
+from sghi.disposable import ResourceDisposedError, not_disposed
+from sghi.etl.aio import (
+    AsyncProcessor,
+    AsyncSink,
+    AsyncSource,
+    FromAsyncProcessor,
+    FromAsyncSink,
+    FromAsyncSource,
+    ToAsyncProcessor,
+    ToAsyncSink,
+    ToAsyncSource,
+)
+from sghi.etl.core import Processor, Sink, Source
+
+if TYPE_CHECKING:
+    from collections.abc import (
+        AsyncIterable,
+        AsyncIterator,
+        Iterable,
+        Iterator,
+    )
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+@dataclass(slots=True)
+class IntsSupplier(Source[list[int]]):
+    """A :class:`Source` that supplies integers, in chunks when streamed."""
+
+    max_ints: int = field(default=5)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw(self) -> list[int]:
+        return list(range(self.max_ints))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+    @not_disposed
+    @override
+    def stream(self) -> Iterator[list[int]]:
+        for value in range(self.max_ints):
+            yield [value]
+
+
+@dataclass(slots=True)
+class IntsToStrings(Processor[list[int], list[str]]):
+    """A :class:`Processor` that takes ints and converts them to strings."""
+
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: list[int]) -> list[str]:
+        return list(map(str, raw_data))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class CollectToList(Sink[list[str]]):
+    """A :class:`Sink` that collects all the values it receives in a list."""
+
+    collection_target: list[str] = field(default_factory=list)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: list[str]) -> None:
+        self.collection_target.extend(processed_data)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class AsyncIntsSupplier(AsyncSource[list[int]]):
+    """An :class:`AsyncSource` that supplies integers."""
+
+    max_ints: int = field(default=5)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    async def draw(self) -> list[int]:
+        await asyncio.sleep(0)
+        return list(range(self.max_ints))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class AsyncIntsToStrings(AsyncProcessor[list[int], list[str]]):
+    """An :class:`AsyncProcessor` that converts ints to strings."""
+
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    async def apply(self, raw_data: list[int]) -> list[str]:
+        await asyncio.sleep(0)
+        return list(map(str, raw_data))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class AsyncCollectToList(AsyncSink[list[str]]):
+    """An :class:`AsyncSink` that collects the values it receives in a list."""
+
+    collection_target: list[str] = field(default_factory=list)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    async def drain(self, processed_data: list[str]) -> None:
+        await asyncio.sleep(0)
+        self.collection_target.extend(processed_data)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class BatchingIntsToStrings(IntsToStrings):
+    """An :class:`IntsToStrings` that merges the chunks of a stream."""
+
+    @not_disposed
+    @override
+    def apply_stream(
+        self,
+        raw_data_chunks: Iterable[list[int]],
+    ) -> Iterator[list[str]]:
+        yield [str(_v) for _chunk in raw_data_chunks for _v in _chunk]
+
+
+@dataclass(slots=True)
+class FirstChunkSink(CollectToList):
+    """A :class:`CollectToList` that only drains the first chunk of a
+    stream.
+    """  # noqa: D205
+
+    @not_disposed
+    @override
+    def drain_stream(self, processed_data_chunks: Iterable[list[str]]) -> None:
+        for processed_data in processed_data_chunks:
+            self.drain(processed_data)
+            break
+
+
+@dataclass(slots=True)
+class AsyncBatchingIntsToStrings(AsyncIntsToStrings):
+    """An :class:`AsyncIntsToStrings` that merges all chunks of a stream into
+    one.
+    """  # noqa: D205
+
+    @not_disposed
+    @override
+    async def apply_stream(
+        self,
+        raw_data_chunks: AsyncIterable[list[int]],
+    ) -> AsyncIterator[list[str]]:
+        yield [str(_v) async for _chunk in raw_data_chunks for _v in _chunk]
+
+
+@dataclass(slots=True)
+class AsyncFirstChunkSink(AsyncCollectToList):
+    """An :class:`AsyncCollectToList` that only drains the first chunk of a
+    stream.
+    """  # noqa: D205
+
+    @not_disposed
+    @override
+    async def drain_stream(
+        self,
+        processed_data_chunks: AsyncIterable[list[str]],
+    ) -> None:
+        async for processed_data in processed_data_chunks:
+            await self.drain(processed_data)
+            break
+
+
+async def _aiter_of(*chunks: list[int]) -> AsyncIterator[list[int]]:
+    for chunk in chunks:
+        yield chunk
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestAsyncInterfaces(TestCase):
+    """Tests for the default method implementations of the async interfaces
+    of the ``sghi.etl.aio`` module.
+    """  # noqa: D205
+
+    def test_invoking_async_components_as_callables(self) -> None:
+        """Invoking :class:`AsyncSource`, :class:`AsyncProcessor` and
+        :class:`AsyncSink` instances as callables should delegate to their
+        ``draw``, ``apply`` and ``drain`` coroutines respectively.
+        """  # noqa: D205
+        collected: list[str] = []
+
+        async def run() -> None:
+            source = AsyncIntsSupplier(max_ints=3)
+            processor = AsyncIntsToStrings()
+            sink = AsyncCollectToList(collection_target=collected)
+            await sink(await processor(await source()))
+
+        asyncio.run(run())
+
+        assert collected == ["0", "1", "2"]
+
+    def test_default_streaming_implementations(self) -> None:
+        """The default streaming implementations should yield a single chunk
+        from the source, apply each chunk and drain each chunk, in order.
+        """  # noqa: D205
+        collected: list[str] = []
+
+        async def run() -> list[list[int]]:
+            source = AsyncIntsSupplier(max_ints=3)
+            processor = AsyncIntsToStrings()
+            sink = AsyncCollectToList(collection_target=collected)
+            raw_chunks = [_c async for _c in source.stream()]
+            await sink.drain_stream(
+                processor.apply_stream(_aiter_of([0, 1], [2])),
+            )
+            return raw_chunks
+
+        assert asyncio.run(run()) == [[0, 1, 2]]
+        assert collected == ["0", "1", "2"]
+
+
+class TestToAsyncAdapters(TestCase):
+    """Tests for the ``ToAsync*`` adapters of the ``sghi.etl.aio`` module."""
+
+    def test_instantiation_fails_on_none_components(self) -> None:
+        """The ``ToAsync*`` adapters should raise a :exc:`ValueError` when
+        given a ``None`` component to wrap.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'source' MUST not be None."):
+            ToAsyncSource(None)  # type: ignore
+        with pytest.raises(ValueError, match="'processor' MUST not be None."):
+            ToAsyncProcessor(None)  # type: ignore
+        with pytest.raises(ValueError, match="'sink' MUST not be None."):
+            ToAsyncSink(None)  # type: ignore
+
+    def test_adapters_delegate_to_the_wrapped_components(self) -> None:
+        """The ``ToAsync*`` adapters should delegate to the wrapped
+        synchronous components.
+        """  # noqa: D205
+        collected: list[str] = []
+        source = ToAsyncSource(IntsSupplier())
+        processor = ToAsyncProcessor(IntsToStrings())
+        sink = ToAsyncSink(CollectToList(collection_target=collected))
+
+        async def run() -> None:
+            await sink.drain(await processor.apply(await source.draw()))
+            await sink.drain_stream(processor.apply_stream(source.stream()))
+
+        asyncio.run(run())
+
+        assert collected == ["0", "1", "2", "3", "4"] * 2
+
+    def test_adapters_use_the_streaming_methods_of_the_components(
+        self,
+    ) -> None:
+        """The ``ToAsync*`` processor and sink adapters should stream chunks
+        through the ``apply_stream`` and ``drain_stream`` methods of the
+        wrapped components.
+        """  # noqa: D205
+        collected: list[str] = []
+        source = ToAsyncSource(IntsSupplier())
+        sink = ToAsyncSink(FirstChunkSink(collection_target=collected))
+
+        async def run() -> None:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                processor = ToAsyncProcessor(
+                    BatchingIntsToStrings(),
+                    executor=executor,
+                )
+                await sink.drain_stream(
+                    processor.apply_stream(source.stream()),
+                )
+            await sink.drain_stream(
+                ToAsyncProcessor(IntsToStrings()).apply_stream(
+                    source.stream(),
+                ),
+            )
+
+        asyncio.run(run())
+
+        assert collected == ["0", "1", "2", "3", "4", "0"]
+
+    def test_adapters_run_blocking_calls_off_the_event_loop(self) -> None:
+        """The ``ToAsync*`` adapters should run the blocking calls of the
+        wrapped components on the given executor and not on the event loop's
+        thread.
+        """  # noqa: D205
+        threads: set[int] = set()
+        barrier = threading.Barrier(3, timeout=5)
+
+        @dataclass(slots=True)
+        class BlockingSupplier(IntsSupplier):
+            @override
+            def draw(self) -> list[int]:
+                threads.add(threading.get_ident())
+                barrier.wait()
+                return [1]
+
+        async def run() -> list[list[int]]:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                sources = [
+                    ToAsyncSource(BlockingSupplier(), executor=executor)
+                    for _ in range(3)
+                ]
+                return await asyncio.gather(*(_s.draw() for _s in sources))
+
+        assert asyncio.run(run()) == [[1], [1], [1]]
+        assert threading.get_ident() not in threads
+        assert len(threads) == 3  # noqa: PLR2004
+
+    def test_dispose_disposes_the_wrapped_components(self) -> None:
+        """Disposing a ``ToAsync*`` adapter should dispose the wrapped
+        component, after which the adapter is no longer usable.
+        """  # noqa: D205
+        source = ToAsyncSource(IntsSupplier())
+        processor = ToAsyncProcessor(IntsToStrings())
+        sink = ToAsyncSink(CollectToList())
+        for adapter in (source, processor, sink):
+            with adapter:
+                assert not adapter.is_disposed
+            assert adapter.is_disposed
+
+        with pytest.raises(ResourceDisposedError):
+            asyncio.run(source.draw())
+
+
+class TestFromAsyncAdapters(TestCase):
+    """Tests for the ``FromAsync*`` adapters of the ``sghi.etl.aio`` module."""
+
+    def test_instantiation_fails_on_none_components(self) -> None:
+        """The ``FromAsync*`` adapters should raise a :exc:`ValueError` when
+        given a ``None`` component to wrap.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'source' MUST not be None."):
+            FromAsyncSource(None)  # type: ignore
+        with pytest.raises(ValueError, match="'processor' MUST not be None."):
+            FromAsyncProcessor(None)  # type: ignore
+        with pytest.raises(ValueError, match="'sink' MUST not be None."):
+            FromAsyncSink(None)  # type: ignore
+
+    def test_adapters_delegate_to_the_wrapped_components(self) -> None:
+        """The ``FromAsync*`` adapters should block on, and return the results
+        of, the wrapped asynchronous components.
+        """  # noqa: D205
+        collected: list[str] = []
+        with (
+            FromAsyncSource(AsyncIntsSupplier()) as source,
+            FromAsyncProcessor(AsyncIntsToStrings()) as processor,
+            FromAsyncSink(AsyncCollectToList(collected)) as sink,
+        ):
+            sink.drain(processor.apply(source.draw()))
+            sink.drain_stream(processor.apply_stream(source.stream()))
+
+        assert collected == ["0", "1", "2", "3", "4"] * 2
+        assert source.is_disposed
+        assert processor.is_disposed
+        assert sink.is_disposed
+
+    def test_adapters_use_the_streaming_methods_of_the_components(
+        self,
+    ) -> None:
+        """The ``FromAsync*`` processor and sink adapters should stream chunks
+        through the ``apply_stream`` and ``drain_stream`` coroutines of the
+        wrapped components.
+        """  # noqa: D205
+        collected: list[str] = []
+        with (
+            FromAsyncProcessor(AsyncBatchingIntsToStrings()) as processor,
+            FromAsyncProcessor(AsyncIntsToStrings()) as other_processor,
+            FromAsyncSink(AsyncFirstChunkSink(collected)) as sink,
+        ):
+            source = IntsSupplier()
+            sink.drain_stream(processor.apply_stream(source.stream()))
+            sink.drain_stream(other_processor.apply_stream(source.stream()))
+
+        assert collected == ["0", "1", "2", "3", "4", "0"]
+
+    def test_adapters_can_use_an_event_loop_running_on_another_thread(
+        self,
+    ) -> None:
+        """The ``FromAsync*`` adapters should submit their coroutines to the
+        given event loop when one is provided.
+        """  # noqa: D205
+        loop = asyncio.new_event_loop()
+        loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+        loop_thread.start()
+        collected: list[str] = []
+        async_sink = AsyncCollectToList(collection_target=collected)
+        try:
+            with (
+                FromAsyncSource(AsyncIntsSupplier(), loop=loop) as source,
+                FromAsyncProcessor(AsyncIntsToStrings(), loop=loop) as proc,
+                FromAsyncSink(async_sink, loop=loop) as sink,
+            ):
+                sink(proc(source()))
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            loop_thread.join(timeout=5)
+            loop.close()
+
+        assert collected == ["0", "1", "2", "3", "4"]
+
+    def test_round_trip_through_both_adapters(self) -> None:
+        """Wrapping a synchronous component in a ``ToAsync*`` adapter and then
+        in a ``FromAsync*`` adapter should preserve its behavior.
+        """  # noqa: D205
+        instance = FromAsyncSource(ToAsyncSource(IntsSupplier(max_ints=3)))
+        with instance:
+            assert list(instance.stream()) == [[0], [1], [2]]
+            assert instance() == [0, 1, 2]
@@ -0,0 +1,150 @@
+"""Tests for the ``sghi.etl.buffers`` module."""
+
+from __future__ import annotations
+
+import queue
+import threading
+from unittest import TestCase
+
+import pytest
+from typing_extensions import override
+
+from sghi.disposable import ResourceDisposedError
+from sghi.etl.buffers import SpillBuffer, estimate_size
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestEstimateSize(TestCase):
+    """Tests for the :func:`sghi.etl.buffers.estimate_size` function."""
+
+    def test_containers_are_measured_recursively(self) -> None:
+        """:func:`estimate_size` should include the contents of containers,
+        count shared objects once and handle reference cycles.
+        """  # noqa: D205
+        payload = "x" * 1000
+        assert estimate_size([payload]) > len(payload)
+        assert estimate_size({"a": payload}) > len(payload)
+        assert estimate_size([payload, payload]) < 2 * len(payload)
+        assert estimate_size(memoryview(bytes(1000))) > 1000  # noqa: PLR2004
+
+        cyclic: list[object] = []
+        cyclic.append(cyclic)
+        assert estimate_size(cyclic) > 0
+
+
+class TestSpillBuffer(TestCase):
+    """Tests for the :class:`sghi.etl.buffers.SpillBuffer` class."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._instance: SpillBuffer[list[int]] = SpillBuffer(
+            memory_budget=200,
+            sizer=lambda _chunk: 100,
+        )
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._instance.dispose()
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`SpillBuffer` constructor should raise a :exc:`ValueError`
+        when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'memory_budget' MUST not be"):
+            SpillBuffer(memory_budget=-1)
+        with pytest.raises(ValueError, match="'sizer' MUST not be None."):
+            SpillBuffer(memory_budget=0, sizer=None)  # type: ignore
+
+    def test_chunks_beyond_the_budget_are_spilled_in_order(self) -> None:
+        """:class:`SpillBuffer` should keep chunks in memory up to the
+        budget, spill the rest, and return all of them in order.
+        """  # noqa: D205
+        for index in range(5):
+            self._instance.put([index])
+
+        assert len(self._instance) == 5  # noqa: PLR2004
+        assert self._instance.memory_usage == 200  # noqa: PLR2004
+        assert self._instance.spilled_chunks == 3  # noqa: PLR2004
+
+        assert self._instance.get() == [0]
+        self._instance.put([5])
+        self._instance.close()
+        assert list(self._instance) == [[1], [2], [3], [4], [5]]
+        assert self._instance.memory_usage == 0
+        assert self._instance.spilled_chunks == 0
+
+    def test_spill_file_is_reused_once_drained(self) -> None:
+        """:class:`SpillBuffer` should keep working after all the spilled
+        chunks have been taken and new chunks are spilled.
+        """  # noqa: D205
+        instance: SpillBuffer[str] = SpillBuffer(memory_budget=0)
+        with instance:
+            instance.put("a" * 100)
+            assert instance.get() == "a" * 100
+            instance.put("b")
+            instance.put("c")
+            assert instance.spilled_chunks == 2  # noqa: PLR2004
+            assert instance.get() == "b"
+            assert instance.get() == "c"
+
+    def test_chunks_spilled_after_a_read_are_readable(self) -> None:
+        """:class:`SpillBuffer` should return chunks spilled after the spill
+        file was last read, and release the file when disposed midway.
+        """  # noqa: D205
+        instance: SpillBuffer[str] = SpillBuffer(memory_budget=0)
+        with instance:
+            instance.put("a")
+            instance.put("b")
+            assert instance.get() == "a"
+            instance.put("c")
+            assert instance.get() == "b"
+            assert instance.get() == "c"
+            assert instance.spilled_chunks == 0
+
+            instance.put("d")
+            instance.put("e")
+            assert instance.get() == "d"
+            assert instance.spilled_chunks == 1
+
+        assert instance.is_disposed
+        assert instance.spilled_chunks == 0
+
+    def test_get_blocks_until_a_chunk_is_available(self) -> None:
+        """:meth:`SpillBuffer.get` should wait for a chunk, time out when none
+        is added, and raise an :exc:`EOFError` once the buffer is closed and
+        empty.
+        """  # noqa: D205
+        with pytest.raises(queue.Empty):
+            self._instance.get(timeout=0.01)
+
+        timer = threading.Timer(0.05, self._instance.put, args=([1],))
+        timer.start()
+        assert self._instance.get(timeout=5) == [1]
+        timer.join()
+
+        self._instance.close()
+        with pytest.raises(EOFError, match="closed and empty"):
+            self._instance.get()
+        with pytest.raises(ValueError, match="closed buffer"):
+            self._instance.put([2])
+
+    def test_dispose_discards_the_chunks(self) -> None:
+        """:meth:`SpillBuffer.dispose` should discard the remaining chunks
+        and make the buffer unusable.
+        """  # noqa: D205
+        for index in range(3):
+            self._instance.put([index])
+        self._instance.dispose()
+        self._instance.dispose()
+
+        assert self._instance.is_disposed
+        assert len(self._instance) == 0
+        with pytest.raises(ResourceDisposedError):
+            self._instance.get()
+        with pytest.raises(ResourceDisposedError):
+            self._instance.put([3])
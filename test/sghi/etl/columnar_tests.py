@@ -0,0 +1,339 @@
+"""Tests for the ``sghi.etl.columnar`` module."""
+
+from __future__ import annotations
+
+import ctypes
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+from unittest import TestCase
+from unittest.mock import patch
+
+import pytest
+from typing_extensions import override
+from workflow_helpers import ComponentsWorkflow
+
+from sghi.disposable import ResourceDisposedError, not_disposed
+from sghi.etl.columnar import (
+    BatchToRecords,
+    ColumnarSink,
+    ColumnarSource,
+    ColumnTransform,
+    RecordBatch,
+    RecordsToBatch,
+)
+from sghi.etl.executors import PipelinedWorkflowExecutor
+from sghi.etl.processors import ProcessorPipe
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+@dataclass(slots=True)
+class BatchSource(ColumnarSource):
+    """A :class:`ColumnarSource` that streams two record batches."""
+
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw(self) -> RecordBatch:
+        return RecordBatch({"id": array("q", [1, 2]), "name": ["a", "b"]})
+
+    @not_disposed
+    @override
+    def stream(self) -> Iterator[RecordBatch]:
+        yield self.draw()
+        yield RecordBatch({"id": array("q", [3]), "name": ["c"]})
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class CollectBatchSink(ColumnarSink):
+    """A :class:`ColumnarSink` that collects the batches it drains."""
+
+    drained: list[RecordBatch] = field(default_factory=list)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: RecordBatch) -> None:
+        self.drained.append(processed_data)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+def double(values: Sequence[Any]) -> Sequence[Any]:
+    """Double each value of a column."""
+    return array("q", (_value * 2 for _value in values))
+
+
+def upper(values: Sequence[Any]) -> Sequence[Any]:
+    """Upper-case each value of a column."""
+    return [_value.upper() for _value in values]
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestRecordBatch(TestCase):
+    """Tests for the :class:`sghi.etl.columnar.RecordBatch` class."""
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`RecordBatch` constructor should raise a :exc:`ValueError`
+        when given invalid columns.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'columns' MUST not be None."):
+            RecordBatch(None)  # type: ignore
+        with pytest.raises(ValueError, match="MUST have the same length."):
+            RecordBatch({"a": [1, 2], "b": [1]})
+        with pytest.raises(ValueError, match="MUST be one-dimensional."):
+            RecordBatch({"a": memoryview(b"abcd").cast("B", (2, 2))})
+
+    def test_from_records_packs_numeric_columns(self) -> None:
+        """:meth:`RecordBatch.from_records` should pack numeric columns into
+        buffers and keep the other columns as lists.
+        """  # noqa: D205
+        records = [
+            {"id": 1, "score": 0.5, "name": "a", "flag": True},
+            {"id": 2, "score": 1.5, "name": "b", "flag": False},
+            {"id": 3, "score": 2.5, "name": None},
+        ]
+        instance = RecordBatch.from_records(records)
+
+        assert len(instance) == 3  # noqa: PLR2004
+        assert instance.column_names == ("id", "score", "name", "flag")
+        assert isinstance(instance.column("id"), memoryview)
+        assert instance.column("id").format == "q"  # type: ignore
+        assert instance.column("score").format == "d"  # type: ignore
+        assert instance.column("name") == ["a", "b", None]
+        assert instance.column("flag") == [True, False, None]
+        assert instance.to_records()[0] == records[0]
+        assert RecordBatch.from_records([]).num_rows == 0
+        assert RecordBatch.from_records(records, ["name"]).column_names == (
+            "name",
+        )
+
+    def test_from_records_keeps_oversized_integers_in_lists(self) -> None:
+        """:meth:`RecordBatch.from_records` should keep integer columns that
+        do not fit in a 64-bit buffer as lists.
+        """  # noqa: D205
+        instance = RecordBatch.from_records([{"id": 1}, {"id": 2**64}])
+
+        assert instance.column("id") == [1, 2**64]
+
+    def test_magic_methods(self) -> None:
+        """:class:`RecordBatch` should support membership tests, equality
+        comparisons, ``len()`` and ``repr()``.
+        """  # noqa: D205
+        instance = RecordBatch({"id": array("q", [1, 2]), "name": ["a", "b"]})
+
+        assert "id" in instance
+        assert "x" not in instance
+        assert instance == RecordBatch({"id": [1, 2], "name": ["a", "b"]})
+        assert instance != RecordBatch({"name": ["a", "b"], "id": [1, 2]})
+        assert instance != instance.to_records()
+        assert len(instance) == 2  # noqa: PLR2004
+        assert repr(instance) == (
+            "RecordBatch(column_names=('id', 'name'), num_rows=2)"
+        )
+        assert dict(instance.columns) == {
+            "id": instance.column("id"),
+            "name": ["a", "b"],
+        }
+        with pytest.raises(TypeError):
+            instance.columns["x"] = [1, 2]  # type: ignore
+
+    def test_derived_batches_share_the_column_buffers(self) -> None:
+        """Batches derived using :meth:`RecordBatch.select`,
+        :meth:`RecordBatch.slice` and :meth:`RecordBatch.with_column` should
+        share the buffers of the original batch.
+        """  # noqa: D205
+        ids = array("q", [1, 2, 3, 4])
+        instance = RecordBatch({"id": ids, "name": ["a", "b", "c", "d"]})
+
+        sliced = instance.slice(1, 3)
+        ids[1] = 20
+        assert list(sliced.column("id")) == [20, 3]
+        assert sliced.column("name") == ["b", "c"]
+
+        selected = instance.select(["id"])
+        assert selected.column("id") is instance.column("id")
+        assert "name" not in selected
+
+        extended = instance.with_column("rank", [4, 3, 2, 1])
+        assert extended.column("id") is instance.column("id")
+        assert extended.column_names == ("id", "name", "rank")
+        assert instance == RecordBatch.from_records(instance.to_records())
+        assert instance != extended
+
+        with pytest.raises(KeyError, match="No column named 'x'"):
+            instance.column("x")
+        with pytest.raises(ValueError, match="MUST have the same length."):
+            instance.with_column("rank", [1])
+
+    def test_arrow_round_trip(self) -> None:
+        """:meth:`RecordBatch.to_arrow` and :meth:`RecordBatch.from_arrow`
+        should convert to and from Arrow record batches.
+        """  # noqa: D205
+        pytest.importorskip("pyarrow")
+        instance = RecordBatch.from_records(
+            [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}],
+        )
+        arrow_batch = instance.to_arrow()
+
+        assert arrow_batch.num_rows == 2  # noqa: PLR2004
+        assert arrow_batch.column(0).to_pylist() == [1, 2]
+        assert RecordBatch.from_arrow(arrow_batch) == instance
+        assert RecordBatch.from_arrow(arrow_batch.slice(1)).to_records() == [
+            {"id": 2, "name": "b"},
+        ]
+
+    def test_to_arrow_shares_native_buffers(self) -> None:
+        """:meth:`RecordBatch.to_arrow` should share contiguous buffers of
+        native byte order with Arrow, whatever the format character they
+        declare, and convert the other columns.
+        """  # noqa: D205
+        pytest.importorskip("pyarrow")
+        # A ctypes array of explicit, native, byte order, e.g. "<q".
+        ordered_int64 = getattr(
+            ctypes.c_int64,
+            "__ctype_le__" if sys.byteorder == "little" else "__ctype_be__",
+        )
+        instance = RecordBatch(
+            {
+                "long": array("l", [1, 2]),
+                "ulong": array("L", [3, 4]),
+                "ordered": (ordered_int64 * 2)(7, 8),
+                "float": array("f", [0.5, 1.5]),
+                "strided": memoryview(array("q", [1, 0, 2, 0]))[::2],
+                "chars": memoryview(b"ab").cast("c"),
+            },
+        )
+        arrow_batch = instance.to_arrow()
+
+        assert [str(_field.type) for _field in arrow_batch.schema] == [
+            "int64",
+            f"uint{array('L').itemsize * 8}",
+            "int64",
+            "float",
+            "int64",
+            "binary",
+        ]
+        assert instance.column("ordered").format[0] in "<>"  # type: ignore
+        assert arrow_batch.column(2).to_pylist() == [7, 8]
+        assert arrow_batch.column(4).to_pylist() == [1, 2]
+        assert (
+            arrow_batch.column(1).buffers()[1].address
+            == (
+                instance.column("ulong").obj.buffer_info()[0]  # type: ignore
+            )
+        )
+
+    def test_from_arrow_converts_chunked_and_nullable_columns(self) -> None:
+        """:meth:`RecordBatch.from_arrow` should combine chunked columns and
+        convert columns with null values to lists.
+        """  # noqa: D205
+        pa = pytest.importorskip("pyarrow")
+        table = pa.table(
+            {
+                "id": pa.chunked_array([[1, 2], [3]]),
+                "score": [1.5, None, 2.5],
+            },
+        )
+        instance = RecordBatch.from_arrow(table)
+
+        assert isinstance(instance.column("id"), memoryview)
+        assert list(instance.column("id")) == [1, 2, 3]
+        assert instance.column("score") == [1.5, None, 2.5]
+
+    def test_arrow_support_requires_pyarrow(self) -> None:
+        """:meth:`RecordBatch.to_arrow` should raise an :exc:`ImportError`
+        when ``pyarrow`` is not installed.
+        """  # noqa: D205
+        instance = RecordBatch({"id": [1, 2]})
+        with (
+            patch.dict(sys.modules, {"pyarrow": None}),
+            pytest.raises(ImportError, match="Install it using the 'arrow'"),
+        ):
+            instance.to_arrow()
+
+
+class TestColumnarComponents(TestCase):
+    """Tests for the columnar components of the ``sghi.etl.columnar``
+    module.
+    """  # noqa: D205
+
+    def test_column_transform_fails_on_invalid_arguments(self) -> None:
+        """:class:`ColumnTransform` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'column' MUST not be None"):
+            ColumnTransform("", double)
+        with pytest.raises(ValueError, match="'function' MUST not be None."):
+            ColumnTransform("id", None)  # type: ignore
+
+    def test_conversion_processors(self) -> None:
+        """:class:`RecordsToBatch` and :class:`BatchToRecords` should
+        convert between records and record batches.
+        """  # noqa: D205
+        records = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+        with (
+            RecordsToBatch(["id"]) as to_batch,
+            BatchToRecords() as to_records,
+        ):
+            batch = to_batch.apply(records)
+            assert batch.column_names == ("id",)
+            assert to_records.apply(batch) == [{"id": 1}, {"id": 2}]
+
+        with pytest.raises(ResourceDisposedError):
+            to_batch.apply(records)
+        with pytest.raises(ResourceDisposedError):
+            to_records.apply(batch)
+
+    def test_columnar_workflow(self) -> None:
+        """Columnar components should compose into a workflow that passes
+        record batches between stages.
+        """  # noqa: D205
+        sink = CollectBatchSink()
+        workflow = ComponentsWorkflow[RecordBatch, RecordBatch](
+            source_factory=BatchSource,
+            processor_factory=lambda: ProcessorPipe(
+                [
+                    ColumnTransform("id", double, output="doubled"),
+                    ColumnTransform("name", upper),
+                ],
+            ),
+            sink_factory=lambda: sink,
+        )
+        PipelinedWorkflowExecutor()(workflow)
+
+        assert [_batch.to_records() for _batch in sink.drained] == [
+            [
+                {"id": 1, "name": "A", "doubled": 2},
+                {"id": 2, "name": "B", "doubled": 4},
+            ],
+            [{"id": 3, "name": "C", "doubled": 6}],
+        ]
@@ -11,6 +11,7 @@ from typing_extensions import override
 
 from sghi.disposable import not_disposed
 from sghi.etl.core import Processor, Sink, Source, WorkflowDefinition
+from sghi.etl.processors import ProcessorPipe
 from sghi.utils import type_fqn
 
 # =============================================================================
@@ -153,6 +154,19 @@ class TestSource(TestCase):
             # noinspection PyArgumentList
             assert list(instance1.draw()) == list(instance2()) == [0, 1, 2, 3]
 
+    def test_stream_default_implementation_yields_a_single_chunk(
+        self,
+    ) -> None:
+        """The default implementation of :meth:`~sghi.etl.core.Source.stream`
+        should yield the result of :meth:`~sghi.etl.core.Source.draw` as the
+        only chunk.
+        """  # noqa: D205
+        instance: IntsSupplier
+        with IntsSupplier(max_ints=4) as instance:
+            chunks = [list(chunk) for chunk in instance.stream()]
+
+            assert chunks == [[0, 1, 2, 3]]
+
 
 class TestProcessor(TestCase):
     """Tests for the :class:`sghi.etl.core.Processor` interface.
@@ -193,6 +207,49 @@ class TestProcessor(TestCase):
                 == ("0", "1", "2", "3", "4")
             )
 
+    def test_apply_stream_default_implementation_applies_each_chunk(
+        self,
+    ) -> None:
+        """The default implementation of
+        :meth:`~sghi.etl.core.Processor.apply_stream` should apply
+        :meth:`~sghi.etl.core.Processor.apply` to each chunk, lazily and in
+        order.
+        """  # noqa: D205
+        raw_chunks = ((0, 1), (2, 3), (4,))
+
+        instance: IntsToStrings
+        with IntsToStrings() as instance:
+            processed_chunks = instance.apply_stream(raw_chunks)
+
+            assert iter(processed_chunks) is processed_chunks
+            assert [tuple(chunk) for chunk in processed_chunks] == [
+                ("0", "1"),
+                ("2", "3"),
+                ("4",),
+            ]
+
+    def test_composing_processors_returns_a_processor_pipe(self) -> None:
+        """Composing two :class:`~sghi.etl.core.Processor` instances using
+        the ``>>`` operator should return a
+        :class:`~sghi.etl.processors.ProcessorPipe` applying both in order.
+        """  # noqa: D205
+        instance1 = IntsToStrings()
+        instance2 = IntsToStrings()
+
+        with instance1 >> instance2 as pipe:
+            assert isinstance(pipe, ProcessorPipe)
+            assert pipe.processors == (instance1, instance2)
+            assert tuple(pipe(tuple(self._source()))) == (
+                "0",
+                "1",
+                "2",
+                "3",
+                "4",
+            )
+
+        assert instance1.is_disposed
+        assert instance2.is_disposed
+
     def test_invoking_the_process_method_returns_expected_value(self) -> None:
         """:meth:`~sghi.etl.core.Processor.process` should return the expected
         value.
@@ -273,6 +330,22 @@ class TestSink(TestCase):
 
             assert collect1 == collect2 == ["0", "1", "2", "3", "4"]
 
+    def test_drain_stream_default_implementation_drains_each_chunk(
+        self,
+    ) -> None:
+        """The default implementation of
+        :meth:`~sghi.etl.core.Sink.drain_stream` should call
+        :meth:`~sghi.etl.core.Sink.drain` once for each chunk, in order.
+        """  # noqa: D205
+        processed_chunks = self._processor.apply_stream(self._source.stream())
+
+        collect: list[str] = []
+        instance: CollectToList
+        with CollectToList(collection_target=collect) as instance:
+            instance.drain_stream(processed_chunks)
+
+            assert collect == ["0", "1", "2", "3", "4"]
+
 
 class TestWorkflow(TestCase):
     """Tests for the :class:`sghi.etl.core.WorkflowDefinition` interface.
@@ -0,0 +1,441 @@
+"""Tests for the ``sghi.etl.deduplication`` module."""
+
+from __future__ import annotations
+
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest import TestCase
+
+import pytest
+from typing_extensions import override
+from workflow_helpers import ChunksSource, CollectSink, ComponentsWorkflow
+
+from sghi.disposable import ResourceDisposedError
+from sghi.etl.deduplication import (
+    BloomKeyFilter,
+    DeduplicatingProcessor,
+    DeduplicatingWorkflowDefinition,
+    ExactKeyFilter,
+    KeyFilter,
+)
+from sghi.etl.executors import PipelinedWorkflowExecutor
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+_Record = dict[str, int]
+
+_Records = list[_Record]
+
+
+def _keys(*values: int) -> list[bytes]:
+    return [_value.to_bytes(16, "little") for _value in values]
+
+
+def _record_id(record: _Record) -> int:
+    return record["id"]
+
+
+def _unseen_ids(key_filter: KeyFilter, *ids: int) -> list[int]:
+    key_filter.rollback()
+    with DeduplicatingProcessor(key_filter, key=_record_id) as processor:
+        records: _Records = processor.apply([{"id": _id} for _id in ids])
+    key_filter.rollback()
+    return [_record["id"] for _record in records]
+
+
+@dataclass(slots=True)
+class FirstChunkSink(CollectSink[Any]):
+    """A :class:`CollectSink` that returns once it has drained the first
+    chunk of a stream.
+    """  # noqa: D205
+
+    @override
+    def drain_stream(self, processed_data_chunks: Iterable[Any]) -> None:
+        for processed_data in processed_data_chunks:
+            self.drain(processed_data)
+            return
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class KeyFilterTestsMixin:
+    """Tests shared by all :class:`KeyFilter` implementations."""
+
+    def make_filter(self) -> KeyFilter:
+        """Create the :class:`KeyFilter` under test."""
+        raise NotImplementedError
+
+    def test_seen_keys_are_reported(self) -> None:
+        """:meth:`KeyFilter.add_all` should report the keys seen before,
+        including earlier in the same batch.
+        """  # noqa: D205
+        with self.make_filter() as instance:
+            assert instance.add_all(_keys(1, 2, 1)) == [False, False, True]
+            assert instance.add_all(_keys(2, 3)) == [True, False]
+
+    def test_rollback_forgets_the_staged_keys(self) -> None:
+        """:meth:`KeyFilter.rollback` should forget the keys added since the
+        last commit only.
+        """  # noqa: D205
+        with self.make_filter() as instance:
+            instance.add_all(_keys(1, 2))
+            instance.commit()
+            instance.add_all(_keys(3, 4))
+            instance.rollback()
+
+            assert instance.add_all(_keys(1, 2, 3, 4)) == [
+                True,
+                True,
+                False,
+                False,
+            ]
+
+    def test_disposed_instances_are_unusable(self) -> None:
+        """A disposed :class:`KeyFilter` should raise a
+        :exc:`ResourceDisposedError` when used.
+        """  # noqa: D205
+        instance = self.make_filter()
+        instance.dispose()
+        instance.dispose()
+
+        assert instance.is_disposed
+        with pytest.raises(ResourceDisposedError):
+            instance.add_all(_keys(1))
+        with pytest.raises(ResourceDisposedError):
+            instance.commit()
+
+
+class TestExactKeyFilter(KeyFilterTestsMixin, TestCase):
+    """Tests for the :class:`sghi.etl.deduplication.ExactKeyFilter` class."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._database: Path = Path(self._temp_dir.name) / "keys.db"
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._temp_dir.cleanup()
+
+    @override
+    def make_filter(self) -> KeyFilter:
+        return ExactKeyFilter(max_keys_in_memory=2)
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`ExactKeyFilter` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'namespace' MUST not be"):
+            ExactKeyFilter(namespace=None)  # type: ignore
+        with pytest.raises(ValueError, match="'max_keys_in_memory' MUST"):
+            ExactKeyFilter(max_keys_in_memory=0)
+
+    def test_committed_keys_persist_per_namespace(self) -> None:
+        """:class:`ExactKeyFilter` should persist the committed keys, and
+        only those, under its namespace when given a database.
+        """  # noqa: D205
+        with ExactKeyFilter(
+            self._database,
+            namespace="a",
+            max_keys_in_memory=2,
+        ) as instance:
+            assert instance.database == self._database
+            assert instance.namespace == "a"
+            instance.add_all(_keys(*range(5)))
+            instance.commit()
+            instance.add_all(_keys(5))
+
+        with ExactKeyFilter(self._database, namespace="a") as instance:
+            assert instance.add_all(_keys(0, 4, 5)) == [True, True, False]
+        with ExactKeyFilter(self._database, namespace="b") as instance:
+            assert instance.add_all(_keys(0)) == [False]
+
+    def test_keys_beyond_the_memory_limit_overflow_to_disk(self) -> None:
+        """:class:`ExactKeyFilter` should keep remembering keys, committed or
+        staged, once they no longer fit in memory.
+        """  # noqa: D205
+        with ExactKeyFilter(max_keys_in_memory=3) as instance:
+            assert instance.add_all(_keys(*range(4))) == [False] * 4
+            instance.commit()
+            assert (
+                instance.add_all(_keys(*range(10))) == [True] * 4 + [False] * 6
+            )
+            instance.rollback()
+
+            assert instance.add_all(_keys(*range(3, 6))) == [
+                True,
+                False,
+                False,
+            ]
+
+
+class TestBloomKeyFilter(KeyFilterTestsMixin, TestCase):
+    """Tests for the :class:`sghi.etl.deduplication.BloomKeyFilter` class."""
+
+    @override
+    def make_filter(self) -> KeyFilter:
+        return BloomKeyFilter(capacity=100)
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`BloomKeyFilter` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'capacity' MUST be greater"):
+            BloomKeyFilter(capacity=0)
+        with pytest.raises(ValueError, match="'false_positive_rate' MUST"):
+            BloomKeyFilter(capacity=1, false_positive_rate=1)
+
+    def test_false_positive_rate_is_honoured(self) -> None:
+        """:class:`BloomKeyFilter` should report few new keys as seen while
+        holding up to its capacity.
+        """  # noqa: D205
+        with BloomKeyFilter(1000, false_positive_rate=0.01) as instance:
+            instance.add_all(_keys(*range(1000)))
+            false_positives = sum(instance.add_all(_keys(*range(1000, 6000))))
+
+            assert instance.capacity == 1000  # noqa: PLR2004
+            assert instance.false_positive_rate == 0.01  # noqa: PLR2004
+            assert false_positives < 150  # noqa: PLR2004
+
+    def test_committed_state_persists(self) -> None:
+        """:class:`BloomKeyFilter` should persist its committed state to the
+        given file and refuse files created with other settings.
+        """  # noqa: D205
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "records.bloom"
+            with BloomKeyFilter(100, path=path) as instance:
+                instance.add_all(_keys(1))
+                instance.commit()
+                instance.add_all(_keys(2))
+                assert instance.path == path
+
+            with BloomKeyFilter(100, path=path) as instance:
+                assert instance.add_all(_keys(1, 2)) == [True, False]
+            with pytest.raises(ValueError, match="is not a Bloom filter"):
+                BloomKeyFilter(200, path=path)
+
+
+class TestDeduplicatingProcessor(TestCase):
+    """Tests for the
+    :class:`sghi.etl.deduplication.DeduplicatingProcessor` class.
+    """  # noqa: D205
+
+    def test_instantiation_fails_on_none_key_filter(self) -> None:
+        """:class:`DeduplicatingProcessor` constructor should raise a
+        :exc:`ValueError` when given a ``None`` key filter.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'key_filter' MUST not be"):
+            DeduplicatingProcessor(None)  # type: ignore
+
+    def test_apply_drops_records_with_seen_keys(self) -> None:
+        """:meth:`DeduplicatingProcessor.apply` should drop the records with
+        keys seen before, across chunks, and keep the order of the others.
+        """  # noqa: D205
+        with (
+            ExactKeyFilter() as key_filter,
+            DeduplicatingProcessor(key_filter, key=_record_id) as instance,
+        ):
+            first = instance.apply([{"id": 1}, {"id": 2}, {"id": 1}])
+            second = instance.apply([{"id": 3}, {"id": 2}])
+
+            assert first == [{"id": 1}, {"id": 2}]
+            assert second == [{"id": 3}]
+            assert instance.dropped == 2  # noqa: PLR2004
+
+    def test_apply_accepts_string_and_bytes_keys(self) -> None:
+        """:meth:`DeduplicatingProcessor.apply` should accept records that
+        are their own string or bytes keys.
+        """  # noqa: D205
+        with (
+            ExactKeyFilter() as key_filter,
+            DeduplicatingProcessor[Any](key_filter) as instance,
+        ):
+            assert instance.apply(["a", b"b", "a", b"c"]) == ["a", b"b", b"c"]
+            assert instance.apply(["a", b"c", "d"]) == ["d"]
+
+        instance.dispose()
+        assert instance.is_disposed
+
+
+class TestDeduplicatingWorkflowDefinition(TestCase):
+    """Tests for the
+    :class:`sghi.etl.deduplication.DeduplicatingWorkflowDefinition` class.
+    """  # noqa: D205
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._chunks: list[_Records] = [[{"id": 1}, {"id": 2}], [{"id": 1}]]
+        self._drained: _Records = []
+        self._fail: bool = False
+        self._key_filter: ExactKeyFilter = ExactKeyFilter()
+        self._workflow: ComponentsWorkflow[_Records, Iterable[_Record]] = (
+            ComponentsWorkflow(
+                source_factory=lambda: ChunksSource(self._chunks),
+                sink_factory=lambda: CollectSink(self._drained, self._fail),
+            )
+        )
+        self._instance: DeduplicatingWorkflowDefinition[_Records, _Record]
+        self._instance = DeduplicatingWorkflowDefinition(
+            self._workflow,
+            self._key_filter,
+            key=_record_id,
+        )
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._instance.dispose()
+        self._key_filter.dispose()
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`DeduplicatingWorkflowDefinition` constructor should raise
+        a :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'workflow' MUST not be None."):
+            DeduplicatingWorkflowDefinition(
+                None,  # type: ignore
+                self._key_filter,
+            )
+        with pytest.raises(ValueError, match="'database' MUST not be given"):
+            DeduplicatingWorkflowDefinition(
+                self._workflow,
+                self._key_filter,
+                database="keys.db",
+            )
+
+    def test_records_are_loaded_once_across_runs(self) -> None:
+        """:class:`DeduplicatingWorkflowDefinition` should load each record
+        once, across successful runs.
+        """  # noqa: D205
+        executor = PipelinedWorkflowExecutor()
+        executor.execute(self._instance)
+        self._chunks.append([{"id": 3}])
+        executor.execute(self._instance)
+
+        assert self._instance.id == self._workflow.id
+        assert self._instance.name == self._workflow.name
+        assert self._instance.description is None
+        assert self._instance.key_filter is self._key_filter
+        assert self._drained == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+    def test_records_of_failed_runs_are_loaded_again(self) -> None:
+        """:class:`DeduplicatingWorkflowDefinition` should not remember the
+        records of a run whose sink failed.
+        """  # noqa: D205
+        executor = PipelinedWorkflowExecutor()
+        self._fail = True
+        with pytest.raises(RuntimeError, match="Failed to drain"):
+            executor.execute(self._instance)
+        self._fail = False
+        executor.execute(self._instance)
+
+        assert self._drained == [{"id": 1}, {"id": 2}]
+
+    def test_drain_commits_the_drained_records(self) -> None:
+        """The sinks of a :class:`DeduplicatingWorkflowDefinition` should
+        commit the keys of the records they drain without streaming.
+        """  # noqa: D205
+        with (
+            self._instance.processor_factory() as processor,
+            self._instance.sink_factory() as sink,
+        ):
+            sink.drain(processor.apply([{"id": 1}, {"id": 2}]))
+
+        assert _unseen_ids(self._key_filter, 1, 2, 3) == [3]
+
+    def test_only_the_records_taken_by_the_sink_are_committed(self) -> None:
+        """The sinks of a :class:`DeduplicatingWorkflowDefinition` should
+        only commit the keys of the chunks that the wrapped sink took, when
+        it returns before the end of a stream.
+        """  # noqa: D205
+        self._chunks.append([{"id": 3}, {"id": 4}])
+        instance = DeduplicatingWorkflowDefinition(
+            ComponentsWorkflow(
+                source_factory=lambda: ChunksSource(self._chunks),
+                sink_factory=lambda: FirstChunkSink(self._drained),
+            ),
+            self._key_filter,
+            key=_record_id,
+        )
+        with (
+            instance.processor_factory() as processor,
+            instance.sink_factory() as sink,
+        ):
+            # Process the whole stream ahead of the sink.
+            processed = [processor.apply(_chunk) for _chunk in self._chunks]
+            sink.drain_stream(processed)
+
+        assert self._drained == [{"id": 1}, {"id": 2}]
+        assert _unseen_ids(self._key_filter, 1, 2, 3, 4) == [3, 4]
+
+    def test_records_of_chunks_not_taken_are_loaded_again(self) -> None:
+        """:class:`DeduplicatingWorkflowDefinition` should load the records
+        of the chunks that the sink did not take on the next run.
+        """  # noqa: D205
+        self._chunks[1] = [{"id": 3}]
+        sinks: list[type[CollectSink[Any]]] = [FirstChunkSink, CollectSink]
+        instance = DeduplicatingWorkflowDefinition(
+            ComponentsWorkflow(
+                source_factory=lambda: ChunksSource(self._chunks),
+                sink_factory=lambda: sinks.pop(0)(self._drained),
+            ),
+            self._key_filter,
+            key=_record_id,
+        )
+        executor = PipelinedWorkflowExecutor()
+        executor.execute(instance)
+        executor.execute(instance)
+
+        assert self._drained == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+    def test_sinks_are_bound_to_processors(self) -> None:
+        """:class:`DeduplicatingWorkflowDefinition` should refuse to create
+        a sink before a processor on the same thread.
+        """  # noqa: D205
+        with pytest.raises(RuntimeError, match="MUST be created before"):
+            self._instance.sink_factory()
+
+    def test_default_filter_is_namespaced_by_the_workflow_id(self) -> None:
+        """:class:`DeduplicatingWorkflowDefinition` should, by default,
+        remember the keys of the loaded records under the id of the
+        wrapped workflow, and dispose the filter it created.
+        """  # noqa: D205
+        executor = PipelinedWorkflowExecutor()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            database = Path(temp_dir) / "keys.db"
+            with DeduplicatingWorkflowDefinition(
+                self._workflow,
+                key=_record_id,
+                database=database,
+            ) as instance:
+                executor.execute(instance)
+                key_filter = instance.key_filter
+                assert isinstance(key_filter, ExactKeyFilter)
+                assert key_filter.database == database
+                assert key_filter.namespace == self._workflow.id
+            with DeduplicatingWorkflowDefinition(
+                self._workflow,
+                key=_record_id,
+                database=database,
+            ) as instance:
+                executor.execute(instance)
+            instance.dispose()
+
+        assert key_filter.is_disposed
+        assert instance.is_disposed
+        assert not self._key_filter.is_disposed
+        assert self._drained == [{"id": 1}, {"id": 2}]
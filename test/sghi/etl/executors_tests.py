@@ -0,0 +1,1498 @@
+"""Tests for the ``sghi.etl.executors`` module."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, TypeVar, cast
+from unittest import TestCase
+from unittest.mock import patch
+
+import pytest
+from typing_extensions import override
+
+from sghi.disposable import ResourceDisposedError, not_disposed
+from sghi.etl.core import Processor, Sink, Source, WorkflowDefinition
+from sghi.etl.executors import (
+    DistributedWorkflowExecutor,
+    GraphWorkflowExecutor,
+    PipelinedWorkflowExecutor,
+    ProcessPoolWorkflowExecutor,
+    WorkerError,
+    WorkflowExecutor,
+    _run_partition_worker,  # pyright: ignore[reportPrivateUsage]
+    _run_worker,  # pyright: ignore[reportPrivateUsage]
+    _Task,  # pyright: ignore[reportPrivateUsage]
+)
+from sghi.etl.graphs import (
+    GraphWorkflowDefinition,
+    Node,
+    ProcessorNode,
+    SinkNode,
+    SourceNode,
+)
+from sghi.etl.instrumentation import (
+    InMemoryExporter,
+    Stage,
+    register_exporter,
+    unregister_exporter,
+)
+from sghi.etl.registry import LazyWorkflowDefinition, WorkflowReference
+from sghi.etl.sources import PartitionedSource
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Sequence
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+_T = TypeVar("_T")
+
+_LAZY_OUTPUT_VARIABLE = "SGHI_ETL_TEST_LAZY_OUTPUT"
+"""The environment variable holding the output path of the lazy workflow."""
+
+
+class SinkError(RuntimeError):
+    """An error that cannot be unpickled, since its constructor takes more
+    arguments than it passes to :class:`BaseException`.
+    """  # noqa: D205
+
+    def __init__(self, path: str, message: str) -> None:
+        """Create a new ``SinkError`` for the sink writing to ``path``."""
+        super().__init__(f"{message} ({path})")
+
+
+@dataclass(slots=True)
+class ChunkedIntsSupplier(Source[list[int]]):
+    """A :class:`Source` that supplies integers in chunks."""
+
+    max_ints: int = field(default=10)
+    chunk_size: int = field(default=3)
+    on_chunk: Callable[[int], None] = field(default=lambda _: None)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw(self) -> list[int]:
+        return list(range(self.max_ints))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+    @not_disposed
+    @override
+    def stream(self) -> Iterator[list[int]]:
+        starts = range(0, self.max_ints, self.chunk_size)
+        for index, start in enumerate(starts):
+            self.on_chunk(index)
+            stop = min(start + self.chunk_size, self.max_ints)
+            yield list(range(start, stop))
+
+
+@dataclass(slots=True)
+class IntsToStrings(Processor[list[int], list[str]]):
+    """A :class:`Processor` that takes ints and converts them to strings."""
+
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: list[int]) -> list[str]:
+        return list(map(str, raw_data))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class CollectToList(Sink[list[str]]):
+    """A :class:`Sink` that collects all the values it receives in a list."""
+
+    collection_target: list[str] = field(default_factory=list)
+    on_chunk: Callable[[list[str]], None] = field(default=lambda _: None)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: list[str]) -> None:
+        self.on_chunk(processed_data)
+        self.collection_target.extend(processed_data)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class TakeFirstChunk(CollectToList):
+    """A :class:`Sink` that only consumes the first chunk it receives."""
+
+    @not_disposed
+    @override
+    def drain_stream(self, processed_data_chunks: Iterable[list[str]]) -> None:
+        for processed_data in processed_data_chunks:  # pragma: no branch
+            self.drain(processed_data)
+            return
+
+
+@dataclass(slots=True)
+class RecordingWorkflowDefinition(WorkflowDefinition[list[int], list[str]]):
+    """A :class:`WorkflowDefinition` that records the components it makes."""
+
+    source: Source[list[int]] = field(default_factory=ChunkedIntsSupplier)
+    processor: Processor[list[int], list[str]] = field(
+        default_factory=IntsToStrings,
+    )
+    sink: Sink[list[str]] = field(default_factory=CollectToList)
+    prologue_error: BaseException | None = field(default=None)
+    calls: list[str] = field(default_factory=list)
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return None
+
+    @property
+    @override
+    def id(self) -> str:
+        return "test"
+
+    @property
+    @override
+    def name(self) -> str:
+        return "Test Workflow"
+
+    @property
+    @override
+    def processor_factory(
+        self,
+    ) -> Callable[[], Processor[list[int], list[str]]]:
+        return lambda: self._record("processor_factory", self.processor)
+
+    @property
+    @override
+    def sink_factory(self) -> Callable[[], Sink[list[str]]]:
+        return lambda: self._record("sink_factory", self.sink)
+
+    @property
+    @override
+    def source_factory(self) -> Callable[[], Source[list[int]]]:
+        return lambda: self._record("source_factory", self.source)
+
+    @property
+    @override
+    def prologue(self) -> Callable[[], None]:
+        def _prologue() -> None:
+            self.calls.append("prologue")
+            if self.prologue_error is not None:
+                raise self.prologue_error
+
+        return _prologue
+
+    @property
+    @override
+    def epilogue(self) -> Callable[[], None]:
+        return lambda: self.calls.append("epilogue")
+
+    def _record(self, call: str, value: _T) -> _T:
+        self.calls.append(call)
+        return value
+
+
+@dataclass(slots=True)
+class CountingSource(Source[list[int]]):
+    """A :class:`Source` that counts the number of times it is drawn from."""
+
+    draws: int = field(default=0)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw(self) -> list[int]:
+        self.draws += 1
+        return [self.draws]
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class AppendToFile(Sink[list[str]]):
+    """A :class:`Sink` that appends the values it receives, together with
+    the id of the current process, to a file.
+    """  # noqa: D205
+
+    path: str
+    fail: bool = field(default=False)
+    unpicklable_error: bool = field(default=False)
+    dispose_delay: float = field(default=0.0)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: list[str]) -> None:
+        if self.unpicklable_error:
+            raise SinkError(self.path, "Sink failed.")
+        if self.fail:
+            _err_msg: str = "Sink failed."
+            raise RuntimeError(_err_msg)
+        with Path(self.path).open("a", encoding="utf-8") as output:
+            for value in processed_data:
+                output.write(f"{os.getpid()} {value}\n")
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        time.sleep(self.dispose_delay)
+        self._is_disposed = True
+
+
+@dataclass(frozen=True, slots=True)
+class FileWorkflowDefinition(WorkflowDefinition[list[int], list[str]]):
+    """A picklable :class:`WorkflowDefinition` that writes to a file."""
+
+    path: str
+    fail: bool = field(default=False)
+    workflow_id: str = field(default="file")
+    unpicklable_error: bool = field(default=False)
+    dispose_delay: float = field(default=0.0)
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return None
+
+    @property
+    @override
+    def id(self) -> str:
+        return self.workflow_id
+
+    @property
+    @override
+    def name(self) -> str:
+        return "File Workflow"
+
+    @property
+    @override
+    def processor_factory(
+        self,
+    ) -> Callable[[], Processor[list[int], list[str]]]:
+        return IntsToStrings
+
+    @property
+    @override
+    def sink_factory(self) -> Callable[[], Sink[list[str]]]:
+        return partial(
+            AppendToFile,
+            self.path,
+            self.fail,
+            self.unpicklable_error,
+            self.dispose_delay,
+        )
+
+    @property
+    @override
+    def source_factory(self) -> Callable[[], Source[list[int]]]:
+        return CountingSource
+
+
+def make_lazy_file_workflow() -> FileWorkflowDefinition:
+    """Create the workflow referenced by the lazily loaded workflow tests."""
+    return FileWorkflowDefinition(
+        path=os.environ[_LAZY_OUTPUT_VARIABLE],
+        workflow_id="lazy",
+    )
+
+
+@dataclass(slots=True)
+class RangePartitions(PartitionedSource[list[int], int]):
+    """A :class:`PartitionedSource` whose partitions are consecutive ranges
+    of integers.
+
+    Drawing partition ``0`` misbehaves as directed by ``behaviour``, on the
+    first attempt or on every attempt, using a marker file in ``directory``
+    to detect the first attempt.
+    """  # noqa: D205
+
+    count: int
+    directory: str
+    behaviour: str | None = field(default=None)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw(self) -> list[int]:
+        return [
+            _value
+            for _partition in self.partitions()
+            for _value in self.draw_partition(_partition)
+        ]
+
+    @not_disposed
+    @override
+    def draw_partition(self, partition: int) -> list[int]:
+        if partition == 1 and self.behaviour == "copy_first":
+            # Keep the run going until partition 0 completes, twice.
+            time.sleep(1)
+        if partition == 0 and self.behaviour is not None:
+            marker = Path(self.directory) / "marker"
+            first_attempt: bool = not marker.exists()
+            marker.touch()
+            self._misbehave(first_attempt=first_attempt)
+        return [partition * 2, partition * 2 + 1]
+
+    @not_disposed
+    @override
+    def partitions(self) -> list[int]:
+        return list(range(self.count))
+
+    def _misbehave(self, *, first_attempt: bool) -> None:
+        match self.behaviour:
+            case "crash" if first_attempt:
+                os._exit(1)
+            case "crash_always":
+                os._exit(1)
+            case "copy_first" if first_attempt:
+                time.sleep(0.6)
+            case "crash_while_copied":
+                # Crash while a copy of the partition is still running.
+                time.sleep(0.5 if first_attempt else 1)
+                if first_attempt:
+                    os._exit(1)
+            case "fail":
+                _err_msg: str = "Partition failed."
+                raise RuntimeError(_err_msg)
+            case "slow":
+                time.sleep(0.5)
+            case "straggle" if first_attempt:
+                time.sleep(30)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class TagWithPid(Processor[list[int], list[str]]):
+    """A :class:`Processor` that converts ints to strings prefixed with the
+    id of the current process.
+
+    The processor fails to instantiate, or returns data that cannot be
+    pickled, when ``behaviour`` is ``"setup"`` or ``"unpicklable"``
+    respectively.
+    """  # noqa: D205
+
+    behaviour: str | None = field(default=None)
+    _is_disposed: bool = field(default=False, init=False)
+
+    def __post_init__(self) -> None:
+        """Fail if directed to by ``behaviour``."""
+        if self.behaviour == "setup":
+            _err_msg: str = "Setup failed."
+            raise RuntimeError(_err_msg)
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: list[int]) -> list[str]:
+        if self.behaviour == "unpicklable":
+            return cast("list[str]", [threading.Lock()])
+        return [f"{os.getpid()} {_value}" for _value in raw_data]
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class PartitionedWorkflowDefinition(
+    WorkflowDefinition[list[int], list[str]],
+):
+    """A picklable :class:`WorkflowDefinition` with a partitioned source."""
+
+    directory: str
+    count: int = field(default=6)
+    behaviour: str | None = field(default=None)
+    drained: list[str] = field(default_factory=list)
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return None
+
+    @property
+    @override
+    def id(self) -> str:
+        return "partitioned"
+
+    @property
+    @override
+    def name(self) -> str:
+        return "Partitioned Workflow"
+
+    @property
+    @override
+    def processor_factory(
+        self,
+    ) -> Callable[[], Processor[list[int], list[str]]]:
+        return partial(TagWithPid, self.behaviour)
+
+    @property
+    @override
+    def sink_factory(self) -> Callable[[], Sink[list[str]]]:
+        return partial(CollectToList, self.drained)
+
+    @property
+    @override
+    def source_factory(self) -> Callable[[], Source[list[int]]]:
+        return partial(
+            RangePartitions,
+            self.count,
+            self.directory,
+            self.behaviour,
+        )
+
+
+class RecordingGraphWorkflowDefinition(GraphWorkflowDefinition):
+    """A :class:`GraphWorkflowDefinition` with settable nodes that records
+    its prologue and epilogue calls.
+    """  # noqa: D205
+
+    __slots__ = ("_nodes", "calls")
+
+    def __init__(self) -> None:
+        """Create a new ``RecordingGraphWorkflowDefinition`` without nodes."""
+        super().__init__()
+        self._nodes: Sequence[Node] = []
+        self.calls: list[str] = []
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return None
+
+    @property
+    @override
+    def id(self) -> str:
+        return "graph"
+
+    @property
+    @override
+    def name(self) -> str:
+        return "Graph Workflow"
+
+    @property
+    @override
+    def nodes(self) -> Sequence[Node]:
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, nodes: Sequence[Node]) -> None:
+        self._nodes = nodes
+
+    @property
+    @override
+    def epilogue(self) -> Callable[[], None]:
+        return lambda: self.calls.append("epilogue")
+
+    @property
+    @override
+    def prologue(self) -> Callable[[], None]:
+        return lambda: self.calls.append("prologue")
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestPipelinedWorkflowExecutor(TestCase):
+    """Tests for the :class:`sghi.etl.executors.PipelinedWorkflowExecutor`."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._collected: list[str] = []
+        self._workflow = RecordingWorkflowDefinition(
+            sink=CollectToList(collection_target=self._collected),
+        )
+        self._instance: PipelinedWorkflowExecutor = PipelinedWorkflowExecutor()
+
+    def test_instantiation_fails_on_invalid_queue_size_value(self) -> None:
+        """:class:`PipelinedWorkflowExecutor` constructor should raise a
+        :exc:`ValueError` when given a ``queue_size`` that is NOT greater than
+        zero.
+        """  # noqa: D205
+        for queue_size in (-1, 0):
+            with pytest.raises(ValueError, match="MUST be greater than zero"):
+                PipelinedWorkflowExecutor(queue_size=queue_size)
+
+    def test_queue_size_return_value(self) -> None:
+        """:attr:`PipelinedWorkflowExecutor.queue_size` should return the
+        value given at instantiation.
+        """  # noqa: D205
+        assert self._instance.queue_size == 2  # noqa: PLR2004
+        assert PipelinedWorkflowExecutor(queue_size=5).queue_size == 5  # noqa: PLR2004
+
+    def test_execute_fails_on_none_workflow(self) -> None:
+        """:meth:`PipelinedWorkflowExecutor.execute` should raise a
+        :exc:`ValueError` when given a ``None`` workflow.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'workflow' MUST not be None."):
+            self._instance.execute(None)  # type: ignore
+
+    def test_execute_runs_the_whole_workflow(self) -> None:
+        """:meth:`PipelinedWorkflowExecutor.execute` should run every stage of
+        the workflow, in order, and dispose all the workflow's components.
+        """  # noqa: D205
+        self._instance.execute(self._workflow)
+
+        assert self._collected == [str(_i) for _i in range(10)]
+        assert self._workflow.calls == [
+            "prologue",
+            "source_factory",
+            "processor_factory",
+            "sink_factory",
+            "epilogue",
+        ]
+        assert self._workflow.source.is_disposed
+        assert self._workflow.processor.is_disposed
+        assert self._workflow.sink.is_disposed
+
+    def test_invoking_executor_as_a_callable_delegates_to_execute(
+        self,
+    ) -> None:
+        """Invoking a :class:`WorkflowExecutor` as a callable should delegate
+        the actual call to :meth:`WorkflowExecutor.execute`.
+        """  # noqa: D205
+        executor: WorkflowExecutor = self._instance
+        executor(self._workflow)
+
+        assert self._collected == [str(_i) for _i in range(10)]
+
+    def test_execute_overlaps_the_workflow_stages(self) -> None:
+        """:meth:`PipelinedWorkflowExecutor.execute` should run the stages of
+        a workflow concurrently.
+
+        The source used here refuses to produce its second chunk until the
+        sink has consumed the first one, something that can only happen if
+        the stages overlap.
+        """  # noqa: D205
+        first_chunk_drained = threading.Event()
+
+        def on_source_chunk(index: int) -> None:
+            if index == 1:
+                assert first_chunk_drained.wait(timeout=5)
+
+        self._workflow.source = ChunkedIntsSupplier(on_chunk=on_source_chunk)
+        self._workflow.sink = CollectToList(
+            collection_target=self._collected,
+            on_chunk=lambda _: first_chunk_drained.set(),
+        )
+        self._instance.execute(self._workflow)
+
+        assert self._collected == [str(_i) for _i in range(10)]
+
+    def test_execute_holds_back_stages_ahead_of_a_slow_sink(self) -> None:
+        """:meth:`PipelinedWorkflowExecutor.execute` should make the stages
+        ahead of a slow sink wait for room in the bounded queues, and then
+        resume.
+        """  # noqa: D205
+        chunks_drawn: list[int] = []
+        drawn_while_draining: list[int] = []
+
+        def on_sink_chunk(_: list[str]) -> None:
+            if not self._collected:
+                # Give the upstream stages time to fill the queues and wait.
+                time.sleep(0.5)
+                drawn_while_draining.append(len(chunks_drawn))
+
+        self._workflow.source = ChunkedIntsSupplier(
+            on_chunk=chunks_drawn.append,
+        )
+        self._workflow.sink = CollectToList(
+            collection_target=self._collected,
+            on_chunk=on_sink_chunk,
+        )
+        PipelinedWorkflowExecutor(queue_size=1).execute(self._workflow)
+
+        # One chunk in the sink, one in each queue and one in each of the
+        # source and processor stages.
+        assert drawn_while_draining[0] <= 5  # noqa: PLR2004
+        assert self._collected == [str(_i) for _i in range(10)]
+
+    def test_execute_does_not_run_the_workflow_if_the_prologue_fails(
+        self,
+    ) -> None:
+        """:meth:`PipelinedWorkflowExecutor.execute` should only run the
+        epilogue if the prologue fails, and propagate the prologue's error.
+        """  # noqa: D205
+        self._workflow.prologue_error = RuntimeError("Prologue failed.")
+
+        with pytest.raises(RuntimeError, match="Prologue failed."):
+            self._instance.execute(self._workflow)
+
+        assert self._workflow.calls == ["prologue", "epilogue"]
+        assert not self._collected
+
+    def test_execute_propagates_errors_raised_by_the_source(self) -> None:
+        """:meth:`PipelinedWorkflowExecutor.execute` should stop the workflow
+        and propagate the error raised by a failing source.
+        """  # noqa: D205
+
+        def on_source_chunk(index: int) -> None:
+            if index == 2:  # noqa: PLR2004
+                _err_msg: str = "Source failed."
+                raise RuntimeError(_err_msg)
+
+        self._workflow.source = ChunkedIntsSupplier(on_chunk=on_source_chunk)
+        with pytest.raises(RuntimeError, match="Source failed."):
+            self._instance.execute(self._workflow)
+
+        assert self._workflow.calls[-1] == "epilogue"
+        assert self._workflow.source.is_disposed
+        assert self._workflow.processor.is_disposed
+        assert self._workflow.sink.is_disposed
+
+    def test_execute_propagates_errors_raised_by_the_sink(self) -> None:
+        """:meth:`PipelinedWorkflowExecutor.execute` should stop the workflow
+        and propagate the error raised by a failing sink, even while the
+        upstream stages are blocked on full queues.
+        """  # noqa: D205
+
+        def on_sink_chunk(_: list[str]) -> None:
+            _err_msg: str = "Sink failed."
+            raise RuntimeError(_err_msg)
+
+        self._workflow.source = ChunkedIntsSupplier(max_ints=100, chunk_size=1)
+        self._workflow.sink = CollectToList(on_chunk=on_sink_chunk)
+        with pytest.raises(RuntimeError, match="Sink failed."):
+            PipelinedWorkflowExecutor(queue_size=1).execute(self._workflow)
+
+        assert self._workflow.calls[-1] == "epilogue"
+        assert self._workflow.sink.is_disposed
+
+    def test_execute_completes_when_the_sink_stops_consuming_early(
+        self,
+    ) -> None:
+        """:meth:`PipelinedWorkflowExecutor.execute` should complete, without
+        blocking, when the sink returns before consuming every chunk.
+        """  # noqa: D205
+        self._workflow.source = ChunkedIntsSupplier(max_ints=100, chunk_size=1)
+        self._workflow.sink = TakeFirstChunk(collection_target=self._collected)
+        PipelinedWorkflowExecutor(queue_size=1).execute(self._workflow)
+
+        assert self._collected == ["0"]
+        assert self._workflow.calls[-1] == "epilogue"
+
+    def test_execute_stops_stages_waiting_on_a_failed_stage(self) -> None:
+        """:meth:`PipelinedWorkflowExecutor.execute` should stop the stages
+        waiting for chunks from a failing stage, whether or not the chunks
+        are spilled to disk.
+        """  # noqa: D205
+
+        def on_source_chunk(_: int) -> None:
+            # Let the downstream stages wait on an empty hand-off first.
+            time.sleep(0.25)
+            _err_msg: str = "Source failed."
+            raise RuntimeError(_err_msg)
+
+        for memory_budget in (None, 0):
+            workflow = RecordingWorkflowDefinition(
+                source=ChunkedIntsSupplier(on_chunk=on_source_chunk),
+            )
+            instance = PipelinedWorkflowExecutor(memory_budget=memory_budget)
+            with pytest.raises(RuntimeError, match="Source failed."):
+                instance.execute(workflow)
+
+            assert workflow.calls[-1] == "epilogue"
+            assert workflow.sink.is_disposed
+
+    def test_execute_stops_the_source_when_the_sink_fails_while_spilling(
+        self,
+    ) -> None:
+        """:meth:`PipelinedWorkflowExecutor.execute` should stop the source
+        once the sink fails, even though the chunks between the stages are
+        spilled to disk and thus never block the source.
+        """  # noqa: D205
+        drawn: list[int] = []
+
+        def on_source_chunk(index: int) -> None:
+            drawn.append(index)
+            time.sleep(0.01)
+
+        def on_sink_chunk(_: list[str]) -> None:
+            _err_msg: str = "Sink failed."
+            raise RuntimeError(_err_msg)
+
+        self._workflow.source = ChunkedIntsSupplier(
+            max_ints=1000,
+            chunk_size=1,
+            on_chunk=on_source_chunk,
+        )
+        self._workflow.sink = CollectToList(on_chunk=on_sink_chunk)
+        with pytest.raises(RuntimeError, match="Sink failed."):
+            PipelinedWorkflowExecutor(memory_budget=0).execute(self._workflow)
+
+        assert len(drawn) < 1000  # noqa: PLR2004
+        assert self._workflow.source.is_disposed
+
+    def test_instantiation_fails_on_negative_memory_budget(self) -> None:
+        """:class:`PipelinedWorkflowExecutor` constructor should raise a
+        :exc:`ValueError` when given a negative ``memory_budget``.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'memory_budget' MUST not be"):
+            PipelinedWorkflowExecutor(memory_budget=-1)
+
+    def test_execute_spills_chunks_beyond_the_memory_budget(self) -> None:
+        """:meth:`PipelinedWorkflowExecutor.execute` should run the whole
+        workflow when the chunks between the stages are spilled to disk, and
+        should let the source run ahead of a slow sink.
+        """  # noqa: D205
+        source_done = threading.Event()
+
+        def on_source_chunk(index: int) -> None:
+            if index == 19:  # noqa: PLR2004
+                source_done.set()
+
+        def on_sink_chunk(_: list[str]) -> None:
+            assert source_done.wait(timeout=5)
+
+        self._workflow.source = ChunkedIntsSupplier(
+            max_ints=20,
+            chunk_size=1,
+            on_chunk=on_source_chunk,
+        )
+        self._workflow.sink = CollectToList(
+            collection_target=self._collected,
+            on_chunk=on_sink_chunk,
+        )
+        instance = PipelinedWorkflowExecutor(memory_budget=0)
+        instance.execute(self._workflow)
+
+        assert instance.memory_budget == 0
+        assert self._collected == [str(_i) for _i in range(20)]
+        assert self._workflow.calls[-1] == "epilogue"
+        assert self._workflow.sink.is_disposed
+
+
+class TestProcessPoolWorkflowExecutor(TestCase):
+    """Tests for the :class:`sghi.etl.executors.ProcessPoolWorkflowExecutor`
+    class.
+    """  # noqa: D205
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._output: Path = Path(self._temp_dir.name) / "output.txt"
+        self._workflow = FileWorkflowDefinition(path=str(self._output))
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._temp_dir.cleanup()
+
+    def _read_output(self) -> list[tuple[int, str]]:
+        lines = self._output.read_text(encoding="utf-8").splitlines()
+        return [
+            (int(_pid), _value)
+            for _pid, _value in (_line.split() for _line in lines)
+        ]
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`ProcessPoolWorkflowExecutor` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'max_workers' MUST be"):
+            ProcessPoolWorkflowExecutor(max_workers=0)
+        with pytest.raises(ValueError, match="'max_runs_per_worker' MUST"):
+            ProcessPoolWorkflowExecutor(max_runs_per_worker=0)
+        with pytest.raises(ValueError, match="'memory_limit' MUST be"):
+            ProcessPoolWorkflowExecutor(memory_limit=0)
+
+    def test_execute_runs_workflows_in_a_reused_worker(self) -> None:
+        """:meth:`ProcessPoolWorkflowExecutor.execute` should run workflows
+        in a worker process that is kept alive between runs.
+        """  # noqa: D205
+        with ProcessPoolWorkflowExecutor(max_workers=1) as instance:
+            instance.execute(self._workflow)
+            instance.execute(self._workflow)
+
+            assert instance.max_workers == 1
+            assert not instance.reuse_components
+
+        (first_pid, first), (second_pid, second) = self._read_output()
+        assert first_pid == second_pid != os.getpid()
+        assert first == second == "1"
+
+    def test_execute_propagates_workflow_errors(self) -> None:
+        """:meth:`ProcessPoolWorkflowExecutor.execute` should raise the
+        errors raised while running a workflow in the worker process.
+        """  # noqa: D205
+        workflow = FileWorkflowDefinition(path=str(self._output), fail=True)
+        with ProcessPoolWorkflowExecutor(max_workers=1) as instance:
+            with pytest.raises(RuntimeError, match="Sink failed.") as exp:
+                instance.execute(workflow)
+            assert any(
+                "Raised in worker process" in _note
+                for _note in exp.value.__notes__
+            )
+            instance.execute(self._workflow)
+
+        assert len(self._read_output()) == 1
+
+    def test_execute_wraps_errors_that_cannot_be_sent_back(self) -> None:
+        """:meth:`ProcessPoolWorkflowExecutor.execute` should raise a
+        :exc:`WorkerError` describing errors that cannot be pickled.
+        """  # noqa: D205
+        workflow = FileWorkflowDefinition(
+            path=str(self._output),
+            unpicklable_error=True,
+        )
+        with (
+            ProcessPoolWorkflowExecutor(max_workers=1) as instance,
+            pytest.raises(WorkerError, match="SinkError: Sink failed."),
+        ):
+            instance.execute(workflow)
+
+    def test_execute_loads_lazy_workflows_in_the_worker(self) -> None:
+        """:meth:`ProcessPoolWorkflowExecutor.execute` should only send the
+        reference of a :class:`LazyWorkflowDefinition` to the worker, which
+        loads the workflow itself.
+        """  # noqa: D205
+        workflow = LazyWorkflowDefinition(
+            WorkflowReference("lazy", f"{__name__}:make_lazy_file_workflow"),
+        )
+        with (
+            patch.dict(os.environ, {_LAZY_OUTPUT_VARIABLE: str(self._output)}),
+            ProcessPoolWorkflowExecutor(
+                max_workers=1,
+                start_method="fork",
+            ) as instance,
+        ):
+            instance.execute(workflow)
+
+        assert not workflow.is_loaded
+        ((pid, value),) = self._read_output()
+        assert pid != os.getpid()
+        assert value == "1"
+
+    def test_execute_fails_on_workflows_that_cannot_be_sent(self) -> None:
+        """:meth:`ProcessPoolWorkflowExecutor.execute` should raise a
+        :exc:`TypeError` when given a workflow that cannot be pickled.
+        """  # noqa: D205
+        with (
+            ProcessPoolWorkflowExecutor(max_workers=1) as instance,
+            pytest.raises(TypeError, match="MUST be picklable"),
+        ):
+            instance.execute(RecordingWorkflowDefinition())
+
+    def test_workers_are_recycled(self) -> None:
+        """:class:`ProcessPoolWorkflowExecutor` should replace workers after
+        ``max_runs_per_worker`` runs or once they exceed ``memory_limit``.
+        """  # noqa: D205
+        for options in ({"max_runs_per_worker": 1}, {"memory_limit": 1}):
+            self._output.unlink(missing_ok=True)
+            with ProcessPoolWorkflowExecutor(
+                max_workers=1,
+                **options,  # type: ignore[arg-type]
+            ) as instance:
+                instance.execute(self._workflow)
+                instance.execute(self._workflow)
+
+            (first_pid, _), (second_pid, _) = self._read_output()
+            assert first_pid != second_pid
+
+    def test_memory_usage_falls_back_to_the_peak_usage(self) -> None:
+        """:class:`ProcessPoolWorkflowExecutor` should recycle workers based
+        on their peak memory usage where their current memory usage is not
+        available.
+        """  # noqa: D205
+        # Forked workers inherit the patch, hiding "/proc/self/statm".
+        with (
+            patch.object(Path, "read_text", side_effect=OSError),
+            ProcessPoolWorkflowExecutor(
+                max_workers=1,
+                memory_limit=1,
+                start_method="fork",
+            ) as instance,
+        ):
+            instance.execute(self._workflow)
+            instance.execute(self._workflow)
+
+        (first_pid, _), (second_pid, _) = self._read_output()
+        assert first_pid != second_pid
+
+    def test_workers_that_do_not_stop_in_time_are_terminated(self) -> None:
+        """:class:`ProcessPoolWorkflowExecutor` should terminate workers that
+        do not exit in time once asked to stop.
+        """  # noqa: D205
+        workflow = FileWorkflowDefinition(
+            path=str(self._output),
+            dispose_delay=30,
+        )
+        with patch("sghi.etl.executors._WORKER_STOP_TIMEOUT", 0.5):
+            started_at = time.monotonic()
+            with ProcessPoolWorkflowExecutor(
+                max_workers=1,
+                reuse_components=True,
+            ) as instance:
+                # The components are only disposed when the worker stops.
+                instance.execute(workflow)
+
+        assert time.monotonic() - started_at < 10  # noqa: PLR2004
+        assert len(self._read_output()) == 1
+
+    def test_components_are_rebuilt_after_a_failed_run(self) -> None:
+        """:class:`ProcessPoolWorkflowExecutor` should discard the components
+        of a workflow whose run fails when ``reuse_components`` is ``True``.
+        """  # noqa: D205
+        failing = FileWorkflowDefinition(path=str(self._output), fail=True)
+        with ProcessPoolWorkflowExecutor(
+            max_workers=1,
+            reuse_components=True,
+        ) as instance:
+            with pytest.raises(RuntimeError, match="Sink failed."):
+                instance.execute(failing)
+            # Both workflows share an id, but the failing sink is discarded.
+            instance.execute(self._workflow)
+            instance.execute(self._workflow)
+
+        assert [_value for _, _value in self._read_output()] == ["1", "2"]
+
+    def test_components_are_reused_when_enabled(self) -> None:
+        """:class:`ProcessPoolWorkflowExecutor` should keep the components of
+        a workflow for its later runs when ``reuse_components`` is ``True``.
+        """  # noqa: D205
+        with ProcessPoolWorkflowExecutor(
+            max_workers=1,
+            reuse_components=True,
+        ) as instance:
+            futures = [instance.submit(self._workflow) for _ in range(3)]
+            for future in futures:
+                assert future.result(timeout=30) is None
+
+        assert [_value for _, _value in self._read_output()] == [
+            "1",
+            "2",
+            "3",
+        ]
+
+    def test_a_dead_worker_is_reported_and_replaced(self) -> None:
+        """:meth:`ProcessPoolWorkflowExecutor.execute` should raise a
+        :exc:`WorkerError` when the worker process dies during a run.
+        """  # noqa: D205
+        workflow = FileWorkflowDefinition(
+            path=str(self._output),
+            workflow_id="exit",
+        )
+        with ProcessPoolWorkflowExecutor(max_workers=1) as instance:
+            instance.execute(self._workflow)
+            (worker,) = (
+                _process
+                for _process in multiprocessing.active_children()
+                if _process.name == "sghi-etl-worker"
+            )
+            worker.kill()
+            with pytest.raises(WorkerError, match="exited unexpectedly"):
+                instance.execute(workflow)
+            instance.execute(self._workflow)
+
+        assert len(self._read_output()) == 2  # noqa: PLR2004
+
+    def test_disposed_instances_reject_workflows(self) -> None:
+        """:class:`ProcessPoolWorkflowExecutor` should stop its workers when
+        disposed and reject workflows afterwards.
+        """  # noqa: D205
+        instance = ProcessPoolWorkflowExecutor(max_workers=1)
+        instance.execute(self._workflow)
+        instance.dispose()
+        instance.dispose()
+
+        assert instance.is_disposed
+        with pytest.raises(ResourceDisposedError):
+            instance.execute(self._workflow)
+        with pytest.raises(ResourceDisposedError):
+            instance.submit(self._workflow)
+
+    def test_disposal_rejects_runs_waiting_for_a_worker(self) -> None:
+        """:class:`ProcessPoolWorkflowExecutor` should make runs waiting for
+        a busy worker fail when disposed, and let the busy worker complete.
+        """  # noqa: D205
+        slow = FileWorkflowDefinition(path=str(self._output), dispose_delay=1)
+        errors: list[BaseException] = []
+
+        def execute() -> None:
+            try:
+                instance.execute(self._workflow)
+            except ResourceDisposedError as exp:
+                errors.append(exp)
+
+        instance = ProcessPoolWorkflowExecutor(max_workers=1)
+        future = instance.submit(slow)
+        time.sleep(0.2)
+        waiter = threading.Thread(target=execute)
+        waiter.start()
+        time.sleep(0.2)
+        instance.dispose()
+        waiter.join()
+
+        assert future.result() is None
+        assert len(errors) == 1
+        assert len(self._read_output()) == 1
+
+    def test_workers_stop_when_their_connection_closes(self) -> None:
+        """Worker processes should dispose their components and exit when
+        their connection to the parent process closes, e.g. when the parent
+        dies.
+        """  # noqa: D205
+        workflow = FileWorkflowDefinition(path=str(self._output))
+        parent_connection, child_connection = multiprocessing.Pipe()
+        worker = threading.Thread(
+            target=_run_worker,
+            args=(child_connection, True),
+        )
+        worker.start()
+        parent_connection.send(_Task.of(workflow))
+        outcome = parent_connection.recv()
+        parent_connection.close()
+        worker.join(timeout=10)
+
+        assert outcome.error is None
+        assert not worker.is_alive()
+        assert child_connection.closed
+
+
+class TestGraphWorkflowExecutor(TestCase):
+    """Tests for the :class:`sghi.etl.executors.GraphWorkflowExecutor`."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._chunks_drawn: list[int] = []
+        self._source = ChunkedIntsSupplier(
+            max_ints=20,
+            chunk_size=2,
+            on_chunk=self._chunks_drawn.append,
+        )
+        self._workflow = RecordingGraphWorkflowDefinition()
+
+    def test_instantiation_fails_on_invalid_queue_size_value(self) -> None:
+        """:class:`GraphWorkflowExecutor` constructor should raise a
+        :exc:`ValueError` when given a ``queue_size`` that is NOT greater than
+        zero.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'queue_size' MUST be greater"):
+            GraphWorkflowExecutor(queue_size=0)
+        instance = GraphWorkflowExecutor(queue_size=3)
+        assert instance.queue_size == 3  # noqa: PLR2004
+
+    def test_execute_fails_on_invalid_graphs(self) -> None:
+        """:meth:`GraphWorkflowExecutor.execute` should raise a
+        :exc:`ValueError`, without running anything, when the nodes of the
+        workflow do not form a valid graph.
+        """  # noqa: D205
+        source = SourceNode("source", ChunkedIntsSupplier)
+        invalid_graphs: list[tuple[list[Node], str]] = [
+            ([source, source], "is not unique"),
+            ([source, SinkNode("sink", CollectToList, "nope")], "MUST be the"),
+            (
+                [
+                    source,
+                    SinkNode("a", CollectToList, "source"),
+                    SinkNode("b", CollectToList, "a"),
+                ],
+                "MUST be the id of a source or processor",
+            ),
+            (
+                [
+                    source,
+                    SinkNode("sink", CollectToList, "source"),
+                    ProcessorNode("a", IntsToStrings, "b"),
+                    ProcessorNode("b", IntsToStrings, "a"),
+                ],
+                "contains a cycle",
+            ),
+            (
+                [source, ProcessorNode("p", IntsToStrings, "source")],
+                "'p' is not consumed",
+            ),
+            ([], "at least one sink"),
+        ]
+        for nodes, message in invalid_graphs:
+            self._workflow.nodes = nodes
+            with pytest.raises(ValueError, match=message):
+                GraphWorkflowExecutor().execute(self._workflow)
+        assert self._workflow.calls == []
+
+    def test_execute_draws_once_and_feeds_every_branch(self) -> None:
+        """:meth:`GraphWorkflowExecutor.execute` should stream each source
+        once, hand every chunk to all the branches consuming it and dispose
+        every component.
+        """  # noqa: D205
+        processor = IntsToStrings()
+        sinks = [CollectToList(), CollectToList(), CollectToList()]
+        self._workflow.nodes = [
+            SinkNode("strings", lambda: sinks[0], "to_strings"),
+            ProcessorNode("to_strings", lambda: processor, "source"),
+            SinkNode("more_strings", lambda: sinks[1], "to_strings"),
+            SinkNode("other", lambda: sinks[2], "other_strings"),
+            ProcessorNode("other_strings", IntsToStrings, "source"),
+            SourceNode("source", lambda: self._source),
+        ]
+        GraphWorkflowExecutor(queue_size=1)(self._workflow)
+
+        expected = [str(_i) for _i in range(20)]
+        assert self._chunks_drawn == list(range(10))
+        assert [_sink.collection_target for _sink in sinks] == [expected] * 3
+        assert self._workflow.calls == ["prologue", "epilogue"]
+        assert self._source.is_disposed
+        assert processor.is_disposed
+        assert all(_sink.is_disposed for _sink in sinks)
+
+    def test_execute_runs_independent_branches_in_parallel(self) -> None:
+        """:meth:`GraphWorkflowExecutor.execute` should run the branches of a
+        graph concurrently, and not hold back a branch when another one
+        stops consuming early.
+        """  # noqa: D205
+        barrier = threading.Barrier(2, timeout=5)
+        collected: list[str] = []
+
+        def wait(_: list[str]) -> None:
+            barrier.wait()
+
+        def wait_once(chunk: list[str]) -> None:
+            if not collected:
+                wait(chunk)
+
+        self._workflow.nodes = [
+            SourceNode("source", lambda: self._source),
+            ProcessorNode("to_strings", IntsToStrings, "source"),
+            SinkNode(
+                "first",
+                lambda: TakeFirstChunk(on_chunk=wait),
+                "to_strings",
+            ),
+            SinkNode(
+                "all",
+                lambda: CollectToList(
+                    collection_target=collected,
+                    on_chunk=wait_once,
+                ),
+                "to_strings",
+            ),
+        ]
+        GraphWorkflowExecutor(queue_size=1).execute(self._workflow)
+
+        assert collected == [str(_i) for _i in range(20)]
+
+    def test_execute_stops_the_nodes_feeding_early_sinks(self) -> None:
+        """:meth:`GraphWorkflowExecutor.execute` should stop feeding, and
+        stop streaming the source of, a sink that returns early.
+        """  # noqa: D205
+        sink = TakeFirstChunk()
+        self._workflow.nodes = [
+            SourceNode("source", lambda: self._source),
+            ProcessorNode("to_strings", IntsToStrings, "source"),
+            SinkNode("first", lambda: sink, "to_strings"),
+        ]
+        GraphWorkflowExecutor(queue_size=1).execute(self._workflow)
+
+        assert sink.collection_target == ["0", "1"]
+        # The source can only be a few chunks ahead of the sink.
+        assert len(self._chunks_drawn) < 10  # noqa: PLR2004
+        assert self._source.is_disposed
+        assert sink.is_disposed
+
+    def test_execute_instruments_every_node(self) -> None:
+        """:meth:`GraphWorkflowExecutor.execute` should observe every node
+        under the workflow and node ids when instrumentation is enabled.
+        """  # noqa: D205
+        exporter = InMemoryExporter()
+        self._workflow.nodes = [
+            SourceNode("source", lambda: self._source),
+            ProcessorNode("to_strings", IntsToStrings, "source"),
+            SinkNode("sink", CollectToList, "to_strings"),
+        ]
+        register_exporter(exporter)
+        try:
+            GraphWorkflowExecutor().execute(self._workflow)
+        finally:
+            unregister_exporter(exporter)
+
+        observed = {(_e.workflow_id, _e.stage) for _e in exporter.events}
+        assert observed == {
+            ("graph/source", Stage.DRAW),
+            ("graph/to_strings", Stage.APPLY),
+            ("graph/sink", Stage.DRAIN),
+        }
+
+    def test_execute_propagates_errors_and_disposes_nodes(self) -> None:
+        """:meth:`GraphWorkflowExecutor.execute` should stop the whole run
+        when a node fails, propagate the error, dispose every component and
+        run the epilogue.
+        """  # noqa: D205
+
+        def on_chunk(_: list[str]) -> None:
+            _err_msg: str = "Sink failed."
+            raise RuntimeError(_err_msg)
+
+        healthy_sink = CollectToList()
+        failing_sink = CollectToList(on_chunk=on_chunk)
+        self._source.max_ints = 1000
+        self._workflow.nodes = [
+            SourceNode("source", lambda: self._source),
+            ProcessorNode("to_strings", IntsToStrings, "source"),
+            SinkNode("healthy", lambda: healthy_sink, "to_strings"),
+            SinkNode("failing", lambda: failing_sink, "to_strings"),
+        ]
+        with pytest.raises(RuntimeError, match="Sink failed."):
+            GraphWorkflowExecutor(queue_size=1).execute(self._workflow)
+
+        assert len(self._chunks_drawn) < 500  # noqa: PLR2004
+        assert self._source.is_disposed
+        assert healthy_sink.is_disposed
+        assert failing_sink.is_disposed
+        assert self._workflow.calls == ["prologue", "epilogue"]
+
+
+class TestDistributedWorkflowExecutor(TestCase):
+    """Tests for the :class:`sghi.etl.executors.DistributedWorkflowExecutor`
+    class.
+    """  # noqa: D205
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._temp_dir = tempfile.TemporaryDirectory()
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._temp_dir.cleanup()
+
+    def _run(
+        self,
+        instance: DistributedWorkflowExecutor,
+        count: int = 6,
+        behaviour: str | None = None,
+    ) -> list[tuple[int, int]]:
+        workflow = PartitionedWorkflowDefinition(
+            self._temp_dir.name,
+            count,
+            behaviour,
+        )
+        instance.execute(workflow)
+        return [
+            (int(_pid), int(_value))
+            for _pid, _value in map(str.split, workflow.drained)
+        ]
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`DistributedWorkflowExecutor` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'workers' MUST be greater"):
+            DistributedWorkflowExecutor(workers=0)
+        with pytest.raises(ValueError, match="'straggler_timeout' MUST be"):
+            DistributedWorkflowExecutor(straggler_timeout=0)
+
+        instance = DistributedWorkflowExecutor(straggler_timeout=None)
+        assert instance.workers == (os.cpu_count() or 1)
+        assert instance.straggler_timeout is None
+        assert not instance.ordered
+
+    def test_execute_aggregates_the_partitions_of_all_workers(self) -> None:
+        """:meth:`DistributedWorkflowExecutor.execute` should process the
+        partitions in worker processes and drain all the results, in order
+        when asked to, into the sink of the coordinator.
+        """  # noqa: D205
+        instance = DistributedWorkflowExecutor(workers=3, ordered=True)
+        results = self._run(instance)
+
+        assert instance.ordered
+        assert [_value for _, _value in results] == list(range(12))
+        assert os.getpid() not in {_pid for _pid, _ in results}
+
+    def test_execute_runs_copies_of_straggling_partitions(self) -> None:
+        """:meth:`DistributedWorkflowExecutor.execute` should hand a copy
+        of a partition that is taking too long to a free worker, and use
+        whichever copy completes first.
+        """  # noqa: D205
+        instance = DistributedWorkflowExecutor(
+            workers=2,
+            straggler_timeout=0.1,
+        )
+        started_at = time.monotonic()
+        results = self._run(instance, count=3, behaviour="straggle")
+
+        assert time.monotonic() - started_at < 10  # noqa: PLR2004
+        assert sorted(_value for _, _value in results) == list(range(6))
+
+    def test_execute_discards_the_results_of_late_copies(self) -> None:
+        """:meth:`DistributedWorkflowExecutor.execute` should discard the
+        result of a partition that completes after a copy of it did.
+        """  # noqa: D205
+        instance = DistributedWorkflowExecutor(
+            workers=3,
+            straggler_timeout=0.1,
+        )
+        results = self._run(instance, count=3, behaviour="copy_first")
+
+        assert sorted(_value for _, _value in results) == list(range(6))
+
+    def test_execute_retries_partitions_of_dead_workers(self) -> None:
+        """:meth:`DistributedWorkflowExecutor.execute` should hand the
+        partition of a worker that died to a replacement worker.
+        """  # noqa: D205
+        instance = DistributedWorkflowExecutor(workers=1)
+        results = self._run(instance, count=3, behaviour="crash")
+
+        assert sorted(_value for _, _value in results) == list(range(6))
+
+    def test_execute_fails_on_partitions_that_keep_killing_workers(
+        self,
+    ) -> None:
+        """:meth:`DistributedWorkflowExecutor.execute` should raise a
+        :exc:`WorkerError` when a partition kills its worker twice.
+        """  # noqa: D205
+        instance = DistributedWorkflowExecutor(workers=1)
+        with pytest.raises(WorkerError, match="exited unexpectedly"):
+            self._run(instance, count=3, behaviour="crash_always")
+
+    def test_execute_does_not_retry_partitions_being_copied(self) -> None:
+        """:meth:`DistributedWorkflowExecutor.execute` should not hand the
+        partition of a worker that died to a replacement worker when a copy
+        of it is still running, nor copy a partition twice.
+        """  # noqa: D205
+        instance = DistributedWorkflowExecutor(
+            workers=2,
+            straggler_timeout=0.1,
+        )
+        results = self._run(instance, count=2, behaviour="crash_while_copied")
+
+        assert sorted(_value for _, _value in results) == list(range(4))
+
+    def test_execute_waits_for_late_partitions_when_not_copying(
+        self,
+    ) -> None:
+        """:meth:`DistributedWorkflowExecutor.execute` should leave free
+        workers idle, instead of copying late partitions, when the straggler
+        timeout is disabled.
+        """  # noqa: D205
+        instance = DistributedWorkflowExecutor(
+            workers=2,
+            straggler_timeout=None,
+        )
+        results = self._run(instance, count=3, behaviour="slow")
+
+        assert sorted(_value for _, _value in results) == list(range(6))
+        assert len({_pid for _pid, _ in results}) == 2  # noqa: PLR2004
+
+    def test_execute_propagates_worker_setup_errors(self) -> None:
+        """:meth:`DistributedWorkflowExecutor.execute` should abort the run
+        and raise the error raised while a worker sets up its components.
+        """  # noqa: D205
+        instance = DistributedWorkflowExecutor(workers=1)
+        with pytest.raises(RuntimeError, match="Setup failed."):
+            self._run(instance, behaviour="setup")
+
+    def test_execute_fails_on_unpicklable_results(self) -> None:
+        """:meth:`DistributedWorkflowExecutor.execute` should raise an error
+        when the processed data of a partition cannot be sent to the
+        coordinator.
+        """  # noqa: D205
+        instance = DistributedWorkflowExecutor(workers=1)
+        with pytest.raises(TypeError, match="pickle"):
+            self._run(instance, behaviour="unpicklable")
+
+    def test_workers_stop_when_their_connection_closes(self) -> None:
+        """Worker processes should dispose their components and exit when
+        their connection to the coordinator closes.
+        """  # noqa: D205
+        workflow = PartitionedWorkflowDefinition(self._temp_dir.name)
+        parent_connection, child_connection = multiprocessing.Pipe()
+        worker = threading.Thread(
+            target=_run_partition_worker,
+            args=(child_connection, _Task.of(workflow)),
+        )
+        worker.start()
+        parent_connection.send((1, 1))
+        outcome = parent_connection.recv()
+        parent_connection.close()
+        worker.join(timeout=10)
+
+        assert outcome.index == 1
+        assert [_value.split()[1] for _value in outcome.data] == ["2", "3"]
+        assert not worker.is_alive()
+        assert child_connection.closed
+
+    def test_execute_propagates_partition_errors(self) -> None:
+        """:meth:`DistributedWorkflowExecutor.execute` should abort the run
+        and raise the error raised while processing any of the partitions.
+        """  # noqa: D205
+        instance = DistributedWorkflowExecutor(workers=2)
+        with pytest.raises(RuntimeError, match="Partition failed.") as exp:
+            self._run(instance, behaviour="fail")
+
+        assert "Raised in worker process" in "".join(exp.value.__notes__)
+
+    def test_execute_fails_on_sources_that_are_not_partitioned(self) -> None:
+        """:meth:`DistributedWorkflowExecutor.execute` should raise a
+        :exc:`TypeError` when the source of the workflow is not a
+        :class:`PartitionedSource`.
+        """  # noqa: D205
+        workflow = FileWorkflowDefinition(path=self._temp_dir.name)
+        with pytest.raises(TypeError, match="MUST be a"):
+            DistributedWorkflowExecutor(workers=1).execute(workflow)
+
+    def test_execute_handles_sources_without_partitions(self) -> None:
+        """:meth:`DistributedWorkflowExecutor.execute` should complete
+        without draining anything when the source has no partitions.
+        """  # noqa: D205
+        assert self._run(DistributedWorkflowExecutor(), count=0) == []
@@ -0,0 +1,62 @@
+"""Tests for the ``sghi.etl.graphs`` module."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from unittest import TestCase
+
+from typing_extensions import override
+
+from sghi.etl.graphs import GraphWorkflowDefinition, SourceNode
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from sghi.etl.graphs import Node
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+class MinimalGraphWorkflowDefinition(GraphWorkflowDefinition):
+    """A :class:`GraphWorkflowDefinition` relying on the defaults."""
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return None
+
+    @property
+    @override
+    def id(self) -> str:
+        return "minimal"
+
+    @property
+    @override
+    def name(self) -> str:
+        return "Minimal Graph Workflow"
+
+    @property
+    @override
+    def nodes(self) -> Sequence[Node]:
+        return [SourceNode("source", object)]  # type: ignore[arg-type]
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestGraphWorkflowDefinition(TestCase):
+    """Tests for the :class:`sghi.etl.graphs.GraphWorkflowDefinition`."""
+
+    def test_prologue_and_epilogue_default_to_doing_nothing(self) -> None:
+        """:class:`GraphWorkflowDefinition` should provide a prologue and an
+        epilogue that do nothing by default.
+        """  # noqa: D205
+        instance = MinimalGraphWorkflowDefinition()
+
+        assert instance.prologue() is None
+        assert instance.epilogue() is None
+        assert instance.nodes[0].id == "source"
@@ -0,0 +1,463 @@
+"""Tests for the ``sghi.etl.incremental`` module."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING
+from unittest import TestCase
+
+import pytest
+from typing_extensions import override
+from workflow_helpers import (
+    ChunksSource,
+    CollectSink,
+    ComponentsWorkflow,
+    IdentityProcessor,
+)
+
+from sghi.disposable import ResourceDisposedError, not_disposed
+from sghi.etl.executors import PipelinedWorkflowExecutor
+from sghi.etl.incremental import (
+    CheckpointedSource,
+    CheckpointStore,
+    CommittingSink,
+    FileCheckpointStore,
+    Increment,
+    IncrementalSource,
+    IncrementalWorkflowDefinition,
+    SQLiteCheckpointStore,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+@dataclass(slots=True)
+class RowsSource(IncrementalSource[list[int], int]):
+    """An :class:`IncrementalSource` over a growing list of row ids, using
+    the last seen row id as the watermark.
+
+    Streams can optionally end with an empty chunk that keeps the previous
+    watermark.
+    """  # noqa: D205
+
+    rows: list[int] = field(default_factory=list)
+    chunk_size: int = field(default=2)
+    trailing_empty_chunk: bool = field(default=False)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw_since(self, watermark: int | None) -> Increment[list[int], int]:
+        new_rows = [row for row in self.rows if row > (watermark or 0)]
+        return Increment(new_rows, new_rows[-1] if new_rows else None)
+
+    @not_disposed
+    @override
+    def stream_since(
+        self,
+        watermark: int | None,
+    ) -> Iterator[Increment[list[int], int]]:
+        new_rows = self.draw_since(watermark).data
+        for start in range(0, len(new_rows), self.chunk_size):
+            chunk = new_rows[start : start + self.chunk_size]
+            yield Increment(chunk, chunk[-1])
+        if self.trailing_empty_chunk:
+            yield Increment([], None)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class FirstChunkSink(CollectSink[list[int]]):
+    """A :class:`CollectSink` that stops draining after the first chunk."""
+
+    @not_disposed
+    @override
+    def drain_stream(
+        self,
+        processed_data_chunks: Iterable[list[int]],
+    ) -> None:
+        for processed_data in processed_data_chunks:
+            self.drain(processed_data)
+            break
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestIncrementalSource(TestCase):
+    """Tests for the :class:`sghi.etl.incremental.IncrementalSource` class."""
+
+    def test_draw_and_stream_return_all_the_data(self) -> None:
+        """:meth:`IncrementalSource.draw` and
+        :meth:`IncrementalSource.stream` should return all the available data
+        when used as a regular ``Source``.
+        """  # noqa: D205
+        with RowsSource([1, 2, 3]) as instance:
+            assert instance.draw() == [1, 2, 3]
+            assert list(instance.stream()) == [[1, 2], [3]]
+            assert list(IncrementalSource.stream_since(instance, 1)) == [
+                Increment([2, 3], 3),
+            ]
+
+
+class _CheckpointStoreTests:
+    """Common tests for :class:`CheckpointStore` implementations."""
+
+    def create_store(self, directory: Path) -> CheckpointStore:
+        raise NotImplementedError
+
+    def test_save_load_and_delete_watermarks(self) -> None:
+        """A :class:`CheckpointStore` should persist saved watermarks until
+        they are deleted.
+        """  # noqa: D205
+        with TemporaryDirectory() as temp_dir:
+            with self.create_store(Path(temp_dir)) as store:
+                assert store.load("a") is None
+                store.save("a", 1)
+                store.save("a", {"offset": 2})
+                store.save("b", "2024-01-01T00:00:00")
+                store.delete("c")
+
+            with self.create_store(Path(temp_dir)) as store:
+                assert store.load("a") == {"offset": 2}
+                assert store.load("b") == "2024-01-01T00:00:00"
+                store.delete("a")
+                assert store.load("a") is None
+                with pytest.raises(ValueError, match="'watermark' MUST not"):
+                    store.save("a", None)
+
+    def test_disposed_stores_are_unusable(self) -> None:
+        """A disposed :class:`CheckpointStore` should raise a
+        :exc:`ResourceDisposedError` when used.
+        """  # noqa: D205
+        with TemporaryDirectory() as temp_dir:
+            store = self.create_store(Path(temp_dir))
+            store.dispose()
+            store.dispose()
+
+            assert store.is_disposed
+            with pytest.raises(ResourceDisposedError):
+                store.load("a")
+
+
+class TestFileCheckpointStore(_CheckpointStoreTests, TestCase):
+    """Tests for the :class:`sghi.etl.incremental.FileCheckpointStore`
+    class.
+    """  # noqa: D205
+
+    @override
+    def create_store(self, directory: Path) -> CheckpointStore:
+        path = directory / "nested" / "checkpoints.json"
+        store = FileCheckpointStore(path)
+        assert store.path == path
+        return store
+
+    def test_instantiation_fails_on_none_path(self) -> None:
+        """:class:`FileCheckpointStore` constructor should raise a
+        :exc:`ValueError` when given a ``None`` path.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'path' MUST not be None."):
+            FileCheckpointStore(None)  # type: ignore
+
+
+class TestSQLiteCheckpointStore(_CheckpointStoreTests, TestCase):
+    """Tests for the :class:`sghi.etl.incremental.SQLiteCheckpointStore`
+    class.
+    """  # noqa: D205
+
+    @override
+    def create_store(self, directory: Path) -> CheckpointStore:
+        return SQLiteCheckpointStore(directory / "checkpoints.db")
+
+    def test_instantiation_fails_on_none_database(self) -> None:
+        """:class:`SQLiteCheckpointStore` constructor should raise a
+        :exc:`ValueError` when given a ``None`` database.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'database' MUST not be None."):
+            SQLiteCheckpointStore(None)  # type: ignore
+
+
+class TestCheckpointedSource(TestCase):
+    """Tests for the :class:`sghi.etl.incremental.CheckpointedSource`
+    class.
+    """  # noqa: D205
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._source: RowsSource = RowsSource([1, 2, 3])
+        self._store: SQLiteCheckpointStore = SQLiteCheckpointStore(":memory:")
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._store.dispose()
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`CheckpointedSource` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'source' MUST not be None."):
+            CheckpointedSource(None, self._store, "k")  # type: ignore
+        with pytest.raises(ValueError, match="'store' MUST not be None."):
+            CheckpointedSource(self._source, None, "k")  # type: ignore
+        with pytest.raises(ValueError, match="'key' MUST not be None or"):
+            CheckpointedSource(self._source, self._store, "")
+
+    def test_draw_resumes_from_the_committed_watermark(self) -> None:
+        """:meth:`CheckpointedSource.draw` should only return the data newer
+        than the committed watermark.
+        """  # noqa: D205
+        with CheckpointedSource(self._source, self._store, "k") as instance:
+            assert instance.key == "k"
+            assert instance.draw() == [1, 2, 3]
+            assert instance.pending_watermark == 3  # noqa: PLR2004
+            assert instance.draw() == [1, 2, 3]
+
+            instance.commit()
+            assert instance.pending_watermark is None
+            assert self._store.load("k") == 3  # noqa: PLR2004
+
+            self._source.rows.append(4)
+            assert instance.draw() == [4]
+            assert instance.draw() == [4]
+
+            self._source.rows.clear()
+            assert instance.draw() == []
+            instance.commit()
+            assert self._store.load("k") == 4  # noqa: PLR2004
+
+    def test_stream_tracks_the_latest_watermark(self) -> None:
+        """:meth:`CheckpointedSource.stream` should resume from the committed
+        watermark and track the watermark of the latest chunk.
+        """  # noqa: D205
+        self._store.save("k", 1)
+        with CheckpointedSource(self._source, self._store, "k") as instance:
+            chunks = instance.stream()
+            assert next(chunks) == [2, 3]
+            assert instance.pending_watermark == 3  # noqa: PLR2004
+
+    def test_commit_saves_the_watermark_of_the_loaded_chunks(self) -> None:
+        """:meth:`CheckpointedSource.commit` should only save the watermark
+        of the given number of streamed chunks, keeping the rest pending.
+        """  # noqa: D205
+        self._source.rows.extend([4, 5])
+        self._source.trailing_empty_chunk = True
+        with CheckpointedSource(self._source, self._store, "k") as instance:
+            chunks = instance.stream()
+            assert next(chunks) == [1, 2]
+            assert next(chunks) == [3, 4]
+
+            instance.commit(0)
+            assert self._store.load("k") is None
+            instance.commit(1)
+            assert self._store.load("k") == 2  # noqa: PLR2004
+            assert instance.pending_watermark == 4  # noqa: PLR2004
+
+            assert next(chunks) == [5]
+            assert next(chunks) == []
+            instance.commit(5)
+            assert self._store.load("k") == 5  # noqa: PLR2004
+            assert instance.pending_watermark is None
+
+    def test_dispose_disposes_the_wrapped_source(self) -> None:
+        """:meth:`CheckpointedSource.dispose` should dispose the wrapped
+        source but not the store.
+        """  # noqa: D205
+        instance = CheckpointedSource(self._source, self._store, "k")
+        instance.dispose()
+        instance.dispose()
+
+        assert instance.is_disposed
+        assert self._source.is_disposed
+        assert not self._store.is_disposed
+        with pytest.raises(ResourceDisposedError):
+            instance.commit()
+
+
+class TestCommittingSink(TestCase):
+    """Tests for the :class:`sghi.etl.incremental.CommittingSink` class."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._store: SQLiteCheckpointStore = SQLiteCheckpointStore(":memory:")
+        self._source: CheckpointedSource[list[int], int] = CheckpointedSource(
+            RowsSource([1, 2, 3]), self._store, "k"
+        )
+        self._sink: CollectSink[list[int]] = CollectSink()
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._source.dispose()
+        self._store.dispose()
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`CommittingSink` constructor should raise a
+        :exc:`ValueError` when given ``None`` components.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'sink' MUST not be None."):
+            CommittingSink(None, self._source)  # type: ignore
+        with pytest.raises(ValueError, match="'source' MUST not be None."):
+            CommittingSink(self._sink, None)  # type: ignore
+
+    def test_watermarks_are_committed_after_successful_drains(self) -> None:
+        """:class:`CommittingSink` should commit the source's watermark only
+        after the wrapped sink drains successfully.
+        """  # noqa: D205
+        with CommittingSink(self._sink, self._source) as instance:
+            self._sink.fail = True
+            with pytest.raises(RuntimeError, match="Failed to drain"):
+                instance.drain(self._source.draw())
+            assert self._store.load("k") is None
+
+            self._sink.fail = False
+            instance.drain(self._source.draw())
+            assert self._store.load("k") == 3  # noqa: PLR2004
+
+            instance.drain_stream(self._source.stream())
+            assert self._sink.drained == [1, 2, 3]
+            assert self._store.load("k") == 3  # noqa: PLR2004
+
+        instance.dispose()
+        assert instance.is_disposed
+        assert self._sink.is_disposed
+        assert not self._source.is_disposed
+
+    def test_only_the_watermark_of_consumed_chunks_is_committed(self) -> None:
+        """:class:`CommittingSink` should only commit the watermark of the
+        chunks that the wrapped sink consumed.
+        """  # noqa: D205
+        sink = FirstChunkSink()
+        with CommittingSink(sink, self._source) as instance:
+            chunks = self._source.stream()
+            instance.drain_stream(chunks)
+            assert sink.drained == [1, 2]
+            assert self._store.load("k") == 2  # noqa: PLR2004
+
+            assert list(chunks) == [[3]]
+            assert self._source.pending_watermark == 3  # noqa: PLR2004
+
+
+class TestIncrementalWorkflowDefinition(TestCase):
+    """Tests for the
+    :class:`sghi.etl.incremental.IncrementalWorkflowDefinition` class.
+    """  # noqa: D205
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._rows: list[int] = [1, 2, 3]
+        self._sink: CollectSink[list[int]] = CollectSink()
+        self._store: SQLiteCheckpointStore = SQLiteCheckpointStore(":memory:")
+        self._workflow: ComponentsWorkflow[list[int], list[int]] = (
+            ComponentsWorkflow(
+                source_factory=lambda: RowsSource(self._rows),
+                sink_factory=lambda: self._sink,
+            )
+        )
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._store.dispose()
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`IncrementalWorkflowDefinition` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'workflow' MUST not be None."):
+            IncrementalWorkflowDefinition(None, self._store)  # type: ignore
+        with pytest.raises(ValueError, match="'store' MUST not be None."):
+            IncrementalWorkflowDefinition(self._workflow, None)  # type: ignore
+        with pytest.raises(ValueError, match="'key' MUST not be None or"):
+            IncrementalWorkflowDefinition(self._workflow, self._store, "")
+
+    def test_reruns_only_process_new_data(self) -> None:
+        """Rerunning an :class:`IncrementalWorkflowDefinition` should only
+        process the data added since the last successful run, and failed
+        runs should not advance the watermark.
+        """  # noqa: D205
+        instance = IncrementalWorkflowDefinition(self._workflow, self._store)
+        executor = PipelinedWorkflowExecutor()
+
+        assert instance.id == "test"
+        assert instance.name == "Test Workflow"
+        assert instance.description is None
+        assert instance.key == "test"
+
+        executor(instance)
+        assert self._sink.drained == [1, 2, 3]
+        assert self._store.load("test") == 3  # noqa: PLR2004
+
+        self._rows.extend([4, 5])
+        self._sink = CollectSink(fail=True)
+        with pytest.raises(RuntimeError, match="Failed to drain"):
+            executor(instance)
+        assert self._store.load("test") == 3  # noqa: PLR2004
+
+        self._sink = CollectSink()
+        executor(instance)
+        assert self._sink.drained == [4, 5]
+        assert self._store.load("test") == 5  # noqa: PLR2004
+
+    def test_reruns_resume_after_the_chunks_consumed_by_the_sink(
+        self,
+    ) -> None:
+        """Rerunning an :class:`IncrementalWorkflowDefinition` whose sink
+        returned early should process the chunks that the sink did not
+        consume, even when the source streamed them ahead of the sink.
+        """  # noqa: D205
+        self._rows.extend([4, 5])
+        instance = IncrementalWorkflowDefinition(self._workflow, self._store)
+        executor = PipelinedWorkflowExecutor()
+
+        self._sink = FirstChunkSink()
+        executor(instance)
+        assert self._sink.drained == [1, 2]
+        assert self._store.load("test") == 2  # noqa: PLR2004
+
+        self._sink = CollectSink()
+        executor(instance)
+        assert self._sink.drained == [3, 4, 5]
+        assert self._store.load("test") == 5  # noqa: PLR2004
+
+    def test_components_must_be_created_in_order(self) -> None:
+        """:class:`IncrementalWorkflowDefinition` should raise an error when
+        the sink is created before the source or the source is not an
+        :class:`IncrementalSource`.
+        """  # noqa: D205
+        instance = IncrementalWorkflowDefinition(
+            ComponentsWorkflow(
+                source_factory=lambda: ChunksSource([[1]]),
+                sink_factory=lambda: self._sink,
+            ),
+            self._store,
+            key="custom",
+        )
+
+        with pytest.raises(RuntimeError, match="MUST be created before"):
+            instance.sink_factory()
+        with pytest.raises(TypeError, match="MUST be an IncrementalSource"):
+            instance.source_factory()
+        assert instance.processor_factory is IdentityProcessor
+        assert instance.prologue() is None
+        assert instance.epilogue() is None
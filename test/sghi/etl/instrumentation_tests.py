@@ -0,0 +1,453 @@
+"""Tests for the ``sghi.etl.instrumentation`` module."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING, Any
+from unittest import TestCase
+
+import pytest
+from typing_extensions import override
+
+from sghi.disposable import not_disposed
+from sghi.etl.core import Processor, Sink, Source, WorkflowDefinition
+from sghi.etl.executors import PipelinedWorkflowExecutor
+from sghi.etl.instrumentation import (
+    InMemoryExporter,
+    InstrumentationExporter,
+    InstrumentedProcessor,
+    InstrumentedSink,
+    InstrumentedSource,
+    LoggingExporter,
+    PrometheusTextFileExporter,
+    Stage,
+    StageEvent,
+    is_enabled,
+    register_exporter,
+    unregister_exporter,
+)
+from sghi.utils import type_fqn
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+@dataclass(slots=True)
+class WordsSupplier(Source[list[str]]):
+    """A :class:`Source` that supplies words, one chunk per word."""
+
+    words: tuple[str, ...] = ("ab", "cde", "f")
+    fail: bool = field(default=False)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw(self) -> list[str]:
+        if self.fail:
+            _err_msg: str = "Draw failed."
+            raise RuntimeError(_err_msg)
+        return list(self.words)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+    @not_disposed
+    @override
+    def stream(self) -> Iterator[list[str]]:
+        for word in self.words:
+            if self.fail:
+                _err_msg: str = "Stream failed."
+                raise RuntimeError(_err_msg)
+            yield [word]
+
+
+@dataclass(slots=True)
+class JoinWords(Processor[list[str], str]):
+    """A :class:`Processor` that joins words into a single string."""
+
+    fail: bool = field(default=False)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: list[str]) -> str:
+        if self.fail:
+            _err_msg: str = "Apply failed."
+            raise RuntimeError(_err_msg)
+        return "".join(raw_data)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class CollectToList(Sink[str]):
+    """A :class:`Sink` that collects all the values it receives in a list."""
+
+    collection_target: list[str] = field(default_factory=list)
+    fail: bool = field(default=False)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: str) -> None:
+        if self.fail:
+            _err_msg: str = "Drain failed."
+            raise RuntimeError(_err_msg)
+        self.collection_target.append(processed_data)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class TakeFirstChunk(CollectToList):
+    """A :class:`Sink` that only consumes the first chunk it receives."""
+
+    @override
+    def drain_stream(self, processed_data_chunks: Iterable[str]) -> None:
+        for processed_data in processed_data_chunks:  # pragma: no branch
+            self.drain(processed_data)
+            return
+
+
+@dataclass(frozen=True, slots=True)
+class WordsWorkflow(WorkflowDefinition[list[str], str]):
+    """A :class:`WorkflowDefinition` that joins and collects words."""
+
+    collection_target: list[str] = field(default_factory=list)
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return None
+
+    @property
+    @override
+    def id(self) -> str:
+        return "words"
+
+    @property
+    @override
+    def name(self) -> str:
+        return "Words Workflow"
+
+    @property
+    @override
+    def processor_factory(self) -> Callable[[], Processor[list[str], str]]:
+        return JoinWords
+
+    @property
+    @override
+    def sink_factory(self) -> Callable[[], Sink[str]]:
+        return lambda: CollectToList(self.collection_target)
+
+    @property
+    @override
+    def source_factory(self) -> Callable[[], Source[list[str]]]:
+        return WordsSupplier
+
+
+class FailingExporter(InstrumentationExporter):
+    """An :class:`InstrumentationExporter` that always fails."""
+
+    @override
+    def export(self, event: StageEvent) -> None:
+        _err_msg: str = "Export failed."
+        raise RuntimeError(_err_msg)
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class InstrumentationTestCase(TestCase):
+    """Base class for tests that need an :class:`InMemoryExporter`."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._exporter: InMemoryExporter = InMemoryExporter()
+        register_exporter(self._exporter)
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        unregister_exporter(self._exporter)
+
+
+class TestRegistry(TestCase):
+    """Tests for the exporter registry of the instrumentation module."""
+
+    def test_registering_exporters_toggles_instrumentation(self) -> None:
+        """Instrumentation should only be enabled while at least one exporter
+        is registered, and registering an exporter twice has no effect.
+        """  # noqa: D205
+        exporter = InMemoryExporter()
+        assert not is_enabled()
+
+        register_exporter(exporter)
+        register_exporter(exporter)
+        assert is_enabled()
+
+        unregister_exporter(exporter)
+        assert not is_enabled()
+
+    def test_register_exporter_fails_on_none_value(self) -> None:
+        """:func:`register_exporter` should raise a :exc:`ValueError` when
+        given a ``None`` exporter.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'exporter' MUST not be None."):
+            register_exporter(None)  # type: ignore
+
+
+class TestInstrumentedComponents(InstrumentationTestCase):
+    """Tests for the instrumented component wrappers."""
+
+    def test_instantiation_fails_on_none_components(self) -> None:
+        """The instrumented wrappers should raise a :exc:`ValueError` when
+        given a ``None`` component to wrap.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'source' MUST not be None."):
+            InstrumentedSource(None)  # type: ignore
+        with pytest.raises(ValueError, match="'processor' MUST not be None."):
+            InstrumentedProcessor(None)  # type: ignore
+        with pytest.raises(ValueError, match="'sink' MUST not be None."):
+            InstrumentedSink(None)  # type: ignore
+
+    def test_single_shot_calls_emit_one_event_each(self) -> None:
+        """Each call to ``draw``, ``apply`` and ``drain`` should emit a single
+        event describing the call.
+        """  # noqa: D205
+        collected: list[str] = []
+        with (
+            InstrumentedSource(WordsSupplier(), "wf") as source,
+            InstrumentedProcessor(JoinWords(), "wf") as processor,
+            InstrumentedSink(CollectToList(collected), "wf") as sink,
+        ):
+            sink(processor(source()))
+
+        assert collected == ["abcdef"]
+        events = self._exporter.events
+        assert [_e.stage for _e in events] == [
+            Stage.DRAW,
+            Stage.APPLY,
+            Stage.DRAIN,
+        ]
+        assert events[0].component == type_fqn(WordsSupplier)
+        assert events[0].item_count == 3  # noqa: PLR2004
+        assert events[0].payload_size is None
+        assert events[1].payload_size == 6  # noqa: PLR2004
+        assert all(_e.workflow_id == "wf" for _e in events)
+        assert all(_e.duration >= 0 for _e in events)
+        assert all(_e.error is None for _e in events)
+        assert source.is_disposed
+        assert processor.is_disposed
+        assert sink.is_disposed
+
+    def test_streaming_calls_emit_one_event_per_chunk(self) -> None:
+        """The streaming methods should emit an event for each chunk."""
+        collected: list[str] = []
+        source = InstrumentedSource(WordsSupplier())
+        processor = InstrumentedProcessor(JoinWords())
+        sink = InstrumentedSink(CollectToList(collected))
+        sink.drain_stream(processor.apply_stream(source.stream()))
+
+        assert collected == ["ab", "cde", "f"]
+        events = self._exporter.events
+        assert [_e.stage for _e in events].count(Stage.DRAW) == 3  # noqa: PLR2004
+        assert [_e.stage for _e in events].count(Stage.APPLY) == 3  # noqa: PLR2004
+        drain_events = [_e for _e in events if _e.stage is Stage.DRAIN]
+        assert [_e.payload_size for _e in drain_events] == [2, 3, 1]
+
+    def test_sink_that_stops_early_still_reports_its_last_chunk(self) -> None:
+        """A sink that returns without requesting another chunk should still
+        have the last chunk it consumed reported.
+        """  # noqa: D205
+        sink = InstrumentedSink(TakeFirstChunk())
+        sink.drain_stream(iter(["a", "b"]))
+
+        assert [_e.payload_size for _e in self._exporter.events] == [1]
+
+    def test_failures_are_reported_and_propagated(self) -> None:
+        """Errors raised by the wrapped components should be reported in an
+        event and then propagated to the caller.
+        """  # noqa: D205
+        source = InstrumentedSource(WordsSupplier(fail=True))
+        processor = InstrumentedProcessor(JoinWords(fail=True))
+        sink = InstrumentedSink(CollectToList(fail=True))
+
+        with pytest.raises(RuntimeError, match="Draw failed."):
+            source.draw()
+        with pytest.raises(RuntimeError, match="Stream failed."):
+            next(source.stream())
+        with pytest.raises(RuntimeError, match="Apply failed."):
+            processor.apply(["a"])
+        with pytest.raises(RuntimeError, match="Apply failed."):
+            next(processor.apply_stream([["a"]]))
+        with pytest.raises(RuntimeError, match="Drain failed."):
+            sink.drain("a")
+        with pytest.raises(RuntimeError, match="Drain failed."):
+            sink.drain_stream(["a"])
+
+        events = self._exporter.events
+        assert len(events) == 6  # noqa: PLR2004
+        assert all(isinstance(_e.error, RuntimeError) for _e in events)
+
+    def test_upstream_failures_are_not_attributed_to_the_processor(
+        self,
+    ) -> None:
+        """Errors raised while the processor waits for its input should not be
+        reported as processor failures.
+        """  # noqa: D205
+        processor = InstrumentedProcessor(JoinWords())
+        source = WordsSupplier(fail=True)
+
+        with pytest.raises(RuntimeError, match="Stream failed."):
+            list(processor.apply_stream(source.stream()))
+        assert not self._exporter.events
+
+    def test_upstream_failures_are_not_attributed_to_the_sink(self) -> None:
+        """Errors raised while the sink waits for its input should not be
+        reported as sink failures.
+        """  # noqa: D205
+        sink = InstrumentedSink(CollectToList())
+        source = WordsSupplier(fail=True)
+
+        with pytest.raises(RuntimeError, match="Stream failed."):
+            sink.drain_stream("".join(_c) for _c in source.stream())
+        assert not self._exporter.events
+
+    def test_payload_sizes_of_binary_data_are_reported(self) -> None:
+        """The size of ``bytes``, ``bytearray`` and ``memoryview`` payloads
+        should be reported in bytes.
+        """  # noqa: D205
+        sink: InstrumentedSink[Any] = InstrumentedSink(CollectToList())
+        sink.drain_stream(
+            [b"ab", bytearray(b"cde"), memoryview(b"fghi").cast("H")],
+        )
+
+        assert [_e.payload_size for _e in self._exporter.events] == [2, 3, 4]
+
+    def test_exporter_errors_do_not_disrupt_the_components(self) -> None:
+        """Errors raised by exporters should be logged and ignored."""
+        failing = FailingExporter()
+        register_exporter(failing)
+        try:
+            with self.assertLogs(level="ERROR") as logs:
+                assert InstrumentedSource(WordsSupplier()).draw() == [
+                    "ab",
+                    "cde",
+                    "f",
+                ]
+        finally:
+            unregister_exporter(failing)
+
+        assert "failed to export an event" in logs.output[0]
+        assert len(self._exporter.events) == 1
+
+    def test_executors_instrument_workflows_when_enabled(self) -> None:
+        """Workflows run by the executors should be instrumented when
+        instrumentation is enabled, and tagged with the workflow's id.
+        """  # noqa: D205
+        workflow = WordsWorkflow()
+        PipelinedWorkflowExecutor().execute(workflow)
+
+        assert workflow.collection_target == ["ab", "cde", "f"]
+        assert {_e.stage for _e in self._exporter.events} == set(Stage)
+        assert {_e.workflow_id for _e in self._exporter.events} == {"words"}
+
+
+class TestExporters(InstrumentationTestCase):
+    """Tests for the bundled :class:`InstrumentationExporter` classes."""
+
+    def test_in_memory_exporter_clear(self) -> None:
+        """:meth:`InMemoryExporter.clear` should discard all events."""
+        InstrumentedSource(WordsSupplier()).draw()
+        assert self._exporter.events
+
+        self._exporter.clear()
+        assert not self._exporter.events
+
+    def test_logging_exporter_logs_every_event(self) -> None:
+        """:class:`LoggingExporter` should log successful events at the given
+        level and failed events at the ``ERROR`` level.
+        """  # noqa: D205
+        logger = logging.getLogger("test.instrumentation")
+        exporter = LoggingExporter(logger, level=logging.WARNING)
+        exporter.export(StageEvent("wf", Stage.DRAW, "a.B", 0.5, 1, 2))
+        with self.assertLogs(logger, level="WARNING") as logs:
+            exporter.export(StageEvent("wf", Stage.DRAW, "a.B", 0.5, 1, 2))
+            exporter.export(
+                StageEvent("wf", Stage.DRAIN, "a.C", 0.1, error=ValueError()),
+            )
+
+        assert logs.records[0].levelno == logging.WARNING
+        assert "a.B draw took 0.500000s" in logs.output[0]
+        assert logs.records[1].levelno == logging.ERROR
+
+    def test_prometheus_exporter_writes_aggregated_metrics(self) -> None:
+        """:class:`PrometheusTextFileExporter` should aggregate events per
+        workflow and stage, and write them using the Prometheus text format.
+        """  # noqa: D205
+        with TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir, "metrics.prom")
+            exporter = PrometheusTextFileExporter(path)
+            exporter.export(StageEvent('w"1', Stage.DRAW, "a.B", 0.5, 2, 10))
+            exporter.export(StageEvent('w"1', Stage.DRAW, "a.B", 0.25, 3))
+            exporter.export(
+                StageEvent(None, Stage.DRAIN, "a.C", 1.0, error=ValueError()),
+            )
+            exporter.write()
+
+            assert exporter.path == path
+            content = path.read_text(encoding="utf-8")
+
+        labels = 'workflow_id="w\\"1",stage="draw"'
+        assert f"sghi_etl_stage_calls_total{{{labels}}} 2.0" in content
+        assert f"sghi_etl_stage_items_total{{{labels}}} 5.0" in content
+        assert f"sghi_etl_stage_payload_bytes_total{{{labels}}} 10.0" in (
+            content
+        )
+        assert (
+            f"sghi_etl_stage_duration_seconds_total{{{labels}}} 0.75"
+            in content
+        )
+        assert (
+            'sghi_etl_stage_errors_total{workflow_id="",stage="drain"} 1.0'
+            in content
+        )
+        assert "# TYPE sghi_etl_stage_calls_total counter" in content
+
+    def test_prometheus_exporter_fails_on_none_path(self) -> None:
+        """:class:`PrometheusTextFileExporter` constructor should raise a
+        :exc:`ValueError` when given a ``None`` path.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'path' MUST not be None."):
+            PrometheusTextFileExporter(None)  # type: ignore
@@ -0,0 +1,723 @@
+"""Tests for the ``sghi.etl.pooling`` module."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from itertools import count
+from typing import TYPE_CHECKING, cast
+from unittest import TestCase
+
+import pytest
+from typing_extensions import override
+from workflow_helpers import (
+    CollectSink,
+    ComponentsWorkflow,
+    IdentityProcessor,
+)
+
+from sghi.disposable import ResourceDisposedError, not_disposed
+from sghi.etl.core import Sink, Source
+from sghi.etl.executors import PipelinedWorkflowExecutor
+from sghi.etl.incremental import (
+    Increment,
+    IncrementalSource,
+    IncrementalWorkflowDefinition,
+    SQLiteCheckpointStore,
+)
+from sghi.etl.pooling import (
+    ComponentPool,
+    PooledWorkflowDefinition,
+    PoolExhaustedError,
+    WorkflowComponents,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Iterator
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+_IDS = count()
+
+
+@dataclass(slots=True)
+class ConnectionSource(Source[list[int]]):
+    """A :class:`Source` that stands in for an expensive connection."""
+
+    identity: int = field(default_factory=lambda: next(_IDS))
+    healthy: bool = field(default=True)
+    fail: bool = field(default=False)
+    fail_on_dispose: bool = field(default=False)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw(self) -> list[int]:
+        if self.fail:
+            _err_msg: str = "Connection lost."
+            raise ConnectionError(_err_msg)
+        return [self.identity]
+
+    @not_disposed
+    @override
+    def stream(self) -> Iterator[list[int]]:
+        yield self.draw()
+        yield self.draw()
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        if self.fail_on_dispose:
+            _err_msg: str = "Cannot close the connection."
+            raise ConnectionError(_err_msg)
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class BufferingSink(Sink[list[int]]):
+    """A :class:`Sink` that only writes the values it drains once disposed."""
+
+    written: list[int]
+    buffered: list[int] = field(default_factory=list)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: list[int]) -> None:
+        self.buffered.extend(processed_data)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self.written.extend(self.buffered)
+        self.buffered.clear()
+        self._is_disposed = True
+
+
+class ConnectionWorkflow(ComponentsWorkflow[list[int], list[int]]):
+    """A workflow that records the sources it creates and the data drained
+    by its sinks.
+    """  # noqa: D205
+
+    __slots__ = ("drained", "sources")
+
+    def __init__(
+        self,
+        sink_factory: Callable[[list[int]], Sink[list[int]]] = CollectSink,
+    ) -> None:
+        """Create a new ``ConnectionWorkflow`` whose sinks, created using
+        ``sink_factory``, drain to :attr:`drained`.
+        """  # noqa: D205
+        self.drained: list[int] = []
+        self.sources: list[ConnectionSource] = []
+        super().__init__(
+            source_factory=self._create_source,
+            sink_factory=lambda: sink_factory(self.drained),
+        )
+
+    def _create_source(self) -> Source[list[int]]:
+        self.sources.append(ConnectionSource())
+        return self.sources[-1]
+
+
+@dataclass(slots=True)
+class RowsSource(IncrementalSource[list[int], int]):
+    """An :class:`IncrementalSource` over a list of row ids, using the last
+    seen row id as the watermark.
+    """  # noqa: D205
+
+    rows: list[int]
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw_since(self, watermark: int | None) -> Increment[list[int], int]:
+        new_rows = [row for row in self.rows if row > (watermark or 0)]
+        return Increment(new_rows, new_rows[-1] if new_rows else None)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+class FlakyFactory:
+    """Creates :class:`ConnectionSource` instances, failing on demand."""
+
+    __slots__ = ("calls", "created", "failing_calls", "on_create")
+
+    def __init__(self, *failing_calls: int) -> None:
+        """Create a factory that fails on the given calls, counted from 1."""
+        super().__init__()
+        self.calls: int = 0
+        self.created: list[ConnectionSource] = []
+        self.failing_calls: tuple[int, ...] = failing_calls
+        self.on_create: Callable[[], object] = lambda: None
+
+    def __call__(self) -> ConnectionSource:
+        """Create a new source, or fail if this call is a failing one."""
+        self.calls += 1
+        if self.calls in self.failing_calls:
+            _err_msg: str = "Cannot connect."
+            raise ConnectionError(_err_msg)
+        self.on_create()
+        self.created.append(ConnectionSource())
+        return self.created[-1]
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestComponentPool(TestCase):
+    """Tests for the :class:`sghi.etl.pooling.ComponentPool` class."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._instance: ComponentPool[ConnectionSource] = ComponentPool(
+            factory=ConnectionSource,
+            max_size=2,
+            health_check=lambda _source: _source.healthy,
+        )
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._instance.dispose()
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`ComponentPool` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'factory' MUST not be None."):
+            ComponentPool(factory=None)  # type: ignore
+        with pytest.raises(ValueError, match="'max_size' MUST be greater"):
+            ComponentPool(factory=ConnectionSource, max_size=0)
+        with pytest.raises(ValueError, match="'min_size' MUST not be"):
+            ComponentPool(factory=ConnectionSource, min_size=2, max_size=1)
+        with pytest.raises(ValueError, match="'max_idle_time' MUST be"):
+            ComponentPool(factory=ConnectionSource, max_idle_time=0)
+
+    def test_released_components_are_reused(self) -> None:
+        """:meth:`ComponentPool.lease` should hand out released components
+        instead of creating new ones.
+        """  # noqa: D205
+        first = self._instance.lease()
+        self._instance.release(first)
+        second = self._instance.lease()
+
+        assert second is first
+        assert self._instance.min_size == 0
+        assert self._instance.max_size == 2  # noqa: PLR2004
+        assert self._instance.size == 1
+        assert self._instance.leased_count == 1
+        assert self._instance.idle_count == 0
+        with pytest.raises(ValueError, match="not leased from this pool"):
+            self._instance.release(ConnectionSource())
+
+    def test_unhealthy_and_discarded_components_are_disposed(self) -> None:
+        """:class:`ComponentPool` should dispose components that fail the
+        health check or are discarded, and replace them.
+        """  # noqa: D205
+        unhealthy = self._instance.lease()
+        unhealthy.healthy = False
+        self._instance.release(unhealthy)
+        replacement = self._instance.lease()
+
+        assert replacement is not unhealthy
+        assert unhealthy.is_disposed
+
+        self._instance.release(replacement)
+        with (  # noqa: PT012
+            pytest.raises(ConnectionError),
+            self._instance.leased() as source,
+        ):
+            source.fail = True
+            source.draw()
+        assert source is replacement
+        assert replacement.is_disposed
+        assert self._instance.size == 0
+
+    def test_health_check_errors_discard_the_component(self) -> None:
+        """:meth:`ComponentPool.lease` should treat components whose health
+        check raises an error as unhealthy.
+        """  # noqa: D205
+
+        def health_check(source: ConnectionSource) -> bool:
+            if source.fail:
+                _err_msg: str = "Cannot check the connection."
+                raise ConnectionError(_err_msg)
+            return True
+
+        instance: ComponentPool[ConnectionSource] = ComponentPool(
+            factory=ConnectionSource,
+            health_check=health_check,
+        )
+        with instance:
+            broken = instance.lease()
+            broken.fail = True
+            instance.release(broken)
+
+            assert instance.lease() is not broken
+            assert broken.is_disposed
+
+    def test_factory_errors_free_the_reserved_room(self) -> None:
+        """:meth:`ComponentPool.lease` should propagate the errors raised by
+        the factory without counting the failed component towards the size.
+        """  # noqa: D205
+        factory = FlakyFactory(1)
+        instance: ComponentPool[ConnectionSource] = ComponentPool(
+            factory=factory,
+            max_size=1,
+        )
+        with instance:
+            with pytest.raises(ConnectionError, match="Cannot connect."):
+                instance.lease(timeout=0)
+            assert instance.size == 0
+            assert instance.lease(timeout=0) is factory.created[0]
+
+    def test_factory_errors_during_instantiation_leak_nothing(self) -> None:
+        """:class:`ComponentPool` constructor should dispose the components
+        it already created if the factory fails while filling the pool.
+        """  # noqa: D205
+        factory = FlakyFactory(3)
+        with pytest.raises(ConnectionError, match="Cannot connect."):
+            ComponentPool(factory=factory, min_size=3, max_size=3)
+
+        assert len(factory.created) == 2  # noqa: PLR2004
+        assert all(_source.is_disposed for _source in factory.created)
+
+    def test_the_minimum_size_is_topped_up(self) -> None:
+        """:class:`ComponentPool` should replace the components it disposes
+        on release to keep its minimum size, retrying failed replacements
+        when evicting idle components.
+        """  # noqa: D205
+        factory = FlakyFactory(3)
+        instance: ComponentPool[ConnectionSource] = ComponentPool(
+            factory=factory,
+            min_size=1,
+            max_size=2,
+        )
+        with instance:
+            first = instance.lease()
+            instance.release(first, discard=True)
+            assert instance.idle_count == 1
+            second = instance.lease()
+            assert second is not first
+
+            # Replacing the second component fails, but is retried.
+            instance.release(second, discard=True)
+            assert instance.size == 0
+            assert instance.evict_idle() == 0
+            assert instance.idle_count == 1
+            assert factory.calls == 4  # noqa: PLR2004
+
+            # Components created once the pool is disposed are disposed.
+            third = instance.lease()
+            factory.on_create = instance.dispose
+            instance.release(third, discard=True)
+
+        assert instance.size == 0
+        assert all(_source.is_disposed for _source in factory.created)
+
+    def test_lease_waits_for_a_component_when_full(self) -> None:
+        """:meth:`ComponentPool.lease` should wait for a release when the
+        pool is full and fail once the timeout elapses.
+        """  # noqa: D205
+        first = self._instance.lease()
+        self._instance.lease()
+        with pytest.raises(PoolExhaustedError, match="components are leased"):
+            self._instance.lease(timeout=0.01)
+
+        timer = threading.Timer(0.05, self._instance.release, args=(first,))
+        timer.start()
+        assert self._instance.lease(timeout=5) is first
+        timer.join()
+
+    def test_idle_components_are_evicted(self) -> None:
+        """:meth:`ComponentPool.evict_idle` should dispose components idle for
+        longer than the maximum idle time, keeping the minimum size.
+        """  # noqa: D205
+        instance: ComponentPool[ConnectionSource] = ComponentPool(
+            factory=ConnectionSource,
+            min_size=1,
+            max_size=3,
+            max_idle_time=0.01,
+        )
+        with instance:
+            sources = [instance.lease() for _ in range(3)]
+            for source in sources:
+                instance.release(source)
+            time.sleep(0.02)
+
+            assert instance.evict_idle() == 2  # noqa: PLR2004
+            assert instance.size == 1
+            assert [_source.is_disposed for _source in sources] == [
+                True,
+                True,
+                False,
+            ]
+
+    def test_expired_components_are_evicted_on_use(self) -> None:
+        """:class:`ComponentPool` should evict the components idle for longer
+        than the maximum idle time whenever a component is leased or
+        released.
+        """  # noqa: D205
+        instance: ComponentPool[ConnectionSource] = ComponentPool(
+            factory=ConnectionSource,
+            max_size=3,
+            max_idle_time=0.05,
+        )
+        with instance:
+            first, second, third = (instance.lease() for _ in range(3))
+            instance.release(first)
+            time.sleep(0.1)
+            instance.release(second)
+            assert first.is_disposed
+            time.sleep(0.1)
+            with instance.leased() as leased:
+                assert leased is not second
+            assert second.is_disposed
+            instance.release(third)
+
+            assert instance.idle_count == 2  # noqa: PLR2004
+
+    def test_disposal_errors_are_logged(self) -> None:
+        """:class:`ComponentPool` should log, not raise, the errors raised
+        while disposing a component.
+        """  # noqa: D205
+        source = self._instance.lease()
+        source.fail_on_dispose = True
+        with self.assertLogs(level="ERROR") as logs:
+            self._instance.release(source, discard=True)
+
+        assert "Error disposing a pooled component." in logs.output[0]
+
+    def test_disposal_fails_leases_waiting_for_a_component(self) -> None:
+        """:meth:`ComponentPool.lease` should raise a
+        :exc:`ResourceDisposedError` when the pool is disposed while waiting
+        for a component.
+        """  # noqa: D205
+        errors: list[BaseException] = []
+
+        def lease() -> None:
+            try:
+                self._instance.lease()
+            except ResourceDisposedError as exp:
+                errors.append(exp)
+
+        self._instance.lease()
+        self._instance.lease()
+        waiter = threading.Thread(target=lease)
+        waiter.start()
+        time.sleep(0.05)
+        self._instance.dispose()
+        waiter.join()
+
+        assert len(errors) == 1
+
+    def test_dispose_disposes_idle_and_returned_components(self) -> None:
+        """:meth:`ComponentPool.dispose` should dispose the idle components,
+        and the leased ones once they are released.
+        """  # noqa: D205
+        leased = self._instance.lease()
+        idle = self._instance.lease()
+        self._instance.release(idle)
+        self._instance.dispose()
+
+        assert self._instance.is_disposed
+        assert idle.is_disposed
+        assert not leased.is_disposed
+        self._instance.release(leased)
+        assert leased.is_disposed
+        with pytest.raises(ResourceDisposedError):
+            self._instance.lease()
+
+
+class TestPooledWorkflowDefinition(TestCase):
+    """Tests for the :class:`sghi.etl.pooling.PooledWorkflowDefinition`
+    class.
+    """  # noqa: D205
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._workflow: ConnectionWorkflow = ConnectionWorkflow()
+        self._instance: PooledWorkflowDefinition[list[int], list[int]] = (
+            PooledWorkflowDefinition(self._workflow)
+        )
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._instance.dispose()
+
+    def test_instantiation_fails_on_none_workflow(self) -> None:
+        """:class:`PooledWorkflowDefinition` constructor should raise a
+        :exc:`ValueError` when given a ``None`` workflow.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'workflow' MUST not be None."):
+            PooledWorkflowDefinition(None)  # type: ignore
+
+    def test_components_are_reused_across_runs(self) -> None:
+        """:class:`PooledWorkflowDefinition` should reuse the components of
+        the wrapped workflow across runs, and dispose them when disposed.
+        """  # noqa: D205
+        executor = PipelinedWorkflowExecutor()
+        executor.execute(self._instance)
+        executor.execute(self._instance)
+
+        (source,) = self._workflow.sources
+        assert self._instance.id == self._workflow.id
+        assert self._instance.name == self._workflow.name
+        assert self._instance.description is None
+        assert self._workflow.drained == [source.identity] * 4
+        assert not source.is_disposed
+        assert self._instance.pool.idle_count == 1
+
+        self._instance.dispose()
+        assert self._instance.is_disposed
+        assert source.is_disposed
+
+    def test_non_streaming_calls_use_the_leased_components(self) -> None:
+        """The components created by a :class:`PooledWorkflowDefinition`
+        should delegate ``draw``, ``apply`` and ``drain`` to the leased
+        components, and return them to the pool once all are disposed.
+        """  # noqa: D205
+        with (
+            self._instance.source_factory() as source,
+            self._instance.processor_factory() as processor,
+            self._instance.sink_factory() as sink,
+        ):
+            sink.drain(processor.apply(source.draw()))
+
+        assert source.is_disposed
+        assert processor.is_disposed
+        assert sink.is_disposed
+        source.dispose()
+        processor.dispose()
+        sink.dispose()
+        (leased_source,) = self._workflow.sources
+        assert self._workflow.drained == [leased_source.identity]
+        assert self._instance.pool.idle_count == 1
+        assert self._instance.pool.size == 1
+
+    def test_closing_a_stream_early_keeps_the_component(self) -> None:
+        """:class:`PooledWorkflowDefinition` should return components whose
+        streams were closed before the end to the pool for reuse.
+        """  # noqa: D205
+        with self._instance.source_factory() as source:
+            stream = cast("Generator[list[int], None, None]", source.stream())
+            (leased_source,) = self._workflow.sources
+            assert next(stream) == [leased_source.identity]
+            stream.close()
+
+        assert self._instance.pool.idle_count == 1
+        assert not leased_source.is_disposed
+
+    def test_components_are_disposed_after_each_run_unless_pooled(
+        self,
+    ) -> None:
+        """:class:`PooledWorkflowDefinition` should dispose the components of
+        the wrapped workflow at the end of each run, writing out the data
+        their sinks buffer, when ``pool_sinks`` is ``False``.
+        """  # noqa: D205
+        workflow = ConnectionWorkflow(sink_factory=BufferingSink)
+        executor = PipelinedWorkflowExecutor()
+        with PooledWorkflowDefinition(
+            workflow,
+            min_size=1,
+            pool_sinks=False,
+        ) as instance:
+            assert not instance.pool_sinks
+            assert instance.pool.min_size == 0
+            executor.execute(instance)
+
+            (source,) = workflow.sources
+            assert workflow.drained == [source.identity] * 2
+            assert source.is_disposed
+            assert instance.pool.size == 0
+
+        assert self._instance.pool_sinks
+        executor.execute(self._instance)
+        assert self._instance.pool.idle_count == 1
+
+    def test_components_created_out_of_order_are_leased_together(
+        self,
+    ) -> None:
+        """:class:`PooledWorkflowDefinition` should lease a new set of
+        components when a processor or sink is created without a matching
+        source on the same thread.
+        """  # noqa: D205
+        with PooledWorkflowDefinition(self._workflow, max_size=2) as instance:
+            with instance.sink_factory() as sink:
+                sink.drain([1])
+            with (
+                instance.processor_factory() as processor,
+                instance.processor_factory() as other_processor,
+            ):
+                assert processor.apply([2]) == [2]
+                assert other_processor.apply([3]) == [3]
+
+            assert self._workflow.drained == [1]
+            assert len(self._workflow.sources) == 2  # noqa: PLR2004
+            assert instance.pool.idle_count == 2  # noqa: PLR2004
+
+    def test_pooled_incremental_workflows_can_be_rerun(self) -> None:
+        """Pooling the components of an
+        :class:`~sghi.etl.incremental.IncrementalWorkflowDefinition` should
+        keep each source paired with its sink across runs, whether or not
+        sinks are pooled.
+        """  # noqa: D205
+        for pool_sinks in (False, True):
+            rows: list[int] = [1, 2]
+            drained: list[int] = []
+            workflow = ComponentsWorkflow(
+                source_factory=lambda rows=rows: RowsSource(rows),
+                sink_factory=lambda drained=drained: CollectSink(drained),
+            )
+            executor = PipelinedWorkflowExecutor()
+            with (
+                SQLiteCheckpointStore(":memory:") as store,
+                PooledWorkflowDefinition(
+                    IncrementalWorkflowDefinition(workflow, store),
+                    pool_sinks=pool_sinks,
+                ) as instance,
+            ):
+                executor.execute(instance)
+                rows.append(3)
+                executor.execute(instance)
+
+                assert drained == [1, 2, 3]
+                assert store.load("test") == 3  # noqa: PLR2004
+
+    def test_pooled_incremental_workflows_can_run_concurrently(self) -> None:
+        """Pooling several sets of components of an
+        :class:`~sghi.etl.incremental.IncrementalWorkflowDefinition` should
+        keep the components of each set paired when runs are concurrent.
+        """  # noqa: D205
+        drained: list[int] = []
+        workflow = ComponentsWorkflow(
+            source_factory=lambda: RowsSource([1, 2, 3]),
+            sink_factory=lambda: CollectSink(drained),
+        )
+        barrier = threading.Barrier(2)
+        with (
+            SQLiteCheckpointStore(":memory:") as store,
+            PooledWorkflowDefinition(
+                IncrementalWorkflowDefinition(workflow, store),
+                min_size=2,
+                max_size=2,
+            ) as instance,
+        ):
+            assert instance.pool.idle_count == 2  # noqa: PLR2004
+
+            def run() -> None:
+                with instance.source_factory() as source:
+                    raw_data = source.draw()
+                    # Both runs draw the rows before either commits.
+                    barrier.wait()
+                    with (
+                        instance.processor_factory() as processor,
+                        instance.sink_factory() as sink,
+                    ):
+                        sink.drain(processor.apply(raw_data))
+
+            threads = [threading.Thread(target=run) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert sorted(drained) == [1, 1, 2, 2, 3, 3]
+            assert store.load("test") == 3  # noqa: PLR2004
+            assert instance.pool.idle_count == 2  # noqa: PLR2004
+
+    def test_factory_errors_during_instantiation_leak_nothing(self) -> None:
+        """:class:`PooledWorkflowDefinition` constructor should dispose the
+        components it already created if creating the next one fails.
+        """  # noqa: D205
+
+        def failing_sink_factory(_: list[int]) -> Sink[list[int]]:
+            _err_msg: str = "Cannot open the sink."
+            raise OSError(_err_msg)
+
+        workflow = ConnectionWorkflow(sink_factory=failing_sink_factory)
+        with pytest.raises(OSError, match="Cannot open the sink."):
+            PooledWorkflowDefinition(workflow, min_size=1)
+
+        (source,) = workflow.sources
+        assert source.is_disposed
+
+    def test_failed_components_are_not_reused(self) -> None:
+        """:class:`PooledWorkflowDefinition` should discard the components
+        of a run in which one raised an error and create new ones for the next
+        run.
+        """  # noqa: D205
+        executor = PipelinedWorkflowExecutor()
+        executor.execute(self._instance)
+        self._workflow.sources[0].fail = True
+        with pytest.raises(ConnectionError, match="Connection lost."):
+            executor.execute(self._instance)
+        executor.execute(self._instance)
+
+        first, second = self._workflow.sources
+        assert first.is_disposed
+        assert not second.is_disposed
+        assert self._instance.pool.size == 1
+
+
+class TestWorkflowComponents(TestCase):
+    """Tests for the :class:`sghi.etl.pooling.WorkflowComponents` class."""
+
+    def test_instantiation_fails_on_none_components(self) -> None:
+        """:class:`WorkflowComponents` constructor should raise a
+        :exc:`ValueError` when given a ``None`` component.
+        """  # noqa: D205
+        source = ConnectionSource()
+        processor: IdentityProcessor[list[int]] = IdentityProcessor()
+        sink: CollectSink[list[int]] = CollectSink()
+        with pytest.raises(ValueError, match="'source' MUST not be None."):
+            WorkflowComponents(None, processor, sink)  # type: ignore
+        with pytest.raises(ValueError, match="'processor' MUST not be None."):
+            WorkflowComponents(source, None, sink)  # type: ignore
+        with pytest.raises(ValueError, match="'sink' MUST not be None."):
+            WorkflowComponents(source, processor, None)  # type: ignore
+
+    def test_dispose_disposes_all_components(self) -> None:
+        """Disposing a :class:`WorkflowComponents` instance should dispose
+        all its components, even if disposing one of them fails.
+        """  # noqa: D205
+        source = ConnectionSource(fail_on_dispose=True)
+        processor: IdentityProcessor[list[int]] = IdentityProcessor()
+        sink: CollectSink[list[int]] = CollectSink()
+        instance = WorkflowComponents(source, processor, sink)
+        assert instance.source is source
+        assert instance.processor is processor
+        assert instance.sink is sink
+
+        with pytest.raises(ConnectionError, match="close the connection"):
+            instance.dispose()
+        instance.dispose()
+
+        assert instance.is_disposed
+        assert processor.is_disposed
+        assert sink.is_disposed
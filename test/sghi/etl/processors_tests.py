@@ -0,0 +1,373 @@
+"""Tests for the ``sghi.etl.processors`` module."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+from unittest import TestCase
+
+import pytest
+from typing_extensions import override
+
+from sghi.disposable import ResourceDisposedError, not_disposed
+from sghi.etl.core import Processor
+from sghi.etl.processors import (
+    ElementwiseProcessor,
+    ParallelProcessor,
+    ProcessorPipe,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+@dataclass(slots=True)
+class SumInts(Processor[list[int], int]):
+    """A :class:`Processor` that sums the integers it receives."""
+
+    delays: dict[int, float] = field(default_factory=dict)
+    disposals: int = field(default=0, init=False)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: list[int]) -> int:
+        result = sum(raw_data)
+        if result < 0:
+            _err_msg: str = "Negative sums are not supported."
+            raise ValueError(_err_msg)
+        time.sleep(self.delays.get(result, 0))
+        return result
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        self.disposals += 1
+
+
+@dataclass(slots=True)
+class AddOne(ElementwiseProcessor[int, int]):
+    """An :class:`ElementwiseProcessor` that increments each element and
+    records the order in which elements are transformed.
+    """  # noqa: D205
+
+    name: str = field(default="add_one")
+    trace: list[str] = field(default_factory=list)
+    fail_dispose: bool = field(default=False)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @override
+    def apply_element(self, raw_element: int) -> int:
+        self.trace.append(f"{self.name}({raw_element})")
+        return raw_element + 1
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        if self.fail_dispose:
+            _err_msg: str = "Dispose failed."
+            raise RuntimeError(_err_msg)
+
+
+@dataclass(slots=True)
+class ReversingAddOne(AddOne):
+    """An :class:`AddOne` that overrides ``apply`` to reverse its results."""
+
+    @override
+    def apply(self, raw_data: Iterable[int]) -> list[int]:
+        return ElementwiseProcessor.apply(self, raw_data)[::-1]
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestElementwiseProcessor(TestCase):
+    """Tests for the :class:`sghi.etl.processors.ElementwiseProcessor`
+    class.
+    """  # noqa: D205
+
+    def test_apply_transforms_each_element(self) -> None:
+        """:meth:`ElementwiseProcessor.apply` should apply
+        :meth:`ElementwiseProcessor.apply_element` to each element and
+        return the results as a list.
+        """  # noqa: D205
+        with AddOne() as instance:
+            assert instance.apply(iter([1, 2, 3])) == [2, 3, 4]
+            assert list(instance.apply_stream([[1], [2, 3]])) == [[2], [3, 4]]
+
+
+class TestParallelProcessor(TestCase):
+    """Tests for the :class:`sghi.etl.processors.ParallelProcessor` class."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._processor: SumInts = SumInts()
+        self._instance: ParallelProcessor[list[int], int]
+        self._instance = ParallelProcessor(self._processor)
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._instance.dispose()
+
+    def test_instantiation_fails_on_none_arguments(self) -> None:
+        """:class:`ParallelProcessor` constructor should raise a
+        :exc:`ValueError` when given a ``None`` processor or executor factory.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'processor' MUST not be None."):
+            ParallelProcessor(None)  # type: ignore
+        with pytest.raises(ValueError, match="'executor_factory' MUST not"):
+            ParallelProcessor(self._processor, None)  # type: ignore
+        with pytest.raises(ValueError, match="'max_in_flight' MUST be"):
+            ParallelProcessor(self._processor, max_in_flight=0)
+
+    def test_apply_returns_results_in_chunk_order_by_default(self) -> None:
+        """:meth:`ParallelProcessor.apply` should return the results in the
+        same order as their chunks by default, regardless of the order in
+        which they complete.
+        """  # noqa: D205
+        self._processor.delays[1] = 0.2
+
+        assert self._instance.ordered
+        assert self._instance.apply([[1], [2, 3], [], [4]]) == [1, 5, 0, 4]
+
+    def test_apply_returns_results_in_completion_order_when_unordered(
+        self,
+    ) -> None:
+        """:meth:`ParallelProcessor.apply` should return the results in the
+        order in which they complete when ``ordered`` is ``False``.
+        """  # noqa: D205
+        instance: ParallelProcessor[list[int], int]
+        instance = ParallelProcessor(SumInts(delays={1: 0.2}), ordered=False)
+        with instance:
+            assert not instance.ordered
+            assert instance.apply([[1], [2, 3], [4]])[-1] == 1
+
+    def test_apply_runs_chunks_concurrently(self) -> None:
+        """:meth:`ParallelProcessor.apply` should process the chunks
+        concurrently on the executor.
+        """  # noqa: D205
+        barrier = threading.Barrier(3, timeout=5)
+
+        @dataclass(slots=True)
+        class WaitForOthers(SumInts):
+            @override
+            def apply(self, raw_data: list[int]) -> int:
+                barrier.wait()
+                return sum(raw_data)
+
+        with ParallelProcessor(WaitForOthers()) as instance:
+            assert instance([[1], [2], [3]]) == [1, 2, 3]
+
+    def test_apply_bounds_the_chunks_in_flight(self) -> None:
+        """:meth:`ParallelProcessor.apply` should not draw more than
+        ``max_in_flight`` chunks ahead of the chunks already processed.
+        """  # noqa: D205
+        processed: list[int] = []
+
+        @dataclass(slots=True)
+        class RecordProcessed(SumInts):
+            @override
+            def apply(self, raw_data: list[int]) -> int:
+                time.sleep(0.01)
+                processed.append(raw_data[0])
+                return sum(raw_data)
+
+        for ordered in (True, False):
+            processed.clear()
+            ahead: list[int] = []
+
+            def chunks(ahead: list[int]) -> Iterator[list[int]]:
+                for value in range(8):
+                    ahead.append(value - len(processed))
+                    yield [value]
+
+            with ParallelProcessor(
+                RecordProcessed(),
+                max_in_flight=2,
+                ordered=ordered,
+            ) as instance:
+                assert instance.max_in_flight == 2  # noqa: PLR2004
+                assert sorted(instance.apply(chunks(ahead))) == list(range(8))
+
+            assert max(ahead) <= 2  # noqa: PLR2004
+
+    def test_apply_propagates_errors_raised_by_the_wrapped_processor(
+        self,
+    ) -> None:
+        """:meth:`ParallelProcessor.apply` should propagate the error raised
+        when processing any of the chunks.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="Negative sums"):
+            self._instance.apply([[1], [-2], [3]])
+
+    def test_apply_works_with_a_process_pool(self) -> None:
+        """:meth:`ParallelProcessor.apply` should work with a
+        :class:`~concurrent.futures.ProcessPoolExecutor`.
+        """  # noqa: D205
+        instance: ParallelProcessor[list[int], int]
+        instance = ParallelProcessor(
+            SumInts(),
+            lambda: ProcessPoolExecutor(max_workers=2),
+        )
+        with instance:
+            assert instance.apply([[1, 2], [3, 4], [5]]) == [3, 7, 5]
+
+    def test_dispose_shuts_down_the_executor_and_the_processor(self) -> None:
+        """:meth:`ParallelProcessor.dispose` should dispose the wrapped
+        processor, after which the ``ParallelProcessor`` is no longer usable.
+        Disposing it again should have no effect.
+        """  # noqa: D205
+        self._instance.dispose()
+        self._instance.dispose()
+
+        assert self._instance.is_disposed
+        assert self._processor.is_disposed
+        assert self._processor.disposals == 1
+        with pytest.raises(ResourceDisposedError):
+            self._instance.apply([[1]])
+
+
+class TestProcessorPipe(TestCase):
+    """Tests for the :class:`sghi.etl.processors.ProcessorPipe` class."""
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`ProcessorPipe` constructor should raise a
+        :exc:`ValueError` when given ``None``, an empty sequence or a
+        sequence containing ``None``.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'processors' MUST not be None"):
+            ProcessorPipe(None)  # type: ignore
+        with pytest.raises(ValueError, match="'processors' MUST not be None"):
+            ProcessorPipe([])
+        with pytest.raises(ValueError, match="MUST not contain None."):
+            ProcessorPipe([AddOne(), None])  # type: ignore
+
+    def test_nested_pipes_are_flattened(self) -> None:
+        """Composing pipes using the ``>>`` operator should produce a single,
+        flat, :class:`ProcessorPipe`.
+        """  # noqa: D205
+        first, second, third = AddOne(), AddOne(), SumInts()
+        with (first >> second) >> third as instance:
+            assert isinstance(instance, ProcessorPipe)
+            assert instance.processors == (first, second, third)
+
+    def test_elementwise_processors_are_fused(self) -> None:
+        """Consecutive :class:`ElementwiseProcessor` instances should be
+        applied to each element in turn, in a single pass.
+        """  # noqa: D205
+        trace: list[str] = []
+        first = AddOne(name="first", trace=trace)
+        second = AddOne(name="second", trace=trace)
+        with ProcessorPipe([first, second, SumInts()]) as instance:
+            assert instance.apply([1, 2]) == 7  # noqa: PLR2004
+
+        assert trace == ["first(1)", "second(2)", "first(2)", "second(3)"]
+
+    def test_elementwise_processors_with_overrides_are_not_fused(
+        self,
+    ) -> None:
+        """:class:`ElementwiseProcessor` instances that override ``apply`` or
+        ``apply_stream`` should not be fused, so that the overrides are used.
+        """  # noqa: D205
+        trace: list[str] = []
+        first = AddOne(name="first", trace=trace)
+        second = ReversingAddOne(name="second", trace=trace)
+        with ProcessorPipe([first, second]) as instance:
+            assert instance.apply([1, 2]) == [4, 3]
+
+        assert trace == ["first(1)", "first(2)", "second(2)", "second(3)"]
+
+    def test_disposed_fused_processors_are_not_applied(self) -> None:
+        """A :class:`ProcessorPipe` should raise a
+        :exc:`ResourceDisposedError` when applying fused processors, one of
+        which has been disposed.
+        """  # noqa: D205
+        first, second = AddOne(), AddOne()
+        with ProcessorPipe([first, second]) as instance:
+            second.dispose()
+            with pytest.raises(ResourceDisposedError, match="fused processor"):
+                instance.apply([1])
+            with pytest.raises(ResourceDisposedError, match="fused processor"):
+                list(instance.apply_stream([[1]]))
+
+        assert first.trace == []
+
+    def test_apply_stream_processes_chunks_one_at_a_time(self) -> None:
+        """:meth:`ProcessorPipe.apply_stream` should pass each chunk through
+        all the members before requesting the next chunk.
+        """  # noqa: D205
+        trace: list[str] = []
+
+        def chunks() -> Iterator[list[int]]:
+            for chunk in ([1], [2, 3]):
+                trace.append(f"draw({chunk})")
+                yield chunk
+
+        pipe = AddOne(trace=trace) >> AddOne(trace=trace) >> SumInts()
+        with pipe as instance:
+            assert list(instance.apply_stream(chunks())) == [3, 9]
+
+        assert trace == [
+            "draw([1])",
+            "add_one(1)",
+            "add_one(2)",
+            "draw([2, 3])",
+            "add_one(2)",
+            "add_one(3)",
+            "add_one(3)",
+            "add_one(4)",
+        ]
+
+    def test_dispose_disposes_all_the_members(self) -> None:
+        """:meth:`ProcessorPipe.dispose` should dispose all the members, even
+        if disposing some of them fails.
+        """  # noqa: D205
+        first, second = AddOne(fail_dispose=True), SumInts()
+        instance = ProcessorPipe([first, second])
+
+        with pytest.raises(RuntimeError, match="Dispose failed."):
+            instance.dispose()
+        instance.dispose()
+
+        assert instance.is_disposed
+        assert first.is_disposed
+        assert second.is_disposed
+        with pytest.raises(ResourceDisposedError):
+            instance.apply([1])
+
+    def test_dispose_marks_flattened_pipes_as_disposed(self) -> None:
+        """:meth:`ProcessorPipe.dispose` should mark the pipes flattened into
+        it, at any depth, as disposed.
+        """  # noqa: D205
+        inner = AddOne() >> AddOne()
+        middle = inner >> SumInts()
+        instance = ProcessorPipe([middle, SumInts()])
+        assert isinstance(inner, ProcessorPipe)
+        assert isinstance(middle, ProcessorPipe)
+
+        instance.dispose()
+
+        assert inner.is_disposed
+        assert middle.is_disposed
+        assert all(_p.is_disposed for _p in instance.processors)
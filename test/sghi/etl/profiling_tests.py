@@ -0,0 +1,292 @@
+"""Tests for the ``sghi.etl.profiling`` module."""
+
+from __future__ import annotations
+
+import json
+import pstats
+import tempfile
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from unittest import TestCase
+
+import pytest
+from typing_extensions import override
+from workflow_helpers import ChunksSource, CollectSink, ComponentsWorkflow
+
+from sghi.disposable import not_disposed
+from sghi.etl.core import Processor
+from sghi.etl.executors import PipelinedWorkflowExecutor
+from sghi.etl.profiling import (
+    ProfiledWorkflowDefinition,
+    ProfilingSettings,
+    disable_profiling,
+    enable_profiling,
+    get_settings,
+    is_enabled,
+)
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+@dataclass(slots=True)
+class Stringify(Processor[list[int], list[str]]):
+    """A :class:`Processor` that converts integers to strings."""
+
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: list[int]) -> list[str]:
+        return [str(_value) * 100 for _value in raw_data]
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+class ProfiledWorkflow(ComponentsWorkflow[list[int], list[str]]):
+    """A workflow whose id needs sanitizing to be used as a directory."""
+
+    __slots__ = ()
+
+    @property
+    @override
+    def id(self) -> str:
+        return "profiled:workflow"
+
+
+def read_summary(report_directory: Path) -> dict[str, dict[str, Any]]:
+    """Return the phases of a profiling report, keyed by their names."""
+    summary = json.loads(
+        (report_directory / "summary.json").read_text(encoding="utf-8"),
+    )
+    return {_phase["phase"]: _phase for _phase in summary["phases"]}
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestRegistry(TestCase):
+    """Tests for the profiling registry."""
+
+    def test_enabling_profiling_is_keyed_by_workflow_id(self) -> None:
+        """:func:`enable_profiling` should only enable profiling for the
+        given workflow, until :func:`disable_profiling` is called.
+        """  # noqa: D205
+        settings = enable_profiling("a", "reports", top_allocations=5)
+        try:
+            assert is_enabled("a")
+            assert not is_enabled("b")
+            assert get_settings("a") == settings
+            assert settings.output_directory == Path("reports")
+            assert settings.top_allocations == 5  # noqa: PLR2004
+        finally:
+            disable_profiling("a")
+        assert not is_enabled("a")
+        disable_profiling("a")
+
+    def test_enable_profiling_fails_on_invalid_arguments(self) -> None:
+        """:func:`enable_profiling` should raise a :exc:`ValueError` when
+        given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'workflow_id' MUST not be"):
+            enable_profiling("", "reports")
+        with pytest.raises(ValueError, match="'output_directory' MUST not"):
+            enable_profiling("a", None)  # type: ignore
+        with pytest.raises(ValueError, match="'top_allocations' MUST be"):
+            enable_profiling("a", "reports", top_allocations=0)
+        assert not is_enabled("a")
+
+
+class TestProfiledWorkflowDefinition(TestCase):
+    """Tests for the
+    :class:`sghi.etl.profiling.ProfiledWorkflowDefinition` class.
+    """  # noqa: D205
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._output_directory: Path = Path(self._temp_dir.name)
+        self._sink: CollectSink[list[str]] = CollectSink()
+        self._workflow: ProfiledWorkflow = ProfiledWorkflow(
+            source_factory=lambda: ChunksSource(
+                [list(range(5)), list(range(5, 10))],
+            ),
+            sink_factory=lambda: self._sink,
+            processor_factory=Stringify,
+        )
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        disable_profiling(self._workflow.id)
+        self._temp_dir.cleanup()
+
+    def test_instantiation_fails_on_none_arguments(self) -> None:
+        """:class:`ProfiledWorkflowDefinition` constructor should raise a
+        :exc:`ValueError` when given ``None`` arguments.
+        """  # noqa: D205
+        settings = ProfilingSettings(self._output_directory)
+        with pytest.raises(ValueError, match="'workflow' MUST not be None."):
+            ProfiledWorkflowDefinition(None, settings)  # type: ignore
+        with pytest.raises(ValueError, match="'settings' MUST not be None."):
+            ProfiledWorkflowDefinition(self._workflow, None)  # type: ignore
+
+    def test_executor_writes_a_report_per_run(self) -> None:
+        """:class:`PipelinedWorkflowExecutor` should profile workflows for
+        which profiling is enabled and write a report for each phase.
+        """  # noqa: D205
+        enable_profiling(self._workflow.id, self._output_directory)
+        PipelinedWorkflowExecutor().execute(self._workflow)
+
+        assert self._sink.drained == [str(_i) * 100 for _i in range(10)]
+        assert not tracemalloc.is_tracing()
+        workflow_directory = self._output_directory / "profiled_workflow"
+        (report_directory,) = workflow_directory.iterdir()
+        summary = json.loads(
+            (report_directory / "summary.json").read_text(encoding="utf-8"),
+        )
+        phases = {_phase["phase"]: _phase for _phase in summary["phases"]}
+
+        assert summary["workflow_id"] == "profiled:workflow"
+        assert set(phases) == {
+            "prologue",
+            "source_factory",
+            "processor_factory",
+            "sink_factory",
+            "draw",
+            "apply",
+            "drain",
+            "epilogue",
+        }
+        assert phases["apply"]["peak_memory_bytes"] > 0
+        assert phases["apply"]["top_allocations"]
+        stats = pstats.Stats(str(report_directory / "apply.pstats"))
+        assert any(
+            _function[2] == "apply"
+            for _function in stats.stats  # type: ignore[attr-defined]
+        )
+
+    def test_memory_tracing_can_be_disabled(self) -> None:
+        """:class:`ProfiledWorkflowDefinition` should not trace memory when
+        asked not to, and should expose the directory of its last report.
+        """  # noqa: D205
+        instance = ProfiledWorkflowDefinition(
+            self._workflow,
+            ProfilingSettings(self._output_directory, trace_memory=False),
+        )
+        assert instance.id == self._workflow.id
+        assert instance.name == self._workflow.name
+        assert instance.description is None
+        assert instance.last_report_directory is None
+        assert not instance.settings.trace_memory
+
+        PipelinedWorkflowExecutor().execute(instance)
+
+        report_directory = instance.last_report_directory
+        assert report_directory is not None
+        summary = json.loads(
+            (report_directory / "summary.json").read_text(encoding="utf-8"),
+        )
+        for phase in summary["phases"]:
+            assert phase["peak_memory_bytes"] is None
+            assert phase["top_allocations"] == []
+            assert (report_directory / phase["stats_file"]).is_file()
+
+    def test_non_streaming_calls_are_profiled(self) -> None:
+        """The components created by a :class:`ProfiledWorkflowDefinition`
+        should profile their ``draw``, ``apply`` and ``drain`` calls, and
+        report the phases that never ran as empty.
+        """  # noqa: D205
+        instance = ProfiledWorkflowDefinition(
+            self._workflow,
+            ProfilingSettings(self._output_directory, top_allocations=1),
+        )
+        # No prologue, the components start a session on first use.
+        source = instance.source_factory()
+        unused_source = instance.source_factory()
+        processor = instance.processor_factory()
+        sink = instance.sink_factory()
+
+        sink.drain(processor.apply(source.draw()))
+        for component in (source, unused_source, processor, sink):
+            component.dispose()
+            assert component.is_disposed
+        instance.epilogue()
+
+        assert self._sink.drained == [str(_i) * 100 for _i in range(10)]
+        report_directory = instance.last_report_directory
+        assert report_directory is not None
+        phases = read_summary(report_directory)
+        assert set(phases) == {
+            "source_factory",
+            "processor_factory",
+            "sink_factory",
+            "draw",
+            "apply",
+            "drain",
+            "epilogue",
+        }
+        assert phases["apply"]["duration_seconds"] > 0
+        assert phases["apply"]["peak_memory_bytes"] > 0
+        assert len(phases["apply"]["top_allocations"]) == 1
+        assert not tracemalloc.is_tracing()
+
+    def test_phases_that_never_ran_report_no_allocations(self) -> None:
+        """:class:`ProfiledWorkflowDefinition` should report phases that
+        were set up but never ran with no memory allocated.
+        """  # noqa: D205
+        instance = ProfiledWorkflowDefinition(
+            self._workflow,
+            ProfilingSettings(self._output_directory),
+        )
+        instance.prologue()
+        with instance.sink_factory():
+            pass
+        instance.epilogue()
+
+        assert instance.last_report_directory is not None
+        phases = read_summary(instance.last_report_directory)
+        assert phases["drain"]["duration_seconds"] == 0
+        assert phases["drain"]["peak_memory_bytes"] == 0
+        assert phases["drain"]["top_allocations"] == []
+
+    def test_overlapping_runs_share_memory_tracing(self) -> None:
+        """:class:`ProfiledWorkflowDefinition` should keep tracing memory
+        until the last of several overlapping runs ends.
+        """  # noqa: D205
+        settings = ProfilingSettings(self._output_directory)
+        first = ProfiledWorkflowDefinition(self._workflow, settings)
+        second = ProfiledWorkflowDefinition(self._workflow, settings)
+
+        first.prologue()
+        second.prologue()
+        first.epilogue()
+        assert tracemalloc.is_tracing()
+        second.epilogue()
+        assert not tracemalloc.is_tracing()
+
+    def test_memory_tracing_started_elsewhere_is_left_running(self) -> None:
+        """:class:`ProfiledWorkflowDefinition` should neither restart nor
+        stop memory tracing that was started by someone else.
+        """  # noqa: D205
+        enable_profiling(self._workflow.id, self._output_directory)
+        tracemalloc.start()
+        try:
+            PipelinedWorkflowExecutor().execute(self._workflow)
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+        assert self._sink.drained == [str(_i) * 100 for _i in range(10)]
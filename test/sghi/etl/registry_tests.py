@@ -0,0 +1,298 @@
+"""Tests for the ``sghi.etl.registry`` module."""
+
+from __future__ import annotations
+
+import json
+import sys
+from importlib.metadata import EntryPoint
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from textwrap import dedent
+from unittest import TestCase
+from unittest.mock import patch
+
+import pytest
+from typing_extensions import override
+
+from sghi.etl.registry import (
+    LazyWorkflowDefinition,
+    WorkflowReference,
+    WorkflowRegistry,
+)
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+_WORKFLOWS_MODULE = "sghi_etl_registry_test_workflows"
+
+_WORKFLOWS_MODULE_SOURCE = dedent(
+    '''
+    """Workflows used by the ``sghi.etl.registry`` tests."""
+
+    from sghi.etl.core import WorkflowDefinition
+
+
+    class HelloWorkflow(WorkflowDefinition):
+        __slots__ = ()
+
+        id = "hello"
+        name = "Hello"
+        description = None
+
+        @property
+        def source_factory(self):
+            return lambda: None
+
+        @property
+        def processor_factory(self):
+            return lambda: None
+
+        @property
+        def sink_factory(self):
+            return lambda: None
+
+
+    hello = HelloWorkflow()
+    not_a_workflow = 42
+
+
+    def make_not_a_workflow():
+        return "hello"
+    ''',
+)
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class _WorkflowsModuleTestCase(TestCase):
+    """Base class for tests needing an importable workflows module."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._temp_dir: TemporaryDirectory[str] = TemporaryDirectory()
+        self._path: Path = Path(self._temp_dir.name)
+        (self._path / f"{_WORKFLOWS_MODULE}.py").write_text(
+            _WORKFLOWS_MODULE_SOURCE,
+        )
+        sys.path.insert(0, self._temp_dir.name)
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        sys.path.remove(self._temp_dir.name)
+        sys.modules.pop(_WORKFLOWS_MODULE, None)
+        self._temp_dir.cleanup()
+
+
+class TestWorkflowReference(_WorkflowsModuleTestCase):
+    """Tests for the :class:`sghi.etl.registry.WorkflowReference` class."""
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`WorkflowReference` constructor should raise a
+        :exc:`ValueError` when given an empty ``id`` or a malformed
+        ``target``.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'id' MUST not be None or"):
+            WorkflowReference(id="", target="module:attribute")
+        with pytest.raises(ValueError, match="'target' MUST be of the form"):
+            WorkflowReference(id="hello", target="module")
+        with pytest.raises(ValueError, match="'target' MUST be of the form"):
+            WorkflowReference(id="hello", target=":attribute")
+
+    def test_load_returns_referenced_workflows(self) -> None:
+        """:meth:`WorkflowReference.load` should return the referenced
+        workflow, calling the referenced object when it is a callable.
+        """  # noqa: D205
+        instance = WorkflowReference("hello", f"{_WORKFLOWS_MODULE}:hello")
+        factory = WorkflowReference(
+            "hello",
+            f"{_WORKFLOWS_MODULE}:HelloWorkflow",
+        )
+
+        assert instance.load().name == "Hello"
+        assert factory.load().name == "Hello"
+
+    def test_load_fails_on_invalid_targets(self) -> None:
+        """:meth:`WorkflowReference.load` should raise a :exc:`TypeError`
+        when the target is not a workflow, nor returns one, and a
+        :exc:`ValueError` when the loaded workflow's id does not match.
+        """  # noqa: D205
+        with pytest.raises(TypeError, match="MUST reference a Workflow"):
+            WorkflowReference(
+                "hello",
+                f"{_WORKFLOWS_MODULE}:not_a_workflow",
+            ).load()
+        with pytest.raises(TypeError, match="instead of a WorkflowDefini"):
+            WorkflowReference(
+                "hello",
+                f"{_WORKFLOWS_MODULE}:make_not_a_workflow",
+            ).load()
+        with pytest.raises(ValueError, match="was expected to have the id"):
+            WorkflowReference("bye", f"{_WORKFLOWS_MODULE}:hello").load()
+
+
+class TestLazyWorkflowDefinition(_WorkflowsModuleTestCase):
+    """Tests for the :class:`sghi.etl.registry.LazyWorkflowDefinition`
+    class.
+    """  # noqa: D205
+
+    def test_instantiation_fails_on_none_reference(self) -> None:
+        """:class:`LazyWorkflowDefinition` constructor should raise a
+        :exc:`ValueError` when given a ``None`` reference.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'reference' MUST not be None."):
+            LazyWorkflowDefinition(None)  # type: ignore
+
+    def test_metadata_does_not_load_the_workflow(self) -> None:
+        """The ``id``, ``name`` and ``description`` of a
+        :class:`LazyWorkflowDefinition` should be served from its reference
+        without importing the workflow's module.
+        """  # noqa: D205
+        reference = WorkflowReference(
+            id="hello",
+            target=f"{_WORKFLOWS_MODULE}:hello",
+            description="Says hello.",
+        )
+        instance = LazyWorkflowDefinition(reference)
+
+        assert instance.id == "hello"
+        assert instance.name == "hello"
+        assert instance.description == "Says hello."
+        assert instance.reference is reference
+        assert not instance.is_loaded
+        assert _WORKFLOWS_MODULE not in sys.modules
+
+    def test_components_are_loaded_on_first_use(self) -> None:
+        """Accessing the factories, prologue or epilogue of a
+        :class:`LazyWorkflowDefinition` should load the referenced workflow
+        once and delegate to it.
+        """  # noqa: D205
+        instance = LazyWorkflowDefinition(
+            WorkflowReference("hello", f"{_WORKFLOWS_MODULE}:HelloWorkflow"),
+        )
+        instance.source_factory()
+
+        assert instance.is_loaded
+        assert _WORKFLOWS_MODULE in sys.modules
+
+        workflow = instance.load()
+        assert instance.load() is workflow
+        assert instance.processor_factory() is None
+        assert instance.sink_factory() is None
+        assert instance.prologue() is None
+        assert instance.epilogue() is None
+
+
+class TestWorkflowRegistry(_WorkflowsModuleTestCase):
+    """Tests for the :class:`sghi.etl.registry.WorkflowRegistry` class."""
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`WorkflowRegistry` constructor should raise a
+        :exc:`ValueError` when given ``None`` or duplicate references.
+        """  # noqa: D205
+        reference = WorkflowReference("hello", f"{_WORKFLOWS_MODULE}:hello")
+        with pytest.raises(ValueError, match="'references' MUST not be None"):
+            WorkflowRegistry(None)  # type: ignore
+        with pytest.raises(ValueError, match="'hello' is already registered"):
+            WorkflowRegistry([reference, reference])
+
+    def test_lookups_do_not_load_workflows(self) -> None:
+        """Registering, listing and looking up workflows in a
+        :class:`WorkflowRegistry` should not load them.
+        """  # noqa: D205
+        registry = WorkflowRegistry()
+        workflow = registry.register(
+            WorkflowReference("hello", f"{_WORKFLOWS_MODULE}:hello", "Hello"),
+        )
+
+        assert len(registry) == 1
+        assert "hello" in registry
+        assert "bye" not in registry
+        assert [w.name for w in registry] == ["Hello"]
+        assert registry.get("hello") is workflow
+        assert _WORKFLOWS_MODULE not in sys.modules
+        with pytest.raises(KeyError, match="No workflow with the id 'bye'"):
+            registry.get("bye")
+
+    def test_from_entry_points_discovers_workflows(self) -> None:
+        """:meth:`WorkflowRegistry.from_entry_points` should register one
+        workflow per entry point in the given group, without loading them.
+        """  # noqa: D205
+        group = "sghi.etl.workflows"
+        discovered = [
+            EntryPoint("hello", f"{_WORKFLOWS_MODULE}:hello", group),
+        ]
+        with patch(
+            "sghi.etl.registry.entry_points",
+            return_value=discovered,
+        ) as entry_points:
+            registry = WorkflowRegistry.from_entry_points()
+
+        entry_points.assert_called_once_with(group=group)
+        assert [w.id for w in registry] == ["hello"]
+        assert _WORKFLOWS_MODULE not in sys.modules
+        assert registry.get("hello").load().name == "Hello"
+
+        with pytest.raises(ValueError, match="'group' MUST not be None or"):
+            WorkflowRegistry.from_entry_points("")
+
+    def test_from_manifest_reads_toml_and_json_manifests(self) -> None:
+        """:meth:`WorkflowRegistry.from_manifest` should register the
+        workflows declared in TOML and JSON manifests.
+        """  # noqa: D205
+        toml_manifest = self._path / "workflows.toml"
+        toml_manifest.write_text(
+            dedent(
+                f"""
+                [[workflows]]
+                id = "hello"
+                name = "Hello"
+                description = "Says hello."
+                target = "{_WORKFLOWS_MODULE}:hello"
+                """,
+            ),
+        )
+        json_manifest = self._path / "workflows.json"
+        json_manifest.write_text(
+            json.dumps(
+                {
+                    "workflows": [
+                        {
+                            "id": "hello",
+                            "target": f"{_WORKFLOWS_MODULE}:hello",
+                        },
+                    ],
+                },
+            ),
+        )
+
+        from_toml = WorkflowRegistry.from_manifest(toml_manifest)
+        from_json = WorkflowRegistry.from_manifest(json_manifest)
+
+        assert from_toml.get("hello").description == "Says hello."
+        assert from_json.get("hello").name == "hello"
+        assert _WORKFLOWS_MODULE not in sys.modules
+
+    def test_from_manifest_fails_on_malformed_manifests(self) -> None:
+        """:meth:`WorkflowRegistry.from_manifest` should raise a
+        :exc:`ValueError` when given a malformed manifest.
+        """  # noqa: D205
+        manifest = self._path / "workflows.json"
+
+        manifest.write_text(json.dumps({"workflows": {"id": "hello"}}))
+        with pytest.raises(ValueError, match="MUST contain a 'workflows'"):
+            WorkflowRegistry.from_manifest(manifest)
+
+        manifest.write_text(json.dumps([]))
+        with pytest.raises(ValueError, match="MUST contain a 'workflows'"):
+            WorkflowRegistry.from_manifest(manifest)
+
+        manifest.write_text(json.dumps({"workflows": [{"id": "hello"}]}))
+        with pytest.raises(ValueError, match="is malformed."):
+            WorkflowRegistry.from_manifest(manifest)
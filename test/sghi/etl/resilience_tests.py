@@ -0,0 +1,329 @@
+"""Tests for the ``sghi.etl.resilience`` module."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from unittest import TestCase
+
+import pytest
+from typing_extensions import override
+
+from sghi.disposable import ResourceDisposedError, not_disposed
+from sghi.etl.core import Sink, Source
+from sghi.etl.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    ResilientSink,
+    ResilientSource,
+    RetryEvent,
+    RetryPolicy,
+)
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+_NO_DELAY: RetryPolicy = RetryPolicy(initial_delay=0, max_delay=0)
+
+
+@dataclass(slots=True)
+class FlakySource(Source[str]):
+    """A :class:`Source` that fails a given number of times before
+    succeeding.
+    """  # noqa: D205
+
+    failures: int = field(default=0)
+    delay: float = field(default=0.0)
+    draws: int = field(default=0)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw(self) -> str:
+        self.draws += 1
+        time.sleep(self.delay)
+        if self.draws <= self.failures:
+            _err_msg: str = f"Draw {self.draws} failed."
+            raise ConnectionError(_err_msg)
+        return "data"
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class FlakySink(Sink[str]):
+    """A :class:`Sink` that fails a given number of times before
+    succeeding.
+    """  # noqa: D205
+
+    failures: int = field(default=0)
+    attempts: int = field(default=0)
+    drained: list[str] = field(default_factory=list)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: str) -> None:
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            _err_msg: str = f"Drain {self.attempts} failed."
+            raise ConnectionError(_err_msg)
+        self.drained.append(processed_data)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestRetryPolicy(TestCase):
+    """Tests for the :class:`sghi.etl.resilience.RetryPolicy` class."""
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`RetryPolicy` constructor should raise a :exc:`ValueError`
+        when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'max_attempts' MUST be"):
+            RetryPolicy(max_attempts=0)
+        with pytest.raises(ValueError, match="'initial_delay' MUST not be"):
+            RetryPolicy(initial_delay=-1)
+        with pytest.raises(ValueError, match="'max_delay' MUST not be less"):
+            RetryPolicy(initial_delay=2, max_delay=1)
+        with pytest.raises(ValueError, match="'multiplier' MUST not be less"):
+            RetryPolicy(multiplier=0.5)
+        with pytest.raises(ValueError, match="'jitter' MUST be between"):
+            RetryPolicy(jitter=2)
+
+    def test_delays_grow_exponentially_up_to_the_maximum(self) -> None:
+        """:meth:`RetryPolicy.delay_for` should grow exponentially, be capped
+        at ``max_delay`` and be reduced by at most ``jitter``.
+        """  # noqa: D205
+        policy = RetryPolicy(initial_delay=1, max_delay=5, jitter=0)
+        assert [policy.delay_for(_a) for _a in range(1, 5)] == [1, 2, 4, 5]
+
+        jittered = RetryPolicy(initial_delay=1, jitter=0.5)
+        assert all(
+            0.5 <= jittered.delay_for(1) <= 1  # noqa: PLR2004
+            for _ in range(100)
+        )
+
+
+class TestCircuitBreaker(TestCase):
+    """Tests for the :class:`sghi.etl.resilience.CircuitBreaker` class."""
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`CircuitBreaker` constructor should raise a
+        :exc:`ValueError` when given non-positive arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'failure_threshold' MUST be"):
+            CircuitBreaker(failure_threshold=0)
+        with pytest.raises(ValueError, match="'reset_timeout' MUST be"):
+            CircuitBreaker(reset_timeout=0)
+
+    def test_breaker_opens_and_recovers(self) -> None:
+        """A :class:`CircuitBreaker` should open after ``failure_threshold``
+        consecutive failures, reject calls while open, and close again once
+        a trial call succeeds.
+        """  # noqa: D205
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        source = FlakySource(failures=3)
+
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                breaker.call(source.draw)
+        assert breaker.state is CircuitState.OPEN
+        with pytest.raises(CircuitOpenError, match="The circuit is open"):
+            breaker.call(source.draw)
+        assert source.draws == 2  # noqa: PLR2004
+
+        time.sleep(0.1)
+        assert breaker.state is CircuitState.HALF_OPEN
+        with pytest.raises(ConnectionError):
+            breaker.call(source.draw)
+        assert breaker.state is CircuitState.OPEN
+
+        time.sleep(0.1)
+        assert breaker.call(source.draw) == "data"
+        assert breaker.state is CircuitState.CLOSED
+        assert breaker.call(source.draw) == "data"
+        assert breaker.state is CircuitState.CLOSED
+
+    def test_concurrent_failures_open_the_breaker_once(self) -> None:
+        """Calls that were let through by a closed :class:`CircuitBreaker`
+        and fail after it opened should keep it open.
+        """  # noqa: D205
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        barrier = threading.Barrier(2)
+
+        def draw() -> str:
+            barrier.wait()
+            _err_msg: str = "Draw failed."
+            raise ConnectionError(_err_msg)
+
+        def call() -> None:
+            with pytest.raises(ConnectionError, match="Draw failed."):
+                breaker.call(draw)
+
+        threads = [threading.Thread(target=call) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert breaker.state is CircuitState.OPEN
+
+
+class TestResilientSource(TestCase):
+    """Tests for the :class:`sghi.etl.resilience.ResilientSource` class."""
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`ResilientSource` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'source' MUST not be None."):
+            ResilientSource(None)  # type: ignore
+        with pytest.raises(ValueError, match="'timeout' MUST be greater"):
+            ResilientSource(FlakySource(), timeout=0)
+
+    def test_draw_retries_transient_failures(self) -> None:
+        """:meth:`ResilientSource.draw` should retry failed draws and report
+        each retry to the hook.
+        """  # noqa: D205
+        events: list[RetryEvent] = []
+        source = FlakySource(failures=2)
+        with ResilientSource(source, _NO_DELAY, on_retry=events.append) as rs:
+            assert rs.draw() == "data"
+            assert list(rs.stream()) == ["data"]
+            assert rs.retries == 2  # noqa: PLR2004
+
+        assert [_event.attempt for _event in events] == [1, 2]
+        assert events[0].operation.endswith("FlakySource.draw")
+        assert isinstance(events[0].error, ConnectionError)
+        assert source.is_disposed
+
+    def test_draw_gives_up_after_max_attempts(self) -> None:
+        """:meth:`ResilientSource.draw` should propagate the last error once
+        all the attempts have failed, and not retry other errors.
+        """  # noqa: D205
+        policy = RetryPolicy(
+            max_attempts=2,
+            initial_delay=0,
+            max_delay=0,
+            retry_on=(ConnectionError,),
+        )
+        with (
+            ResilientSource(FlakySource(failures=5), policy) as instance,
+            pytest.raises(ConnectionError, match="Draw 2 failed."),
+        ):
+            instance.draw()
+
+        instance.dispose()
+        with pytest.raises(ResourceDisposedError):
+            instance.draw()
+
+    def test_draw_times_out_slow_attempts(self) -> None:
+        """:meth:`ResilientSource.draw` should abandon attempts that take
+        longer than the ``timeout``.
+        """  # noqa: D205
+        policy = RetryPolicy(max_attempts=1)
+        with (
+            ResilientSource(
+                FlakySource(delay=0.5),
+                policy,
+                timeout=0.05,
+            ) as instance,
+            pytest.raises(TimeoutError, match="did not complete within"),
+        ):
+            instance.draw()
+
+    def test_timed_out_attempts_are_only_retried_if_reentrant(self) -> None:
+        """:meth:`ResilientSource.draw` should only retry attempts that timed
+        out, and are therefore still running, when the wrapped source is
+        declared reentrant.
+        """  # noqa: D205
+        source = FlakySource(delay=0.2)
+        with (
+            ResilientSource(source, _NO_DELAY, timeout=0.05) as instance,
+            pytest.raises(TimeoutError, match="did not complete within"),
+        ):
+            instance.draw()
+        assert source.draws == 1
+        assert instance.retries == 0
+
+        source = FlakySource(delay=0.2)
+        with (
+            ResilientSource(
+                source,
+                _NO_DELAY,
+                timeout=0.05,
+                reentrant=True,
+            ) as instance,
+            pytest.raises(TimeoutError, match="did not complete within"),
+        ):
+            instance.draw()
+        assert source.draws == _NO_DELAY.max_attempts
+        assert instance.retries == _NO_DELAY.max_attempts - 1
+
+    def test_open_circuits_are_not_retried(self) -> None:
+        """:meth:`ResilientSource.draw` should not retry calls rejected by an
+        open :class:`CircuitBreaker`.
+        """  # noqa: D205
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        source = FlakySource(failures=5)
+        with (
+            ResilientSource(
+                source,
+                _NO_DELAY,
+                circuit_breaker=breaker,
+            ) as instance,
+            pytest.raises(CircuitOpenError),
+        ):
+            instance.draw()
+
+        assert source.draws == 1
+        assert instance.retries == 1
+
+
+class TestResilientSink(TestCase):
+    """Tests for the :class:`sghi.etl.resilience.ResilientSink` class."""
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`ResilientSink` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'sink' MUST not be None."):
+            ResilientSink(None)  # type: ignore
+        with pytest.raises(ValueError, match="'timeout' MUST be greater"):
+            ResilientSink(FlakySink(), timeout=-1)
+
+    def test_drain_retries_each_chunk(self) -> None:
+        """:meth:`ResilientSink.drain_stream` should retry only the chunks
+        whose drain failed.
+        """  # noqa: D205
+        sink = FlakySink(failures=1)
+        with ResilientSink(sink, _NO_DELAY, timeout=5) as instance:
+            instance.drain_stream(["a", "b"])
+            assert instance.retries == 1
+
+        assert sink.drained == ["a", "b"]
+        assert sink.is_disposed
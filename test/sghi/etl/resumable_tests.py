@@ -0,0 +1,316 @@
+"""Tests for the ``sghi.etl.resumable`` module."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+from unittest import TestCase
+
+import pytest
+from typing_extensions import override
+from workflow_helpers import ChunksSource, CollectSink, ComponentsWorkflow
+
+from sghi.disposable import ResourceDisposedError, not_disposed
+from sghi.etl.core import Processor
+from sghi.etl.executors import PipelinedWorkflowExecutor
+from sghi.etl.incremental import SQLiteCheckpointStore
+from sghi.etl.resumable import (
+    AcknowledgingSink,
+    ResumableSource,
+    ResumableWorkflowDefinition,
+    SeekableSource,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+@dataclass(slots=True)
+class PagesSource(SeekableSource[str]):
+    """A :class:`SeekableSource` over a fixed list of pages that records the
+    pages it draws.
+    """  # noqa: D205
+
+    pages: list[str] = field(default_factory=lambda: ["a", "b", "c", "d"])
+    drawn: list[str] = field(default_factory=list)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw(self) -> str:
+        return "".join(self.stream())
+
+    @not_disposed
+    @override
+    def stream_from(self, position: int) -> Iterator[str]:
+        for page in self.pages[position:]:
+            self.drawn.append(page)
+            yield page
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class UpperCase(Processor[str, str]):
+    """A :class:`Processor` that upper-cases its input."""
+
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: str) -> str:
+        return raw_data.upper()
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestResumableSource(TestCase):
+    """Tests for the :class:`sghi.etl.resumable.ResumableSource` class."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._source: ChunksSource[str] = ChunksSource(["a", "b", "c", "d"])
+        self._store: SQLiteCheckpointStore = SQLiteCheckpointStore(":memory:")
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._store.dispose()
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`ResumableSource` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'source' MUST not be None."):
+            ResumableSource(None, self._store, "k")  # type: ignore
+        with pytest.raises(ValueError, match="'store' MUST not be None."):
+            ResumableSource(self._source, None, "k")  # type: ignore
+        with pytest.raises(ValueError, match="'key' MUST not be None or"):
+            ResumableSource(self._source, self._store, "")
+
+    def test_stream_skips_acknowledged_chunks(self) -> None:
+        """:meth:`ResumableSource.stream` should skip the chunks acknowledged
+        in the store, while :meth:`ResumableSource.draw` should not.
+        """  # noqa: D205
+        with ResumableSource(self._source, self._store, "k") as instance:
+            assert instance.key == "k"
+            assert list(instance.stream()) == ["a", "b", "c", "d"]
+            assert instance.resumed_from == 0
+
+            self._store.save("k", 3)
+            assert list(instance.stream()) == ["d"]
+            assert instance.resumed_from == 3  # noqa: PLR2004
+            assert instance.draw() == "abcd"
+
+    def test_stream_seeks_past_acknowledged_chunks(self) -> None:
+        """:meth:`ResumableSource.stream` should start streaming a wrapped
+        :class:`SeekableSource` from the first unacknowledged chunk, without
+        drawing the acknowledged chunks.
+        """  # noqa: D205
+        source = PagesSource()
+        with ResumableSource(source, self._store, "k") as instance:
+            assert list(instance.stream()) == ["a", "b", "c", "d"]
+
+            source.drawn.clear()
+            self._store.save("k", 2)
+            assert list(instance.stream()) == ["c", "d"]
+            assert instance.resumed_from == 2  # noqa: PLR2004
+            assert source.drawn == ["c", "d"]
+            assert instance.draw() == "abcd"
+
+    def test_dispose_disposes_the_wrapped_source(self) -> None:
+        """:meth:`ResumableSource.dispose` should dispose the wrapped source
+        but not the store.
+        """  # noqa: D205
+        instance = ResumableSource(self._source, self._store, "k")
+        instance.dispose()
+        instance.dispose()
+
+        assert instance.is_disposed
+        assert self._source.is_disposed
+        assert not self._store.is_disposed
+        with pytest.raises(ResourceDisposedError):
+            instance.draw()
+
+
+class TestAcknowledgingSink(TestCase):
+    """Tests for the :class:`sghi.etl.resumable.AcknowledgingSink` class."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._store: SQLiteCheckpointStore = SQLiteCheckpointStore(":memory:")
+        self._source: ResumableSource[str] = ResumableSource(
+            ChunksSource(["a", "b", "c", "d"]),
+            self._store,
+            "k",
+        )
+        self._sink: CollectSink[str] = CollectSink()
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._source.dispose()
+        self._store.dispose()
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`AcknowledgingSink` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'sink' MUST not be None."):
+            AcknowledgingSink(None, self._source, self._store)  # type: ignore
+        with pytest.raises(ValueError, match="'source' MUST not be None."):
+            AcknowledgingSink(self._sink, None, self._store)  # type: ignore
+        with pytest.raises(ValueError, match="'store' MUST not be None."):
+            AcknowledgingSink(self._sink, self._source, None)  # type: ignore
+        with pytest.raises(ValueError, match="'checkpoint_interval' MUST"):
+            AcknowledgingSink(self._sink, self._source, self._store, 0)
+
+    def test_progress_is_saved_on_failure_and_cleared_on_success(
+        self,
+    ) -> None:
+        """:meth:`AcknowledgingSink.drain_stream` should save the progress
+        when draining fails and clear it once all chunks are drained.
+        """  # noqa: D205
+        instance = AcknowledgingSink(
+            self._sink,
+            self._source,
+            self._store,
+            checkpoint_interval=10,
+        )
+        with instance:
+            self._sink.fail_on = "c"
+            with pytest.raises(RuntimeError, match="Failed to drain 'c'."):
+                instance.drain_stream(self._source.stream())
+            assert self._store.load("k") == 2  # noqa: PLR2004
+
+            self._sink.fail_on = None
+            instance.drain_stream(self._source.stream())
+            instance.drain("e")
+            assert self._sink.drained == ["a", "b", "c", "d", "e"]
+            assert self._store.load("k") is None
+
+        instance.dispose()
+        assert self._sink.is_disposed
+        assert not self._source.is_disposed
+
+    def test_no_progress_is_saved_when_no_chunk_was_drained(self) -> None:
+        """:meth:`AcknowledgingSink.drain_stream` should save no progress
+        when draining fails before any chunk is drained.
+        """  # noqa: D205
+
+        def failing_chunks() -> Iterator[str]:
+            _err_msg: str = "No chunks."
+            raise RuntimeError(_err_msg)
+            yield ""
+
+        with AcknowledgingSink(self._sink, self._source, self._store) as sink:
+            with pytest.raises(RuntimeError, match="No chunks."):
+                sink.drain_stream(failing_chunks())
+            assert self._store.load("k") is None
+
+
+class TestResumableWorkflowDefinition(TestCase):
+    """Tests for the
+    :class:`sghi.etl.resumable.ResumableWorkflowDefinition` class.
+    """  # noqa: D205
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._source: ChunksSource[str] = ChunksSource(["a", "b", "c", "d"])
+        self._sink: CollectSink[str] = CollectSink()
+        self._store: SQLiteCheckpointStore = SQLiteCheckpointStore(":memory:")
+        self._workflow: ComponentsWorkflow[str, str] = ComponentsWorkflow(
+            source_factory=lambda: self._source,
+            sink_factory=lambda: self._sink,
+            processor_factory=UpperCase,
+        )
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._store.dispose()
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`ResumableWorkflowDefinition` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'workflow' MUST not be None."):
+            ResumableWorkflowDefinition(None, self._store)  # type: ignore
+        with pytest.raises(ValueError, match="'store' MUST not be None."):
+            ResumableWorkflowDefinition(self._workflow, None)  # type: ignore
+        with pytest.raises(ValueError, match="'key' MUST not be None or"):
+            ResumableWorkflowDefinition(self._workflow, self._store, "")
+        with pytest.raises(ValueError, match="'checkpoint_interval' MUST"):
+            ResumableWorkflowDefinition(
+                self._workflow,
+                self._store,
+                checkpoint_interval=0,
+            )
+
+    def test_reruns_skip_already_drained_chunks(self) -> None:
+        """Rerunning a failed :class:`ResumableWorkflowDefinition` should
+        skip the chunks drained by the failed run, and a completed run should
+        leave no progress behind.
+        """  # noqa: D205
+        instance = ResumableWorkflowDefinition(self._workflow, self._store)
+        executor = PipelinedWorkflowExecutor()
+
+        assert instance.id == "test"
+        assert instance.name == "Test Workflow"
+        assert instance.description is None
+        assert instance.key == "test:progress"
+
+        self._sink = CollectSink(fail_on="C")
+        with pytest.raises(RuntimeError, match="Failed to drain 'C'."):
+            executor(instance)
+        assert self._sink.drained == ["A", "B"]
+        assert self._store.load(instance.key) == 2  # noqa: PLR2004
+
+        self._source = ChunksSource(["a", "b", "c", "d"])
+        self._sink = CollectSink()
+        executor(instance)
+        assert self._source.streamed == ["a", "b", "c", "d"]
+        assert self._sink.drained == ["C", "D"]
+        assert self._store.load(instance.key) is None
+
+    def test_sink_must_be_created_after_the_source(self) -> None:
+        """:class:`ResumableWorkflowDefinition` should raise an error when
+        the sink is created before the source.
+        """  # noqa: D205
+        instance = ResumableWorkflowDefinition(
+            self._workflow,
+            self._store,
+            key="custom",
+        )
+
+        with pytest.raises(RuntimeError, match="MUST be created before"):
+            instance.sink_factory()
+        assert instance.processor_factory is UpperCase
+        assert instance.prologue() is None
+        assert instance.epilogue() is None
@@ -0,0 +1,234 @@
+"""Tests for the ``sghi.etl.scheduling`` module."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+from unittest import TestCase
+
+import pytest
+from typing_extensions import override
+
+from sghi.etl.core import Processor, Sink, Source, WorkflowDefinition
+from sghi.etl.executors import WorkflowExecutor
+from sghi.etl.scheduling import (
+    ScheduledWorkflow,
+    WorkflowScheduler,
+    WorkflowStatus,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+@dataclass(frozen=True, slots=True)
+class NamedWorkflow(WorkflowDefinition[Any, Any]):
+    """A :class:`WorkflowDefinition` that is only identified by its id."""
+
+    workflow_id: str
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return None
+
+    @property
+    @override
+    def id(self) -> str:
+        return self.workflow_id
+
+    @property
+    @override
+    def name(self) -> str:
+        return self.workflow_id
+
+    @property
+    @override
+    def processor_factory(self) -> Callable[[], Processor[Any, Any]]:
+        raise NotImplementedError
+
+    @property
+    @override
+    def sink_factory(self) -> Callable[[], Sink[Any]]:
+        raise NotImplementedError
+
+    @property
+    @override
+    def source_factory(self) -> Callable[[], Source[Any]]:
+        raise NotImplementedError
+
+
+@dataclass(slots=True)
+class RecordingExecutor(WorkflowExecutor):
+    """A :class:`WorkflowExecutor` that records the workflows it runs."""
+
+    failing: frozenset[str] = field(default_factory=frozenset)
+    delay: float = field(default=0.05)
+    executed: list[str] = field(default_factory=list)
+    max_concurrency: int = field(default=0)
+    _running: int = field(default=0)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @override
+    def execute(self, workflow: WorkflowDefinition[Any, Any]) -> None:
+        with self._lock:
+            self._running += 1
+            self.max_concurrency = max(self.max_concurrency, self._running)
+        try:
+            time.sleep(self.delay)
+            if workflow.id in self.failing:
+                _err_msg: str = f"Workflow '{workflow.id}' failed."
+                raise RuntimeError(_err_msg)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.executed.append(workflow.id)
+
+
+def _scheduled(
+    workflow_id: str,
+    depends_on: tuple[str, ...] = (),
+    tags: tuple[str, ...] = (),
+) -> ScheduledWorkflow:
+    return ScheduledWorkflow(
+        workflow=NamedWorkflow(workflow_id),
+        depends_on=frozenset(depends_on),
+        tags=frozenset(tags),
+    )
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestWorkflowScheduler(TestCase):
+    """Tests for the :class:`sghi.etl.scheduling.WorkflowScheduler` class."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._executor: RecordingExecutor = RecordingExecutor()
+
+    def test_instantiation_fails_on_invalid_limits(self) -> None:
+        """:class:`WorkflowScheduler` constructor should raise a
+        :exc:`ValueError` when given a ``max_workers`` value or a tag limit
+        that is NOT greater than zero.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'max_workers' MUST be greater"):
+            WorkflowScheduler(max_workers=0)
+        with pytest.raises(ValueError, match="limit of tag 'db'"):
+            WorkflowScheduler(tag_limits={"db": 0})
+
+    def test_properties_return_the_configured_values(self) -> None:
+        """The properties of a :class:`WorkflowScheduler` should return the
+        values given at instantiation.
+        """  # noqa: D205
+        instance = WorkflowScheduler(max_workers=8, tag_limits={"db": 2})
+
+        assert instance.max_workers == 8  # noqa: PLR2004
+        assert instance.tag_limits == {"db": 2}
+
+    def test_run_fails_on_invalid_workflows(self) -> None:
+        """:meth:`WorkflowScheduler.run` should raise a :exc:`ValueError` when
+        given duplicate ids, unknown dependencies or cyclic dependencies.
+        """  # noqa: D205
+        instance = WorkflowScheduler(self._executor)
+
+        with pytest.raises(ValueError, match="'workflows' MUST not be None"):
+            instance.run(None)  # type: ignore
+        with pytest.raises(ValueError, match="Duplicate workflow id 'a'"):
+            instance.run([_scheduled("a"), _scheduled("a")])
+        with pytest.raises(ValueError, match="unknown workflow\\(s\\): z"):
+            instance.run([_scheduled("a", depends_on=("z",))])
+        with pytest.raises(ValueError, match="contain a cycle"):
+            instance.run(
+                [
+                    _scheduled("a", depends_on=("c",)),
+                    _scheduled("b", depends_on=("a",)),
+                    _scheduled("c", depends_on=("b",)),
+                ],
+            )
+        assert not self._executor.executed
+
+    def test_run_executes_workflows_concurrently_up_to_max_workers(
+        self,
+    ) -> None:
+        """:meth:`WorkflowScheduler.run` should run independent workflows
+        concurrently, but never more than ``max_workers`` at a time.
+        """  # noqa: D205
+        instance = WorkflowScheduler(self._executor, max_workers=3)
+        outcomes = instance.run(_scheduled(f"w{_i}") for _i in range(9))
+
+        assert self._executor.max_concurrency == 3  # noqa: PLR2004
+        assert set(outcomes) == {f"w{_i}" for _i in range(9)}
+        for outcome in outcomes.values():
+            assert outcome.status is WorkflowStatus.SUCCEEDED
+            assert outcome.started_at is not None
+            assert outcome.duration > 0
+            assert outcome.error is None
+
+    def test_run_honors_tag_limits(self) -> None:
+        """:meth:`WorkflowScheduler.run` should not run more workflows bearing
+        a limited tag than the tag's limit at the same time.
+        """  # noqa: D205
+        instance = WorkflowScheduler(
+            self._executor,
+            max_workers=4,
+            tag_limits={"db": 1},
+        )
+        outcomes = instance.run(
+            _scheduled(f"w{_i}", tags=("db", "other")) for _i in range(4)
+        )
+
+        assert self._executor.max_concurrency == 1
+        assert len(outcomes) == 4  # noqa: PLR2004
+
+    def test_run_honors_dependencies(self) -> None:
+        """:meth:`WorkflowScheduler.run` should only start a workflow after
+        all its dependencies have succeeded.
+        """  # noqa: D205
+        instance = WorkflowScheduler(self._executor, max_workers=4)
+        instance.run(
+            [
+                _scheduled("load", depends_on=("clean", "enrich")),
+                _scheduled("clean", depends_on=("extract",)),
+                _scheduled("enrich", depends_on=("extract",)),
+                _scheduled("extract"),
+            ],
+        )
+        executed = self._executor.executed
+
+        assert executed[0] == "extract"
+        assert set(executed[1:3]) == {"clean", "enrich"}
+        assert executed[3] == "load"
+
+    def test_run_reports_failures_and_skips_dependents(self) -> None:
+        """:meth:`WorkflowScheduler.run` should report failed workflows and
+        skip, transitively, the workflows that depend on them, while still
+        running the unrelated ones.
+        """  # noqa: D205
+        self._executor.failing = frozenset({"a"})
+        instance = WorkflowScheduler(self._executor)
+        outcomes = instance.run(
+            [
+                _scheduled("a"),
+                _scheduled("b", depends_on=("a",)),
+                _scheduled("c", depends_on=("b",)),
+                _scheduled("d"),
+            ],
+        )
+
+        assert outcomes["a"].status is WorkflowStatus.FAILED
+        assert isinstance(outcomes["a"].error, RuntimeError)
+        assert outcomes["b"].status is WorkflowStatus.SKIPPED
+        assert outcomes["b"].started_at is None
+        assert outcomes["c"].status is WorkflowStatus.SKIPPED
+        assert outcomes["d"].status is WorkflowStatus.SUCCEEDED
+        assert sorted(self._executor.executed) == ["a", "d"]
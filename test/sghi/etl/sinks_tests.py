@@ -0,0 +1,354 @@
+"""Tests for the ``sghi.etl.sinks`` module."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from unittest import TestCase
+
+import pytest
+from typing_extensions import override
+
+from sghi.disposable import ResourceDisposedError, not_disposed
+from sghi.etl.core import Sink
+from sghi.etl.sinks import BatchingSink, FailurePolicy, FanOutSink
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+@dataclass(slots=True)
+class CollectBatches(Sink[list[str]]):
+    """A :class:`Sink` that records every batch it receives.
+
+    Draining fails when ``fail`` is set, or while ``failures`` is positive,
+    in which case it is decremented.
+    """
+
+    batches: list[list[str]] = field(default_factory=list)
+    fail: bool = field(default=False)
+    failures: int = field(default=0)
+    attempted: threading.Event = field(default_factory=threading.Event)
+    drained: threading.Event = field(default_factory=threading.Event)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: list[str]) -> None:
+        self.attempted.set()
+        if self.fail or self.failures > 0:
+            self.failures -= 1
+            _err_msg: str = "Drain failed."
+            raise RuntimeError(_err_msg)
+        self.batches.append(processed_data)
+        self.drained.set()
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class SlowSink(Sink[str]):
+    """A :class:`Sink` that takes a while to drain and can be made to fail."""
+
+    delay: float = field(default=0.0)
+    fail: bool = field(default=False)
+    drained: list[str] = field(default_factory=list)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: str) -> None:
+        time.sleep(self.delay)
+        if self.fail:
+            _err_msg: str = f"Failed to drain '{processed_data}'."
+            raise RuntimeError(_err_msg)
+        self.drained.append(processed_data)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        if self.fail:
+            _err_msg: str = "Dispose failed."
+            raise RuntimeError(_err_msg)
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestBatchingSink(TestCase):
+    """Tests for the :class:`sghi.etl.sinks.BatchingSink` class."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._sink: CollectBatches = CollectBatches()
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`BatchingSink` constructor should raise a :exc:`ValueError`
+        when given ``None`` components or non-positive thresholds.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'sink' MUST not be None."):
+            BatchingSink(None)  # type: ignore
+        with pytest.raises(ValueError, match="'max_items' MUST be greater"):
+            BatchingSink(self._sink, max_items=0)
+        with pytest.raises(ValueError, match="'max_bytes' MUST be greater"):
+            BatchingSink(self._sink, max_bytes=0)
+        with pytest.raises(ValueError, match="'max_latency' MUST be greater"):
+            BatchingSink(self._sink, max_latency=0)
+        with pytest.raises(ValueError, match="'size_of' MUST not be None."):
+            BatchingSink(self._sink, size_of=None)  # type: ignore
+
+    def test_drain_flushes_when_max_items_is_reached(self) -> None:
+        """:meth:`BatchingSink.drain` should drain a batch to the wrapped sink
+        each time ``max_items`` pieces of data have been buffered.
+        """  # noqa: D205
+        with BatchingSink(self._sink, max_items=2) as instance:
+            instance.drain_stream(["a", "b", "c", "d", "e"])
+
+            assert self._sink.batches == [["a", "b"], ["c", "d"]]
+
+        assert self._sink.batches == [["a", "b"], ["c", "d"], ["e"]]
+
+    def test_drain_flushes_when_max_bytes_is_reached(self) -> None:
+        """:meth:`BatchingSink.drain` should drain a batch to the wrapped sink
+        once the combined size of the buffered data reaches ``max_bytes``.
+        """  # noqa: D205
+        instance: BatchingSink[str] = BatchingSink(
+            self._sink,
+            max_bytes=5,
+            size_of=len,
+        )
+        with instance:
+            for value in ("ab", "cde", "f", "ghijk", "l"):
+                instance(value)
+
+            assert self._sink.batches == [["ab", "cde"], ["f", "ghijk"]]
+
+        assert self._sink.batches[-1] == ["l"]
+
+    def test_drain_flushes_when_max_latency_elapses(self) -> None:
+        """Buffered data should be drained to the wrapped sink once it has
+        waited for ``max_latency`` seconds, even if no new data arrives.
+        """  # noqa: D205
+        with BatchingSink(self._sink, max_latency=0.05) as instance:
+            instance.drain("a")
+            instance.drain("b")
+
+            assert self._sink.drained.wait(timeout=5)
+            assert self._sink.batches == [["a", "b"]]
+
+            self._sink.drained.clear()
+            instance.drain("c")
+            assert self._sink.drained.wait(timeout=5)
+            assert self._sink.batches == [["a", "b"], ["c"]]
+
+    def test_flush_drains_buffered_data_immediately(self) -> None:
+        """:meth:`BatchingSink.flush` should drain any buffered data to the
+        wrapped sink and do nothing when the buffer is empty.
+        """  # noqa: D205
+        with BatchingSink(self._sink) as instance:
+            instance.flush()
+            instance.drain("a")
+            instance.flush()
+
+            assert self._sink.batches == [["a"]]
+
+    def test_batches_are_kept_when_draining_them_fails(self) -> None:
+        """A batch that the wrapped sink fails to drain should be kept and
+        drained, together with the data buffered since, by the next flush.
+        """  # noqa: D205
+        self._sink.failures = 1
+        with BatchingSink(self._sink, max_items=2) as instance:
+            instance.drain("a")
+            with pytest.raises(RuntimeError, match="Drain failed."):
+                instance.drain("b")
+            instance.drain("c")
+
+            assert self._sink.batches == [["a", "b", "c"]]
+
+    def test_background_drain_failures_are_retried(self) -> None:
+        """A batch that the wrapped sink fails to drain on the background
+        thread should be logged and retried by the next call to the
+        ``BatchingSink``.
+        """  # noqa: D205
+        self._sink.failures = 1
+        instance = BatchingSink(self._sink, max_latency=0.01)
+        with self.assertLogs(level="ERROR") as logs:
+            instance.drain("a")
+            assert self._sink.attempted.wait(timeout=5)
+            # Waits for the background flush to release the lock.
+            instance.flush()
+
+        assert "will be retried" in logs.output[0]
+        assert self._sink.batches == [["a"]]
+
+        self._sink.failures = 1
+        self._sink.attempted.clear()
+        with self.assertLogs(level="ERROR"):
+            instance.drain("b")
+            assert self._sink.attempted.wait(timeout=5)
+            instance.drain("c")
+
+        instance.dispose()
+        assert self._sink.batches == [["a"], ["b"], ["c"]]
+
+    def test_background_drain_errors_are_reraised(self) -> None:
+        """Errors raised by the wrapped sink when retrying a batch that
+        failed to drain on the background thread should be raised by the
+        call that retried it.
+        """  # noqa: D205
+        self._sink.fail = True
+        with BatchingSink(self._sink, max_latency=0.01) as instance:
+            with self.assertLogs(level="ERROR"):
+                instance.drain("a")
+                assert self._sink.attempted.wait(timeout=5)
+
+                with pytest.raises(RuntimeError, match="Drain failed."):
+                    instance.drain("b")
+            self._sink.fail = False
+
+        assert self._sink.batches == [["a"]]
+
+    def test_dispose_raises_when_the_final_flush_fails(self) -> None:
+        """:meth:`BatchingSink.dispose` should raise the error of a failed
+        final flush, instead of losing the buffered data silently, and still
+        dispose the wrapped sink.
+        """  # noqa: D205
+        self._sink.fail = True
+        instance = BatchingSink(self._sink, max_latency=0.01)
+        with self.assertLogs(level="ERROR"):
+            instance.drain("a")
+            assert self._sink.attempted.wait(timeout=5)
+
+            with pytest.raises(RuntimeError, match="Drain failed."):
+                instance.dispose()
+
+        assert instance.is_disposed
+        assert self._sink.is_disposed
+
+    def test_dispose_flushes_and_disposes_the_wrapped_sink(self) -> None:
+        """:meth:`BatchingSink.dispose` should drain any buffered data and
+        then dispose the wrapped sink, and be safe to call more than once.
+        """  # noqa: D205
+        instance = BatchingSink(self._sink, max_latency=60)
+        instance.drain("a")
+        instance.dispose()
+        instance.dispose()
+
+        assert instance.is_disposed
+        assert self._sink.is_disposed
+        assert self._sink.batches == [["a"]]
+        with pytest.raises(ResourceDisposedError):
+            instance.drain("b")
+
+    def test_dispose_disposes_the_wrapped_sink_even_if_the_flush_fails(
+        self,
+    ) -> None:
+        """:meth:`BatchingSink.dispose` should dispose the wrapped sink even
+        when draining the remaining data fails.
+        """  # noqa: D205
+        instance = BatchingSink(self._sink)
+        instance.drain("a")
+        self._sink.fail = True
+
+        with pytest.raises(RuntimeError, match="Drain failed."):
+            instance.dispose()
+        assert self._sink.is_disposed
+
+
+class TestFanOutSink(TestCase):
+    """Tests for the :class:`sghi.etl.sinks.FanOutSink` class."""
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`FanOutSink` constructor should raise a :exc:`ValueError`
+        when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'sinks' MUST not be None or"):
+            FanOutSink([])
+        with pytest.raises(ValueError, match="'sinks' MUST not contain"):
+            FanOutSink([SlowSink(), None])  # type: ignore
+        with pytest.raises(ValueError, match="'failure_policy' MUST not be"):
+            FanOutSink([SlowSink()], None)  # type: ignore
+        with pytest.raises(ValueError, match="'max_workers' MUST be greater"):
+            FanOutSink([SlowSink()], max_workers=0)
+
+    def test_drain_drains_to_all_sinks_concurrently(self) -> None:
+        """:meth:`FanOutSink.drain` should drain the same data to all the
+        wrapped sinks concurrently.
+        """  # noqa: D205
+        sinks = [SlowSink(delay=0.2) for _ in range(3)]
+        with FanOutSink(sinks) as instance:
+            assert instance.sinks == tuple(sinks)
+            assert instance.failure_policy is FailurePolicy.FAIL_FAST
+
+            started = time.perf_counter()
+            instance.drain("a")
+            assert time.perf_counter() - started < 0.5  # noqa: PLR2004
+            instance.drain_stream(["b", "c"])
+
+        assert all(_sink.drained == ["a", "b", "c"] for _sink in sinks)
+
+    def test_fail_fast_propagates_the_first_error(self) -> None:
+        """With :attr:`FailurePolicy.FAIL_FAST`, :meth:`FanOutSink.drain`
+        should propagate the first error once the sinks that already started
+        draining are done.
+        """  # noqa: D205
+        failing, slow = SlowSink(fail=True), SlowSink(delay=0.2)
+        instance = FanOutSink([failing, slow])
+        with pytest.raises(RuntimeError, match="Failed to drain 'a'."):
+            instance.drain("a")
+
+        assert slow.drained == ["a"]
+        failing.fail = False
+        instance.dispose()
+
+    def test_best_effort_aggregates_errors(self) -> None:
+        """With :attr:`FailurePolicy.BEST_EFFORT`, :meth:`FanOutSink.drain`
+        should drain to all the sinks and then raise all the errors in an
+        :exc:`ExceptionGroup`.
+        """  # noqa: D205
+        sinks = [SlowSink(fail=True), SlowSink(), SlowSink(fail=True)]
+        instance = FanOutSink(sinks, FailurePolicy.BEST_EFFORT)
+        with pytest.raises(ExceptionGroup) as exc_info:
+            instance.drain("a")
+
+        assert len(exc_info.value.exceptions) == 2  # noqa: PLR2004
+        assert sinks[1].drained == ["a"]
+        for sink in sinks:
+            sink.fail = False
+        instance.drain("b")
+        assert all(_sink.drained[-1] == "b" for _sink in sinks)
+        instance.dispose()
+
+    def test_dispose_disposes_all_sinks_in_order(self) -> None:
+        """:meth:`FanOutSink.dispose` should dispose all the wrapped sinks,
+        even if disposing some of them fails, and be safe to call more than
+        once.
+        """  # noqa: D205
+        sinks = [SlowSink(fail=True), SlowSink()]
+        instance = FanOutSink(sinks)
+
+        with pytest.raises(RuntimeError, match="Dispose failed."):
+            instance.dispose()
+        instance.dispose()
+
+        assert instance.is_disposed
+        assert all(_sink.is_disposed for _sink in sinks)
+        with pytest.raises(ResourceDisposedError):
+            instance.drain("a")
@@ -0,0 +1,522 @@
+"""Tests for the ``sghi.etl.sources`` module."""
+
+from __future__ import annotations
+
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import cast
+from unittest import TestCase
+
+import pytest
+from typing_extensions import override
+
+from sghi.disposable import ResourceDisposedError, not_disposed
+from sghi.etl.core import Source
+from sghi.etl.sources import (
+    CachingSource,
+    PartitionedSource,
+    ScatterGatherSource,
+    SourceCache,
+    _modification_time,  # pyright: ignore[reportPrivateUsage]
+)
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+@dataclass(slots=True)
+class CountingSource(Source[list[int]]):
+    """A :class:`Source` that counts how many times it has been drawn."""
+
+    draws: int = field(default=0)
+    delay: float = field(default=0.0)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw(self) -> list[int]:
+        time.sleep(self.delay)
+        self.draws += 1
+        return [self.draws]
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class PartitionSource(Source[str]):
+    """A :class:`Source` that draws a single partition after a delay."""
+
+    partition: str
+    delay: float = field(default=0.0)
+    fail: bool = field(default=False)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw(self) -> str:
+        time.sleep(self.delay)
+        if self.fail:
+            _err_msg: str = f"Failed to draw '{self.partition}'."
+            raise RuntimeError(_err_msg)
+        return self.partition
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+        if self.fail:
+            _err_msg: str = "Dispose failed."
+            raise RuntimeError(_err_msg)
+
+
+@dataclass(slots=True)
+class CountiesSource(PartitionedSource[str, str]):
+    """A :class:`PartitionedSource` with one partition per county."""
+
+    counties: list[str] = field(default_factory=list)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw(self) -> str:
+        return ",".join(self.stream())
+
+    @not_disposed
+    @override
+    def draw_partition(self, partition: str) -> str:
+        return partition.upper()
+
+    @not_disposed
+    @override
+    def partitions(self) -> list[str]:
+        return self.counties
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestSourceCache(TestCase):
+    """Tests for the :class:`sghi.etl.sources.SourceCache` class."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._source: CountingSource = CountingSource()
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`SourceCache` constructor should raise a :exc:`ValueError`
+        when given a ``max_entries``, ``ttl`` or ``max_disk_entries`` that is
+        NOT greater than zero.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'max_entries' MUST be greater"):
+            SourceCache(max_entries=0)
+        with pytest.raises(ValueError, match="'ttl' MUST be greater"):
+            SourceCache(ttl=0)
+        with pytest.raises(ValueError, match="'max_disk_entries' MUST be"):
+            SourceCache(max_disk_entries=0)
+
+    def test_get_or_draw_memoizes_drawn_data(self) -> None:
+        """:meth:`SourceCache.get_or_draw` should only draw from the source
+        when the key is missing.
+        """  # noqa: D205
+        with SourceCache() as cache:
+            assert "k" not in cache
+            assert cache.get_or_draw("k", self._source) == [1]
+            assert cache.get_or_draw("k", self._source) == [1]
+            assert "k" in cache
+        assert self._source.draws == 1
+
+    def test_entries_expire_after_the_ttl(self) -> None:
+        """Entries should be drawn again once their ``ttl`` has elapsed."""
+        with SourceCache(ttl=0.05) as cache:
+            assert cache.get_or_draw("k", self._source) == [1]
+            time.sleep(0.1)
+            assert "k" not in cache
+            assert cache.get_or_draw("k", self._source) == [2]
+
+    def test_least_recently_used_entries_are_evicted(self) -> None:
+        """The least recently used entries should be evicted once more than
+        ``max_entries`` entries are held.
+        """  # noqa: D205
+        with SourceCache(max_entries=2) as cache:
+            cache.get_or_draw("a", self._source)
+            cache.get_or_draw("b", self._source)
+            cache.get_or_draw("a", self._source)
+            cache.get_or_draw("c", self._source)
+
+            assert "a" in cache
+            assert "b" not in cache
+            assert "c" in cache
+
+    def test_concurrent_misses_only_draw_once(self) -> None:
+        """Concurrent calls for the same missing key should only draw from
+        the source once.
+        """  # noqa: D205
+        self._source.delay = 0.05
+        results: list[list[int]] = []
+        with SourceCache() as cache:
+            threads = [
+                threading.Thread(
+                    target=lambda: results.append(
+                        cache.get_or_draw("k", self._source),
+                    ),
+                )
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=5)
+
+        assert results == [[1]] * 4
+        assert self._source.draws == 1
+
+    def test_key_locks_are_removed_once_draws_complete(self) -> None:
+        """:class:`SourceCache` should only keep the locks of the keys being
+        drawn, and draws in flight should complete when the cache is
+        disposed.
+        """  # noqa: D205
+        self._source.delay = 0.1
+        cache = SourceCache()
+        results: list[list[int]] = []
+
+        def draw() -> None:
+            results.append(cache.get_or_draw("k", self._source))
+
+        threads = [threading.Thread(target=draw) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        assert results == [[1], [1]]
+        assert cache._key_locks == {}  # pyright: ignore[reportPrivateUsage]
+
+        cache.invalidate("k")
+        thread = threading.Thread(target=draw)
+        thread.start()
+        time.sleep(0.05)
+        assert "k" in cache._key_locks  # pyright: ignore[reportPrivateUsage]
+        cache.dispose()
+        thread.join(timeout=5)
+
+        assert results == [[1], [1], [2]]
+        assert cache._key_locks == {}  # pyright: ignore[reportPrivateUsage]
+        assert "k" not in cache
+
+    def test_entries_are_shared_through_the_directory(self) -> None:
+        """Entries should be persisted to, and loaded from, the directory so
+        that they are shared between caches, and removed on invalidation.
+        """  # noqa: D205
+        with TemporaryDirectory() as temp_dir:
+            with SourceCache(directory=temp_dir) as cache1:
+                assert cache1.get_or_draw("k", self._source) == [1]
+            # Disposed caches still find entries on disk, but keep none.
+            assert "k" in cache1
+            assert not cache1._entries  # pyright: ignore[reportPrivateUsage]
+            with SourceCache(directory=temp_dir) as cache2:
+                assert cache2.get_or_draw("k", self._source) == [1]
+                cache2.invalidate("k")
+                cache2.invalidate("missing")
+            with SourceCache(directory=temp_dir) as cache3:
+                assert "k" not in cache3
+
+        assert self._source.draws == 1
+
+    def test_expired_entries_are_removed_from_the_directory(self) -> None:
+        """Expired entries should be removed from the directory."""
+        with TemporaryDirectory() as temp_dir:
+            with SourceCache(ttl=0.05, directory=temp_dir) as cache1:
+                cache1.get_or_draw("k", self._source)
+            time.sleep(0.1)
+            with SourceCache(directory=temp_dir) as cache2:
+                assert "k" not in cache2
+            with SourceCache(directory=temp_dir) as cache3:
+                assert cache3.get_or_draw("k", self._source) == [2]
+
+    def test_unreadable_entries_on_disk_are_misses(self) -> None:
+        """Entries on disk that cannot be loaded should be treated as
+        missing and drawn again.
+        """  # noqa: D205
+        with TemporaryDirectory() as temp_dir:
+            with SourceCache(directory=temp_dir) as cache1:
+                cache1.get_or_draw("k", self._source)
+                path = cache1._path_of("k")  # pyright: ignore[reportPrivateUsage]
+            for content in (b"corrupt", pickle.dumps(42)):
+                path.write_bytes(content)
+                with SourceCache(directory=temp_dir) as cache2:
+                    assert "k" not in cache2
+                    cache2.get_or_draw("k", self._source)
+
+        assert self._source.draws == 3  # noqa: PLR2004
+
+    def test_least_recently_used_entries_are_evicted_from_disk(self) -> None:
+        """The least recently used entries on disk should be removed once
+        more than ``max_disk_entries`` entries are held there.
+        """  # noqa: D205
+        with TemporaryDirectory() as temp_dir:
+            with SourceCache(directory=temp_dir, max_disk_entries=2) as cache1:
+                assert cache1.max_disk_entries == 2  # noqa: PLR2004
+                cache1.get_or_draw("a", self._source)
+                cache1.get_or_draw("b", self._source)
+                path_of = cache1._path_of  # pyright: ignore[reportPrivateUsage]
+            os.utime(path_of("a"), (1, 1))
+            os.utime(path_of("b"), (2, 2))
+            with SourceCache(directory=temp_dir, max_disk_entries=2) as cache2:
+                # Loading "a" from disk marks it as recently used.
+                assert "a" in cache2
+                cache2.get_or_draw("c", self._source)
+
+            assert sorted(Path(temp_dir).iterdir()) == sorted(
+                [path_of("a"), path_of("c")],
+            )
+        assert _modification_time(path_of("a")) == 0.0
+
+    def test_dispose_discards_in_memory_entries(self) -> None:
+        """:meth:`SourceCache.dispose` should discard the in-memory entries,
+        after which the cache is no longer usable.
+        """  # noqa: D205
+        cache = SourceCache()
+        cache.get_or_draw("k", self._source)
+        cache.dispose()
+
+        assert cache.is_disposed
+        assert "k" not in cache
+        with pytest.raises(ResourceDisposedError):
+            cache.get_or_draw("k", self._source)
+
+
+class TestCachingSource(TestCase):
+    """Tests for the :class:`sghi.etl.sources.CachingSource` class."""
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self._cache: SourceCache = SourceCache()
+        self._source: CountingSource = CountingSource()
+
+    @override
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._cache.dispose()
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`CachingSource` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'source' MUST not be None."):
+            CachingSource(None, self._cache, "k")  # type: ignore
+        with pytest.raises(ValueError, match="'cache' MUST not be None."):
+            CachingSource(self._source, None, "k")  # type: ignore
+        with pytest.raises(ValueError, match="'key' MUST not be None or"):
+            CachingSource(self._source, self._cache, "")
+
+    def test_draw_is_memoized_across_instances(self) -> None:
+        """:meth:`CachingSource.draw` should return cached data, including
+        across instances sharing the same cache and key.
+        """  # noqa: D205
+        with CachingSource(self._source, self._cache, "k") as instance:
+            assert instance.key == "k"
+            assert instance() == [1]
+            assert list(instance.stream()) == [[1]]
+        with CachingSource(CountingSource(), self._cache, "k") as instance:
+            assert instance.draw() == [1]
+
+        assert self._source.draws == 1
+
+    def test_dispose_disposes_the_wrapped_source(self) -> None:
+        """:meth:`CachingSource.dispose` should dispose the wrapped source but
+        keep the cached entry by default.
+        """  # noqa: D205
+        instance = CachingSource(self._source, self._cache, "k")
+        instance.draw()
+        instance.dispose()
+        instance.dispose()
+
+        assert instance.is_disposed
+        assert self._source.is_disposed
+        assert "k" in self._cache
+        with pytest.raises(ResourceDisposedError):
+            instance.draw()
+
+    def test_dispose_invalidates_the_entry_when_configured(self) -> None:
+        """:meth:`CachingSource.dispose` should remove the cached entry when
+        ``invalidate_on_dispose`` is ``True`` and the cache is still usable.
+        """  # noqa: D205
+        instance = CachingSource(
+            self._source,
+            self._cache,
+            "k",
+            invalidate_on_dispose=True,
+        )
+        with instance:
+            instance.draw()
+            assert "k" in self._cache
+
+        assert "k" not in self._cache
+
+        self._cache.dispose()
+        CachingSource(
+            self._source,
+            self._cache,
+            "k",
+            invalidate_on_dispose=True,
+        ).dispose()
+
+
+class TestScatterGatherSource(TestCase):
+    """Tests for the :class:`sghi.etl.sources.ScatterGatherSource` class."""
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`ScatterGatherSource` constructor and
+        :meth:`ScatterGatherSource.from_partitions` should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'sources' MUST not be None or"):
+            ScatterGatherSource([])
+        with pytest.raises(ValueError, match="'sources' MUST not contain"):
+            ScatterGatherSource([PartitionSource("a"), None])  # type: ignore
+        with pytest.raises(ValueError, match="'max_workers' MUST be greater"):
+            ScatterGatherSource([PartitionSource("a")], max_workers=0)
+        with pytest.raises(ValueError, match="'partitions' MUST not be None"):
+            ScatterGatherSource.from_partitions(
+                None,  # type: ignore
+                PartitionSource,
+            )
+        with pytest.raises(ValueError, match="'source_factory' MUST not be"):
+            ScatterGatherSource.from_partitions(["a"], None)  # type: ignore
+
+    def test_from_partitions_disposes_children_on_failure(self) -> None:
+        """:meth:`ScatterGatherSource.from_partitions` should dispose the
+        children it already created if creating the next one, or the
+        ``ScatterGatherSource`` itself, fails.
+        """  # noqa: D205
+        created: list[PartitionSource] = []
+
+        def source_factory(partition: str) -> PartitionSource:
+            if partition == "c":
+                _err_msg: str = "Cannot connect."
+                raise ConnectionError(_err_msg)
+            created.append(PartitionSource(partition))
+            return created[-1]
+
+        with pytest.raises(ConnectionError, match="Cannot connect."):
+            ScatterGatherSource.from_partitions(
+                ["a", "b", "c"], source_factory
+            )
+        with pytest.raises(ValueError, match="'max_workers' MUST be greater"):
+            ScatterGatherSource.from_partitions(["d"], source_factory, 0)
+
+        assert [_s.partition for _s in created] == ["a", "b", "d"]
+        assert all(_s.is_disposed for _s in created)
+
+    def test_draw_draws_all_partitions_concurrently(self) -> None:
+        """:meth:`ScatterGatherSource.draw` should draw from all the
+        children concurrently and return the data in the children's order.
+        """  # noqa: D205
+        instance: ScatterGatherSource[str] = (
+            ScatterGatherSource.from_partitions(
+                ["a", "b", "c"],
+                lambda _partition: PartitionSource(_partition, delay=0.2),
+            )
+        )
+        with instance:
+            assert instance.ordered
+            sources = cast("tuple[PartitionSource, ...]", instance.sources)
+            assert [_s.partition for _s in sources] == ["a", "b", "c"]
+
+            started = time.perf_counter()
+            assert instance.draw() == ["a", "b", "c"]
+            assert time.perf_counter() - started < 0.5  # noqa: PLR2004
+
+    def test_unordered_stream_yields_partitions_as_they_complete(
+        self,
+    ) -> None:
+        """:meth:`ScatterGatherSource.stream` should yield the data of each
+        child as soon as it is drawn when ``ordered`` is ``False``.
+        """  # noqa: D205
+        sources = [
+            PartitionSource("slow", delay=0.2),
+            PartitionSource("fast"),
+        ]
+        with ScatterGatherSource(sources, ordered=False) as instance:
+            assert list(instance.stream()) == [["fast"], ["slow"]]
+
+    def test_draw_propagates_errors_raised_by_the_children(self) -> None:
+        """:meth:`ScatterGatherSource.draw` should propagate errors raised
+        when drawing from any of the children.
+        """  # noqa: D205
+        sources = [PartitionSource("a"), PartitionSource("b", fail=True)]
+        instance = ScatterGatherSource(sources, max_workers=1)
+        with pytest.raises(RuntimeError, match="Failed to draw 'b'."):
+            instance.draw()
+
+        sources[1].fail = False
+        instance.dispose()
+
+    def test_dispose_disposes_all_the_children(self) -> None:
+        """:meth:`ScatterGatherSource.dispose` should dispose all the
+        children, even if disposing some of them fails, and be safe to call
+        more than once.
+        """  # noqa: D205
+        sources = [PartitionSource("a", fail=True), PartitionSource("b")]
+        instance = ScatterGatherSource(sources)
+
+        with pytest.raises(RuntimeError, match="Dispose failed."):
+            instance.dispose()
+        instance.dispose()
+
+        assert instance.is_disposed
+        assert all(_source.is_disposed for _source in sources)
+        with pytest.raises(ResourceDisposedError):
+            instance.draw()
+
+
+class TestPartitionedSource(TestCase):
+    """Tests for the :class:`sghi.etl.sources.PartitionedSource` class."""
+
+    def test_stream_draws_each_partition_in_order(self) -> None:
+        """:meth:`PartitionedSource.stream` should yield the data of each
+        partition, in the same order as the partitions.
+        """  # noqa: D205
+        instance = CountiesSource(["nairobi", "kisumu", "mombasa"])
+
+        assert list(instance.stream()) == ["NAIROBI", "KISUMU", "MOMBASA"]
+        assert instance.draw() == "NAIROBI,KISUMU,MOMBASA"
+
+    def test_stream_fails_once_disposed(self) -> None:
+        """:meth:`PartitionedSource.stream` should raise a
+        :exc:`ResourceDisposedError` once the source is disposed.
+        """  # noqa: D205
+        instance = CountiesSource(["nairobi"])
+        instance.dispose()
+
+        with pytest.raises(ResourceDisposedError):
+            next(instance.stream())
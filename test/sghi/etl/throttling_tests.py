@@ -0,0 +1,243 @@
+"""Tests for the ``sghi.etl.throttling`` module."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+from unittest import TestCase
+
+import pytest
+from typing_extensions import override
+
+from sghi.disposable import ResourceDisposedError, not_disposed
+from sghi.etl.core import Sink, Source
+from sghi.etl.throttling import (
+    AdaptiveConcurrencyLimiter,
+    RateLimiter,
+    ThrottledSink,
+    ThrottledSource,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# =============================================================================
+# TESTS HELPERS
+# =============================================================================
+
+
+@dataclass(slots=True)
+class CountingSource(Source[int]):
+    """A :class:`Source` that streams a fixed number of chunks."""
+
+    chunks: int = field(default=3)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw(self) -> int:
+        return self.chunks
+
+    @not_disposed
+    @override
+    def stream(self) -> Iterator[int]:
+        yield from range(self.chunks)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class ConcurrencyTrackingSink(Sink[int]):
+    """A :class:`Sink` that records the most drains it saw in flight."""
+
+    delay: float = field(default=0.02)
+    drained: list[int] = field(default_factory=list)
+    max_in_flight: int = field(default=0)
+    _in_flight: int = field(default=0, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: int) -> None:
+        with self._lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self._in_flight -= 1
+            self.drained.append(processed_data)
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+
+
+class TestRateLimiter(TestCase):
+    """Tests for the :class:`sghi.etl.throttling.RateLimiter` class."""
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`RateLimiter` constructor should raise a :exc:`ValueError`
+        when given non-positive arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'rate' MUST be greater"):
+            RateLimiter(rate=0)
+        with pytest.raises(ValueError, match="'capacity' MUST be greater"):
+            RateLimiter(rate=1, capacity=0)
+
+    def test_acquire_allows_bursts_then_limits_the_rate(self) -> None:
+        """:meth:`RateLimiter.acquire` should allow bursts of up to
+        ``capacity`` tokens and then wait for the bucket to be refilled.
+        """  # noqa: D205
+        instance = RateLimiter(rate=50, capacity=2)
+        assert instance.rate == 50  # noqa: PLR2004
+        assert instance.capacity == 2  # noqa: PLR2004
+
+        assert instance.try_acquire()
+        assert instance.acquire() == 0
+        assert not instance.try_acquire()
+
+        started_at = time.monotonic()
+        instance.acquire(2)
+        assert time.monotonic() - started_at >= 0.03  # noqa: PLR2004
+
+    def test_acquire_fails_on_invalid_token_counts(self) -> None:
+        """:meth:`RateLimiter.acquire` should raise a :exc:`ValueError` when
+        asked for a non-positive number of tokens or for more tokens than the
+        bucket can hold.
+        """  # noqa: D205
+        instance = RateLimiter(rate=1)
+        with pytest.raises(ValueError, match="'tokens' MUST be greater"):
+            instance.acquire(0)
+        with pytest.raises(ValueError, match="MUST not exceed the capacity"):
+            instance.try_acquire(2)
+
+
+class TestAdaptiveConcurrencyLimiter(TestCase):
+    """Tests for the
+    :class:`sghi.etl.throttling.AdaptiveConcurrencyLimiter` class.
+    """  # noqa: D205
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """:class:`AdaptiveConcurrencyLimiter` constructor should raise a
+        :exc:`ValueError` when given invalid arguments.
+        """  # noqa: D205
+        with pytest.raises(ValueError, match="'min_limit' MUST be greater"):
+            AdaptiveConcurrencyLimiter(min_limit=0)
+        with pytest.raises(ValueError, match="'max_limit' MUST not be less"):
+            AdaptiveConcurrencyLimiter(min_limit=4, max_limit=2)
+        with pytest.raises(ValueError, match="'initial_limit' MUST be"):
+            AdaptiveConcurrencyLimiter(initial_limit=100)
+        with pytest.raises(ValueError, match="'backoff_ratio' MUST be"):
+            AdaptiveConcurrencyLimiter(backoff_ratio=1)
+        with pytest.raises(ValueError, match="'latency_threshold' MUST be"):
+            AdaptiveConcurrencyLimiter(latency_threshold=0)
+
+    def test_limit_increases_additively_and_decreases_multiplicatively(
+        self,
+    ) -> None:
+        """The limit of an :class:`AdaptiveConcurrencyLimiter` should grow
+        by about one per window of successful calls, and be cut when calls
+        fail or are too slow, within the configured bounds.
+        """  # noqa: D205
+        instance = AdaptiveConcurrencyLimiter(
+            initial_limit=2,
+            max_limit=3,
+            latency_threshold=0.05,
+        )
+        for _ in range(3):
+            with instance.slot():
+                assert instance.in_flight == 1
+        assert instance.limit == 3  # noqa: PLR2004
+        for _ in range(10):
+            with instance.slot():
+                pass
+        assert instance.limit == 3  # noqa: PLR2004
+
+        with pytest.raises(RuntimeError), instance.slot():
+            raise RuntimeError
+        assert instance.limit == 1
+        assert instance.in_flight == 0
+
+        with instance.slot():
+            time.sleep(0.06)
+        assert instance.limit == 1
+
+
+class TestThrottledComponents(TestCase):
+    """Tests for the :class:`sghi.etl.throttling.ThrottledSource` and
+    :class:`sghi.etl.throttling.ThrottledSink` classes.
+    """  # noqa: D205
+
+    def test_instantiation_fails_on_invalid_arguments(self) -> None:
+        """The constructors should raise a :exc:`ValueError` when given a
+        ``None`` component or no limiters.
+        """  # noqa: D205
+        limiter = RateLimiter(rate=1)
+        with pytest.raises(ValueError, match="'source' MUST not be None."):
+            ThrottledSource(None, limiter)  # type: ignore
+        with pytest.raises(ValueError, match="'sink' MUST not be None."):
+            ThrottledSink(None, limiter)  # type: ignore
+        with pytest.raises(ValueError, match="At least one of"):
+            ThrottledSource(CountingSource())
+        with pytest.raises(ValueError, match="At least one of"):
+            ThrottledSink(ConcurrencyTrackingSink())
+
+    def test_source_takes_a_token_per_call(self) -> None:
+        """:class:`ThrottledSource` should take a token for each draw and for
+        each streamed chunk.
+        """  # noqa: D205
+        limiter = RateLimiter(rate=1, capacity=5)
+        source = CountingSource()
+        with ThrottledSource(source, limiter) as instance:
+            assert instance.draw() == 3  # noqa: PLR2004
+            assert list(instance.stream()) == [0, 1, 2]
+            assert not limiter.try_acquire(2)
+
+        assert source.is_disposed
+        with pytest.raises(ResourceDisposedError):
+            instance.draw()
+
+    def test_shared_concurrency_limiter_bounds_calls_in_flight(self) -> None:
+        """A shared :class:`AdaptiveConcurrencyLimiter` should bound the
+        number of drains in flight across all the sinks using it.
+        """  # noqa: D205
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+        sink = ConcurrencyTrackingSink()
+        instances = [
+            ThrottledSink(sink, concurrency_limiter=limiter) for _ in range(3)
+        ]
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            for index in range(6):
+                executor.submit(instances[index % 3].drain, index)
+
+        assert sorted(sink.drained) == list(range(6))
+        assert sink.max_in_flight <= 2  # noqa: PLR2004
+        assert limiter.in_flight == 0
+
+        for instance in instances:
+            instance.dispose()
+            assert instance.is_disposed
+        assert sink.is_disposed
+        with pytest.raises(ResourceDisposedError):
+            instances[0].drain(6)
@@ -0,0 +1,200 @@
+"""Components and workflows shared by the ``sghi.etl`` tests.
+
+The components in this module are deliberately simple and configurable so
+that tests exercising the workflow wrappers, e.g. incremental, resumable,
+profiled, pooled or deduplicating workflows, can build the workflows that
+they wrap without re-declaring a ``Source``, ``Processor``, ``Sink`` and
+``WorkflowDefinition`` of their own.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Generic, TypeVar, cast
+
+from typing_extensions import override
+
+from sghi.disposable import not_disposed
+from sghi.etl.core import Processor, Sink, Source, WorkflowDefinition
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+# =============================================================================
+# TYPES
+# =============================================================================
+
+
+_PDT = TypeVar("_PDT")
+"""Processed Data Type."""
+
+_RDT = TypeVar("_RDT")
+"""Raw Data Type."""
+
+
+# =============================================================================
+# COMPONENTS
+# =============================================================================
+
+
+@dataclass(slots=True)
+class ChunksSource(Source[_RDT], Generic[_RDT]):
+    """A :class:`Source` that streams a fixed list of chunks.
+
+    Drawing returns all the chunks combined using the ``+`` operator, e.g.
+    concatenated strings or lists. Every streamed chunk is recorded in
+    :attr:`streamed` as it is yielded.
+    """
+
+    chunks: list[_RDT]
+    streamed: list[_RDT] = field(default_factory=list)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def draw(self) -> _RDT:
+        drawn: Any = self.chunks[0]
+        for chunk in self.chunks[1:]:
+            drawn = drawn + chunk
+        return drawn
+
+    @not_disposed
+    @override
+    def stream(self) -> Iterator[_RDT]:
+        for chunk in self.chunks:
+            self.streamed.append(chunk)
+            yield chunk
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class IdentityProcessor(Processor[_RDT, _RDT], Generic[_RDT]):
+    """A :class:`Processor` that returns the data it is given."""
+
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def apply(self, raw_data: _RDT) -> _RDT:
+        return raw_data
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+@dataclass(slots=True)
+class CollectSink(Sink[_PDT], Generic[_PDT]):
+    """A :class:`Sink` that collects the items of the data it drains.
+
+    The drained data MUST be iterable, e.g. a string or a list, and its
+    items are appended to :attr:`drained`.
+
+    The sink can be made to fail on every drain, using :attr:`fail`, or on
+    the drain of a given piece of data, using :attr:`fail_on`.
+    """
+
+    drained: list[Any] = field(default_factory=list)
+    fail: bool = field(default=False)
+    fail_on: Any = field(default=None)
+    _is_disposed: bool = field(default=False, init=False)
+
+    @not_disposed
+    @override
+    def drain(self, processed_data: _PDT) -> None:
+        if self.fail or (
+            self.fail_on is not None and processed_data == self.fail_on
+        ):
+            _err_msg: str = f"Failed to drain '{processed_data}'."
+            raise RuntimeError(_err_msg)
+        self.drained.extend(cast("Iterable[Any]", processed_data))
+
+    @property
+    @override
+    def is_disposed(self) -> bool:
+        return self._is_disposed
+
+    @override
+    def dispose(self) -> None:
+        self._is_disposed = True
+
+
+# =============================================================================
+# WORKFLOWS
+# =============================================================================
+
+
+class ComponentsWorkflow(WorkflowDefinition[_RDT, _PDT]):
+    """A :class:`WorkflowDefinition` with configurable component factories.
+
+    The processor factory defaults to creating an
+    :class:`IdentityProcessor`.
+    """
+
+    __slots__ = ("_processor_factory", "_sink_factory", "_source_factory")
+
+    def __init__(
+        self,
+        source_factory: Callable[[], Source[_RDT]],
+        sink_factory: Callable[[], Sink[_PDT]],
+        processor_factory: Callable[
+            [],
+            Processor[_RDT, _PDT],
+        ] = IdentityProcessor,
+    ) -> None:
+        """Create a new ``ComponentsWorkflow`` instance.
+
+        :param source_factory: The factory of the workflow's sources.
+        :param sink_factory: The factory of the workflow's sinks.
+        :param processor_factory: The factory of the workflow's processors.
+            Defaults to creating an ``IdentityProcessor``.
+        """
+        super().__init__()
+        self._source_factory: Callable[[], Source[_RDT]] = source_factory
+        self._sink_factory: Callable[[], Sink[_PDT]] = sink_factory
+        self._processor_factory: Callable[[], Processor[_RDT, _PDT]] = (
+            processor_factory
+        )
+
+    @property
+    @override
+    def description(self) -> str | None:
+        return None
+
+    @property
+    @override
+    def id(self) -> str:
+        return "test"
+
+    @property
+    @override
+    def name(self) -> str:
+        return "Test Workflow"
+
+    @property
+    @override
+    def processor_factory(self) -> Callable[[], Processor[_RDT, _PDT]]:
+        return self._processor_factory
+
+    @property
+    @override
+    def sink_factory(self) -> Callable[[], Sink[_PDT]]:
+        return self._sink_factory
+
+    @property
+    @override
+    def source_factory(self) -> Callable[[], Source[_RDT]]:
+        return self._source_factory